@@ -9,6 +9,9 @@ from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
+from app.utils.autocomplete import Autocomplete
+from app.utils.cache import DetailCache
+from app.utils.reference_data import ReferenceData
 from config import Config
 
 
@@ -31,6 +34,9 @@ login.login_view = 'auth.login'
 login.login_message = 'Please log in to access this page.'
 mail = Mail()
 bootstrap = Bootstrap()
+detail_cache = DetailCache()
+autocomplete = Autocomplete()
+reference_data = ReferenceData()
 
 
 def create_app(config_class=Config):
@@ -43,6 +49,12 @@ def create_app(config_class=Config):
     mail.init_app(app)
     bootstrap.init_app(app)
 
+    from app.utils.detail_pages import get_dependent_pages
+    detail_cache.init_app(app, get_dependent_pages)
+
+    from app.models import Compartment, EvidenceLevel, Mechanism, Organism, ReferenceDataVersion, ReferenceType
+    reference_data.init_app(app, [Compartment, EvidenceLevel, Mechanism, Organism, ReferenceType], ReferenceDataVersion)
+
     from app.errors import bp as errors_bp
     app.register_blueprint(errors_bp)
 
@@ -52,6 +64,15 @@ def create_app(config_class=Config):
     from app.main import bp as main_np
     app.register_blueprint(main_np)
 
+    from app.api import bp as api_bp
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+
+    from app.api.autocomplete import AUTOCOMPLETE_SOURCES
+    autocomplete.init_app(app, AUTOCOMPLETE_SOURCES)
+
+    from app.load_data.xref_index import close_xref_index
+    app.teardown_appcontext(close_xref_index)
+
     app.upload_path = app.config['UPLOAD_FOLDER']
     app.download_path = app.config['DOWNLOAD_FOLDER']
 
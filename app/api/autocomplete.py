@@ -0,0 +1,40 @@
+from flask import jsonify, request
+from flask_login import login_required
+
+from app import autocomplete
+from app.api import bp
+from app.api.errors import error_response
+from app.models import Enzyme, EnzymeStructure, Gene, Metabolite, Organism
+
+AUTOCOMPLETE_SOURCES = {
+    'gene': Gene.name,
+    'isoenzyme': Enzyme.isoenzyme,
+    'metabolite': Metabolite.bigg_id,
+    'organism': Organism.name,
+    'strain': EnzymeStructure.strain,
+}
+
+AUTOCOMPLETE_MAX_LIMIT = 100
+
+
+@bp.route('/autocomplete/<entity>')
+@login_required
+def get_autocomplete(entity):
+    """
+    Gets the values of entity that start with q, e.g. /api/v1/autocomplete/isoenzyme?q=pf&limit=10
+
+    Entities: gene, isoenzyme, metabolite (bigg id), organism, strain.
+
+    Returns:
+        JSON with results, the list of values sorted alphabetically.
+    """
+
+    if entity not in AUTOCOMPLETE_SOURCES:
+        return error_response(404, 'Unknown entity: ' + entity + '. Valid entities are: ' +
+                              ', '.join(sorted(AUTOCOMPLETE_SOURCES)) + '.')
+
+    limit = request.args.get('limit', None, type=int)
+    if limit is not None:
+        limit = min(max(limit, 1), AUTOCOMPLETE_MAX_LIMIT)
+
+    return jsonify({'results': autocomplete.search(entity, request.args.get('q', ''), limit)})
@@ -0,0 +1,16 @@
+from flask import jsonify
+from werkzeug.http import HTTP_STATUS_CODES
+
+
+def error_response(status_code, message=None, **details):
+    payload = {'error': HTTP_STATUS_CODES.get(status_code, 'Unknown error')}
+    if message:
+        payload['message'] = message
+    payload.update(details)
+    response = jsonify(payload)
+    response.status_code = status_code
+    return response
+
+
+def bad_request(message, **details):
+    return error_response(400, message, **details)
@@ -0,0 +1,116 @@
+""" This module implements the options endpoint used by the lazy select fields in app.main.fields.
+
+Options are searched by the prefix of one or more columns, e.g. the isoenzyme, reaction acronym or organism name of an
+EnzymeReactionOrganism, and returned in pages sorted by id. The relationships used in the option labels are loaded in
+the same query.
+
+"""
+
+from flask import current_app, jsonify, request, url_for
+from flask_login import login_required
+from sqlalchemy import or_
+from sqlalchemy.orm import contains_eager, joinedload
+from wtforms.ext.sqlalchemy.fields import get_pk_from_identity
+
+from app.api import bp
+from app.api.errors import error_response
+from app.models import Enzyme, EnzymeReactionActivation, EnzymeReactionEffector, EnzymeReactionInhibition, \
+    EnzymeReactionMiscInfo, EnzymeReactionOrganism, Metabolite, ModelAssumptions, Organism, Reaction
+from app.utils.pagination import keyset_paginate
+
+
+class OptionSource(object):
+    """
+    The options of an entity.
+
+    Args:
+        model: the database model.
+        search_columns: list of columns searched by prefix.
+        joins: list of relationships joined to search their columns, they are also loaded with the options.
+        eager_loads: list of other relationships used in the labels.
+    """
+
+    def __init__(self, model, search_columns, joins=(), eager_loads=()):
+        self.model = model
+        self.search_columns = search_columns
+        self.joins = joins
+        self.eager_loads = eager_loads
+
+    def get_query(self, prefix):
+        """
+        Gets the query for the options that start with prefix.
+
+        Args:
+            prefix: the prefix to search for, if empty all the options are returned.
+
+        Returns:
+            the query.
+        """
+
+        query = self.model.query
+        for relationship in self.joins:
+            query = query.join(relationship).options(contains_eager(relationship))
+        for relationship in self.eager_loads:
+            query = query.options(joinedload(relationship))
+
+        if prefix:
+            pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            query = query.filter(or_(*[column.ilike(pattern, escape='\\') for column in self.search_columns]))
+        return query
+
+
+OPTION_SOURCES = {
+    'enzyme': OptionSource(Enzyme, [Enzyme.isoenzyme]),
+    'reaction': OptionSource(Reaction, [Reaction.acronym]),
+    'enzyme_reaction_organism': OptionSource(EnzymeReactionOrganism,
+                                             [Enzyme.isoenzyme, Reaction.acronym, Organism.name],
+                                             joins=[EnzymeReactionOrganism.enzyme, EnzymeReactionOrganism.reaction,
+                                                    EnzymeReactionOrganism.organism]),
+    'enzyme_inhibition': OptionSource(EnzymeReactionInhibition, [Metabolite.bigg_id],
+                                      joins=[EnzymeReactionInhibition.inhibitor_met],
+                                      eager_loads=[EnzymeReactionInhibition.affected_met,
+                                                   EnzymeReactionInhibition.evidence]),
+    'enzyme_activation': OptionSource(EnzymeReactionActivation, [Metabolite.bigg_id],
+                                      joins=[EnzymeReactionActivation.activator_met],
+                                      eager_loads=[EnzymeReactionActivation.evidence]),
+    'enzyme_effector': OptionSource(EnzymeReactionEffector, [Metabolite.bigg_id],
+                                    joins=[EnzymeReactionEffector.effector_met],
+                                    eager_loads=[EnzymeReactionEffector.evidence]),
+    'enzyme_misc_info': OptionSource(EnzymeReactionMiscInfo, [EnzymeReactionMiscInfo.topic],
+                                     eager_loads=[EnzymeReactionMiscInfo.evidence]),
+    'model_assumption': OptionSource(ModelAssumptions, [ModelAssumptions.assumption]),
+}
+
+
+@bp.route('/options/<entity>')
+@login_required
+def get_options(entity):
+    """
+    Gets a page of the options of entity that start with q, e.g. /api/v1/options/reaction?q=pf
+
+    Entities: enzyme, reaction, enzyme_reaction_organism, enzyme_inhibition, enzyme_activation, enzyme_effector,
+    enzyme_misc_info, model_assumption.
+
+    Returns:
+        JSON with results, a list of {id, text}, and next, the url of the next page or None.
+    """
+
+    if entity not in OPTION_SOURCES:
+        return error_response(404, 'Unknown entity: ' + entity + '. Valid entities are: ' +
+                              ', '.join(sorted(OPTION_SOURCES)) + '.')
+
+    source = OPTION_SOURCES[entity]
+    per_page = min(max(request.args.get('limit', current_app.config['OPTIONS_PAGE_SIZE'], type=int), 1),
+                   current_app.config['API_MAX_BATCH_SIZE'])
+
+    page = keyset_paginate(source.get_query(request.args.get('q', '')), [source.model.id],
+                           cursor=request.args.get('cursor'), per_page=per_page)
+
+    next_url = None
+    if page.has_next:
+        args = request.args.to_dict()
+        args['cursor'] = page.next_cursor
+        next_url = url_for('api.get_options', entity=entity, **args)
+
+    return jsonify({'results': [{'id': get_pk_from_identity(obj), 'text': str(obj)} for obj in page.items],
+                    'next': next_url})
@@ -0,0 +1,75 @@
+""" This module implements the bulk insert endpoint for enzyme inhibitions, activations, effectors and misc infos, see
+app.load_data.load_regulations for the record fields.
+
+"""
+
+from flask import current_app, jsonify, request
+from flask_login import login_required
+
+from app import db
+from app.api import bp
+from app.api.errors import bad_request
+from app.load_data.load_regulations import insert_regulations, read_regulations
+
+
+def _get_records():
+    """
+    Gets the records from a JSON body, a CSV body or an uploaded CSV or JSON file.
+    """
+
+    if 'file' in request.files:
+        upload = request.files['file']
+        file_format = upload.filename.rsplit('.', 1)[-1].lower() if '.' in upload.filename else 'csv'
+        return read_regulations(upload.read().decode('utf-8'), file_format)
+
+    if request.mimetype == 'text/csv':
+        return read_regulations(request.get_data(as_text=True), 'csv')
+
+    return read_regulations(request.get_data(as_text=True), 'json')
+
+
+@bp.route('/regulations', methods=['POST'])
+@login_required
+def insert_regulations_endpoint():
+    """
+    Inserts a list of enzyme inhibitions, activations, effectors and misc infos, given as a JSON array, a CSV body
+    (Content-Type: text/csv) or an uploaded file, e.g. curl -F file=@inhibitions.csv .../api/v1/regulations
+
+    Either all the records are inserted or none. With ?dry_run=1 the records are only validated.
+
+    Returns:
+        JSON with the number of inserted records per type and their ids, or with the errors of each record.
+    """
+
+    try:
+        records = _get_records()
+    except (ValueError, UnicodeDecodeError, KeyError) as error:
+        return bad_request('The data could not be read: ' + str(error))
+
+    if not records:
+        return bad_request('No records were given.')
+
+    max_rows = current_app.config['REGULATIONS_MAX_ROWS']
+    if len(records) > max_rows:
+        return bad_request('At most {} records can be inserted at once.'.format(max_rows))
+
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    regulations, errors = insert_regulations(records, dry_run=dry_run)
+
+    if errors:
+        db.session.rollback()
+        return bad_request('{} of {} records have errors, nothing was inserted.'.format(len(errors), len(records)),
+                           errors=errors)
+
+    if dry_run:
+        return jsonify({'dry_run': True, 'n_records': len(records)})
+
+    ids = [regulation.id for regulation in regulations]
+    counts = {}
+    for record in records:
+        counts[record['type'].strip()] = counts.get(record['type'].strip(), 0) + 1
+    db.session.commit()
+
+    response = jsonify({'n_records': len(records), 'counts': counts, 'ids': ids})
+    response.status_code = 201
+    return response
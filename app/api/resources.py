@@ -0,0 +1,309 @@
+""" This module implements the resources of the JSON API: for each entity type, its natural key, the fields that can be
+selected with fields=, and the related data that can be added with include=.
+
+Each include is loaded for all the requested entries with a single query, so a request runs one query for the entries
+plus one per include, however many entries it asks for.
+
+"""
+
+from collections import OrderedDict
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import ChebiIds, Compartment, Enzyme, EnzymeOrganism, EnzymeReactionActivation, \
+    EnzymeReactionEffector, EnzymeReactionInhibition, EnzymeReactionMiscInfo, EnzymeReactionOrganism, \
+    EnzymeStructure, GibbsEnergy, GibbsEnergyReactionModel, Metabolite, Model, ModelAssumptions, Organism, Reaction, \
+    ReactionMetabolite, enzyme_reaction_activation_model, enzyme_reaction_effector_model, \
+    enzyme_reaction_inhibition_model, enzyme_reaction_misc_info_model, enzyme_reaction_organism_model, \
+    metabolite_chebi, metabolite_compartment
+
+
+class Resource(object):
+    """
+    An entity type of the API.
+
+    Args:
+        name: name of the resource in urls, e.g. reactions.
+        model: the database model.
+        key: name of the natural key column, e.g. acronym.
+        fields: OrderedDict {field name: function that takes an entry and returns the field value}.
+        includes: OrderedDict {include name: function that takes a list of entry ids and returns a dictionary
+            {entry id: list of related data}}.
+    """
+
+    def __init__(self, name, model, key, fields, includes):
+        self.name = name
+        self.model = model
+        self.key = key
+        self.key_column = getattr(model, key)
+        self.fields = fields
+        self.includes = includes
+
+    def serialize(self, entries, fields, includes):
+        """
+        Converts entries to dictionaries.
+
+        Args:
+            entries: list of entries of the resource model.
+            fields: list of field names, the key is always included.
+            includes: list of include names.
+
+        Returns:
+            list of dictionaries, in the same order as entries.
+        """
+
+        entry_ids = [entry.id for entry in entries]
+        included_data = dict((include, self.includes[include](entry_ids) if entry_ids else {})
+                             for include in includes)
+
+        data = []
+        for entry in entries:
+            entry_data = {self.key: getattr(entry, self.key)}
+            for field in fields:
+                entry_data[field] = self.fields[field](entry)
+            for include in includes:
+                entry_data[include] = included_data[include].get(entry.id, [])
+            data.append(entry_data)
+        return data
+
+
+def _group_rows(rows):
+    """
+    Groups (entry id, value) rows by entry id, dropping repeated values.
+    """
+
+    grouped_data = {}
+    for entry_id, value in rows:
+        values = grouped_data.setdefault(entry_id, [])
+        if value not in values:
+            values.append(value)
+    return grouped_data
+
+
+def _get_values(id_column, value_column, *joins):
+    """
+    Gets an include function that returns the values of value_column for each entry.
+
+    Args:
+        id_column: column with the entry id.
+        value_column: column with the values.
+        joins: (target, on clause) tuples that lead from id_column to value_column.
+
+    Returns:
+        include function.
+    """
+
+    def get_values(entry_ids):
+        query = db.session.query(id_column, value_column)
+        for target, on_clause in joins:
+            query = query.join(target, on_clause)
+        query = query.filter(id_column.in_(entry_ids), value_column.isnot(None)).order_by(id_column, value_column)
+        return _group_rows(query.all())
+
+    return get_values
+
+
+def _get_evidence_level(data_point):
+    return data_point.evidence.description if data_point.evidence else None
+
+
+def _get_bigg_id(metabolite):
+    return metabolite.bigg_id if metabolite else None
+
+
+_REGULATIONS = OrderedDict([
+    ('inhibitors', (EnzymeReactionInhibition, enzyme_reaction_inhibition_model.c.inhibition_id,
+                    [EnzymeReactionInhibition.inhibitor_met, EnzymeReactionInhibition.affected_met],
+                    lambda inhibition: {'inhibitor': _get_bigg_id(inhibition.inhibitor_met),
+                                        'affected_metabolite': _get_bigg_id(inhibition.affected_met),
+                                        'inhibition_type': inhibition.inhibition_type,
+                                        'inhibition_constant': inhibition.inhibition_constant})),
+    ('activators', (EnzymeReactionActivation, enzyme_reaction_activation_model.c.activation_id,
+                    [EnzymeReactionActivation.activator_met],
+                    lambda activation: {'activator': _get_bigg_id(activation.activator_met),
+                                        'activation_constant': activation.activation_constant})),
+    ('effectors', (EnzymeReactionEffector, enzyme_reaction_effector_model.c.effector_id,
+                   [EnzymeReactionEffector.effector_met],
+                   lambda effector: {'effector': _get_bigg_id(effector.effector_met),
+                                     'effector_type': effector.effector_type})),
+    ('misc_infos', (EnzymeReactionMiscInfo, enzyme_reaction_misc_info_model.c.misc_info_id, [],
+                    lambda misc_info: {'topic': misc_info.topic, 'description': misc_info.description})),
+])
+
+
+def _get_regulations(regulation, by_model=False):
+    """
+    Gets an include function that returns the inhibitors, activators, effectors or misc info of each enzyme, or of each
+    model if by_model is True.
+    """
+
+    data_model, model_id_column, relationships, get_data = _REGULATIONS[regulation]
+
+    def get_regulations(entry_ids):
+        if by_model:
+            model_table = model_id_column.table
+            id_column = model_table.c.model_id
+            query = db.session.query(id_column, Enzyme.isoenzyme, Reaction.acronym, Organism.name, data_model) \
+                .select_from(data_model).join(model_table, model_id_column == data_model.id)
+        else:
+            id_column = EnzymeReactionOrganism.enzyme_id
+            query = db.session.query(id_column, Enzyme.isoenzyme, Reaction.acronym, Organism.name, data_model) \
+                .select_from(data_model)
+
+        query = query.join(EnzymeReactionOrganism, data_model.enz_rxn_org_id == EnzymeReactionOrganism.id) \
+            .join(Enzyme, EnzymeReactionOrganism.enzyme_id == Enzyme.id) \
+            .join(Reaction, EnzymeReactionOrganism.reaction_id == Reaction.id) \
+            .join(Organism, EnzymeReactionOrganism.organism_id == Organism.id) \
+            .options(*[joinedload(relationship) for relationship in relationships + [data_model.evidence]]) \
+            .filter(id_column.in_(entry_ids)).order_by(id_column, data_model.id)
+
+        grouped_data = {}
+        for entry_id, isoenzyme, acronym, organism, data_point in query:
+            regulation_data = {'enzyme': isoenzyme, 'reaction': acronym, 'organism': organism,
+                               'evidence_level': _get_evidence_level(data_point), 'comments': data_point.comments}
+            regulation_data.update(get_data(data_point))
+            grouped_data.setdefault(entry_id, []).append(regulation_data)
+        return grouped_data
+
+    return get_regulations
+
+
+def _get_enzyme_organisms(enzyme_ids):
+    query = db.session.query(EnzymeStructure.enzyme_id, Organism.name) \
+        .join(Organism, EnzymeStructure.organism_id == Organism.id) \
+        .filter(EnzymeStructure.enzyme_id.in_(enzyme_ids)) \
+        .union(db.session.query(EnzymeOrganism.enzyme_id, Organism.name)
+               .join(Organism, EnzymeOrganism.organism_id == Organism.id)
+               .filter(EnzymeOrganism.enzyme_id.in_(enzyme_ids))) \
+        .union(db.session.query(EnzymeReactionOrganism.enzyme_id, Organism.name)
+               .join(Organism, EnzymeReactionOrganism.organism_id == Organism.id)
+               .filter(EnzymeReactionOrganism.enzyme_id.in_(enzyme_ids)))
+    return _group_rows(sorted(query.all()))
+
+
+def _get_reaction_metabolites(reaction_ids):
+    query = db.session.query(ReactionMetabolite.reaction_id, Metabolite.bigg_id, Compartment.bigg_id,
+                             ReactionMetabolite.stoich_coef) \
+        .join(Metabolite, ReactionMetabolite.metabolite_id == Metabolite.id) \
+        .join(Compartment, ReactionMetabolite.compartment_id == Compartment.id) \
+        .filter(ReactionMetabolite.reaction_id.in_(reaction_ids)) \
+        .order_by(ReactionMetabolite.reaction_id, ReactionMetabolite.stoich_coef, Metabolite.bigg_id)
+
+    return _group_rows((reaction_id, {'metabolite': met_bigg_id, 'compartment': compartment_bigg_id,
+                                      'stoich_coef': stoich_coef})
+                       for reaction_id, met_bigg_id, compartment_bigg_id, stoich_coef in query)
+
+
+def _get_reaction_gibbs_energies(reaction_ids):
+    query = db.session.query(GibbsEnergyReactionModel.reaction_id, Model.name, GibbsEnergy) \
+        .join(Model, GibbsEnergyReactionModel.model_id == Model.id) \
+        .join(GibbsEnergy, GibbsEnergyReactionModel.gibbs_energy_id == GibbsEnergy.id) \
+        .filter(GibbsEnergyReactionModel.reaction_id.in_(reaction_ids)) \
+        .order_by(GibbsEnergyReactionModel.reaction_id, GibbsEnergyReactionModel.id)
+
+    return _group_rows((reaction_id, {'model': model_name, 'standard_dg': gibbs_energy.standard_dg,
+                                      'standard_dg_std': gibbs_energy.standard_dg_std, 'ph': gibbs_energy.ph,
+                                      'ionic_strength': gibbs_energy.ionic_strength})
+                       for reaction_id, model_name, gibbs_energy in query)
+
+
+def _get_metabolite_chebis(metabolite_ids):
+    query = db.session.query(metabolite_chebi.c.metabolite_id, ChebiIds.chebi_id, ChebiIds.inchi) \
+        .join(ChebiIds, metabolite_chebi.c.chebi_id == ChebiIds.id) \
+        .filter(metabolite_chebi.c.metabolite_id.in_(metabolite_ids)) \
+        .order_by(metabolite_chebi.c.metabolite_id, ChebiIds.id)
+
+    return _group_rows((metabolite_id, {'chebi_id': chebi_id, 'inchi': inchi})
+                       for metabolite_id, chebi_id, inchi in query)
+
+
+def _get_model_reactions(model_ids):
+    model_id_column = enzyme_reaction_organism_model.c.model_id
+    query = db.session.query(model_id_column, Enzyme.isoenzyme, Reaction.acronym, Organism.name) \
+        .select_from(enzyme_reaction_organism_model) \
+        .join(EnzymeReactionOrganism,
+              enzyme_reaction_organism_model.c.enzyme_reaction_organism_id == EnzymeReactionOrganism.id) \
+        .join(Enzyme, EnzymeReactionOrganism.enzyme_id == Enzyme.id) \
+        .join(Reaction, EnzymeReactionOrganism.reaction_id == Reaction.id) \
+        .join(Organism, EnzymeReactionOrganism.organism_id == Organism.id) \
+        .filter(model_id_column.in_(model_ids)).order_by(model_id_column, EnzymeReactionOrganism.id)
+
+    return _group_rows((model_id, {'enzyme': isoenzyme, 'reaction': acronym, 'organism': organism})
+                       for model_id, isoenzyme, acronym, organism in query)
+
+
+def _get_model_assumptions(model_ids):
+    query = ModelAssumptions.query.options(joinedload(ModelAssumptions.evidence)) \
+        .filter(ModelAssumptions.model_id.in_(model_ids)).order_by(ModelAssumptions.model_id, ModelAssumptions.id)
+
+    return _group_rows((model_assumption.model_id,
+                        {'assumption': model_assumption.assumption, 'description': model_assumption.description,
+                         'included_in_model': model_assumption.included_in_model,
+                         'evidence_level': _get_evidence_level(model_assumption),
+                         'comments': model_assumption.comments})
+                       for model_assumption in query)
+
+
+_ero_model_id = enzyme_reaction_organism_model.c.enzyme_reaction_organism_id
+
+ENZYMES = Resource(
+    'enzymes', Enzyme, 'isoenzyme',
+    fields=OrderedDict([
+        ('name', lambda enzyme: enzyme.name),
+        ('acronym', lambda enzyme: enzyme.acronym),
+        ('ec_number', lambda enzyme: enzyme.ec_number)]),
+    includes=OrderedDict([
+        ('organisms', _get_enzyme_organisms),
+        ('reactions', _get_values(EnzymeReactionOrganism.enzyme_id, Reaction.acronym,
+                                  (Reaction, EnzymeReactionOrganism.reaction_id == Reaction.id))),
+        ('models', _get_values(EnzymeReactionOrganism.enzyme_id, Model.name,
+                               (enzyme_reaction_organism_model, _ero_model_id == EnzymeReactionOrganism.id),
+                               (Model, enzyme_reaction_organism_model.c.model_id == Model.id))),
+        ('uniprot_ids', _get_values(EnzymeOrganism.enzyme_id, EnzymeOrganism.uniprot_id)),
+        ('pdb_ids', _get_values(EnzymeStructure.enzyme_id, EnzymeStructure.pdb_id))] +
+        [(regulation, _get_regulations(regulation)) for regulation in _REGULATIONS]))
+
+REACTIONS = Resource(
+    'reactions', Reaction, 'acronym',
+    fields=OrderedDict([
+        ('name', lambda reaction: reaction.name),
+        ('equation', lambda reaction: reaction.equation),
+        ('metanetx_id', lambda reaction: reaction.metanetx_id),
+        ('bigg_id', lambda reaction: reaction.bigg_id),
+        ('kegg_id', lambda reaction: reaction.kegg_id),
+        ('compartment', lambda reaction: reaction.compartment_name)]),
+    includes=OrderedDict([
+        ('metabolites', _get_reaction_metabolites),
+        ('enzymes', _get_values(EnzymeReactionOrganism.reaction_id, Enzyme.isoenzyme,
+                                (Enzyme, EnzymeReactionOrganism.enzyme_id == Enzyme.id))),
+        ('organisms', _get_values(EnzymeReactionOrganism.reaction_id, Organism.name,
+                                  (Organism, EnzymeReactionOrganism.organism_id == Organism.id))),
+        ('models', _get_values(EnzymeReactionOrganism.reaction_id, Model.name,
+                               (enzyme_reaction_organism_model, _ero_model_id == EnzymeReactionOrganism.id),
+                               (Model, enzyme_reaction_organism_model.c.model_id == Model.id))),
+        ('gibbs_energies', _get_reaction_gibbs_energies)]))
+
+METABOLITES = Resource(
+    'metabolites', Metabolite, 'grasp_id',
+    fields=OrderedDict([
+        ('name', lambda metabolite: metabolite.name),
+        ('bigg_id', lambda metabolite: metabolite.bigg_id),
+        ('metanetx_id', lambda metabolite: metabolite.metanetx_id)]),
+    includes=OrderedDict([
+        ('compartments', _get_values(metabolite_compartment.c.metabolite_id, Compartment.bigg_id,
+                                     (Compartment, metabolite_compartment.c.compartment_id == Compartment.id))),
+        ('chebis', _get_metabolite_chebis),
+        ('reactions', _get_values(ReactionMetabolite.metabolite_id, Reaction.acronym,
+                                  (Reaction, ReactionMetabolite.reaction_id == Reaction.id)))]))
+
+MODELS = Resource(
+    'models', Model, 'name',
+    fields=OrderedDict([
+        ('organism', lambda model: model.organism_name),
+        ('strain', lambda model: model.strain),
+        ('comments', lambda model: model.comments)]),
+    includes=OrderedDict([
+        ('reactions', _get_model_reactions),
+        ('assumptions', _get_model_assumptions)] +
+        [(regulation, _get_regulations(regulation, by_model=True)) for regulation in _REGULATIONS]))
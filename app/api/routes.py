@@ -0,0 +1,145 @@
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request, url_for
+from flask_login import login_required
+
+from app.api import bp
+from app.api.errors import bad_request
+from app.api.resources import ENZYMES, METABOLITES, MODELS, REACTIONS
+from app.utils.pagination import keyset_paginate
+
+
+def _get_list_arg(name):
+    """
+    Gets a list from a query string argument given as comma separated values, repeated, or both, e.g.
+    ?acronym=PGI,PFK&acronym=FBA.
+    """
+
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(item.strip() for item in value.split(',') if item.strip())
+    return values
+
+
+def _get_resource_response(resource):
+    """
+    Gets the entries of resource as JSON.
+
+    If the request has the resource key, e.g. ?acronym=PGI,PFK, the entries with those keys are returned in the same
+    order, and the keys that were not found are listed in missing. Otherwise, the entries are returned in pages sorted
+    by key, with a next url while there are more.
+
+    fields=... selects the fields of each entry, the key is always included, and include=... adds related data.
+
+    The response has an ETag, requests with a matching If-None-Match get a 304 response.
+
+    Args:
+        resource: the Resource to get.
+
+    Returns:
+        JSON response.
+    """
+
+    fields = _get_list_arg('fields') if 'fields' in request.args else list(resource.fields)
+    unknown_fields = [field for field in fields if field not in resource.fields]
+    if unknown_fields:
+        return bad_request('Unknown fields: ' + ', '.join(unknown_fields) + '. Valid fields are: ' +
+                           ', '.join(resource.fields) + '.')
+
+    includes = list(OrderedDict.fromkeys(_get_list_arg('include')))
+    unknown_includes = [include for include in includes if include not in resource.includes]
+    if unknown_includes:
+        return bad_request('Unknown includes: ' + ', '.join(unknown_includes) + '. Valid includes are: ' +
+                           ', '.join(resource.includes) + '.')
+
+    max_batch_size = current_app.config['API_MAX_BATCH_SIZE']
+    keys = list(OrderedDict.fromkeys(_get_list_arg(resource.key)))
+
+    if keys:
+        if len(keys) > max_batch_size:
+            return bad_request('At most {} {} can be requested at once.'.format(max_batch_size, resource.key))
+
+        entries = dict((getattr(entry, resource.key), entry)
+                       for entry in resource.model.query.filter(resource.key_column.in_(keys)))
+        payload = {'data': resource.serialize([entries[key] for key in keys if key in entries], fields, includes),
+                   'missing': [key for key in keys if key not in entries]}
+    else:
+        per_page = min(max(request.args.get('limit', current_app.config['API_PAGE_SIZE'], type=int), 1),
+                       max_batch_size)
+        page = keyset_paginate(resource.model.query, [resource.key_column, resource.model.id],
+                               cursor=request.args.get('cursor'), per_page=per_page)
+
+        next_url = None
+        if page.has_next:
+            args = request.args.to_dict(flat=False)
+            args['cursor'] = page.next_cursor
+            next_url = url_for(request.endpoint, **args)
+        payload = {'data': resource.serialize(page.items, fields, includes), 'next': next_url}
+
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@bp.route('/enzymes')
+@login_required
+def get_enzymes():
+    """
+    Gets enzymes by isoenzyme, e.g. /api/v1/enzymes?isoenzyme=PFK1,PFK2&include=reactions,inhibitors
+
+    Fields: name, acronym, ec_number.
+    Includes: organisms, reactions, models, uniprot_ids, pdb_ids, inhibitors, activators, effectors, misc_infos.
+
+    Returns:
+        JSON with data and missing, or data and next if no isoenzyme is given.
+    """
+
+    return _get_resource_response(ENZYMES)
+
+
+@bp.route('/reactions')
+@login_required
+def get_reactions():
+    """
+    Gets reactions by acronym, e.g. /api/v1/reactions?acronym=PGI,PFK&fields=equation&include=metabolites
+
+    Fields: name, equation, metanetx_id, bigg_id, kegg_id, compartment.
+    Includes: metabolites, enzymes, organisms, models, gibbs_energies.
+
+    Returns:
+        JSON with data and missing, or data and next if no acronym is given.
+    """
+
+    return _get_resource_response(REACTIONS)
+
+
+@bp.route('/metabolites')
+@login_required
+def get_metabolites():
+    """
+    Gets metabolites by grasp id, e.g. /api/v1/metabolites?grasp_id=pep,pyr&include=chebis
+
+    Fields: name, bigg_id, metanetx_id.
+    Includes: compartments, chebis, reactions.
+
+    Returns:
+        JSON with data and missing, or data and next if no grasp_id is given.
+    """
+
+    return _get_resource_response(METABOLITES)
+
+
+@bp.route('/models')
+@login_required
+def get_models():
+    """
+    Gets models by name, e.g. /api/v1/models?name=E. coli - iteration 1&include=reactions,assumptions
+
+    Fields: organism, strain, comments.
+    Includes: reactions, assumptions, inhibitors, activators, effectors, misc_infos.
+
+    Returns:
+        JSON with data and missing, or data and next if no name is given.
+    """
+
+    return _get_resource_response(MODELS)
@@ -0,0 +1,86 @@
+""" This module implements helpers to insert many rows at once when loading data into the database.
+
+Rows are built in memory as dictionaries and inserted with multi-row INSERT statements, instead of adding one ORM
+object at a time and querying the database for every foreign key.
+
+The write helpers of app.main.utils only flush, so that a whole import is one transaction. Loaders of large files can
+use write_in_batches to write every N records in a savepoint and commit them, so a batch that fails is rolled back on
+its own and the batches before it stay committed.
+
+"""
+
+from app import db
+
+BULK_INSERT_BATCH_SIZE = 1000
+
+
+def bulk_insert(table, rows, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Inserts rows into table with one multi-row INSERT per batch. Python side column defaults (e.g. timestamps) are
+    applied to each row.
+
+    The insert is part of the current session transaction, it is up to the caller to commit it.
+
+    Args:
+        table: the table to insert into, either a db.Table or Model.__table__.
+        rows: list of dictionaries of the form {column_name: value}, all with the same keys.
+        batch_size: maximum number of rows per INSERT statement.
+
+    Returns:
+        None
+    """
+
+    rows = list(rows)
+    for i in range(0, len(rows), batch_size):
+        db.session.execute(table.insert().values(rows[i:i + batch_size]))
+
+
+def get_key_map(key_column, value_column):
+    """
+    Gets a dictionary mapping the values of key_column to the values of value_column with a single query, e.g.
+    get_key_map(Metabolite.bigg_id, Metabolite.id).
+
+    Args:
+        key_column: the column with the dictionary keys, typically a natural key.
+        value_column: the column with the dictionary values, typically the primary key.
+
+    Returns:
+        dictionary of the form {key: value}
+    """
+
+    return dict(db.session.query(key_column, value_column).all())
+
+
+def write_in_batches(records, write_batch, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Writes records in batches and commits each batch. Each batch is written and flushed in a savepoint, which is
+    committed with the session if the batch succeeds and rolled back if it fails, so a failing batch does not undo the
+    other ones. Changes pending in the session before the call are committed with the first batch.
+
+    Args:
+        records: list of records.
+        write_batch: function that adds a list of records to the session, e.g. insert_regulations.
+        batch_size: number of records per savepoint and commit.
+
+    Returns:
+        tuple (number of records written, list of (index of the first record of the batch, exception) for the batches
+        that failed).
+    """
+
+    records = list(records)
+    n_written = 0
+    failed_batches = []
+    for i in range(0, len(records), batch_size):
+        batch = records[i:i + batch_size]
+        savepoint = db.session.begin_nested()
+        try:
+            write_batch(batch)
+            savepoint.commit()
+            db.session.commit()
+        except Exception as error:
+            savepoint.rollback()
+            failed_batches.append((i, error))
+        else:
+            n_written += len(batch)
+
+    return n_written, failed_batches
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from app.utils.parsers import split_input_column
+
 
 def get_model_name(file_path, sheet_name):
     """
@@ -83,6 +85,30 @@ def get_model_enzymes(file_path, sheet_name):
     return enzyme_list
 
 
+def get_model_enzyme_id_lists(enzyme_list):
+    """
+    Splits the uniprot ids, pdb ids, and strains of all enzymes in the model, each column in one step. The lists are
+    the ones parse_input_list returns for each cell.
+
+    Args:
+        enzyme_list: the enzyme list returned by get_model_enzymes, so the sheet is not read again.
+
+    Returns:
+        dictionary of the form {column_name: [id_list for each enzyme]} for the columns uniprot_ids, pdb_ids, and
+        strain, in the same order as enzyme_list.
+    """
+
+    data_df = pd.DataFrame(enzyme_list, columns=['uniprot_ids', 'pdb_ids', 'strain'])
+
+    id_lists = {}
+    for column in ('uniprot_ids', 'pdb_ids', 'strain'):
+        token_df = split_input_column(data_df[column])
+        id_lists[column] = token_df.groupby('row_index', sort=False)['token'].apply(list) \
+            .reindex(data_df.index).tolist()
+
+    return id_lists
+
+
 def get_model_subunits(file_path, sheet_name):
     """
     Gets the columns reaction ID and subunits and returns a tuple (reaction ID, subunits).
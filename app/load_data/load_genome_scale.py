@@ -0,0 +1,275 @@
+""" This module implements a scalable initial load of genome-scale or universal models (e.g. the BiGG universal model,
+~28k reactions and ~15k metabolites) into the database, together with the Metanetx ids and KEGG ids of their
+metabolites and reactions.
+
+Each SBML file and, if the xref index has not been built, each Metanetx file is parsed in its own process. The
+results are merged in memory and written with bulk inserts. Metabolites, reactions and compartments that are already
+in the database are left untouched, so this can be run on top of load_initial_data.
+
+Usage:
+    python -m app.load_data.load_genome_scale universal_model.xml [other_model.xml ...] [--processes N]
+
+The benchmark target is to load the full BiGG universe in under BENCHMARK_TARGET_SECONDS on a laptop-class machine.
+
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app import create_app, db, detail_cache, reference_data
+from app.load_data import METABOLITE_DATA_FILE, REACTION_DATA_FILE
+from app.load_data.bulk_insert import bulk_insert, get_key_map
+from app.load_data.load_sbml_models import load_sbml_model, Flavor
+from app.load_data.metanetx_xrefs import iter_xrefs, CHEM_XREF_COLUMNS, REAC_XREF_COLUMNS
+from app.load_data.xref_index import get_xref_index
+from app.models import Compartment, Metabolite, Reaction, ReactionMetabolite, metabolite_compartment
+from config import Config
+
+BENCHMARK_TARGET_SECONDS = 300
+
+
+def _parse_model(model_file):
+    """
+    Parses an SBML model into plain python data, so that it can be returned from a worker process.
+
+    Exchange and biomass reactions are left out.
+
+    Args:
+        model_file: path to the SBML file.
+
+    Returns:
+        dictionary with:
+         - 'compartments': {compartment_bigg_id: compartment_name}
+         - 'metabolites': {metabolite_bigg_id: metabolite_name}
+         - 'met_compartments': set of (metabolite_bigg_id, compartment_bigg_id)
+         - 'reactions': {reaction_bigg_id: (reaction_name, [(metabolite_bigg_id, compartment_bigg_id, stoich_coef)])},
+           where reaction_bigg_id has no 'R_' prefix.
+    """
+
+    model = load_sbml_model(model_file, kind='cb', flavor=Flavor.BIGG, exchange_detection_mode=None, load_gprs=False)
+
+    parsed_model = {'compartments': {}, 'metabolites': {}, 'met_compartments': set(), 'reactions': {}}
+
+    for comp_id, comp_name, _ in model['compartments']:
+        parsed_model['compartments'][comp_id] = comp_name or comp_id
+
+    for bigg_id, _, name, compartment, _, _ in model['metabolites']:
+        parsed_model['metabolites'].setdefault(bigg_id, name)
+        parsed_model['met_compartments'].add((bigg_id, compartment))
+
+    for rxn_id, name, _, stoichiometry, _, is_exchange in model['reactions']:
+        bigg_id = re.sub('^R_', '', rxn_id)
+        if is_exchange or bigg_id.startswith('BIOMASS'):
+            continue
+
+        rxn_stoichiometry = []
+        for met, stoich_coef in stoichiometry.items():
+            met_compartment = re.findall('M_(\w+)_(\w+)', met)[0]
+            rxn_stoichiometry.append((met_compartment[0], met_compartment[1], stoich_coef))
+
+        parsed_model['reactions'][bigg_id] = (name, rxn_stoichiometry)
+
+    return parsed_model
+
+
+def _read_met_xrefs(met_data_file):
+    met_xrefs = {}
+    for chunk in iter_xrefs(met_data_file, CHEM_XREF_COLUMNS, {'bigg:': None},
+                            usecols=['bigg_id', 'metanetx_id', 'name'], xref_col='bigg_id'):
+        for bigg_id, metanetx_id in zip(chunk['bigg_id'], chunk['metanetx_id']):
+            if not bigg_id.startswith('M_'):
+                met_xrefs.setdefault(bigg_id, {'metanetx_id': metanetx_id})
+    return met_xrefs
+
+
+def _read_rxn_xrefs(rxn_data_file):
+    bigg_xrefs = {}
+    kegg_ids = {}
+    for chunk in iter_xrefs(rxn_data_file, REAC_XREF_COLUMNS, {'bigg:R': None, 'kegg:R': None},
+                            usecols=['XREF', 'metanetx_id']):
+        for source, xref_id, metanetx_id in zip(chunk['source'], chunk['XREF'], chunk['metanetx_id']):
+            if source == 'bigg':
+                bigg_xrefs.setdefault(re.sub('^R_', '', xref_id), metanetx_id)
+            else:
+                kegg_ids[metanetx_id] = min(xref_id, kegg_ids.get(metanetx_id, xref_id))
+
+    return {bigg_id: {'metanetx_id': metanetx_id, 'kegg_id': kegg_ids.get(metanetx_id)}
+            for bigg_id, metanetx_id in bigg_xrefs.items()}
+
+
+def _merge_models(parsed_models):
+    merged_model = {'compartments': {}, 'metabolites': {}, 'met_compartments': set(), 'reactions': {}}
+
+    for parsed_model in parsed_models:
+        for key in ('compartments', 'metabolites', 'reactions'):
+            for bigg_id, value in parsed_model[key].items():
+                merged_model[key].setdefault(bigg_id, value)
+        merged_model['met_compartments'].update(parsed_model['met_compartments'])
+
+    return merged_model
+
+
+def _insert_compartments(compartments):
+    compartment_ids = get_key_map(Compartment.bigg_id, Compartment.id)
+    compartment_names = set(get_key_map(Compartment.name, Compartment.id))
+
+    compartment_rows = []
+    for bigg_id, name in sorted(compartments.items()):
+        if bigg_id not in compartment_ids:
+            name = name if name not in compartment_names else bigg_id
+            compartment_names.add(name)
+            compartment_rows.append({'name': name, 'bigg_id': bigg_id, 'metanetx_id': None})
+
+    bulk_insert(Compartment.__table__, compartment_rows)
+    if compartment_rows:
+        reference_data.invalidate(Compartment)
+    return len(compartment_rows)
+
+
+def _insert_metabolites(model, met_xrefs):
+    existing_ids = set(get_key_map(Metabolite.bigg_id, Metabolite.id))
+    existing_grasp_ids = set(get_key_map(Metabolite.grasp_id, Metabolite.id))
+
+    metabolite_rows = [{'grasp_id': bigg_id if bigg_id not in existing_grasp_ids else None,
+                        'name': name,
+                        'bigg_id': bigg_id,
+                        'metanetx_id': met_xrefs.get(bigg_id, {}).get('metanetx_id')}
+                       for bigg_id, name in sorted(model['metabolites'].items()) if bigg_id not in existing_ids]
+
+    bulk_insert(Metabolite.__table__, metabolite_rows)
+    return len(metabolite_rows)
+
+
+def _insert_reactions(model, rxn_xrefs, metabolite_ids, compartment_ids, compartment_names):
+    existing_acronyms = set(get_key_map(Reaction.acronym, Reaction.id))
+
+    reaction_rows = []
+    new_reactions = {}
+    for bigg_id, (name, rxn_stoichiometry) in sorted(model['reactions'].items()):
+        if bigg_id in existing_acronyms:
+            continue
+
+        compartment_list = set(compartment_acronym for _, compartment_acronym, _ in rxn_stoichiometry)
+        compartment_name = compartment_names[compartment_list.pop()] if len(compartment_list) == 1 else None
+
+        xrefs = rxn_xrefs.get(bigg_id, {})
+        reaction_rows.append({'name': name,
+                              'acronym': bigg_id,
+                              'metanetx_id': xrefs.get('metanetx_id'),
+                              'bigg_id': bigg_id,
+                              'kegg_id': xrefs.get('kegg_id'),
+                              'compartment_name': compartment_name,
+                              'equation': Reaction.get_equation(rxn_stoichiometry)})
+        new_reactions[bigg_id] = rxn_stoichiometry
+
+    bulk_insert(Reaction.__table__, reaction_rows)
+    reaction_ids = get_key_map(Reaction.acronym, Reaction.id)
+
+    rxn_met_rows = [{'reaction_id': reaction_ids[bigg_id],
+                     'metabolite_id': metabolite_ids[met_bigg_id],
+                     'compartment_id': compartment_ids[compartment_acronym],
+                     'stoich_coef': stoich_coef}
+                    for bigg_id, rxn_stoichiometry in new_reactions.items()
+                    for met_bigg_id, compartment_acronym, stoich_coef in rxn_stoichiometry]
+
+    bulk_insert(ReactionMetabolite.__table__, rxn_met_rows)
+    return len(reaction_rows), len(rxn_met_rows)
+
+
+def load_genome_scale_model(model_files, processes=None, met_data_file=METABOLITE_DATA_FILE,
+                            rxn_data_file=REACTION_DATA_FILE):
+    """
+    Loads the compartments, metabolites and reactions of one or more SBML models (BiGG flavor) into the database,
+    together with their Metanetx and KEGG ids.
+
+    The xref index is used if it has been built (see xref_index.build_xref_index), otherwise the Metanetx files are
+    streamed in parallel to the SBML parsing.
+
+    Args:
+        model_files: list of paths to SBML files.
+        processes: maximum number of worker processes, defaults to the number of CPUs.
+        met_data_file: path to chem_xref.tsv, only used if there is no xref index.
+        rxn_data_file: path to reac_xref.tsv, only used if there is no xref index.
+
+    Returns:
+        dictionary with the number of inserted compartments, metabolites, metabolite_compartments, reactions,
+        and reaction_metabolites.
+    """
+
+    xref_index = get_xref_index()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        model_futures = [executor.submit(_parse_model, model_file) for model_file in model_files]
+        if not xref_index:
+            met_xrefs_future = executor.submit(_read_met_xrefs, met_data_file)
+            rxn_xrefs_future = executor.submit(_read_rxn_xrefs, rxn_data_file)
+
+        model = _merge_models(future.result() for future in model_futures)
+
+        if xref_index:
+            met_xrefs = xref_index.get_metabolites(model['metabolites'])
+            rxn_xrefs = xref_index.get_reactions(model['reactions'])
+        else:
+            met_xrefs = met_xrefs_future.result()
+            rxn_xrefs = rxn_xrefs_future.result()
+
+    counts = {'compartments': _insert_compartments(model['compartments']),
+              'metabolites': _insert_metabolites(model, met_xrefs)}
+
+    compartment_ids = get_key_map(Compartment.bigg_id, Compartment.id)
+    compartment_names = get_key_map(Compartment.bigg_id, Compartment.name)
+    metabolite_ids = get_key_map(Metabolite.bigg_id, Metabolite.id)
+
+    existing_met_compartments = set(db.session.query(metabolite_compartment.c.metabolite_id,
+                                                     metabolite_compartment.c.compartment_id).all())
+    met_compartments = set((metabolite_ids[bigg_id], compartment_ids[compartment_acronym])
+                           for bigg_id, compartment_acronym in model['met_compartments'])
+    met_compartments.difference_update(existing_met_compartments)
+
+    bulk_insert(metabolite_compartment, [{'metabolite_id': met_id, 'compartment_id': comp_id}
+                                         for met_id, comp_id in sorted(met_compartments)])
+    counts['metabolite_compartments'] = len(met_compartments)
+
+    counts['reactions'], counts['reaction_metabolites'] = _insert_reactions(model, rxn_xrefs, metabolite_ids,
+                                                                            compartment_ids, compartment_names)
+
+    db.session.commit()
+    # the bulk inserts bypass the session events that invalidate the detail pages
+    detail_cache.clear()
+
+    return counts
+
+
+class LoadDataConfig(Config):
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Loads genome-scale or universal SBML models into the database.')
+    parser.add_argument('model_files', nargs='+', help='SBML files (BiGG flavor)')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+
+    app = create_app(LoadDataConfig)
+    app_context = app.app_context()
+    app_context.push()
+
+    db.create_all()
+
+    start_time = time.perf_counter()
+    counts = load_genome_scale_model(args.model_files, processes=args.processes)
+    elapsed_time = time.perf_counter() - start_time
+
+    for table, n_rows in counts.items():
+        print('{}: {}'.format(table, n_rows))
+
+    n_rows = sum(counts.values())
+    print('Total: {:.2f} s, {:.0f} rows/s (benchmark target: {} s)'.format(elapsed_time, n_rows / elapsed_time,
+                                                                          BENCHMARK_TARGET_SECONDS))
+
+
+if __name__ == '__main__':
+    main()
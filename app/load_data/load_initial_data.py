@@ -4,21 +4,47 @@ Author: Marta Matos
 
 """
 
+import math
 import re
+import time
 
 import pandas as pd
 
-from app import create_app, db
+from app import create_app, db, detail_cache, reference_data
 from app.load_data import COMPARTMENT_DATA_FILE, ECOLI_CORE_MODEL, METABOLITE_DATA_FILE, REACTION_DATA_FILE, \
     REACTION_EC_DATA_FILE, ENZYME_GENES_DATA_FILE
+from app.load_data.bulk_insert import bulk_insert, get_key_map
 from app.load_data.load_sbml_models import load_sbml_model, Flavor
+from app.load_data.metanetx_xrefs import stream_xrefs, stream_rows, CHEM_XREF_COLUMNS, REAC_XREF_COLUMNS, \
+    REAC_PROP_COLUMNS
+from app.load_data.xref_index import get_xref_index
 from app.models import Compartment, Enzyme, EnzymeGeneOrganism, Gene, Metabolite, Organism, Reaction, ReferenceType, \
     EnzymeReactionOrganism, EvidenceLevel, Model, Mechanism, EnzymeReactionInhibition, EnzymeReactionActivation, \
-    EnzymeReactionMiscInfo, EnzymeReactionEffector, ModelAssumptions
+    EnzymeReactionMiscInfo, EnzymeReactionEffector, ModelAssumptions, ReactionMetabolite, enzyme_complex_subunit, \
+    metabolite_compartment
 from app.utils.misc import clear_data
 from config import Config
 
 
+def _none_if_nan(value):
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _get_compartment_rows():
+    comp_data_df = pd.read_csv(COMPARTMENT_DATA_FILE, sep='\t', comment='#', header=None)
+    col_names = ['bigg_id', 'metanetx_id', 'name']
+    comp_data_df.columns = col_names
+
+    compartment_rows = [{'name': comp_data_df.loc[index, 'name'],
+                         'bigg_id': re.findall('bigg:(\w+)', comp_data_df.loc[index, 'bigg_id'])[0],
+                         'metanetx_id': comp_data_df.loc[index, 'metanetx_id']}
+                        for index in comp_data_df.index]
+
+    compartment_rows.append({'name': 'imaginary', 'bigg_id': 'z', 'metanetx_id': ''})
+
+    return compartment_rows
+
+
 def load_compartments():
     """
     Using a file based on Metanetx comp_xref.tsv, populate the Compartment table with the compartments found in BiGG.
@@ -27,25 +53,28 @@ def load_compartments():
         None
     """
 
-    comp_data_df = pd.read_csv(COMPARTMENT_DATA_FILE, sep='\t', comment='#', header=None)
-    col_names = ['bigg_id', 'metanetx_id', 'name']
-    comp_data_df.columns = col_names
+    bulk_insert(Compartment.__table__, _get_compartment_rows())
+    reference_data.invalidate(Compartment)
 
-    for index in comp_data_df.index:
-        bigg_id = re.findall('bigg:(\w+)', comp_data_df.loc[index, 'bigg_id'])
-        compartment = Compartment(name=comp_data_df.loc[index, 'name'],
-                                  bigg_id=bigg_id[0],
-                                  metanetx_id=comp_data_df.loc[index, 'metanetx_id'])
+    db.session.commit()
 
-        db.session.add(compartment)
 
-    compartment = Compartment(name='imaginary',
-                              bigg_id='z',
-                              metanetx_id='')
+def _get_enzyme_rows():
+    enzymes_df = pd.read_csv(ENZYME_GENES_DATA_FILE, sep=',')
 
-    db.session.add(compartment)
+    enzyme_rows = [{'name': enzymes_df.loc[row, 'enzyme_name'],
+                    'acronym': enzymes_df.loc[row, 'enzyme_acronym'],
+                    'isoenzyme': enzymes_df.loc[row, 'isoenzyme'],
+                    'ec_number': _none_if_nan(enzymes_df.loc[row, 'EC'])}
+                   for row in enzymes_df.index]
 
-    db.session.commit()
+    ex_enzyme = ('Fake enzyme for exchange reactions', 'EX_enz', 'EX_enz', None)
+    enzyme_rows.append({'name': ex_enzyme[0],
+                        'acronym': ex_enzyme[1],
+                        'isoenzyme': ex_enzyme[2],
+                        'ec_number': ex_enzyme[3]})
+
+    return enzyme_rows
 
 
 def load_enzymes():
@@ -56,32 +85,24 @@ def load_enzymes():
         None
     """
 
-    enzymes_df = pd.read_csv(ENZYME_GENES_DATA_FILE, sep=',')
-
-    for row in enzymes_df.index:
-        enzyme = Enzyme(name=enzymes_df.loc[row, 'enzyme_name'],
-                        acronym=enzymes_df.loc[row, 'enzyme_acronym'],
-                        isoenzyme=enzymes_df.loc[row, 'isoenzyme'],
-                        ec_number=enzymes_df.loc[row, 'EC'])
+    bulk_insert(Enzyme.__table__, _get_enzyme_rows())
 
-        db.session.add(enzyme)
+    enzyme_ids = get_key_map(Enzyme.isoenzyme, Enzyme.id)
+    if 'SUCOAS_complex' in enzyme_ids and 'SUCOASa' in enzyme_ids and 'SUCOASb' in enzyme_ids:
+        bulk_insert(enzyme_complex_subunit, [{'enzyme_complex_id': enzyme_ids['SUCOAS_complex'],
+                                              'enzyme_subunit_id': enzyme_ids[subunit]}
+                                             for subunit in ('SUCOASa', 'SUCOASb')])
 
-    sucoas_complex = Enzyme.query.filter_by(isoenzyme='SUCOAS_complex').first()
-    sucoas_a = Enzyme.query.filter_by(isoenzyme='SUCOASa').first()
-    sucoas_b = Enzyme.query.filter_by(isoenzyme='SUCOASb').first()
+    db.session.commit()
 
-    if sucoas_complex and sucoas_a and sucoas_b:
-        sucoas_complex.add_subunit(sucoas_a)
-        sucoas_complex.add_subunit(sucoas_b)
 
-    ex_enzyme = ('Fake enzyme for exchange reactions', 'EX_enz', 'EX_enz', None)
-    enzyme = Enzyme(name=ex_enzyme[0],
-                    acronym=ex_enzyme[1],
-                    isoenzyme=ex_enzyme[2])
+def _get_genes_df():
+    genes_df = pd.read_csv(ENZYME_GENES_DATA_FILE, sep=',')
+    return genes_df.loc[genes_df['gene_name'].dropna().index, :]
 
-    db.session.add(enzyme)
 
-    db.session.commit()
+def _get_gene_rows():
+    return [{'name': gene_name} for gene_name in _get_genes_df()['gene_name']]
 
 
 def load_genes():
@@ -93,21 +114,19 @@ def load_genes():
         None
     """
 
-    genes_df = pd.read_csv(ENZYME_GENES_DATA_FILE, sep=',')
+    genes_df = _get_genes_df()
 
     organism = Organism.query.filter_by(name='E. coli').first()
-    genes_df = genes_df.loc[genes_df['gene_name'].dropna().index, :]
 
-    for row in genes_df.index:
-        gene = Gene(name=genes_df.loc[row, 'gene_name'])
-        db.session.add(gene)
+    bulk_insert(Gene.__table__, _get_gene_rows())
 
-        enzyme = Enzyme.query.filter_by(isoenzyme=genes_df.loc[row, 'isoenzyme']).first()
-        enzyme_gene_organism = EnzymeGeneOrganism(gene_id=gene.id,
-                                                  enzyme_id=enzyme.id,
-                                                  organism_id=organism.id)
+    gene_ids = get_key_map(Gene.name, Gene.id)
+    enzyme_ids = get_key_map(Enzyme.isoenzyme, Enzyme.id)
 
-        db.session.add(enzyme_gene_organism)
+    bulk_insert(EnzymeGeneOrganism.__table__, [{'gene_id': gene_ids[genes_df.loc[row, 'gene_name']],
+                                                'enzyme_id': enzyme_ids[genes_df.loc[row, 'isoenzyme']],
+                                                'organism_id': organism.id}
+                                               for row in genes_df.index])
 
     db.session.commit()
 
@@ -126,45 +145,56 @@ def _get_metabolites_from_core_ecoli():
 def _get_met_ids_from_metanetx(metabolites_df):
     met_bigg_ids = metabolites_df['bigg_id'].values
 
-    met_data_df = pd.read_csv(METABOLITE_DATA_FILE, sep='\t', comment='#', header=None)
-    col_names = ['bigg_id', 'metanetx_id', 'evidence', 'name']
-    met_data_df.columns = col_names
-
-    bigg_data_df = met_data_df[met_data_df['bigg_id'].str.match('bigg:[^M]')]
-    bigg_data_df['bigg_id'].replace(regex='bigg:', value='', inplace=True)
-    bigg_data_df = bigg_data_df[bigg_data_df['bigg_id'].isin(met_bigg_ids)]
+    xref_index = get_xref_index()
+    if xref_index:
+        met_xrefs = xref_index.get_metabolites(met_bigg_ids)
+        bigg_data_df = pd.DataFrame([(bigg_id, xrefs['metanetx_id'], None, xrefs['name'])
+                                     for bigg_id, xrefs in met_xrefs.items()], columns=CHEM_XREF_COLUMNS)
+    else:
+        bigg_data_df = stream_xrefs(METABOLITE_DATA_FILE, CHEM_XREF_COLUMNS, {'bigg:': met_bigg_ids},
+                                    xref_col='bigg_id', categorical_cols=['evidence'])
+        bigg_data_df = bigg_data_df[CHEM_XREF_COLUMNS]
 
     assert len(set(met_bigg_ids).difference(set(bigg_data_df['bigg_id'].values))) == 0
 
     return bigg_data_df
 
 
+def _get_metabolite_rows(metabolites_df):
+    bigg_data_df = _get_met_ids_from_metanetx(metabolites_df)
+
+    return [{'grasp_id': bigg_data_df.loc[index, 'bigg_id'],
+             'name': _none_if_nan(bigg_data_df.loc[index, 'name']),
+             'bigg_id': bigg_data_df.loc[index, 'bigg_id'],
+             'metanetx_id': _none_if_nan(bigg_data_df.loc[index, 'metanetx_id'])}
+            for index in bigg_data_df.index]
+
+
 def load_metabolites():
     """
     Gets all metabolites on the E. coli core model (see BiGG database), and then uses chem_xref.tsv from metanetx to
     get the metanetx ids and populate the Metabolite table.
 
+    If the xref index has been built (see xref_index.build_xref_index), it is used instead of chem_xref.tsv.
+
     Returns:
         None
     """
 
     metabolites_df = _get_metabolites_from_core_ecoli()
-    bigg_data_df = _get_met_ids_from_metanetx(metabolites_df)
 
-    for index in bigg_data_df.index:
-        bigg_id = bigg_data_df.loc[index, 'bigg_id']
+    bulk_insert(Metabolite.__table__, _get_metabolite_rows(metabolites_df))
 
-        metabolite = Metabolite(grasp_id=bigg_id,
-                                name=bigg_data_df.loc[index, 'name'],
-                                bigg_id=bigg_id,
-                                metanetx_id=bigg_data_df.loc[index, 'metanetx_id'])
+    metabolite_ids = get_key_map(Metabolite.bigg_id, Metabolite.id)
+    compartment_ids = get_key_map(Compartment.bigg_id, Compartment.id)
 
-        db.session.add(metabolite)
+    met_compartments = set()
+    for bigg_id, comp_acronym in zip(metabolites_df['bigg_id'], metabolites_df['compartment']):
+        if bigg_id in metabolite_ids and comp_acronym in compartment_ids:
+            met_compartments.add((metabolite_ids[bigg_id], compartment_ids[comp_acronym]))
 
-        met_compartments = metabolites_df[metabolites_df['bigg_id'].str.match(bigg_id)]['compartment'].values
-        for comp_acronym in met_compartments:
-            compartment = Compartment.query.filter_by(bigg_id=comp_acronym).first()
-            metabolite.add_compartment(compartment)
+    bulk_insert(metabolite_compartment, [{'metabolite_id': met_id, 'compartment_id': comp_id}
+                                         for met_id, comp_id in sorted(met_compartments)])
 
     db.session.commit()
 
@@ -180,31 +210,41 @@ def _get_reactions_from_core_ecoli():
     return reactions_df
 
 
+def _get_rxn_ids_from_index(xref_index, rxn_bigg_ids):
+    rxn_xrefs = xref_index.get_reactions(rxn_bigg_ids)
+
+    rxn_data = []
+    for bigg_id in set(rxn_bigg_ids):
+        xrefs = rxn_xrefs.get(re.sub('^R_', '', bigg_id))
+        assert xrefs is not None
+
+        rxn_data.append((bigg_id, xrefs['metanetx_id'], xrefs['kegg_id'], xrefs['ec_number']))
+
+    return pd.DataFrame(rxn_data, columns=['bigg_id', 'metanetx_id', 'kegg_id', 'ec_number'])
+
+
 def _get_rxn_ids_from_metanetx(reactions_df):
     rxn_bigg_ids = reactions_df['bigg_id']
 
-    met_data_df = pd.read_csv(REACTION_DATA_FILE, sep='\t', comment='#', header=None)
-    col_names = ['XREF', 'metanetx_id', 'rxn']
-    met_data_df.columns = col_names
-    met_data_df = met_data_df[['XREF', 'metanetx_id']]
+    xref_index = get_xref_index()
+    if xref_index:
+        return _get_rxn_ids_from_index(xref_index, rxn_bigg_ids)
+
+    # get bigg and kegg IDs in one pass over the file
+    xref_data_df = stream_xrefs(REACTION_DATA_FILE, REAC_XREF_COLUMNS, {'bigg:R': rxn_bigg_ids, 'kegg:R': None},
+                                usecols=['XREF', 'metanetx_id'])
 
-    # get bigg IDs
-    bigg_data_df = met_data_df[met_data_df['XREF'].str.match('bigg:R')]
-    bigg_data_df['XREF'].replace(regex='bigg:', value='', inplace=True)
-    bigg_data_df = bigg_data_df[bigg_data_df['XREF'].isin(rxn_bigg_ids)]
+    bigg_data_df = xref_data_df[xref_data_df['source'] == 'bigg'][['XREF', 'metanetx_id']]
     assert len(set(rxn_bigg_ids).difference(set(bigg_data_df['XREF'].values))) == 0
 
-    # get kegg IDs
-    kegg_data_df = met_data_df[met_data_df['XREF'].str.match('kegg:R')]
-    kegg_data_df['XREF'].replace(regex='kegg:', value='', inplace=True)
+    kegg_data_df = xref_data_df[xref_data_df['source'] == 'kegg'][['XREF', 'metanetx_id']]
+    kegg_data_df = kegg_data_df[kegg_data_df['metanetx_id'].isin(bigg_data_df['metanetx_id'])]
     joined_rxn_data_df = bigg_data_df.join(kegg_data_df.set_index('metanetx_id'), rsuffix='_kegg', how='left',
                                            on='metanetx_id')
 
     # get EC numbers
-    rxn_ec_data_df = pd.read_csv(REACTION_EC_DATA_FILE, sep='\t', comment='#', header=None)
-    col_names = ['metanetx_id', 'equation', 'description', 'balance', 'EC', 'source']
-    rxn_ec_data_df.columns = col_names
-    rxn_ec_data_df = rxn_ec_data_df[['metanetx_id', 'EC']]
+    rxn_ec_data_df = stream_rows(REACTION_EC_DATA_FILE, REAC_PROP_COLUMNS, 'metanetx_id',
+                                 bigg_data_df['metanetx_id'].values, usecols=['metanetx_id', 'EC'])
     joined_rxn_data_df = joined_rxn_data_df.join(rxn_ec_data_df.set_index('metanetx_id'), how='left', on='metanetx_id')
 
     # rename columns
@@ -230,59 +270,91 @@ def load_organisms():
     db.session.commit()
 
 
-def load_reactions():
-    """
-    Gets all reactions on the E. coli core model (see BiGG database), and then uses reac_xref.tsv from metanetx to
-    get the metanetx ids, kegg ids, and metacyc ids and populate the Reaction table.
-
-    It also gets the corresponding EC numbers from reac_prop.csv which will be used to populate the Enzyme table.
-
-    Returns:
-        None
-    """
-
+def _get_reaction_rows(compartment_names):
     reactions_df = _get_reactions_from_core_ecoli()
     metanetx_data_df = _get_rxn_ids_from_metanetx(reactions_df)
 
     reactions_df = reactions_df.join(metanetx_data_df.set_index('bigg_id'), how='left', on='bigg_id')
     reactions_df['bigg_id'].replace(regex='R_', value='', inplace=True)
 
+    reaction_rows = []
+    rxn_stoichiometries = {}
     for index in reactions_df.index:
         if not reactions_df.loc[index, 'bigg_id'].endswith('t') and not reactions_df.loc[index, 'bigg_id'].startswith(
                 'EX') \
                 and not reactions_df.loc[index, 'bigg_id'].startswith('BIOMASS'):
 
-            reaction = Reaction(name=reactions_df.loc[index, 'name'],
-                                acronym=reactions_df.loc[index, 'bigg_id'],
-                                metanetx_id=reactions_df.loc[index, 'metanetx_id'],
-                                bigg_id=reactions_df.loc[index, 'bigg_id'],
-                                kegg_id=reactions_df.loc[index, 'kegg_id'])
-
-            db.session.add(reaction)
+            acronym = reactions_df.loc[index, 'bigg_id']
 
-            compartment_list = []
+            rxn_stoichiometry = []
             for met, stoich_coef in reactions_df.loc[index, 'stoichiometry'].items():
                 met_compartment = re.findall('M_(\w+)_(\w+)', met)[0]
+                rxn_stoichiometry.append((met_compartment[0], met_compartment[1], stoich_coef))
+
+            compartment_list = [compartment_acronym for _, compartment_acronym, _ in rxn_stoichiometry]
+            compartment_name = compartment_names[compartment_list[0]] if len(set(compartment_list)) == 1 else None
+
+            reaction_rows.append({'name': _none_if_nan(reactions_df.loc[index, 'name']),
+                                  'acronym': acronym,
+                                  'metanetx_id': _none_if_nan(reactions_df.loc[index, 'metanetx_id']),
+                                  'bigg_id': acronym,
+                                  'kegg_id': _none_if_nan(reactions_df.loc[index, 'kegg_id']),
+                                  'compartment_name': compartment_name,
+                                  'equation': Reaction.get_equation(rxn_stoichiometry)})
+            rxn_stoichiometries[acronym] = rxn_stoichiometry
+
+    return reaction_rows, rxn_stoichiometries
+
+
+def _add_reaction_metabolites(rxn_stoichiometries):
+    compartment_ids = get_key_map(Compartment.bigg_id, Compartment.id)
+    metabolite_ids = get_key_map(Metabolite.bigg_id, Metabolite.id)
+    reaction_ids = get_key_map(Reaction.acronym, Reaction.id)
+
+    # metabolites that are in reactions but were not loaded from chem_xref.tsv
+    new_metabolites = sorted(set(bigg_id for rxn_stoichiometry in rxn_stoichiometries.values()
+                                 for bigg_id, _, _ in rxn_stoichiometry).difference(metabolite_ids))
+    bulk_insert(Metabolite.__table__, [{'bigg_id': bigg_id, 'grasp_id': bigg_id} for bigg_id in new_metabolites])
+    if new_metabolites:
+        metabolite_ids = get_key_map(Metabolite.bigg_id, Metabolite.id)
+
+    existing_met_compartments = set(db.session.query(metabolite_compartment.c.metabolite_id,
+                                                     metabolite_compartment.c.compartment_id).all())
+    met_compartments = set()
+    rxn_met_rows = []
+    for acronym, rxn_stoichiometry in rxn_stoichiometries.items():
+        for bigg_id, compartment_acronym, stoich_coef in rxn_stoichiometry:
+            met_id = metabolite_ids[bigg_id]
+            comp_id = compartment_ids[compartment_acronym]
+
+            met_compartments.add((met_id, comp_id))
+            rxn_met_rows.append({'reaction_id': reaction_ids[acronym],
+                                 'metabolite_id': met_id,
+                                 'compartment_id': comp_id,
+                                 'stoich_coef': stoich_coef})
+
+    bulk_insert(metabolite_compartment, [{'metabolite_id': met_id, 'compartment_id': comp_id}
+                                         for met_id, comp_id in sorted(met_compartments - existing_met_compartments)])
+    bulk_insert(ReactionMetabolite.__table__, rxn_met_rows)
 
-                bigg_id = met_compartment[0]
-                met_db = Metabolite.query.filter_by(bigg_id=bigg_id).first()
 
-                compartment_acronym = met_compartment[1]
-                compartment_list.append(compartment_acronym)
+def load_reactions():
+    """
+    Gets all reactions on the E. coli core model (see BiGG database), and then uses reac_xref.tsv from metanetx to
+    get the metanetx ids, kegg ids, and metacyc ids and populate the Reaction table.
 
-                if not met_db:
-                    met_db = Metabolite(bigg_id=bigg_id,
-                                        grasp_id=bigg_id)
+    It also gets the corresponding EC numbers from reac_prop.csv which will be used to populate the Enzyme table.
 
-                    db.session.add(met_db)
+    If the xref index has been built (see xref_index.build_xref_index), it is used instead of the metanetx files.
 
-                compartment_db = Compartment.query.filter_by(bigg_id=compartment_acronym).first()
-                met_db.add_compartment(compartment_db)
+    Returns:
+        None
+    """
 
-                reaction.add_metabolite(met_db, stoich_coef, compartment_db)
+    reaction_rows, rxn_stoichiometries = _get_reaction_rows(get_key_map(Compartment.bigg_id, Compartment.name))
 
-            if len(set(compartment_list)) == 1:
-                compartment_db.add_reaction(reaction)
+    bulk_insert(Reaction.__table__, reaction_rows)
+    _add_reaction_metabolites(rxn_stoichiometries)
 
     db.session.commit()
 
@@ -298,20 +370,18 @@ def load_enzyme_reaction_relation():
     data_df = pd.read_csv(ENZYME_GENES_DATA_FILE, sep=',')
 
     organism = Organism.query.filter_by(name='E. coli').first()
+    enzyme_ids = get_key_map(Enzyme.isoenzyme, Enzyme.id)
+    reaction_ids = get_key_map(Reaction.acronym, Reaction.id)
 
-    id = 1
+    enzyme_reaction_organism_rows = []
     for row in data_df.index:
         if data_df.loc[row, 'isoenzyme'] != 'SUCOASa' and data_df.loc[row, 'isoenzyme'] != 'SUCOASb':
-            enzyme = Enzyme.query.filter_by(isoenzyme=data_df.loc[row, 'isoenzyme']).first()
-            reaction = Reaction.query.filter_by(acronym=data_df.loc[row, 'reaction_acronym']).first()
+            enzyme_reaction_organism_rows.append({'id': len(enzyme_reaction_organism_rows) + 1,
+                                                  'enzyme_id': enzyme_ids[data_df.loc[row, 'isoenzyme']],
+                                                  'reaction_id': reaction_ids[data_df.loc[row, 'reaction_acronym']],
+                                                  'organism_id': organism.id})
 
-            enzyme_reaction_organism = EnzymeReactionOrganism(id=id,
-                                                              enzyme_id=enzyme.id,
-                                                              reaction_id=reaction.id,
-                                                              organism_id=organism.id)
-
-            db.session.add(enzyme_reaction_organism)
-            id += 1
+    bulk_insert(EnzymeReactionOrganism.__table__, enzyme_reaction_organism_rows)
 
     db.session.commit()
 
@@ -446,30 +516,26 @@ def main():
     app_context = app.app_context()
     app_context.push()
 
+    start_time = time.perf_counter()
+
     db.drop_all()
     #clear_data(db)
     db.create_all()
 
-    load_organisms()
-
-    load_compartments()
-
-    load_metabolites()
-    load_reactions()
-
-    load_enzymes()
-
-    load_genes()
-
-    load_reference_types()
-
-    load_enzyme_reaction_relation()
+    # tables are loaded in dependency order, e.g. reactions need metabolites and compartments
+    load_functions = [load_organisms, load_compartments, load_metabolites, load_reactions, load_enzymes, load_genes,
+                      load_reference_types, load_enzyme_reaction_relation, load_evidence_levels, load_mechanisms,
+                      load_empty_entries]
 
-    load_evidence_levels()
+    for load_function in load_functions:
+        step_start_time = time.perf_counter()
+        load_function()
+        print('{}: {:.2f} s'.format(load_function.__name__, time.perf_counter() - step_start_time))
 
-    load_mechanisms()
+    # the bulk inserts bypass the session events that invalidate the detail pages
+    detail_cache.clear()
 
-    load_empty_entries()
+    print('Total: {:.2f} s'.format(time.perf_counter() - start_time))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,376 @@
+""" This module implements the bulk insert of enzyme inhibitions, activations, effectors and misc infos, e.g. all the Ki
+values of a literature review at once, from CSV or JSON.
+
+Each record is a dictionary with:
+ - type: inhibition, activation, effector or misc_info.
+ - isoenzyme, reaction (acronym) and organism (name), required.
+ - models: model names, and references: DOIs, both optional, as lists or separated by commas.
+ - evidence_level (description) and comments, optional.
+ - inhibition: inhibitor_met (required), affected_met, inhibition_type and inhibition_constant.
+ - activation: activator_met (required) and activation_constant.
+ - effector: effector_met (required) and effector_type.
+ - misc_info: topic and description (both required).
+
+Metabolites are given by bigg id, with or without compartment, and as in the forms they are added if they are not in the
+database yet, as are references and EnzymeReactionOrganisms.
+
+All the keys are resolved with one query per entity type, and all the records are validated before anything is
+inserted, so either all the records are inserted or none and the errors of each record are reported. With
+--batch-size the records are written and committed in batches of N records, and a batch that fails when it is written
+is rolled back on its own, without undoing the batches committed before it.
+
+Usage:
+    python -m app.load_data.load_regulations regulations.csv [--dry-run] [--batch-size N]
+
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+from sqlalchemy import func, tuple_
+
+from app import create_app, db, reference_data
+from app.load_data.bulk_insert import write_in_batches
+from app.load_data.load_initial_data import LoadDataConfig
+from app.main.forms import EFFECTOR_TYPES, INHIBITION_TYPES
+from app.models import Enzyme, EnzymeReactionActivation, EnzymeReactionEffector, EnzymeReactionInhibition, \
+    EnzymeReactionMiscInfo, EnzymeReactionOrganism, EvidenceLevel, Model, Organism, Reaction
+from app.utils.metabolites import get_metabolite_resolver
+from app.utils.references import get_reference_resolver
+
+
+class RegulationType(object):
+    """
+    A type of regulation record.
+
+    Args:
+        model: the regulation model, e.g. EnzymeReactionInhibition.
+        required: fields that must be given, besides isoenzyme, reaction and organism.
+        metabolites: fields with metabolite bigg ids, set to the model relationship with the same name.
+        floats: fields with numbers.
+        choices: dictionary {field: list of valid values}, the first value is the default.
+        texts: other text fields.
+    """
+
+    def __init__(self, model, required, metabolites=(), floats=(), choices=None, texts=()):
+        self.model = model
+        self.required = required
+        self.metabolites = metabolites
+        self.floats = floats
+        self.choices = choices or {}
+        self.texts = texts
+
+    @property
+    def fields(self):
+        return list(self.metabolites) + list(self.floats) + list(self.choices) + list(self.texts)
+
+
+REGULATION_TYPES = OrderedDict([
+    ('inhibition', RegulationType(EnzymeReactionInhibition, ['inhibitor_met'],
+                                  metabolites=['inhibitor_met', 'affected_met'], floats=['inhibition_constant'],
+                                  choices={'inhibition_type': INHIBITION_TYPES})),
+    ('activation', RegulationType(EnzymeReactionActivation, ['activator_met'], metabolites=['activator_met'],
+                                  floats=['activation_constant'])),
+    ('effector', RegulationType(EnzymeReactionEffector, ['effector_met'], metabolites=['effector_met'],
+                                choices={'effector_type': EFFECTOR_TYPES})),
+    ('misc_info', RegulationType(EnzymeReactionMiscInfo, ['topic', 'description'], texts=['topic', 'description'])),
+])
+
+COMMON_FIELDS = ['type', 'isoenzyme', 'reaction', 'organism', 'models', 'references', 'evidence_level', 'comments']
+
+
+def read_regulations(data, file_format):
+    """
+    Reads regulation records from CSV or JSON.
+
+    Args:
+        data: the CSV or JSON text.
+        file_format: 'csv' or 'json'.
+
+    Returns:
+        list of dictionaries.
+
+    Raises:
+        ValueError if the data cannot be read.
+    """
+
+    if file_format == 'csv':
+        records = []
+        for i, row in enumerate(csv.DictReader(io.StringIO(data)), 1):
+            if None in row:
+                raise ValueError('Row {} has more values than columns.'.format(i))
+            records.append(dict(row))
+        return records
+
+    if file_format == 'json':
+        records = json.loads(data)
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValueError('The JSON data must be an array of objects.')
+        return records
+
+    raise ValueError('Unknown format: ' + str(file_format) + ', please use csv or json.')
+
+
+def _get_value(record, field):
+    value = record.get(field)
+    if isinstance(value, str):
+        value = value.strip()
+    return value if value not in ('', None) else None
+
+
+def _get_list(record, field):
+    value = _get_value(record, field)
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(',') if item.strip()]
+
+
+def _get_objects(key_column, keys):
+    """
+    Gets the entries whose key_column is in keys with a single query.
+
+    Returns:
+        dictionary {key: entry}
+    """
+
+    if not keys:
+        return {}
+    return dict((getattr(obj, key_column.key), obj) for obj in key_column.class_.query.filter(key_column.in_(keys)))
+
+
+class _Keys(object):
+    """
+    The entries referenced by a list of records, loaded with one query per entity type.
+    """
+
+    def __init__(self, records):
+        values = dict((field, set()) for field in ('isoenzyme', 'reaction', 'models'))
+        for record in records:
+            values['isoenzyme'].add(_get_value(record, 'isoenzyme'))
+            values['reaction'].add(_get_value(record, 'reaction'))
+            values['models'].update(_get_list(record, 'models'))
+
+        self.enzymes = _get_objects(Enzyme.isoenzyme, values['isoenzyme'] - {None})
+        self.reactions = _get_objects(Reaction.acronym, values['reaction'] - {None})
+        self.models = _get_objects(Model.name, values['models'])
+        self.enz_rxn_orgs = {}
+
+    def load_enz_rxn_orgs(self, id_triples):
+        """
+        Gets the EnzymeReactionOrganisms for the given (enzyme_id, reaction_id, organism_id) with a single query, and
+        adds the ones that do not exist.
+        """
+
+        columns = (EnzymeReactionOrganism.enzyme_id, EnzymeReactionOrganism.reaction_id,
+                   EnzymeReactionOrganism.organism_id)
+        if id_triples:
+            for enz_rxn_org in EnzymeReactionOrganism.query.filter(tuple_(*columns).in_(list(id_triples))):
+                self.enz_rxn_orgs[(enz_rxn_org.enzyme_id, enz_rxn_org.reaction_id, enz_rxn_org.organism_id)] = \
+                    enz_rxn_org
+
+        next_id = (db.session.query(func.max(EnzymeReactionOrganism.id)).scalar() or 0) + 1
+        for enzyme_id, reaction_id, organism_id in sorted(set(id_triples) - set(self.enz_rxn_orgs)):
+            enz_rxn_org = EnzymeReactionOrganism(id=next_id, enzyme_id=enzyme_id, reaction_id=reaction_id,
+                                                 organism_id=organism_id)
+            db.session.add(enz_rxn_org)
+            self.enz_rxn_orgs[(enzyme_id, reaction_id, organism_id)] = enz_rxn_org
+            next_id += 1
+
+
+def _validate_record(record, keys):
+    """
+    Validates a record and resolves its keys.
+
+    Returns:
+        tuple (values, errors), where values is a dictionary with the resolved values.
+    """
+
+    errors = []
+    regulation_type = REGULATION_TYPES.get(_get_value(record, 'type'))
+    if regulation_type is None:
+        return None, ['type must be one of: ' + ', '.join(REGULATION_TYPES) + '.']
+
+    unknown_fields = sorted(field for field in record
+                            if field not in COMMON_FIELDS and not any(field in other_type.fields
+                                                                      for other_type in REGULATION_TYPES.values()))
+    if unknown_fields:
+        errors.append('Unknown fields: ' + ', '.join(unknown_fields) + '.')
+
+    for field in ['isoenzyme', 'reaction', 'organism'] + regulation_type.required:
+        if _get_value(record, field) is None:
+            errors.append(field + ' is required.')
+
+    values = {'regulation_type': regulation_type, 'comments': _get_value(record, 'comments')}
+
+    for field, objects in (('isoenzyme', keys.enzymes), ('reaction', keys.reactions)):
+        key = _get_value(record, field)
+        if key is not None and key not in objects:
+            errors.append('Unknown ' + field + ': ' + str(key) + '.')
+        values[field] = objects.get(key)
+
+    organism_name = _get_value(record, 'organism')
+    values['organism'] = reference_data.get(Organism, name=organism_name) if organism_name is not None else None
+    if organism_name is not None and values['organism'] is None:
+        errors.append('Unknown organism: ' + str(organism_name) + '.')
+
+    evidence_level = _get_value(record, 'evidence_level')
+    values['evidence'] = reference_data.get(EvidenceLevel, description=evidence_level) if evidence_level else None
+    if evidence_level is not None and values['evidence'] is None:
+        errors.append('Unknown evidence level: ' + str(evidence_level) + '.')
+
+    values['models'] = []
+    for model_name in _get_list(record, 'models'):
+        if model_name not in keys.models:
+            errors.append('Unknown model: ' + model_name + '.')
+        else:
+            values['models'].append(keys.models[model_name])
+    values['references'] = list(OrderedDict.fromkeys(_get_list(record, 'references')))
+
+    values['fields'] = {}
+    for field in regulation_type.metabolites:
+        values['fields'][field] = str(_get_value(record, field)) if _get_value(record, field) is not None else None
+    for field in regulation_type.floats:
+        value = _get_value(record, field)
+        try:
+            values['fields'][field] = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            errors.append(field + ' must be a number, got: ' + str(value) + '.')
+    for field, choices in regulation_type.choices.items():
+        value = _get_value(record, field)
+        if value is not None and value not in choices:
+            errors.append(field + ' must be one of: ' + ', '.join(choices) + '.')
+        values['fields'][field] = value if value is not None else choices[0]
+    for field in regulation_type.texts:
+        values['fields'][field] = _get_value(record, field)
+
+    return values, errors
+
+
+def insert_regulations(records, dry_run=False):
+    """
+    Validates regulation records and, if they are all valid, adds them to the session.
+
+    The insert is part of the current session transaction, it is up to the caller to commit it.
+
+    Args:
+        records: list of dictionaries, see the module docstring.
+        dry_run: if True the records are only validated.
+
+    Returns:
+        tuple (regulations, errors): the list of regulation objects in the same order as records (empty if there are
+        errors or dry_run is True), and the list of errors as dictionaries {'row': row number starting at 1,
+        'errors': list of messages}.
+    """
+
+    keys = _Keys(records)
+
+    rows = []
+    errors = []
+    for i, record in enumerate(records, 1):
+        values, record_errors = _validate_record(record, keys)
+        if record_errors:
+            errors.append({'row': i, 'errors': record_errors})
+        rows.append(values)
+
+    if errors or dry_run:
+        return [], errors
+
+    keys.load_enz_rxn_orgs(set((values['isoenzyme'].id, values['reaction'].id, values['organism'].id)
+                               for values in rows))
+
+    # all the DOIs are looked up with one query, the resolver then has them for each row
+    reference_resolver = get_reference_resolver()
+    reference_resolver.resolve([doi for values in rows for doi in values['references']])
+    # and so are the metabolites
+    metabolite_resolver = get_metabolite_resolver()
+    metabolite_resolver.resolve([values['fields'][field] for values in rows
+                                 for field in values['regulation_type'].metabolites
+                                 if values['fields'][field] is not None])
+
+    regulations = []
+    for values in rows:
+        regulation_type = values['regulation_type']
+        fields = dict(values['fields'])
+        for field in regulation_type.metabolites:
+            fields[field] = metabolite_resolver.resolve([fields[field]])[0] if fields[field] is not None else None
+
+        regulation = regulation_type.model(
+            enzyme_reaction_organism=keys.enz_rxn_orgs[(values['isoenzyme'].id, values['reaction'].id,
+                                                        values['organism'].id)],
+            evidence=values['evidence'],
+            comments=values['comments'],
+            **fields)
+        for model in values['models']:
+            regulation.models.append(model)
+        for reference in OrderedDict.fromkeys(reference_resolver.resolve(values['references'])):
+            regulation.references.append(reference)
+
+        db.session.add(regulation)
+        regulations.append(regulation)
+
+    db.session.flush()
+    return regulations, []
+
+
+def _insert_regulations_batch(records):
+    # the records were validated before, but the database may have changed in the meantime
+    regulations, errors = insert_regulations(records)
+    if errors:
+        raise ValueError('Invalid records: ' + str(errors))
+    return regulations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inserts enzyme inhibitions, activations, effectors and misc infos '
+                                                 'from a CSV or JSON file.')
+    parser.add_argument('regulations_file', help='CSV or JSON file, see the module docstring for the fields')
+    parser.add_argument('--dry-run', action='store_true', help='only validate the records')
+    parser.add_argument('--batch-size', type=int, help='write and commit the records in batches of BATCH_SIZE records')
+    args = parser.parse_args()
+
+    app = create_app(LoadDataConfig)
+    app_context = app.app_context()
+    app_context.push()
+
+    with open(args.regulations_file) as regulations_file:
+        records = read_regulations(regulations_file.read(),
+                                   os.path.splitext(args.regulations_file)[1].lstrip('.').lower())
+
+    start_time = time.perf_counter()
+    regulations, errors = insert_regulations(records, dry_run=args.dry_run or bool(args.batch_size))
+
+    if errors:
+        db.session.rollback()
+        for error in errors:
+            print('Row {}: {}'.format(error['row'], ' '.join(error['errors'])), file=sys.stderr)
+        print('{} of {} rows have errors, nothing was inserted'.format(len(errors), len(records)), file=sys.stderr)
+        sys.exit(1)
+
+    if args.dry_run:
+        print('All {} rows are valid'.format(len(records)))
+        return
+
+    if args.batch_size:
+        n_regulations, failed_batches = write_in_batches(records, _insert_regulations_batch, args.batch_size)
+        for first_record, error in failed_batches:
+            last_row = min(first_record + args.batch_size, len(records))
+            print('Rows {}-{} were not inserted: {}'.format(first_record + 1, last_row, error), file=sys.stderr)
+    else:
+        n_regulations = len(regulations)
+    db.session.commit()
+
+    elapsed_time = time.perf_counter() - start_time
+    print('Inserted {} regulations in {:.2f} s ({:.0f} rows/s)'.format(n_regulations, elapsed_time,
+                                                                       n_regulations / elapsed_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+""" This module implements streaming readers for the Metanetx cross-reference files (chem_xref.tsv, reac_xref.tsv and
+reac_prop.tsv).
+
+These files are several GB large, so instead of loading them in one go and filtering afterwards, they are read in
+chunks, only the needed columns are parsed, and the rows are filtered while reading. This way the peak memory depends
+on the chunk size and on the number of matching rows, not on the size of the file.
+
+"""
+
+import pandas as pd
+
+XREF_CHUNK_SIZE = 200000
+
+CHEM_XREF_COLUMNS = ['bigg_id', 'metanetx_id', 'evidence', 'name']
+REAC_XREF_COLUMNS = ['XREF', 'metanetx_id', 'rxn']
+REAC_PROP_COLUMNS = ['metanetx_id', 'equation', 'description', 'balance', 'EC', 'source']
+
+
+def _read_chunks(file_path, col_names, usecols, chunksize):
+    return pd.read_csv(file_path, sep='\t', comment='#', header=None, names=col_names, usecols=usecols, dtype=str,
+                       chunksize=chunksize)
+
+
+def _concat_chunks(chunks, columns, categorical_cols):
+    if chunks:
+        data_df = pd.concat(chunks, ignore_index=True)
+    else:
+        data_df = pd.DataFrame(columns=columns)
+
+    for col in categorical_cols:
+        data_df[col] = data_df[col].astype('category')
+
+    return data_df
+
+
+def iter_xrefs(file_path, col_names, xref_filters, usecols=None, xref_col='XREF', chunksize=XREF_CHUNK_SIZE):
+    """
+    Reads a Metanetx xref file (chem_xref.tsv or reac_xref.tsv) in chunks and yields, for each chunk, the rows whose
+    xref starts with one of the prefixes in xref_filters.
+
+    The database prefix (e.g. 'bigg:') is stripped from the xref and stored in a new column 'source' (e.g. 'bigg').
+
+    Args:
+        file_path: path to the xref file.
+        col_names: names of all columns in the file.
+        xref_filters: dictionary of the form {prefix: wanted_ids}, e.g. {'bigg:R': ['R_PGI', 'R_PFK'], 'kegg:R': None}.
+            If wanted_ids is None all rows starting with prefix are kept, otherwise only the rows whose id (without
+            the database prefix) is in wanted_ids.
+        usecols: the columns to be parsed, all if None.
+        xref_col: the name of the column with the xrefs.
+        chunksize: number of lines read at a time.
+
+    Returns:
+        generator of pandas dataframes with the matching rows.
+    """
+
+    usecols = list(usecols) if usecols else list(col_names)
+    xref_filters = {prefix: (set(wanted_ids) if wanted_ids is not None else None)
+                    for prefix, wanted_ids in xref_filters.items()}
+
+    for chunk in _read_chunks(file_path, col_names, usecols, chunksize):
+        for prefix, wanted_ids in xref_filters.items():
+            matched_df = chunk[chunk[xref_col].str.startswith(prefix, na=False)]
+            if matched_df.empty:
+                continue
+
+            source, _ = prefix.split(':', 1)
+            xref_ids = matched_df[xref_col].str.slice(len(source) + 1)
+            if wanted_ids is not None:
+                is_wanted = xref_ids.isin(wanted_ids)
+                matched_df = matched_df[is_wanted]
+                xref_ids = xref_ids[is_wanted]
+
+            if not matched_df.empty:
+                yield matched_df.assign(**{xref_col: xref_ids, 'source': source})
+
+
+def stream_xrefs(file_path, col_names, xref_filters, usecols=None, xref_col='XREF', categorical_cols=(),
+                 chunksize=XREF_CHUNK_SIZE):
+    """
+    Reads a Metanetx xref file (chem_xref.tsv or reac_xref.tsv) in chunks and keeps only the rows whose xref starts
+    with one of the prefixes in xref_filters (see iter_xrefs).
+
+    Args:
+        file_path: path to the xref file.
+        col_names: names of all columns in the file.
+        xref_filters: dictionary of the form {prefix: wanted_ids}, see iter_xrefs.
+        usecols: the columns to be parsed, all if None.
+        xref_col: the name of the column with the xrefs.
+        categorical_cols: columns to be converted to the categorical dtype.
+        chunksize: number of lines read at a time.
+
+    Returns:
+        pandas dataframe with the matching rows.
+    """
+
+    usecols = list(usecols) if usecols else list(col_names)
+    chunks = list(iter_xrefs(file_path, col_names, xref_filters, usecols=usecols, xref_col=xref_col,
+                             chunksize=chunksize))
+
+    return _concat_chunks(chunks, usecols + ['source'], ['source'] + list(categorical_cols))
+
+
+def iter_rows(file_path, col_names, usecols=None, chunksize=XREF_CHUNK_SIZE):
+    """
+    Reads a Metanetx tsv file (e.g. reac_prop.tsv) in chunks, parsing only the given columns.
+
+    Args:
+        file_path: path to the tsv file.
+        col_names: names of all columns in the file.
+        usecols: the columns to be parsed, all if None.
+        chunksize: number of lines read at a time.
+
+    Returns:
+        generator of pandas dataframes.
+    """
+
+    usecols = list(usecols) if usecols else list(col_names)
+    return _read_chunks(file_path, col_names, usecols, chunksize)
+
+
+def stream_rows(file_path, col_names, key_col, wanted_keys, usecols=None, categorical_cols=(),
+                chunksize=XREF_CHUNK_SIZE):
+    """
+    Reads a Metanetx tsv file (e.g. reac_prop.tsv) in chunks and keeps only the rows whose key_col is in wanted_keys.
+
+    Args:
+        file_path: path to the tsv file.
+        col_names: names of all columns in the file.
+        key_col: the name of the column to filter on.
+        wanted_keys: the values of key_col to keep.
+        usecols: the columns to be parsed, all if None.
+        categorical_cols: columns to be converted to the categorical dtype.
+        chunksize: number of lines read at a time.
+
+    Returns:
+        pandas dataframe with the matching rows.
+    """
+
+    usecols = list(usecols) if usecols else list(col_names)
+    wanted_keys = set(wanted_keys)
+
+    chunks = []
+    for chunk in iter_rows(file_path, col_names, usecols=usecols, chunksize=chunksize):
+        matched_df = chunk[chunk[key_col].isin(wanted_keys)]
+        if not matched_df.empty:
+            chunks.append(matched_df)
+
+    return _concat_chunks(chunks, usecols, categorical_cols)
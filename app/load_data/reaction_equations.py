@@ -0,0 +1,92 @@
+""" This module implements the backfill of the reaction equation column.
+
+Reaction.equation is kept up to date by Reaction.add_metabolite and Reaction.empty_metabolites, and the bulk loaders
+set it on insert. Reactions created before the column existed, or whose metabolites were changed with raw SQL, have a
+missing or stale equation, which this command rebuilds from reaction_metabolite.
+
+Usage:
+    python -m app.load_data.reaction_equations [--missing-only]
+
+"""
+
+import argparse
+import time
+
+from sqlalchemy import bindparam
+
+from app import create_app, db, detail_cache
+from app.load_data.bulk_insert import BULK_INSERT_BATCH_SIZE
+from app.load_data.load_initial_data import LoadDataConfig
+from app.models import Compartment, Metabolite, Reaction, ReactionMetabolite
+
+
+def _get_terms(equation):
+    return [sorted(side.split(' + ')) for side in equation.split(' <-> ')] if equation is not None else None
+
+
+def update_reaction_equations(missing_only=False, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Rebuilds Reaction.equation from the reaction metabolites of all reactions, with one query to read the
+    stoichiometries and one batched UPDATE for the reactions whose equation changed.
+
+    reaction_metabolite rows have no order, so an equation is only considered changed if its terms changed, and
+    equations that only differ in the order of the terms keep the order they were entered with.
+
+    The update is part of the current session transaction, it is up to the caller to commit it.
+
+    Args:
+        missing_only: if True, only reactions without an equation are updated.
+        batch_size: maximum number of rows per UPDATE statement.
+
+    Returns:
+        the number of updated reactions.
+    """
+
+    reaction_query = db.session.query(Reaction.id, Reaction.equation)
+    if missing_only:
+        reaction_query = reaction_query.filter(Reaction.equation.is_(None))
+    current_equations = dict(reaction_query.all())
+
+    stoichiometries = dict((reaction_id, []) for reaction_id in current_equations)
+    rxn_met_query = db.session.query(ReactionMetabolite.reaction_id, Metabolite.bigg_id, Compartment.bigg_id,
+                                     ReactionMetabolite.stoich_coef) \
+        .join(Metabolite, ReactionMetabolite.metabolite_id == Metabolite.id) \
+        .join(Compartment, ReactionMetabolite.compartment_id == Compartment.id)
+    for reaction_id, met_bigg_id, compartment_acronym, stoich_coef in rxn_met_query:
+        if reaction_id in stoichiometries:
+            stoichiometries[reaction_id].append((met_bigg_id, compartment_acronym, stoich_coef))
+
+    rows = []
+    for reaction_id, rxn_stoichiometry in stoichiometries.items():
+        equation = Reaction.get_equation(rxn_stoichiometry)
+        if _get_terms(equation) != _get_terms(current_equations[reaction_id]):
+            rows.append({'reaction_id': reaction_id, 'equation': equation})
+
+    table = Reaction.__table__
+    update_stmt = table.update().where(table.c.id == bindparam('reaction_id')) \
+        .values(equation=bindparam('equation'))
+    for i in range(0, len(rows), batch_size):
+        db.session.execute(update_stmt, rows[i:i + batch_size])
+
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuilds the equation of the reactions in the database.')
+    parser.add_argument('--missing-only', action='store_true', help='only update reactions without an equation')
+    args = parser.parse_args()
+
+    app = create_app(LoadDataConfig)
+    app_context = app.app_context()
+    app_context.push()
+
+    start_time = time.perf_counter()
+    n_updated = update_reaction_equations(missing_only=args.missing_only)
+    db.session.commit()
+    detail_cache.clear()
+
+    print('Updated the equation of {} reactions in {:.2f} s'.format(n_updated, time.perf_counter() - start_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+""" This module implements an incremental refresh of the data loaded by load_initial_data.
+
+Instead of dropping and reloading all tables, compartments, metabolites, reactions, enzymes and genes are upserted by
+their natural key (bigg_id, acronym, isoenzyme or name). Rows whose content hash did not change are not touched, and
+only the columns that come from the source files are updated, so curated data (e.g. grasp ids) is kept.
+
+Usage:
+    python -m app.load_data.refresh_data
+
+"""
+
+import hashlib
+import json
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import create_app, db, detail_cache, reference_data
+from app.load_data.bulk_insert import BULK_INSERT_BATCH_SIZE, bulk_insert, get_key_map
+from app.load_data.load_initial_data import LoadDataConfig, _add_reaction_metabolites, _get_compartment_rows, \
+    _get_enzyme_rows, _get_gene_rows, _get_metabolite_rows, _get_metabolites_from_core_ecoli, _get_reaction_rows
+from app.models import Compartment, Enzyme, Gene, Metabolite, Reaction
+
+
+def _content_hash(values):
+    return hashlib.sha1(json.dumps([str(value) if value is not None else None for value in values])
+                        .encode('utf-8')).hexdigest()
+
+
+def _write_upserts(table, key_column, rows, update_columns, batch_size):
+    if db.engine.dialect.name == 'postgresql':
+        for i in range(0, len(rows), batch_size):
+            insert_stmt = pg_insert(table).values(rows[i:i + batch_size])
+            if update_columns:
+                changed = or_(*[table.c[col].is_distinct_from(insert_stmt.excluded[col]) for col in update_columns])
+                insert_stmt = insert_stmt.on_conflict_do_update(
+                    index_elements=[key_column], set_={col: insert_stmt.excluded[col] for col in update_columns},
+                    where=changed)
+            else:
+                insert_stmt = insert_stmt.on_conflict_do_nothing(index_elements=[key_column])
+            db.session.execute(insert_stmt)
+    else:
+        # other databases have no INSERT ... ON CONFLICT in sqlalchemy, split into inserts and updates
+        existing_keys = set(get_key_map(table.c[key_column], table.c[key_column]))
+        bulk_insert(table, [row for row in rows if row[key_column] not in existing_keys], batch_size=batch_size)
+        for row in rows:
+            if row[key_column] in existing_keys and update_columns:
+                db.session.execute(table.update().where(table.c[key_column] == row[key_column])
+                                   .values({col: row[col] for col in update_columns}))
+
+
+def upsert_rows(table, key_column, rows, update_columns, batch_size=BULK_INSERT_BATCH_SIZE):
+    """
+    Inserts the rows whose key is not in table and updates update_columns in the rows whose content changed, in
+    batches of INSERT ... ON CONFLICT DO UPDATE statements.
+
+    The content hash of update_columns of each row is compared with the one of the row in the database, so unchanged
+    rows are not sent to the database at all.
+
+    Args:
+        table: the table to upsert into, e.g. Metabolite.__table__.
+        key_column: name of the natural key column, it must have a unique constraint.
+        rows: list of dictionaries of the form {column_name: value}, all with the same keys.
+        update_columns: names of the columns to be updated on existing rows.
+        batch_size: maximum number of rows per statement.
+
+    Returns:
+        dictionary with the number of inserted, updated and unchanged rows.
+    """
+
+    # the last row wins if a key is repeated, a key can only be upserted once per statement
+    rows = list({row[key_column]: row for row in rows}.values())
+
+    existing_hashes = {row[0]: _content_hash(row[1:]) for row in
+                       db.session.query(table.c[key_column], *[table.c[col] for col in update_columns]).all()}
+
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    changed_rows = []
+    for row in rows:
+        existing_hash = existing_hashes.get(row[key_column])
+        if existing_hash is None:
+            counts['inserted'] += 1
+        elif existing_hash != _content_hash([row[col] for col in update_columns]):
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+            continue
+        changed_rows.append(row)
+
+    _write_upserts(table, key_column, changed_rows, update_columns, batch_size)
+
+    return counts
+
+
+def refresh_data():
+    """
+    Upserts compartments, metabolites, reactions, enzymes and genes from the same sources as load_initial_data.
+
+    For new reactions, their metabolites are added as well.
+
+    Returns:
+        dictionary of the form {table_name: {'inserted': n, 'updated': n, 'unchanged': n}}
+    """
+
+    counts = {'compartment': upsert_rows(Compartment.__table__, 'bigg_id', _get_compartment_rows(),
+                                         ['name', 'metanetx_id'])}
+    reference_data.invalidate(Compartment)
+
+    metabolites_df = _get_metabolites_from_core_ecoli()
+    counts['metabolite'] = upsert_rows(Metabolite.__table__, 'bigg_id', _get_metabolite_rows(metabolites_df),
+                                       ['name', 'metanetx_id'])
+
+    existing_reactions = set(get_key_map(Reaction.acronym, Reaction.id))
+    reaction_rows, rxn_stoichiometries = _get_reaction_rows(get_key_map(Compartment.bigg_id, Compartment.name))
+    counts['reaction'] = upsert_rows(Reaction.__table__, 'acronym', reaction_rows,
+                                     ['name', 'metanetx_id', 'bigg_id', 'kegg_id'])
+    _add_reaction_metabolites({acronym: rxn_stoichiometry for acronym, rxn_stoichiometry in rxn_stoichiometries.items()
+                               if acronym not in existing_reactions})
+
+    counts['enzyme'] = upsert_rows(Enzyme.__table__, 'isoenzyme', _get_enzyme_rows(),
+                                   ['name', 'acronym', 'ec_number'])
+    counts['gene'] = upsert_rows(Gene.__table__, 'name', _get_gene_rows(), [])
+
+    db.session.commit()
+    # the upserts bypass the session events that invalidate the detail pages
+    detail_cache.clear()
+
+    return counts
+
+
+def main():
+    app = create_app(LoadDataConfig)
+    app_context = app.app_context()
+    app_context.push()
+
+    start_time = time.perf_counter()
+    counts = refresh_data()
+
+    for table, table_counts in counts.items():
+        print('{}: {inserted} inserted, {updated} updated, {unchanged} unchanged'.format(table, **table_counts))
+    print('Total: {:.2f} s'.format(time.perf_counter() - start_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+""" This module implements an on-disk index (a SQLite file) of the BiGG <-> Metanetx <-> KEGG <-> EC mappings.
+
+The index is built once from the Metanetx files (chem_xref.tsv, reac_xref.tsv and reac_prop.tsv) with
+build_xref_index, and afterwards XrefIndex resolves ids with indexed lookups instead of reparsing the raw files.
+
+The path of the index is the XREF_INDEX_FILE setting of the app config. get_xref_index opens one read-only connection
+per app context, i.e. per request or per load script, so connections are not shared between threads and a rebuilt
+index is seen by the next request.
+
+Usage:
+    python -m app.load_data.xref_index
+
+BiGG ids are stored without the 'M_' and 'R_' prefixes, e.g. 'atp' and 'PGI'.
+
+"""
+
+import os
+import re
+import sqlite3
+
+from flask import current_app, g
+
+from app import create_app
+from app.load_data import METABOLITE_DATA_FILE, REACTION_DATA_FILE, REACTION_EC_DATA_FILE
+from app.load_data.metanetx_xrefs import iter_rows, iter_xrefs, CHEM_XREF_COLUMNS, REAC_XREF_COLUMNS, \
+    REAC_PROP_COLUMNS
+
+_SCHEMA = """
+    CREATE TABLE met_xref (source TEXT NOT NULL, xref_id TEXT NOT NULL, metanetx_id TEXT NOT NULL, name TEXT);
+    CREATE TABLE rxn_xref (source TEXT NOT NULL, xref_id TEXT NOT NULL, metanetx_id TEXT NOT NULL);
+    CREATE TABLE rxn_ec (metanetx_id TEXT PRIMARY KEY, ec_number TEXT);
+"""
+
+_INDEXES = """
+    CREATE INDEX ix_met_xref_source_xref_id ON met_xref (source, xref_id);
+    CREATE INDEX ix_met_xref_metanetx_id ON met_xref (metanetx_id, source);
+    CREATE INDEX ix_rxn_xref_source_xref_id ON rxn_xref (source, xref_id);
+    CREATE INDEX ix_rxn_xref_metanetx_id ON rxn_xref (metanetx_id, source);
+"""
+
+# sqlite limits the number of host parameters in a query
+_MAX_PARAMS = 900
+
+
+def _strip_bigg_prefix(bigg_id):
+    return re.sub('^[MR]_', '', bigg_id)
+
+
+def build_xref_index(index_file, met_data_file=METABOLITE_DATA_FILE,
+                     rxn_data_file=REACTION_DATA_FILE, rxn_ec_data_file=REACTION_EC_DATA_FILE):
+    """
+    Builds the xref index from the Metanetx files. The files are streamed in chunks, so memory usage does not depend
+    on their size. An existing index file is replaced.
+
+    Args:
+        index_file: path to the SQLite file to be created.
+        met_data_file: path to chem_xref.tsv.
+        rxn_data_file: path to reac_xref.tsv.
+        rxn_ec_data_file: path to reac_prop.tsv.
+
+    Returns:
+        None
+    """
+
+    tmp_file = index_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    conn = sqlite3.connect(tmp_file)
+    conn.executescript(_SCHEMA)
+
+    for chunk in iter_xrefs(met_data_file, CHEM_XREF_COLUMNS, {'bigg:': None, 'kegg:C': None},
+                            usecols=['bigg_id', 'metanetx_id', 'name'], xref_col='bigg_id'):
+        chunk = chunk[~chunk['bigg_id'].str.startswith('M_')]
+        conn.executemany('INSERT INTO met_xref VALUES (?, ?, ?, ?)',
+                         zip(chunk['source'], chunk['bigg_id'], chunk['metanetx_id'],
+                             chunk['name'].where(chunk['name'].notnull(), None)))
+
+    for chunk in iter_xrefs(rxn_data_file, REAC_XREF_COLUMNS, {'bigg:R': None, 'kegg:R': None},
+                            usecols=['XREF', 'metanetx_id']):
+        xref_ids = [_strip_bigg_prefix(xref_id) if source == 'bigg' else xref_id
+                    for source, xref_id in zip(chunk['source'], chunk['XREF'])]
+        conn.executemany('INSERT INTO rxn_xref VALUES (?, ?, ?)',
+                         zip(chunk['source'], xref_ids, chunk['metanetx_id']))
+
+    for chunk in iter_rows(rxn_ec_data_file, REAC_PROP_COLUMNS, usecols=['metanetx_id', 'EC']):
+        chunk = chunk[chunk['EC'].notnull()]
+        conn.executemany('INSERT OR REPLACE INTO rxn_ec VALUES (?, ?)', zip(chunk['metanetx_id'], chunk['EC']))
+
+    conn.executescript(_INDEXES)
+    conn.commit()
+    conn.close()
+
+    os.replace(tmp_file, index_file)
+
+
+class XrefIndex:
+    """
+    Read-only lookups on an xref index built with build_xref_index.
+
+    Args:
+        index_file: path to the SQLite file.
+    """
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.conn = sqlite3.connect('file:{}?mode=ro'.format(index_file), uri=True)
+
+    def close(self):
+        self.conn.close()
+
+    def _select_in(self, query, values, params=()):
+        rows = []
+        values = list(values)
+        for i in range(0, len(values), _MAX_PARAMS):
+            batch = values[i:i + _MAX_PARAMS]
+            placeholders = ', '.join('?' * len(batch))
+            rows.extend(self.conn.execute(query.format(placeholders), tuple(params) + tuple(batch)).fetchall())
+        return rows
+
+    def get_metabolites(self, bigg_ids):
+        """
+        Gets the Metanetx id and name of a list of metabolites.
+
+        Args:
+            bigg_ids: list of metabolite bigg ids, e.g. ['atp', 'adp'].
+
+        Returns:
+            dictionary of the form {bigg_id: {'metanetx_id': metanetx_id, 'name': name}}, ids not found are not
+            included.
+        """
+
+        rows = self._select_in('SELECT xref_id, metanetx_id, name FROM met_xref '
+                               'WHERE source = ? AND xref_id IN ({})',
+                               set(_strip_bigg_prefix(bigg_id) for bigg_id in bigg_ids), params=('bigg',))
+
+        met_xrefs = {}
+        for bigg_id, metanetx_id, name in rows:
+            met_xrefs.setdefault(bigg_id, {'metanetx_id': metanetx_id, 'name': name})
+        return met_xrefs
+
+    def get_reactions(self, bigg_ids):
+        """
+        Gets the Metanetx id, KEGG id, and EC number of a list of reactions.
+
+        Args:
+            bigg_ids: list of reaction bigg ids, e.g. ['PGI', 'PFK'].
+
+        Returns:
+            dictionary of the form {bigg_id: {'metanetx_id': metanetx_id, 'kegg_id': kegg_id, 'ec_number': ec_number}},
+            ids not found are not included.
+        """
+
+        rows = self._select_in('SELECT bigg.xref_id, bigg.metanetx_id, MIN(kegg.xref_id), ec.ec_number '
+                               'FROM rxn_xref AS bigg '
+                               'LEFT JOIN rxn_xref AS kegg ON kegg.metanetx_id = bigg.metanetx_id '
+                               'AND kegg.source = ? '
+                               'LEFT JOIN rxn_ec AS ec ON ec.metanetx_id = bigg.metanetx_id '
+                               'WHERE bigg.source = ? AND bigg.xref_id IN ({}) '
+                               'GROUP BY bigg.xref_id, bigg.metanetx_id, ec.ec_number',
+                               set(_strip_bigg_prefix(bigg_id) for bigg_id in bigg_ids), params=('kegg', 'bigg'))
+
+        rxn_xrefs = {}
+        for bigg_id, metanetx_id, kegg_id, ec_number in rows:
+            rxn_xrefs.setdefault(bigg_id, {'metanetx_id': metanetx_id, 'kegg_id': kegg_id, 'ec_number': ec_number})
+        return rxn_xrefs
+
+    def get_metabolite(self, bigg_id):
+        """
+        Gets the Metanetx id and name of a metabolite, see get_metabolites.
+
+        Args:
+            bigg_id: the metabolite bigg id, e.g. 'atp'.
+
+        Returns:
+            dictionary with metanetx_id and name or None if the metabolite is not in the index.
+        """
+
+        return self.get_metabolites([bigg_id]).get(_strip_bigg_prefix(bigg_id))
+
+    def get_reaction(self, bigg_id):
+        """
+        Gets the Metanetx id, KEGG id, and EC number of a reaction, see get_reactions.
+
+        Args:
+            bigg_id: the reaction bigg id, e.g. 'PGI'.
+
+        Returns:
+            dictionary with metanetx_id, kegg_id, and ec_number or None if the reaction is not in the index.
+        """
+
+        return self.get_reactions([bigg_id]).get(_strip_bigg_prefix(bigg_id))
+
+
+def get_xref_index():
+    """
+    Gets the XrefIndex of the current app context for the XREF_INDEX_FILE of the app config. The connection is opened
+    the first time the index is used in the app context and closed with it, see close_xref_index.
+
+    Returns:
+        XrefIndex or None if the index file does not exist.
+    """
+
+    if 'xref_index' not in g:
+        index_file = current_app.config.get('XREF_INDEX_FILE')
+        g.xref_index = XrefIndex(index_file) if index_file and os.path.isfile(index_file) else None
+    return g.xref_index
+
+
+def close_xref_index(exception=None):
+    """
+    Closes the connection of the xref index of the current app context, if it was opened. It is registered with
+    teardown_appcontext in create_app.
+    """
+
+    xref_index = g.pop('xref_index', None)
+    if xref_index is not None:
+        xref_index.close()
+
+
+def main():
+    app = create_app()
+    build_xref_index(app.config['XREF_INDEX_FILE'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+""" This module implements select fields for big tables, e.g. reactions or enzyme inhibitions.
+
+Unlike QuerySelectField, which loads the whole table every time the form is rendered or validated, these fields only
+render the selected entries. The other options are searched by the browser through the api options endpoint, and the
+submitted entries are loaded with a single IN query.
+
+"""
+
+from flask import url_for
+from markupsafe import escape
+from sqlalchemy import tuple_
+from sqlalchemy.orm import class_mapper
+from wtforms import Field
+from wtforms.ext.sqlalchemy.fields import get_pk_from_identity
+from wtforms.validators import ValidationError
+from wtforms.widgets import HTMLString, html_params
+
+
+class LazySelect(object):
+    """
+    Renders a select with only the selected options, the url of the options endpoint is set in data-search-url.
+
+    Args:
+        multiple: if True renders a multiple select.
+    """
+
+    def __init__(self, multiple=False):
+        self.multiple = multiple
+
+    def __call__(self, field, **kwargs):
+        kwargs.setdefault('id', field.id)
+        if self.multiple:
+            kwargs['multiple'] = True
+        kwargs['data-search-url'] = url_for('api.get_options', entity=field.entity)
+
+        html = ['<select %s>' % html_params(name=field.name, **kwargs)]
+        if not self.multiple and field.allow_blank:
+            html.append('<option %s></option>' % html_params(value='__None'))
+        for obj in field.get_selected():
+            html.append('<option %s>%s</option>' % (html_params(value=get_pk_from_identity(obj), selected=True),
+                                                    escape(field.get_label(obj))))
+        html.append('</select>')
+        return HTMLString(''.join(html))
+
+
+class LazyQuerySelectMultipleField(Field):
+    """
+    Multiple select of model entries, the data property holds a list with the selected entries.
+
+    Args:
+        label: the field label.
+        validators: the field validators.
+        model: the model class of the entries, e.g. EnzymeReactionInhibition.
+        entity: the name of the entries in the api options endpoint, e.g. 'enzyme_inhibition'.
+        get_label: function that gets the label of an entry, str by default.
+    """
+
+    widget = LazySelect(multiple=True)
+
+    def __init__(self, label=None, validators=None, model=None, entity=None, get_label=None, **kwargs):
+        kwargs.setdefault('default', [])
+        super(LazyQuerySelectMultipleField, self).__init__(label, validators, **kwargs)
+        self.model = model
+        self.entity = entity
+        self.get_label = get_label or str
+        self._formdata = None
+        self._invalid_formdata = False
+
+    def _get_data(self):
+        if self._formdata is not None:
+            objects = get_objects(self.model, self._formdata)
+            self._invalid_formdata = any(pk not in objects for pk in self._formdata)
+            self._set_data([objects[pk] for pk in self._formdata if pk in objects])
+        return self._data
+
+    def _set_data(self, data):
+        self._data = data
+        self._formdata = None
+
+    data = property(_get_data, _set_data)
+
+    def get_selected(self):
+        """
+        Gets the selected entries, as a list.
+        """
+
+        return list(self.data or [])
+
+    def process_formdata(self, valuelist):
+        self._formdata = [value for value in valuelist if value and value != '__None']
+
+    def pre_validate(self, form):
+        if self._formdata is not None:
+            self._get_data()
+        if self._invalid_formdata:
+            raise ValidationError(self.gettext('Not a valid choice'))
+
+
+class LazyQuerySelectField(LazyQuerySelectMultipleField):
+    """
+    Select of one model entry, the data property holds the selected entry or None.
+
+    Args:
+        label: the field label.
+        validators: the field validators.
+        model: the model class of the entries, e.g. Reaction.
+        entity: the name of the entries in the api options endpoint, e.g. 'reaction'.
+        get_label: function that gets the label of an entry, str by default.
+        allow_blank: if True the field can be left blank.
+    """
+
+    widget = LazySelect()
+
+    def __init__(self, label=None, validators=None, allow_blank=False, **kwargs):
+        kwargs.setdefault('default', None)
+        super(LazyQuerySelectField, self).__init__(label, validators, **kwargs)
+        self.allow_blank = allow_blank
+
+    def _get_data(self):
+        if self._formdata is not None:
+            key = self._formdata[0] if self._formdata else None
+            obj = get_objects(self.model, [key]).get(key) if key else None
+            self._invalid_formdata = key is not None and obj is None
+            self._set_data(obj)
+        return self._data
+
+    data = property(_get_data, LazyQuerySelectMultipleField._set_data)
+
+    def get_selected(self):
+        return [self.data] if self.data is not None else []
+
+    def process_formdata(self, valuelist):
+        super(LazyQuerySelectField, self).process_formdata(valuelist[:1])
+
+    def pre_validate(self, form):
+        if self._formdata is not None:
+            self._get_data()
+        if self._invalid_formdata or (self.data is None and not self.allow_blank):
+            raise ValidationError(self.gettext('Not a valid choice'))
+
+
+def get_objects(model, keys):
+    """
+    Gets the entries of model with the given primary keys with a single query.
+
+    Args:
+        model: the model class.
+        keys: list of primary keys as rendered in the select options, e.g. '1' or '1:1:1' for composite keys.
+
+    Returns:
+        dictionary {key: entry}, keys that are not valid or not found are left out.
+    """
+
+    pk_columns = class_mapper(model).primary_key
+
+    idents = []
+    for key in keys:
+        values = key.split(':')
+        if len(values) != len(pk_columns):
+            continue
+        try:
+            idents.append(tuple(column.type.python_type(value) for column, value in zip(pk_columns, values)))
+        except ValueError:
+            continue
+
+    if not idents:
+        return {}
+
+    if len(pk_columns) == 1:
+        query = model.query.filter(pk_columns[0].in_([ident[0] for ident in idents]))
+    else:
+        query = model.query.filter(tuple_(*pk_columns).in_(idents))
+
+    return dict((get_pk_from_identity(obj), obj) for obj in query)
@@ -6,50 +6,28 @@ from wtforms.ext.sqlalchemy.fields import QuerySelectField, QuerySelectMultipleF
 from wtforms.validators import ValidationError, DataRequired, Length, Optional
 from flask_wtf.file import FileField, FileRequired
 
+from app import reference_data
+from app.main.fields import LazyQuerySelectField, LazyQuerySelectMultipleField
 from app.models import Compartment, Enzyme, EvidenceLevel, Mechanism, Model, Organism, Reaction, User, \
     EnzymeReactionOrganism, EnzymeReactionInhibition, EnzymeReactionActivation, \
     EnzymeReactionEffector, ModelAssumptions, EnzymeReactionMiscInfo, Metabolite
-from app.utils.parsers import parse_input_list, ReactionParser
+from app.utils.parsers import parse_input_list, parse_reaction
 
 
-def get_compartments():
-    return Compartment.query
-
-
-def get_enzymes():
-    return Enzyme.query
-
-
-def get_enzyme_activations():
-    return EnzymeReactionActivation.query
-
-
-def get_enzyme_effectors():
-    return EnzymeReactionEffector.query
-
-
-def get_enzyme_inhibitions():
-    return EnzymeReactionInhibition.query
-
+INHIBITION_TYPES = ['Unknown', 'Competitive', 'Uncompetitive', 'Noncompetitive', 'Mixed']
+EFFECTOR_TYPES = ['Activating', 'Inhibiting']
 
-def get_enzyme_misc_infos():
-    return EnzymeReactionMiscInfo.query
 
-
-def get_enzyme_reaction_organisms():
-    return EnzymeReactionOrganism.query
+def get_compartments():
+    return reference_data.all(Compartment)
 
 
 def get_evidence_names():
-    return EvidenceLevel.query
+    return reference_data.all(EvidenceLevel)
 
 
 def get_mechanisms():
-    return Mechanism.query
-
-
-def get_model_assumptions():
-    return ModelAssumptions.query
+    return reference_data.all(Mechanism)
 
 
 def get_models():
@@ -57,11 +35,7 @@ def get_models():
 
 
 def get_organisms():
-    return Organism.query
-
-
-def get_reactions():
-    return Reaction.query
+    return reference_data.all(Organism)
 
 
 class EditProfileForm(FlaskForm):
@@ -139,17 +113,14 @@ class EnzymeForm(FlaskForm):
 
 
 class EnzymeInhibitionForm(FlaskForm):
-    enzyme = QuerySelectField('Isoenzyme *', query_factory=get_enzymes)
-    reaction = QuerySelectField('Reaction *', query_factory=get_reactions)
+    enzyme = LazyQuerySelectField('Isoenzyme *', model=Enzyme, entity='enzyme')
+    reaction = LazyQuerySelectField('Reaction *', model=Reaction, entity='reaction')
     organism = QuerySelectField('Organism *', query_factory=get_organisms)
     models = QuerySelectMultipleField('Model(s)', query_factory=get_models, allow_blank=True)
     inhibitor_met = StringField('Inhibiting metabolite (e.g. adp), please use bigg IDs *', validators=[DataRequired()],
                                 id='metabolite_list')
     affected_met = StringField('Affected metabolite (e.g. atp), please use bigg IDs', id='metabolite_list')
-    inhibition_type = SelectField('Inhibition type', choices=[('Unknown', 'Unknown'), ('Competitive', 'Competitive'),
-                                                              ('Uncompetitive', 'Uncompetitive'),
-                                                              ('Noncompetitive', 'Noncompetitive'),
-                                                              ('Mixed', 'Mixed')])
+    inhibition_type = SelectField('Inhibition type', choices=[(value, value) for value in INHIBITION_TYPES])
     inhibition_constant = FloatField('Inhibition constant (in M)', validators=[Optional()])
     inhibition_evidence_level = QuerySelectField('Enzyme inhibition evidence level', query_factory=get_evidence_names,
                                                  allow_blank=True)
@@ -161,8 +132,8 @@ class EnzymeInhibitionForm(FlaskForm):
 
 
 class EnzymeActivationForm(FlaskForm):
-    enzyme = QuerySelectField('Isoenzyme *', query_factory=get_enzymes, validators=[DataRequired()])
-    reaction = QuerySelectField('Reaction *', query_factory=get_reactions, validators=[DataRequired()])
+    enzyme = LazyQuerySelectField('Isoenzyme *', model=Enzyme, entity='enzyme', validators=[DataRequired()])
+    reaction = LazyQuerySelectField('Reaction *', model=Reaction, entity='reaction', validators=[DataRequired()])
     organism = QuerySelectField('Organism *', query_factory=get_organisms)
     models = QuerySelectMultipleField('Model(s)', query_factory=get_models, allow_blank=True)
     activator_met = StringField('Activating metabolite (e.g. adp), please use bigg IDs *', validators=[DataRequired()],
@@ -178,13 +149,13 @@ class EnzymeActivationForm(FlaskForm):
 
 
 class EnzymeEffectorForm(FlaskForm):
-    enzyme = QuerySelectField('Isoenzyme *', query_factory=get_enzymes, validators=[DataRequired()])
-    reaction = QuerySelectField('Reaction *', query_factory=get_reactions, validators=[DataRequired()])
+    enzyme = LazyQuerySelectField('Isoenzyme *', model=Enzyme, entity='enzyme', validators=[DataRequired()])
+    reaction = LazyQuerySelectField('Reaction *', model=Reaction, entity='reaction', validators=[DataRequired()])
     organism = QuerySelectField('Organism *', query_factory=get_organisms)
     models = QuerySelectMultipleField('Model(s)', query_factory=get_models, allow_blank=True)
     effector_met = StringField('Effector metabolite (e.g. adp), please use bigg IDs *', validators=[DataRequired()],
                                id='metabolite_list')
-    effector_type = SelectField('Effector type', choices=[('Activating', 'Activating'), ('Inhibiting', 'Inhibiting')])
+    effector_type = SelectField('Effector type', choices=[(value, value) for value in EFFECTOR_TYPES])
     effector_evidence_level = QuerySelectField('Effector evidence level', query_factory=get_evidence_names,
                                                allow_blank=True)
     references = StringField(
@@ -195,8 +166,8 @@ class EnzymeEffectorForm(FlaskForm):
 
 
 class EnzymeMiscInfoForm(FlaskForm):
-    enzyme = QuerySelectField('Isoenzyme *', query_factory=get_enzymes, validators=[DataRequired()])
-    reaction = QuerySelectField('Reaction *', query_factory=get_reactions, validators=[DataRequired()])
+    enzyme = LazyQuerySelectField('Isoenzyme *', model=Enzyme, entity='enzyme', validators=[DataRequired()])
+    reaction = LazyQuerySelectField('Reaction *', model=Reaction, entity='reaction', validators=[DataRequired()])
     organism = QuerySelectField('Organism *', query_factory=get_organisms)
     models = QuerySelectMultipleField('Model(s)', query_factory=get_models, allow_blank=True)
     topic = StringField('Topic (e.g. allostery) *', validators=[DataRequired()])
@@ -274,8 +245,8 @@ class ModelForm(FlaskForm):
     name = StringField('Model name (e.g. E coli - iteration 1) *', validators=[DataRequired()])
     organism_name = StringField('Organism name (e.g. E coli) *', validators=[DataRequired()], id='organism_name')
     strain = StringField('Organism strain (e.g. MG1655)')
-    enz_rxn_orgs = QuerySelectMultipleField('Reactions in the model', query_factory=get_enzyme_reaction_organisms,
-                                            allow_blank=True)
+    enz_rxn_orgs = LazyQuerySelectMultipleField('Reactions in the model', model=EnzymeReactionOrganism,
+                                                entity='enzyme_reaction_organism')
 
     comments = TextAreaField('Comments')
 
@@ -295,16 +266,18 @@ class ModelModifyForm(FlaskForm):
     name = StringField('Model name (e.g. E coli - iteration 1) *', validators=[DataRequired()])
     organism_name = StringField('Organism name (e.g. E coli) *', validators=[DataRequired()], id='organism_name')
     strain = StringField('Organism strain (e.g. MG1655)')
-    enz_rxn_orgs = QuerySelectMultipleField('Reactions', query_factory=get_enzyme_reaction_organisms, allow_blank=True)
-    model_inhibitions = QuerySelectMultipleField('Enzyme inhibitions', query_factory=get_enzyme_inhibitions,
-                                                 allow_blank=True)
-    model_activations = QuerySelectMultipleField('Enzyme activations', query_factory=get_enzyme_activations,
-                                                 allow_blank=True)
-    model_effectors = QuerySelectMultipleField('Enzyme effectors', query_factory=get_enzyme_effectors, allow_blank=True)
-    model_misc_infos = QuerySelectMultipleField('Enzyme misc info', query_factory=get_enzyme_misc_infos,
-                                                allow_blank=True)
-    model_assumptions = QuerySelectMultipleField('Model assumptions', query_factory=get_model_assumptions,
-                                                 allow_blank=True)
+    enz_rxn_orgs = LazyQuerySelectMultipleField('Reactions', model=EnzymeReactionOrganism,
+                                                entity='enzyme_reaction_organism')
+    model_inhibitions = LazyQuerySelectMultipleField('Enzyme inhibitions', model=EnzymeReactionInhibition,
+                                                     entity='enzyme_inhibition')
+    model_activations = LazyQuerySelectMultipleField('Enzyme activations', model=EnzymeReactionActivation,
+                                                     entity='enzyme_activation')
+    model_effectors = LazyQuerySelectMultipleField('Enzyme effectors', model=EnzymeReactionEffector,
+                                                   entity='enzyme_effector')
+    model_misc_infos = LazyQuerySelectMultipleField('Enzyme misc info', model=EnzymeReactionMiscInfo,
+                                                    entity='enzyme_misc_info')
+    model_assumptions = LazyQuerySelectMultipleField('Model assumptions', model=ModelAssumptions,
+                                                     entity='model_assumption')
 
     comments = TextAreaField('Comments')
 
@@ -331,7 +304,7 @@ class OrganismForm(FlaskForm):
     submit = SubmitField('Submit')
 
     def validate_name(self, name):
-        organism_db = Organism.query.filter_by(name=name.data).first()
+        organism_db = reference_data.get(Organism, name=name.data)
         if organism_db:
             raise ValidationError('An organism with that name already exists, please use another name')
 
@@ -354,8 +327,8 @@ class ReactionForm(FlaskForm):
     compartment = QuerySelectField('Compartment name', query_factory=get_compartments, allow_blank=True)
     organism = QuerySelectField('Organism name *', query_factory=get_organisms)
     models = QuerySelectMultipleField('Model name', query_factory=get_models, allow_blank=True)
-    enzymes = QuerySelectMultipleField('Isoenzyme(s) that catalyze the reaction *', query_factory=get_enzymes,
-                                       validators=[DataRequired()])
+    enzymes = LazyQuerySelectMultipleField('Isoenzyme(s) that catalyze the reaction *', model=Enzyme, entity='enzyme',
+                                           validators=[DataRequired()])
 
     mechanism = QuerySelectField(
         'Enzyme mechanism name (if you add the mechanism, you also need to add the isoenzyme(s) that catalyze the reaction)',
@@ -384,7 +357,10 @@ class ReactionForm(FlaskForm):
                 raise ValidationError('Please select one and only one isoenzyme.')
 
     def validate_reaction_string(self, reaction_string):
-        reversible, stoichiometry = ReactionParser().parse_reaction(reaction_string.data)
+        try:
+            reversible, stoichiometry = parse_reaction(reaction_string.data)
+        except SyntaxError as error:
+            raise ValidationError(str(error))
         # (True, OrderedDict([('m_pep_c', -1.0), ('m_adp_c', -1.5), ('m_pyr_c', 1.0), ('m_atp_m', 2.0)]))
 
         for met, stoich_coef in stoichiometry.items():
@@ -394,7 +370,7 @@ class ReactionForm(FlaskForm):
                 raise ValidationError(
                     'Please specify the metabolite' + met + 'as metabolite_compartmentAcronym, e.g. adp_c.')
 
-            compartment_db = Compartment.query.filter_by(bigg_id=met_compartment[0][1]).first()
+            compartment_db = reference_data.get(Compartment, bigg_id=met_compartment[0][1])
             if not compartment_db:
                 raise ValidationError('The specified compartment bigg_acronym' + met_compartment[0][
                     1] + ' is not part of the database, please insert it first.')
@@ -463,8 +439,8 @@ class SelectOrganismForm(FlaskForm):
 
 
 class SelectIsoenzymeForm(FlaskForm):
-    enzyme = QuerySelectMultipleField('Isoenzyme that catalyzes the reaction (select only one) *',
-                                      query_factory=get_enzymes, validators=[DataRequired()])
+    enzyme = LazyQuerySelectMultipleField('Isoenzyme that catalyzes the reaction (select only one) *',
+                                          model=Enzyme, entity='enzyme', validators=[DataRequired()])
 
     submit = SubmitField('Continue')
 
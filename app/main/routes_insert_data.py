@@ -5,7 +5,7 @@ from flask import render_template, flash, redirect, url_for
 from flask_login import login_required
 from werkzeug.utils import secure_filename
 
-from app import db
+from app import db, reference_data
 from app.load_data.import_grasp_model import get_model_name, get_model_stoichiometry, get_model_enzymes, get_model_subunits, \
     get_model_mechanisms, get_model_inhibitors, get_model_activators, get_model_effectors, get_model_gibbs_energies
 from app.main import bp
@@ -14,11 +14,12 @@ from app.main.forms import EnzymeForm, EnzymeActivationForm, EnzymeEffectorForm,
     MetaboliteForm, UploadModelForm
 from app.main.utils import add_enzyme_structures, add_enzyme_organism, add_enzyme_genes, add_metabolites_to_reaction, \
     add_gibbs_energy, add_references, check_metabolite, set_binding_release_order, \
-    add_enzyme_organism_subunits_only, add_effector
+    add_enzyme_organism_subunits_only, add_effector, get_autocomplete_field, get_metabolite_xrefs, get_reaction_xrefs
 from app.models import Compartment, Enzyme, EnzymeReactionOrganism, EnzymeReactionActivation, \
-    EnzymeReactionEffector, EnzymeReactionInhibition, EnzymeReactionMiscInfo, EnzymeStructure, \
+    EnzymeReactionEffector, EnzymeReactionInhibition, EnzymeReactionMiscInfo, \
     Gene, Metabolite, Model, ModelAssumptions, Mechanism, GibbsEnergy, \
     Organism, Reaction, ChebiIds, GibbsEnergyReactionModel
+from app.utils.metabolites import get_metabolite_resolver
 from app.utils.parsers import parse_input_list
 
 
@@ -28,7 +29,7 @@ def add_enzyme():
     """
     Adds an enzyme to the database.
 
-    First generates the list of gene bigg ids and strains so that these fields can be autocompleted.
+    The gene bigg ids and strains fields are autocompleted with the api autocomplete endpoint.
 
     After validating the form where the enzyme data is inserted:
      - creates the enzyme object and adds it to the DB
@@ -44,17 +45,7 @@ def add_enzyme():
 
     form = EnzymeForm()
 
-    genes = Gene.query.all()
-    gene_bigg_ids = {'id_value': '#gene_bigg_ids',
-                     'input_data': [{'field1': gene.name} for gene in genes] if genes else []}
-
-    enzyme_structures = EnzymeStructure.query.all()
-    enzyme_structure_strains = set(
-        [enzyme_structure.strain for enzyme_structure in enzyme_structures]) if enzyme_structures else []
-    strain = {'id_value': '#strain', 'input_data': [{'field1': strain} for strain in
-                                                    enzyme_structure_strains] if enzyme_structures else []}
-
-    data_list = [gene_bigg_ids, strain]
+    data_list = [get_autocomplete_field('#gene_bigg_ids', 'gene'), get_autocomplete_field('#strain', 'strain')]
 
     if form.validate_on_submit():
 
@@ -72,7 +63,7 @@ def add_enzyme():
         db.session.add(enzyme)
 
         if form.organism_name.data:
-            organism_db = Organism.query.filter_by(name=form.organism_name.data.name).first()
+            organism_db = reference_data.get(Organism, name=form.organism_name.data.name)
             organism_id = organism_db.id
 
             if form.gene_names.data:
@@ -121,15 +112,11 @@ def add_enzyme_inhibition():
 
     form = EnzymeInhibitionForm()
 
-    metabolites = Metabolite.query.all()
-    metabolite_list = {'id_value': '#metabolite_list', 'input_data': [{'field1': metabolite.bigg_id} for metabolite in
-                                                                      metabolites] if metabolites else []}
-    data_list = [metabolite_list]
+    data_list = [get_autocomplete_field('#metabolite_list', 'metabolite')]
 
     if form.validate_on_submit():
 
-        inhib_met = check_metabolite(form.inhibitor_met.data)
-        affected_met = check_metabolite(form.affected_met.data)
+        inhib_met, affected_met = get_metabolite_resolver().resolve([form.inhibitor_met.data, form.affected_met.data])
         inhibition_evidence_level_id = form.inhibition_evidence_level.data.id if form.inhibition_evidence_level.data else None
 
         enz_rxn_org = EnzymeReactionOrganism.query.filter_by(enzyme_id=form.enzyme.data.id,
@@ -142,7 +129,7 @@ def add_enzyme_inhibition():
                                                  reaction_id=form.reaction.data.id,
                                                  organism_id=form.organism.data.id)
             db.session.add(enz_rxn_org)
-            db.session.commit()
+            db.session.flush()
 
         enz_rxn_inhib = EnzymeReactionInhibition(enz_rxn_org_id=enz_rxn_org.id,
                                                  inhibitor_met_id=inhib_met.id,
@@ -195,10 +182,7 @@ def add_enzyme_activation():
 
     form = EnzymeActivationForm()
 
-    metabolites = Metabolite.query.all()
-    metabolite_list = {'id_value': '#metabolite_list', 'input_data': [{'field1': metabolite.bigg_id} for metabolite in
-                                                                      metabolites] if metabolites else []}
-    data_list = [metabolite_list]
+    data_list = [get_autocomplete_field('#metabolite_list', 'metabolite')]
 
     if form.validate_on_submit():
 
@@ -215,7 +199,7 @@ def add_enzyme_activation():
                                                  reaction_id=form.reaction.data.id,
                                                  organism_id=form.organism.data.id)
             db.session.add(enz_rxn_org)
-            db.session.commit()
+            db.session.flush()
 
         enz_rxn_activation = EnzymeReactionActivation(enz_rxn_org_id=enz_rxn_org.id,
                                                       activator_met_id=activator_met.id,
@@ -223,7 +207,7 @@ def add_enzyme_activation():
                                                       evidence_level_id=activation_evidence_level_id,
                                                       comments=form.comments.data)
         db.session.add(enz_rxn_activation)
-        db.session.commit()
+        db.session.flush()
 
         if form.models.data:
             for model in form.models.data:
@@ -271,10 +255,7 @@ def add_enzyme_effector():
     """
     form = EnzymeEffectorForm()
 
-    metabolites = Metabolite.query.all()
-    metabolite_list = {'id_value': '#metabolite_list', 'input_data': [{'field1': metabolite.bigg_id} for metabolite in
-                                                                      metabolites] if metabolites else []}
-    data_list = [metabolite_list]
+    data_list = [get_autocomplete_field('#metabolite_list', 'metabolite')]
 
     if form.validate_on_submit():
         effector_met = check_metabolite(form.effector_met.data)
@@ -290,7 +271,7 @@ def add_enzyme_effector():
                                                  reaction_id=form.reaction.data.id,
                                                  organism_id=form.organism.data.id)
             db.session.add(enz_rxn_org)
-            db.session.commit()
+            db.session.flush()
 
         enz_rxn_effector = EnzymeReactionEffector(enz_rxn_org_id=enz_rxn_org.id,
                                                   effector_met_id=effector_met.id,
@@ -350,7 +331,7 @@ def add_enzyme_misc_info():
                                                  reaction_id=form.reaction.data.id,
                                                  organism_id=form.organism.data.id)
             db.session.add(enz_rxn_org)
-            db.session.commit()
+            db.session.flush()
 
         enz_rxn_misc_info = EnzymeReactionMiscInfo(enz_rxn_org_id=enz_rxn_org.id,
                                                    topic=form.topic.data,
@@ -408,7 +389,7 @@ def add_metabolite():
      Adds a metabolite to the database.
 
      After the form validation:
-      - create Metabolite object and adds it to the DB
+      - create Metabolite object and adds it to the DB, if no metanetx id is given it is looked up in the xref index
       - adds all compartments to DB where metabolite can be found (according to the data inserted by the user)
       - parses the lists of chebi IDs and inchis and adds the respective ChebiIds entries to the DB.
 
@@ -420,14 +401,15 @@ def add_metabolite():
     form = MetaboliteForm()
 
     if form.validate_on_submit():
+        met_xrefs = get_metabolite_xrefs(form.bigg_id.data) if not form.metanetx_id.data else {}
         metabolite = Metabolite(grasp_id=form.grasp_id.data,
                                 name=form.name.data,
                                 bigg_id=form.bigg_id.data,
-                                metanetx_id=form.metanetx_id.data)
+                                metanetx_id=form.metanetx_id.data or met_xrefs.get('metanetx_id'))
         db.session.add(metabolite)
 
-        for compartment in form.compartments.data:
-            metabolite.add_compartment(compartment)
+        get_metabolite_resolver().add_compartments([(metabolite, compartment)
+                                                    for compartment in form.compartments.data])
 
         chebi_id_list = parse_input_list(form.chebi_ids.data)
         inchi_list = parse_input_list(form.inchis.data, False)
@@ -458,7 +440,7 @@ def add_model():
      If the model is to be built from an existing model the user is redirected to modify_model.
 
      If the model is to be built from scatch:
-       - before the form validation a list of organisms is built to be used in the form autocompletion.
+       - the organism field is autocompleted with the api autocomplete endpoint.
        - after the form validation:
           - checks if the organism exists and if not adds it to the DB
           - adds the model
@@ -482,16 +464,13 @@ def add_model():
             return redirect(url_for('main.modify_model', model_name=form_base.model_base.data.name))
 
         else:
-            organisms = Organism.query.all()
-            organism_name = {'id_value': '#organism_name',
-                             'input_data': [{'field1': organism.name} for organism in organisms] if organisms else []}
-            data_list = [organism_name]
+            data_list = [get_autocomplete_field('#organism_name', 'organism')]
 
             form = ModelForm()
 
             if form.validate_on_submit():
 
-                organism = Organism.query.filter_by(name=form.organism_name.data).first()
+                organism = reference_data.get(Organism, name=form.organism_name.data)
                 if not organism:
                     organism = Organism(name=form.organism_name.data)
                     db.session.add(organism)
@@ -502,7 +481,7 @@ def add_model():
                               comments=form.comments.data)
 
                 db.session.add(model)
-                db.session.commit()
+                db.session.flush()
 
                 if form.enz_rxn_orgs.data:
                     for enz_rxn_org in form.enz_rxn_orgs.data:
@@ -595,10 +574,10 @@ def add_reaction():
     """"
      Adds a reaction to the database.
 
-     Before form validation builds a list of isoenzymes to be used in the form autocompletion.
+     The isoenzyme field is autocompleted with the api autocomplete endpoint.
 
      After form validation:
-       - the Reaction object is created and added to the DB
+       - the Reaction object is created and added to the DB, missing metanetx/kegg ids are looked up in the xref index
        - the metabolites involved in the reaction are associated to the reaction
        - if a compartment is specified, it is associated to the reaction
        - the respective EnzymeReactionOrganism objects are created and added to the DB
@@ -613,19 +592,17 @@ def add_reaction():
 
     form = ReactionForm()
 
-    enzymes = Enzyme.query.all()
-    isoenzyme_list = {'id_value': '#isoenzyme_acronyms',
-                      'input_data': [{'field1': enzyme.isoenzyme} for enzyme in enzymes] if enzymes else []}
-    data_list = [isoenzyme_list]
+    data_list = [get_autocomplete_field('#isoenzyme_acronyms', 'isoenzyme')]
 
     if form.validate_on_submit():
 
         compartment = form.compartment.data if form.compartment.data else None
+        rxn_xrefs = get_reaction_xrefs(form.bigg_id.data) if not (form.metanetx_id.data and form.kegg_id.data) else {}
         reaction = Reaction(name=form.name.data,
                             acronym=form.acronym.data,
-                            metanetx_id=form.metanetx_id.data,
+                            metanetx_id=form.metanetx_id.data or rxn_xrefs.get('metanetx_id'),
                             bigg_id=form.bigg_id.data,
-                            kegg_id=form.kegg_id.data,
+                            kegg_id=form.kegg_id.data or rxn_xrefs.get('kegg_id'),
                             compartment=compartment)
 
         db.session.add(reaction)
@@ -633,7 +610,7 @@ def add_reaction():
         add_metabolites_to_reaction(reaction, form.reaction_string.data)
 
         if compartment:
-            compartment = Compartment.query.filter_by(name=compartment.name).first()
+            compartment = reference_data.get(Compartment, name=compartment.name)
             compartment.add_reaction(reaction)
 
         mechanism_id = form.mechanism.data.id if form.mechanism.data else None
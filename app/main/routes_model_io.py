@@ -6,23 +6,21 @@ from flask import render_template, flash, redirect, url_for
 from werkzeug.utils import secure_filename
 import flask_sqlalchemy
 
-from app import db
+from app import db, reference_data
 from app.load_data.import_grasp_model import get_model_name, get_model_stoichiometry, get_model_enzymes, \
-    get_model_subunits, \
+    get_model_enzyme_id_lists, get_model_subunits, \
     get_model_mechanisms, get_model_inhibitors, get_model_activators, get_model_effectors, get_model_gibbs_energies
 from app.main import bp
 from app.main.forms import UploadModelForm
 from app.main.utils import add_enzyme_structures, add_enzyme_organism, add_metabolites_to_reaction, \
-    add_references, check_metabolite, set_binding_release_order, \
-    add_enzyme_organism_subunits_only, add_effector
-from app.models import Enzyme, EnzymeReactionOrganism, EnzymeReactionActivation, \
-    EnzymeReactionInhibition, Model, Mechanism, GibbsEnergy, \
+    add_references, set_binding_release_order, add_enzyme_organism_subunits_only, add_effector, get_reaction_bigg_ids
+from app.models import Enzyme, EnzymeReactionOrganism, Model, Mechanism, GibbsEnergy, \
     Reaction, GibbsEnergyReactionModel
-from app.utils.parsers import parse_input_list
+from app.utils.metabolites import get_metabolite_resolver
+from app.utils.regulations import get_regulation_lookup
 
 
-
-def _add_enzyme(i, rxn, enzyme_list, form, subunit_dict):
+def _add_enzyme(i, rxn, enzyme_list, enzyme_id_lists, form, subunit_dict):
 
     if enzyme_list[i]['isoenzyme']:
         enzyme_db = Enzyme.query.filter_by(isoenzyme=enzyme_list[i]['isoenzyme']).first()
@@ -35,19 +33,19 @@ def _add_enzyme(i, rxn, enzyme_list, form, subunit_dict):
 
             # add uniprot and subunit info
             if enzyme_list[i]['uniprot_ids']:
-                uniprot_id_list = parse_input_list(enzyme_list[i]['uniprot_ids'])
+                uniprot_id_list = enzyme_id_lists['uniprot_ids'][i]
                 add_enzyme_organism(enzyme_db, form.organism.data.id, uniprot_id_list, subunit_dict[rxn])
             else:
                 add_enzyme_organism_subunits_only(enzyme_db, form.organism.data.id, subunit_dict[rxn])
 
             # add structure info
             if enzyme_list[i]['pdb_ids']:
-                pdb_id_list = parse_input_list(enzyme_list[i]['pdb_ids'])
-                pdb_strains_list = parse_input_list(enzyme_list[i]['strain'])
+                pdb_id_list = enzyme_id_lists['pdb_ids'][i]
+                pdb_strains_list = enzyme_id_lists['strain'][i]
 
                 add_enzyme_structures(enzyme_db, form.organism.data.id, pdb_id_list, pdb_strains_list)
 
-        db.session.commit()
+        db.session.flush()
 
     elif rxn.startswith('EX_') or rxn.startswith('IN_'):
         enzyme_db = Enzyme.query.filter_by(isoenzyme='EX_enz').first()
@@ -62,13 +60,13 @@ def _add_enzyme(i, rxn, enzyme_list, form, subunit_dict):
 def _add_mechanism(i, rxn, enz_rxn_org, rxn_strings, mechanisms_dict):
 
     mechanism_type = None
-    for db_mech_type in Mechanism.query.all():
+    for db_mech_type in reference_data.all(Mechanism):
         if mechanisms_dict[rxn][0].lower().find(db_mech_type.name.lower()) != -1:
             mechanism_type = db_mech_type.name
             break
 
     if mechanism_type:
-        mechanism_db = Mechanism.query.filter_by(grasp_name=mechanisms_dict[rxn][0]).first()
+        mechanism_db = reference_data.get(Mechanism, grasp_name=mechanisms_dict[rxn][0])
         if not mechanism_db:
 
             mechanism_db = Mechanism(name=mechanism_type,
@@ -86,19 +84,11 @@ def _add_mechanism(i, rxn, enz_rxn_org, rxn_strings, mechanisms_dict):
 
 
 def _add_inhibitors(rxn, enz_rxn_org, model, inhibitors_dict):
-    for inhib_met_i, inhib_met in enumerate(inhibitors_dict[rxn][0]):
-
-        inhib_met_db = check_metabolite(inhib_met)
-
-        enz_inhib_db = EnzymeReactionInhibition.query.filter_by(affected_met=None,
-                                                                inhibition_type=None,
-                                                                inhibition_constant=None,
-                                                                inhibitor_met=inhib_met_db).first()
+    inhib_mets_db = get_metabolite_resolver().resolve(inhibitors_dict[rxn][0])
 
-        if not enz_inhib_db:
-            enz_inhib_db = EnzymeReactionInhibition(inhibitor_met=inhib_met_db)
-            db.session.add(enz_inhib_db)
+    for inhib_met_i, (inhib_met, inhib_met_db) in enumerate(zip(inhibitors_dict[rxn][0], inhib_mets_db)):
 
+        enz_inhib_db = get_regulation_lookup().get_inhibition(inhib_met_db)
         enz_inhib_db.add_model(model)
         enz_rxn_org.add_enzyme_reaction_inhibition(enz_inhib_db)
 
@@ -115,16 +105,11 @@ def _add_inhibitors(rxn, enz_rxn_org, model, inhibitors_dict):
 
 
 def _add_activators(rxn, enz_rxn_org, model, activators_dict):
-    for activ_met_i, activ_met in enumerate(activators_dict[rxn][0]):
-        activ_met_db = check_metabolite(activ_met)
+    activ_mets_db = get_metabolite_resolver().resolve(activators_dict[rxn][0])
 
-        enz_activ_db = EnzymeReactionActivation.query.filter_by(activation_constant=None,
-                                                                activator_met=activ_met_db).first()
-
-        if not enz_activ_db:
-            enz_activ_db = EnzymeReactionActivation(activator_met=activ_met_db)
-            db.session.add(enz_activ_db)
+    for activ_met_i, (activ_met, activ_met_db) in enumerate(zip(activators_dict[rxn][0], activ_mets_db)):
 
+        enz_activ_db = get_regulation_lookup().get_activation(activ_met_db)
         enz_rxn_org.add_enzyme_reaction_activation(enz_activ_db)
         enz_activ_db.add_model(model)
 
@@ -197,6 +182,7 @@ def upload_model():
         # load input file
         mets, rxns, rxn_strings = get_model_stoichiometry(file_path, 'stoic')
         enzyme_list = get_model_enzymes(file_path, 'enzyme_reaction')
+        enzyme_id_lists = get_model_enzyme_id_lists(enzyme_list)
         subunit_dict = get_model_subunits(file_path, 'kinetics1')
         gibbs_energies_dict = get_model_gibbs_energies(file_path, 'thermoRxns')
         mechanisms_dict = get_model_mechanisms(file_path, 'kinetics1')
@@ -205,10 +191,20 @@ def upload_model():
         neg_effectors_dict, pos_effectors_dict = get_model_effectors(file_path, 'kinetics1')
         print(mechanisms_dict)
 
+        # the metabolites that are already in the database are looked up with a single query for the whole model,
+        # and so are the inhibitions, activations and effectors of the regulator metabolites
+        regulator_bigg_ids = [met for regulators_dict in (inhibitors_dict, activators_dict, neg_effectors_dict,
+                                                          pos_effectors_dict)
+                              for regulators in regulators_dict.values() for met in regulators[0]]
+        metabolites = get_metabolite_resolver().resolve(
+            regulator_bigg_ids + [met[0] for rxn_string in rxn_strings for met in get_reaction_bigg_ids(rxn_string)],
+            create=False)
+        get_regulation_lookup().load(metabolites[:len(regulator_bigg_ids)])
+
         for i, rxn in enumerate(rxns):
 
             # add enzyme
-            enzyme_db = _add_enzyme(i, rxn, enzyme_list, form, subunit_dict)
+            enzyme_db = _add_enzyme(i, rxn, enzyme_list, enzyme_id_lists, form, subunit_dict)
 
             # add reaction
             reaction_db = Reaction.query.filter_by(acronym=rxn).first()
@@ -226,7 +222,7 @@ def upload_model():
                                                  organism_id=form.organism.data.id,
                                                  grasp_id=rxn)
             db.session.add(enz_rxn_org)
-            db.session.commit()
+            db.session.flush()
             enz_rxn_org.add_model(model)
 
             # add mechanism
@@ -246,6 +242,9 @@ def upload_model():
             # add gibbs energies
             _add_gibbs_energies(rxn, reaction_db, model, gibbs_energies_dict)
 
+        # the whole model is one transaction
+        db.session.commit()
+
         flash('Your model is now live!', 'success')
         return redirect(url_for('main.see_model_list'))
 
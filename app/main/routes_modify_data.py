@@ -5,17 +5,19 @@ from flask import render_template, flash, redirect, url_for
 from flask import request
 from flask_login import login_required
 
-from app import current_app, db
+from app import current_app, db, reference_data
 from app.main import bp
 from app.main.forms import EnzymeForm, EnzymeActivationForm, EnzymeEffectorForm, EnzymeInhibitionForm, \
     EnzymeMiscInfoForm, GeneForm, ModelAssumptionsForm, ModelForm, OrganismForm, ReactionForm, ModelModifyForm, \
     SelectOrganismForm, SelectIsoenzymeForm, SelectModelForm, MetaboliteForm
-from app.main.utils import add_enzyme_structures, add_enzyme_organism, add_enzyme_genes, add_metabolites_to_reaction, \
-    add_gibbs_energy, add_mechanism_references, add_references, check_metabolite
+from app.main.utils import add_gibbs_energy, add_mechanism_references, add_references, check_metabolite, \
+    get_autocomplete_field, update_collection, update_enzyme_genes, update_enzyme_organisms, update_enzyme_structures, \
+    update_metabolite_chebis, update_reaction_metabolites
 from app.models import Compartment, Enzyme, EnzymeReactionOrganism, EnzymeReactionActivation, EnzymeReactionEffector, \
-    EnzymeReactionInhibition, EnzymeReactionMiscInfo, EnzymeOrganism, EnzymeStructure, EvidenceLevel, Gene, \
-    GibbsEnergy, GibbsEnergyReactionModel, Mechanism, Metabolite, Model, ModelAssumptions, Organism, Reaction, \
-    ReactionMetabolite, Reference, EnzymeGeneOrganism, ChebiIds
+    EnzymeReactionInhibition, EnzymeReactionMiscInfo, EnzymeOrganism, EnzymeStructure, EvidenceLevel, GibbsEnergy, \
+    GibbsEnergyReactionModel, Mechanism, Metabolite, Model, ModelAssumptions, Organism, Reaction, ReactionMetabolite, \
+    Reference, EnzymeGeneOrganism
+from app.utils.metabolites import get_metabolite_resolver
 from app.utils.parsers import ReactionParser, parse_input_list
 
 
@@ -103,15 +105,15 @@ def modify_enzyme(isoenzyme):
     Before form validation:
      - formats data_form properly to pass the data to EnzymeForm, this data is used to fill in the EnzymeForm with the
      values currently in the database.
-     - gathers gene_ids and strains into data_list to use for form autocompletion
+     - gene bigg ids and strains are autocompleted with the api autocomplete endpoint
 
      After form validation:
      - updates the enzyme data
-     - if an organism is specified, it removes all:
+     - if an organism is specified, it updates the following associations in that organism, only the ones that
+     changed are removed, added or updated:
         - genes associated to the enzyme
         - structures associated to the enzyme
         - organisms associated to the enzyme
-     - the new associations are then added if specified
 
 
     Args:
@@ -126,21 +128,11 @@ def modify_enzyme(isoenzyme):
     data_form = json.loads(data_form.replace("'", "\""))
 
     if 'organism_name' in data_form:
-        data_form['organism_name'] = Organism.query.filter_by(name=data_form['organism_name']).first()
+        data_form['organism_name'] = reference_data.get(Organism, name=data_form['organism_name'])
 
     form = EnzymeForm(data=data_form, flag='modify')
 
-    genes = Gene.query.all()
-    gene_bigg_ids = {'id_value': '#gene_bigg_ids',
-                     'input_data': [{'field1': gene.name} for gene in genes] if genes else []}
-
-    enzyme_structures = EnzymeStructure.query.all()
-    enzyme_structure_strains = set(
-        [enzyme_structure.strain for enzyme_structure in enzyme_structures]) if enzyme_structures else []
-    strain = {'id_value': '#strain', 'input_data': [{'field1': strain} for strain in
-                                                    enzyme_structure_strains] if enzyme_structures else []}
-
-    data_list = [gene_bigg_ids, strain]
+    data_list = [get_autocomplete_field('#gene_bigg_ids', 'gene'), get_autocomplete_field('#strain', 'strain')]
 
     if form.validate_on_submit():
         enzyme = Enzyme.query.filter_by(isoenzyme=isoenzyme).first()
@@ -153,23 +145,16 @@ def modify_enzyme(isoenzyme):
         if form.organism_name.data:
             # organism_db = Organism.query.filter_by(name=form.organism_name.data.name).first()
             organism_id = form.organism_name.data.id
-            enzyme.empty_enzyme_gene_organisms(organism_id)
-            enzyme.empty_structures(organism_id)
-            enzyme.empty_enzyme_organisms(organism_id)
-
-            if form.gene_names.data:
-                add_enzyme_genes(form.gene_names.data, enzyme, organism_id)
+            update_enzyme_genes(form.gene_names.data, enzyme, organism_id)
 
-            # populate enzyme_structure
-            if form.pdb_structure_ids.data:
-                pdb_id_list = parse_input_list(form.pdb_structure_ids.data)
-                strain_list = parse_input_list(form.strain.data)
-                add_enzyme_structures(enzyme, organism_id, pdb_id_list, strain_list)
+            # update enzyme_structure
+            pdb_id_list = parse_input_list(form.pdb_structure_ids.data) if form.pdb_structure_ids.data else []
+            strain_list = parse_input_list(form.strain.data) if form.strain.data else []
+            update_enzyme_structures(enzyme, organism_id, pdb_id_list, strain_list)
 
-            # populate enzyme_organism
-            if form.uniprot_id_list.data:
-                uniprot_id_list = parse_input_list(form.uniprot_id_list.data)
-                add_enzyme_organism(enzyme, organism_id, uniprot_id_list, form.number_of_active_sites.data)
+            # update enzyme_organism
+            uniprot_id_list = parse_input_list(form.uniprot_id_list.data) if form.uniprot_id_list.data else []
+            update_enzyme_organisms(enzyme, organism_id, uniprot_id_list, form.number_of_active_sites.data)
 
         db.session.commit()
 
@@ -187,7 +172,7 @@ def modify_enzyme_inhibitor(inhibitor_id):
     Modifies an enzyme inhibitor in the database.
 
     Before form validation:
-     - gathers all metabolite bigg ids in data_list to use for the form autocompletion
+     - metabolite bigg ids are autocompleted with the api autocomplete endpoint
      - gathers all the data for the inhibitor from the DB to fill in the form with the existing values
 
     After form validation:
@@ -211,10 +196,7 @@ def modify_enzyme_inhibitor(inhibitor_id):
          url_for see_enzyme_inhibitor after form validation
     """
 
-    metabolites = Metabolite.query.all()
-    metabolite_list = {'id_value': '#metabolite_list', 'input_data': [{'field1': metabolite.bigg_id} for metabolite in
-                                                                      metabolites] if metabolites else []}
-    data_list = [metabolite_list]
+    data_list = [get_autocomplete_field('#metabolite_list', 'metabolite')]
 
     enz_inhibitor = EnzymeReactionInhibition.query.filter_by(id=inhibitor_id).first()
     enz_inhibitor_refs = ', '.join([ref.doi for ref in enz_inhibitor.references]) if enz_inhibitor.references else ''
@@ -248,14 +230,13 @@ def modify_enzyme_inhibitor(inhibitor_id):
                                                      organism_id=form.organism.data.id)
 
                 db.session.add(enz_rxn_org)
-                db.session.commit()
+                db.session.flush()
 
             enz_inhibitor.enzyme_reaction_organism = enz_rxn_org
 
-        inhibitor_met = check_metabolite(form.inhibitor_met.data)
+        inhibitor_met, affected_met = get_metabolite_resolver().resolve([form.inhibitor_met.data,
+                                                                         form.affected_met.data])
         enz_inhibitor.inhibitor_met = inhibitor_met
-
-        affected_met = check_metabolite(form.affected_met.data)
         enz_inhibitor.affected_met = affected_met
 
         enz_inhibitor.inhibition_type = form.inhibition_type.data
@@ -294,7 +275,7 @@ def modify_enzyme_activator(activator_id):
     Modifies an enzyme activator in the database.
 
     Before form validation:
-     - gathers all metabolite bigg ids in data_list to use for the form autocompletion
+     - metabolite bigg ids are autocompleted with the api autocomplete endpoint
      - gathers all the data for the activator from the DB to fill in the form with the existing values
 
     After form validation:
@@ -317,10 +298,7 @@ def modify_enzyme_activator(activator_id):
          url_for see_enzyme_activator after form validation
     """
 
-    metabolites = Metabolite.query.all()
-    metabolite_list = {'id_value': '#metabolite_list', 'input_data': [{'field1': metabolite.bigg_id} for metabolite in
-                                                                      metabolites] if metabolites else []}
-    data_list = [metabolite_list]
+    data_list = [get_autocomplete_field('#metabolite_list', 'metabolite')]
 
     enz_activator = EnzymeReactionActivation.query.filter_by(id=activator_id).first()
     enz_activator_refs = ', '.join([ref.doi for ref in enz_activator.references]) if enz_activator.references else ''
@@ -352,7 +330,7 @@ def modify_enzyme_activator(activator_id):
                                                      organism_id=form.organism.data.id)
 
                 db.session.add(enz_rxn_org)
-                db.session.commit()
+                db.session.flush()
 
             enz_activator.enzyme_reaction_organism = enz_rxn_org
 
@@ -396,7 +374,7 @@ def modify_enzyme_effector(effector_id):
     the inhibitors and activators.
 
     Before form validation:
-     - gathers all metabolite bigg ids in data_list to use for the form autocompletion
+     - metabolite bigg ids are autocompleted with the api autocomplete endpoint
      - gathers all the data for the effector from the DB to fill in the form with the existing values
 
     After form validation:
@@ -419,10 +397,7 @@ def modify_enzyme_effector(effector_id):
          url_for see_enzyme_effector after form validation
     """
 
-    metabolites = Metabolite.query.all()
-    metabolite_list = {'id_value': '#metabolite_list', 'input_data': [{'field1': metabolite.bigg_id} for metabolite in
-                                                                      metabolites] if metabolites else []}
-    data_list = [metabolite_list]
+    data_list = [get_autocomplete_field('#metabolite_list', 'metabolite')]
 
     enz_effector = EnzymeReactionEffector.query.filter_by(id=effector_id).first()
     enz_effector_refs = ', '.join([ref.doi for ref in enz_effector.references]) if enz_effector.references else ''
@@ -456,7 +431,7 @@ def modify_enzyme_effector(effector_id):
                                                      organism_id=form.organism.data.id)
 
                 db.session.add(enz_rxn_org)
-                db.session.commit()
+                db.session.flush()
 
                 enz_effector.enzyme_reaction_organism = enz_rxn_org
 
@@ -550,7 +525,7 @@ def modify_enzyme_misc_info(misc_info_id):
                                                      organism_id=form.organism.data.id)
 
                 db.session.add(enz_rxn_org)
-                db.session.commit()
+                db.session.flush()
 
             enz_misc_info.enzyme_reaction_organism = enz_rxn_org
 
@@ -591,19 +566,18 @@ def modify_model(model_name):
 
     Before form validation:
      - gathers all the data for the model from the DB to fill in the form with the existing values
-     - gathers all organism names into data_list to be used for autocompletion in the form
+     - organism names are autocompleted with the api autocomplete endpoint
 
     After form validation:
      - looks for the specified organism in the DB, and if it doesn't exist it creates it
      - updates the model attributes
-     - removes all the model associations to:
+     - updates the model associations to the ones specified, only the associations that changed are removed or added:
         - inhibitors
         - activators
         - effectors
         - EnzymeReactionOrganisms
         - misc info
         - model assumptions
-     - adds the newly specified (above) associations
 
     Args:
         model_name: name of the model to be modified
@@ -622,15 +596,13 @@ def modify_model(model_name):
                      model_inhibitions=model.enzyme_reaction_inhibitions,
                      model_activations=model.enzyme_reaction_activations,
                      model_effectors=model.enzyme_reaction_effectors,
+                     model_misc_infos=model.enzyme_reaction_misc_infos,
                      model_assumptions=model.model_assumptions,
                      comments=model.comments)
 
     form = ModelModifyForm(data=data_form)
 
-    organisms = Organism.query.all()
-    organism_name = {'id_value': '#organism_name',
-                     'input_data': [{'field1': organism.name} for organism in organisms] if organisms else []}
-    data_list = [organism_name]
+    data_list = [get_autocomplete_field('#organism_name', 'organism')]
 
     if form.validate_on_submit():
 
@@ -644,36 +616,12 @@ def modify_model(model_name):
         model.strain = form.strain.data
         model.comments = form.comments.data
 
-        model.empty_enzyme_reaction_organisms()
-        model.emtpy_enzyme_reaction_inhibitions()
-        model.emtpy_enzyme_reaction_activations()
-        model.emtpy_enzyme_reaction_effectors()
-        model.emtpy_enzyme_reaction_misc_infos()
-        model.emtpy_model_assumptions()
-
-        if form.enz_rxn_orgs.data:
-            for enz_rxn_org in form.enz_rxn_orgs.data:
-                model.add_enzyme_reaction_organism(enz_rxn_org)
-
-        if form.model_inhibitions.data:
-            for model_inhibitor in form.model_inhibitions.data:
-                model.add_enzyme_reaction_inhibitor(model_inhibitor)
-
-        if form.model_activations.data:
-            for model_activator in form.model_activations.data:
-                model.add_enzyme_reaction_activator(model_activator)
-
-        if form.model_effectors.data:
-            for model_effector in form.model_effectors.data:
-                model.add_enzyme_reaction_effector(model_effector)
-
-        if form.model_misc_infos.data:
-            for model_misc_info in form.model_misc_infos.data:
-                model.add_enzyme_reaction_misc_info(model_misc_info)
-
-        if form.model_assumptions.data:
-            for model_assumption in form.model_assumptions.data:
-                model.add_model_assumption(model_assumption)
+        update_collection(model.enzyme_reaction_organisms, form.enz_rxn_orgs.data)
+        update_collection(model.enzyme_reaction_inhibitions, form.model_inhibitions.data)
+        update_collection(model.enzyme_reaction_activations, form.model_activations.data)
+        update_collection(model.enzyme_reaction_effectors, form.model_effectors.data)
+        update_collection(model.enzyme_reaction_misc_infos, form.model_misc_infos.data)
+        update_collection(model.model_assumptions, form.model_assumptions.data)
 
         db.session.commit()
 
@@ -696,8 +644,8 @@ def modify_metabolite(grasp_id):
 
     After form validation:
      - updates the metabolite attributes
-     - removes the existing metabolite associations to compartments and adds the newly specified ones
-     - removes the existing metabolite associations to ChebiIds and adds the newly specified ones
+     - updates the metabolite associations to compartments and ChebiIds, only the ones that changed are removed or
+     added
 
 
     Args:
@@ -732,19 +680,11 @@ def modify_metabolite(grasp_id):
         metabolite.bigg_id = form.bigg_id.data
         metabolite.metanetx_id = form.metanetx_id.data
 
-        metabolite.empty_compartments()
-        for compartment in form.compartments.data:
-            metabolite.add_compartment(compartment)
+        update_collection(metabolite.compartments, form.compartments.data)
 
-        metabolite.empty_chebis()
         chebi_id_list = parse_input_list(form.chebi_ids.data)
         inchi_list = parse_input_list(form.inchis.data, False)
-        for chebi_id, inchi_id in zip(chebi_id_list, inchi_list):
-            chebi_id_db = ChebiIds(chebi_id=chebi_id,
-                                   inchi=inchi_id)
-
-            db.session.add(chebi_id_db)
-            metabolite.add_chebi_id(chebi_id_db)
+        update_metabolite_chebis(metabolite, chebi_id_list, inchi_list)
 
         db.session.commit()
 
@@ -839,7 +779,7 @@ def modify_organism(organism_name):
     form = OrganismForm(data=data_form)
 
     if form.validate_on_submit():
-        organism = Organism.query.filter_by(name=organism_name).first()
+        organism = reference_data.get(Organism, name=organism_name)
         organism.name = form.name.data
         db.session.commit()
 
@@ -919,7 +859,7 @@ def modify_reaction_select_isoenzyme(reaction_acronym):
     data_form = request.args.get('data_form')
     data_form = json.loads(data_form.replace("'", "\""))
 
-    organism = Organism.query.filter_by(name=data_form['organism']).first()
+    organism = reference_data.get(Organism, name=data_form['organism'])
     reaction = Reaction.query.filter_by(acronym=reaction_acronym).first()
     enzyme_rxn_orgs = EnzymeReactionOrganism.query.filter_by(reaction_id=reaction.id,
                                                              organism_id=organism.id).all()
@@ -969,7 +909,7 @@ def modify_reaction_select_model(reaction_acronym):
     data_form = request.args.get('data_form')
     data_form = json.loads(data_form.replace("'", "\""))
 
-    organism = Organism.query.filter_by(name=data_form['organism']).first()
+    organism = reference_data.get(Organism, name=data_form['organism'])
     reaction = Reaction.query.filter_by(acronym=reaction_acronym).first()
     enzyme = Enzyme.query.filter_by(isoenzyme=data_form['isoenzyme']).first()
 
@@ -1033,7 +973,7 @@ def modify_reaction(reaction_acronym):
     data_form = json.loads(data_form.replace("'", "\""))
 
     reaction = Reaction.query.filter_by(acronym=reaction_acronym).first()
-    organism = Organism.query.filter_by(name=data_form['organism']).first()
+    organism = reference_data.get(Organism, name=data_form['organism'])
     enzyme = Enzyme.query.filter_by(isoenzyme=data_form['isoenzyme']).first()
 
     enzyme_rxn_org = EnzymeReactionOrganism.query.filter_by(reaction_id=reaction.id,
@@ -1096,11 +1036,10 @@ def modify_reaction(reaction_acronym):
 
         db.session.add(reaction)
 
-        reaction.empty_metabolites()
-        add_metabolites_to_reaction(reaction, form.reaction_string.data)
+        update_reaction_metabolites(reaction, form.reaction_string.data)
 
         if compartment_name:
-            compartment = Compartment.query.filter_by(name=compartment_name).first()
+            compartment = reference_data.get(Compartment, name=compartment_name)
             compartment.add_reaction(reaction)
 
         mechanism_id = form.mechanism.data.id if form.mechanism.data else ''
@@ -1119,7 +1058,7 @@ def modify_reaction(reaction_acronym):
                                                         reaction_id=reaction.id,
                                                         organism_id=form.organism.data.id)
                 db.session.add(enzyme_rxn_org)
-                db.session.commit()
+                db.session.flush()
 
         enzyme_rxn_org.mechanism_id = mechanism_id
         enzyme_rxn_org.mech_evidence_level_id = mech_evidence_level_id
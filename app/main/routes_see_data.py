@@ -1,14 +1,78 @@
 from flask import Markup
 from flask import render_template, flash, redirect, url_for, request
 from flask_login import login_required
+from sqlalchemy.orm import joinedload
 
-from app import current_app, db
+from app import current_app, db, detail_cache, reference_data
 from app.main import bp
 from app.main.forms import EnzymeForm, GeneForm, ModelForm, OrganismForm, ReactionForm, ModifyDataForm
 from app.main.forms import OrganismForm
 from app.models import Compartment, Enzyme, EnzymeReactionOrganism, EnzymeReactionInhibition, EnzymeReactionActivation, \
-    EnzymeReactionEffector, EnzymeReactionMiscInfo, EnzymeOrganism, EnzymeStructure, EvidenceLevel, Gene, \
-    GibbsEnergy, Mechanism, Metabolite, Model, Organism, Reaction, ReactionMetabolite, Reference, ModelAssumptions
+    EnzymeReactionEffector, EnzymeReactionMiscInfo, EvidenceLevel, Gene, GibbsEnergy, Mechanism, Metabolite, Model, \
+    Organism, Reaction, ReactionMetabolite, Reference, ModelAssumptions, metabolite_compartment
+from app.utils.pagination import keyset_paginate
+from app.utils.profiles import EnzymeProfile
+
+
+def _enzyme_reaction_organism_options(model):
+    """
+    Gets the loader options to fetch the enzyme, reaction, and organism of model.enzyme_reaction_organism in the same
+    query as model, for the enzyme inhibitors, activators, effectors, and misc info lists.
+
+    Args:
+        model: EnzymeReactionInhibition, EnzymeReactionActivation, EnzymeReactionEffector, or EnzymeReactionMiscInfo.
+
+    Returns:
+        list of loader options.
+    """
+
+    return [joinedload(model.enzyme_reaction_organism).joinedload(EnzymeReactionOrganism.enzyme),
+            joinedload(model.enzyme_reaction_organism).joinedload(EnzymeReactionOrganism.reaction),
+            joinedload(model.enzyme_reaction_organism).joinedload(EnzymeReactionOrganism.organism)]
+
+
+def _get_page(query, sort_columns, endpoint, descending=False):
+    """
+    Gets the page of query given by the cursor in the request arguments, using keyset pagination so that any page
+    costs the same as the first one, together with the urls of the next and previous pages.
+
+    Args:
+        query: the query with the data to show, without order_by.
+        sort_columns: list of model columns to sort by, the last one must be unique (see keyset_paginate).
+        endpoint: the endpoint of the list, e.g. 'main.see_reaction_list'.
+        descending: if True the data is sorted in descending order.
+
+    Returns:
+        page, next_url, prev_url
+    """
+
+    page = keyset_paginate(query, sort_columns, cursor=request.args.get('cursor'),
+                           per_page=current_app.config['POSTS_PER_PAGE'], descending=descending)
+    next_url = url_for(endpoint, cursor=page.next_cursor) if page.has_next else None
+    prev_url = url_for(endpoint, cursor=page.prev_cursor) if page.has_prev else None
+    return page, next_url, prev_url
+
+
+def _get_metabolite_compartments(metabolites):
+    """
+    Gets the compartments of a page of metabolites with a single query.
+
+    Args:
+        metabolites: list of Metabolite objects.
+
+    Returns:
+        dictionary of the form {metabolite_id: [compartment bigg ids]}
+    """
+
+    metabolite_compartments = dict((metabolite.id, []) for metabolite in metabolites)
+    if metabolite_compartments:
+        compartment_query = db.session.query(metabolite_compartment.c.metabolite_id, Compartment.bigg_id) \
+            .join(Compartment, Compartment.id == metabolite_compartment.c.compartment_id) \
+            .filter(metabolite_compartment.c.metabolite_id.in_(metabolite_compartments))
+        for metabolite_id, compartment in compartment_query:
+            metabolite_compartments[metabolite_id].append(compartment)
+
+    return metabolite_compartments
 
 
 @bp.route('/see_enzyme_list')
@@ -34,13 +98,7 @@ def see_enzyme_list():
                     <th>EC number</th>")
 
     # enzyme_header = Enzyme.__table__.columns.keys()
-    page = request.args.get('page', 1, type=int)
-    enzymes = Enzyme.query.order_by(Enzyme.isoenzyme.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_enzyme_list', page=enzymes.next_num) \
-        if enzymes.has_next else None
-    prev_url = url_for('main.see_enzyme_list', page=enzymes.prev_num) \
-        if enzymes.has_prev else None
+    enzymes, next_url, prev_url = _get_page(Enzyme.query, [Enzyme.isoenzyme, Enzyme.id], 'main.see_enzyme_list')
     return render_template("see_data.html", title='See enzymes', data=enzymes.items,
                            data_type='enzyme', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -69,7 +127,28 @@ def see_enzyme(isoenzyme):
         render_template to see_data with data_type set to enzymes.
     """
 
-    enzyme = Enzyme.query.filter_by(isoenzyme=isoenzyme).first()
+    detail = detail_cache.get_or_set(('enzyme', isoenzyme), lambda: _get_enzyme_detail(isoenzyme))
+
+    form = ModifyDataForm()
+    if form.validate_on_submit():
+        return redirect(url_for('main.modify_enzyme_select_organism', isoenzyme=isoenzyme))
+
+    return render_template("see_data_element.html", title='See enzyme', data_type='enzyme', form=form, **detail)
+
+
+def _get_enzyme_detail(isoenzyme):
+    """
+    Gets the data shown in the see_enzyme page, as strings so that it can be cached.
+
+    Args:
+        isoenzyme: the isoenzyme, e.g. PFK1.
+
+    Returns:
+        dict with data_name, data_list and data_list_nested.
+    """
+
+    profile = EnzymeProfile.from_isoenzyme(isoenzyme)
+    enzyme = profile.enzyme
 
     data = []
     data_nested = []
@@ -79,60 +158,26 @@ def see_enzyme(isoenzyme):
     data.append({'field_name': 'Isoenzyme', 'data': enzyme.isoenzyme})
     data.append({'field_name': 'EC number', 'data': enzyme.ec_number})
 
-    enzyme_structures = EnzymeStructure.query.filter_by(enzyme_id=enzyme.id).all()
-    enzyme_structures_organism_list = [structure.organism_id for structure in enzyme_structures]
-
-    enzyme_organism = EnzymeOrganism.query.filter_by(enzyme_id=enzyme.id).all()
-    enzyme_organisms_organism_list = [enz_org.organism_id for enz_org in enzyme_organism]
-
-    enzyme_reaction_organism = EnzymeReactionOrganism.query.filter_by(enzyme_id=enzyme.id)
-    enzyme_reaction_organisms_organism_list = [enz_rxn_org.organism_id for enz_rxn_org in enzyme_reaction_organism]
-
-    organism_ids_set = set(
-        enzyme_structures_organism_list + enzyme_organisms_organism_list + enzyme_reaction_organisms_organism_list)
-
-    organisms = [organism.name for organism in Organism.query.filter(Organism.id.in_(organism_ids_set)).all()]
+    organisms = [organism.name for organism in profile.organisms]
     data.append({'field_name': 'Organisms', 'data': ', '.join(organisms) if organisms else 'NA'})
 
-    enz_rxn_org_models = [enz_rxn_org.models for enz_rxn_org in enzyme_reaction_organism]
-    models = [item.name for sublist in enz_rxn_org_models for item in sublist]
+    models = [model.name for model in profile.models]
     data.append({'field_name': 'Models', 'data': ', '.join(models) if models else 'NA'})
 
-    reactions_ids = [enz_rxn_org.reaction_id for enz_rxn_org in enzyme_reaction_organism]
-    reactions = [str(reaction) for reaction in Reaction.query.filter(Reaction.id.in_(reactions_ids)).all()]
-    data_nested.append({'field_name': 'Reactions', 'data': reactions})
-
-    enz_rxn_org_id_list = [enz_rxn_org.id for enz_rxn_org in enzyme_reaction_organism]
-
-    inhibitors = EnzymeReactionInhibition.query.filter(
-        EnzymeReactionInhibition.enz_rxn_org_id.in_(enz_rxn_org_id_list)).all()
-    data_nested.append({'field_name': 'Inhibitors', 'data': inhibitors})
-
-    activators = EnzymeReactionActivation.query.filter(
-        EnzymeReactionActivation.enz_rxn_org_id.in_(enz_rxn_org_id_list)).all()
-    data_nested.append({'field_name': 'Activators', 'data': activators})
-
-    effectors = EnzymeReactionEffector.query.filter(
-        EnzymeReactionEffector.enz_rxn_org_id.in_(enz_rxn_org_id_list)).all()
-    data_nested.append({'field_name': 'Effectors', 'data': effectors})
-
-    misc_infos = EnzymeReactionMiscInfo.query.filter(
-        EnzymeReactionMiscInfo.enz_rxn_org_id.in_(enz_rxn_org_id_list)).all()
-    data_nested.append({'field_name': 'Misc info', 'data': misc_infos})
+    data_nested.append({'field_name': 'Reactions', 'data': [str(reaction) for reaction in profile.reactions]})
+    data_nested.append({'field_name': 'Inhibitors', 'data': [str(inhibitor) for inhibitor in profile.inhibitors]})
+    data_nested.append({'field_name': 'Activators', 'data': [str(activator) for activator in profile.activators]})
+    data_nested.append({'field_name': 'Effectors', 'data': [str(effector) for effector in profile.effectors]})
+    data_nested.append({'field_name': 'Misc info', 'data': [str(misc_info) for misc_info in profile.misc_infos]})
 
     # TODO: add encoding genes
 
-    uniprot_ids = [enz_org.uniprot_id for enz_org in enzyme_organism]
+    uniprot_ids = profile.uniprot_ids
     data.append({'field_name': 'Uniprot IDs', 'data': ', '.join(uniprot_ids) if uniprot_ids and uniprot_ids[0] is not None else 'NA'})
-    pdb_ids = [structure.pdb_id for structure in enzyme_structures]
+    pdb_ids = profile.pdb_ids
     data.append({'field_name': 'PDB IDs', 'data': ', '.join(pdb_ids) if pdb_ids else 'NA'})
 
-    form = ModifyDataForm()
-    if form.validate_on_submit():
-        return redirect(url_for('main.modify_enzyme_select_organism', isoenzyme=isoenzyme))
-
-    return render_template("see_data_element.html", title='See enzyme', data_name=isoenzyme, data_type='enzyme',
-                           data_list=data, data_list_nested=data_nested, form=form)
+    return {'data_name': isoenzyme, 'data_list': data, 'data_list_nested': data_nested}
 
 
 @bp.route('/see_enzyme_inhibitors_list')
@@ -165,13 +210,11 @@ def see_enzyme_inhibitors_list():
 
     # enzyme_header = Enzyme.__table__.columns.keys()
 
-    page = request.args.get('page', 1, type=int)
-    enzyme_inhibitors = EnzymeReactionInhibition.query.order_by(EnzymeReactionInhibition.id.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_enzyme_inhibitors_list', page=enzyme_inhibitors.next_num) \
-        if enzyme_inhibitors.has_next else None
-    prev_url = url_for('main.see_enzyme_inhibitors_list', page=enzyme_inhibitors.prev_num) \
-        if enzyme_inhibitors.has_prev else None
+    enzyme_inhibitor_query = EnzymeReactionInhibition.query \
+        .options(joinedload(EnzymeReactionInhibition.inhibitor_met), joinedload(EnzymeReactionInhibition.affected_met),
+                 *_enzyme_reaction_organism_options(EnzymeReactionInhibition))
+    enzyme_inhibitors, next_url, prev_url = _get_page(enzyme_inhibitor_query, [EnzymeReactionInhibition.id],
+                                                      'main.see_enzyme_inhibitors_list')
     return render_template("see_data.html", title='See enzyme inhibitors', data=enzyme_inhibitors.items,
                            data_type='enzyme_inhibitors', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -257,13 +300,11 @@ def see_enzyme_activators_list():
                     <th>Organism</th>")
 
     # enzyme_header = Enzyme.__table__.columns.keys()
-    page = request.args.get('page', 1, type=int)
-    enzyme_activators = EnzymeReactionActivation.query.order_by(EnzymeReactionActivation.id.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_enzyme_activators_list', page=enzyme_activators.next_num) \
-        if enzyme_activators.has_next else None
-    prev_url = url_for('main.see_enzyme_activatorslist', page=enzyme_activators.prev_num) \
-        if enzyme_activators.has_prev else None
+    enzyme_activator_query = EnzymeReactionActivation.query \
+        .options(joinedload(EnzymeReactionActivation.activator_met),
+                 *_enzyme_reaction_organism_options(EnzymeReactionActivation))
+    enzyme_activators, next_url, prev_url = _get_page(enzyme_activator_query, [EnzymeReactionActivation.id],
+                                                      'main.see_enzyme_activators_list')
     return render_template("see_data.html", title='See enzyme activators', data=enzyme_activators.items,
                            data_type='enzyme_activators', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -345,13 +386,11 @@ def see_enzyme_effectors_list():
                     <th>Organism</th>")
 
     # enzyme_header = Enzyme.__table__.columns.keys()
-    page = request.args.get('page', 1, type=int)
-    enzyme_effector_list = EnzymeReactionEffector.query.order_by(EnzymeReactionEffector.id.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_enzyme_effector_list', page=enzyme_effector_list.next_num) \
-        if enzyme_effector_list.has_next else None
-    prev_url = url_for('main.see_enzyme_effector_list', page=enzyme_effector_list.prev_num) \
-        if enzyme_effector_list.has_prev else None
+    enzyme_effector_query = EnzymeReactionEffector.query \
+        .options(joinedload(EnzymeReactionEffector.effector_met),
+                 *_enzyme_reaction_organism_options(EnzymeReactionEffector))
+    enzyme_effector_list, next_url, prev_url = _get_page(enzyme_effector_query, [EnzymeReactionEffector.id],
+                                                         'main.see_enzyme_effectors_list')
     return render_template("see_data.html", title='See enzyme effectors', data=enzyme_effector_list.items,
                            data_type='enzyme_effectors', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -435,13 +474,10 @@ def see_enzyme_misc_info_list():
                     <th>Organism</th>")
 
     # enzyme_header = Enzyme.__table__.columns.keys()
-    page = request.args.get('page', 1, type=int)
-    enzyme_misc_info = EnzymeReactionMiscInfo.query.order_by(EnzymeReactionMiscInfo.id.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_enzyme_misc_info_list', page=enzyme_misc_info.next_num) \
-        if enzyme_misc_info.has_next else None
-    prev_url = url_for('main.see_enzyme_misc_info_list', page=enzyme_misc_info.prev_num) \
-        if enzyme_misc_info.has_prev else None
+    enzyme_misc_info_query = EnzymeReactionMiscInfo.query \
+        .options(*_enzyme_reaction_organism_options(EnzymeReactionMiscInfo))
+    enzyme_misc_info, next_url, prev_url = _get_page(enzyme_misc_info_query, [EnzymeReactionMiscInfo.id],
+                                                     'main.see_enzyme_misc_info_list')
     return render_template("see_data.html", title='See enzyme misc info', data=enzyme_misc_info.items,
                            data_type='enzyme_misc_info', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -512,13 +548,8 @@ def see_gene_list():
                   "enzyme_misc_info:": "#", "model_assumptions": "#", "mechanisms": "#"}
     header = ''
 
-    page = request.args.get('page', 1, type=int)
-    genes = Gene.query.order_by(Gene.timestamp.desc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_gene_list', page=genes.next_num) \
-        if genes.has_next else None
-    prev_url = url_for('main.see_gene_list', page=genes.prev_num) \
-        if genes.has_prev else None
+    genes, next_url, prev_url = _get_page(Gene.query, [Gene.timestamp, Gene.id], 'main.see_gene_list',
+                                          descending=True)
     return render_template("see_data.html", title='See genes', data=genes.items,
                            data_type='gene', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -544,13 +575,7 @@ def see_mechanism_list():
                     <th>Name</th> \
                     <th>Image</th>")
 
-    page = request.args.get('page', 1, type=int)
-    mechanisms = Mechanism.query.order_by(Mechanism.id.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_mechanism_list', page=mechanisms.next_num) \
-        if mechanisms.has_next else None
-    prev_url = url_for('main.see_mechanism_list', page=mechanisms.prev_num) \
-        if mechanisms.has_prev else None
+    mechanisms, next_url, prev_url = _get_page(Mechanism.query, [Mechanism.id], 'main.see_mechanism_list')
     return render_template("see_data.html", title='See mechanisms', data=mechanisms.items,
                            data_type='mechanism', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -580,16 +605,12 @@ def see_metabolite_list():
                     <th>MetanetX ID</th> \
                     <th>Compartment</th>")
 
-    page = request.args.get('page', 1, type=int)
-    metabolites = Metabolite.query.order_by(Metabolite.grasp_id.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_metabolite_list', page=metabolites.next_num) \
-        if metabolites.has_next else None
-    prev_url = url_for('main.see_metabolite_list', page=metabolites.prev_num) \
-        if metabolites.has_prev else None
+    metabolites, next_url, prev_url = _get_page(Metabolite.query, [Metabolite.grasp_id, Metabolite.id],
+                                                'main.see_metabolite_list')
     return render_template("see_data.html", title='See metabolites', data=metabolites.items,
                            data_type='metabolite', tab_status=tab_status, header=header,
-                           next_url=next_url, prev_url=prev_url)
+                           next_url=next_url, prev_url=prev_url,
+                           metabolite_compartments=_get_metabolite_compartments(metabolites.items))
 
 
 @bp.route('/see_metabolite/<grasp_id>', methods=['GET', 'POST'])
@@ -613,6 +634,27 @@ def see_metabolite(grasp_id):
          render_template to see_data with data_type set to metabolite.
      """
 
+    detail = detail_cache.get_or_set(('metabolite', grasp_id), lambda: _get_metabolite_detail(grasp_id))
+
+    form = ModifyDataForm()
+    if form.validate_on_submit():
+        return redirect(url_for('main.modify_metabolite', grasp_id=grasp_id, title='Modify metabolite'))
+
+    return render_template("see_data_element.html", title='See metabolite', data_type='metabolite', form=form,
+                           **detail)
+
+
+def _get_metabolite_detail(grasp_id):
+    """
+    Gets the data shown in the see_metabolite page, as strings so that it can be cached.
+
+    Args:
+        grasp_id: the metabolite grasp id, e.g. pep.
+
+    Returns:
+        dict with data_name, data_list and data_list_nested.
+    """
+
     metabolite = Metabolite.query.filter_by(grasp_id=grasp_id).first()
 
     data = []
@@ -632,13 +674,7 @@ def see_metabolite(grasp_id):
 
     data_nested.append({'field_name': 'Reactions', 'data': [str(rxn_met.reaction) for rxn_met in metabolite.reactions]})
 
-    form = ModifyDataForm()
-    if form.validate_on_submit():
-        return redirect(url_for('main.modify_metabolite', grasp_id=metabolite.grasp_id, title='Modify metabolite'))
-
-    return render_template("see_data_element.html", title='See metabolite', data_name=metabolite,
-                           data_type='metabolite', form=form,
-                           data_list=data, data_list_nested=data_nested)
+    return {'data_name': str(metabolite), 'data_list': data, 'data_list_nested': data_nested}
 
 
 @bp.route('/see_model_list')
@@ -661,18 +697,57 @@ def see_model_list():
                     <th>Organism</th> \
                     <th>Strain</th>")
 
-    page = request.args.get('page', 1, type=int)
-    models = Model.query.order_by(Model.name.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_model_list', page=models.next_num) \
-        if models.has_next else None
-    prev_url = url_for('main.see_model_list', page=models.prev_num) \
-        if models.has_prev else None
+    models, next_url, prev_url = _get_page(Model.query, [Model.name, Model.id], 'main.see_model_list')
     return render_template("see_data.html", title='See models', data=models.items,
                            data_type='model', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
 
 
+def _get_model_reaction_data(model):
+    """
+    Gets the reactions of a model, each followed by its inhibitors, activators, effectors and misc info that are part
+    of the model, with one query for the reactions and one for each of the association tables.
+
+    Args:
+        model: Model object.
+
+    Returns:
+        list with the EnzymeReactionOrganism objects of the model, each followed by the strings of its inhibitors,
+        activators, effectors and misc info, prefixed by '-> '.
+    """
+
+    enz_rxn_orgs = model.enzyme_reaction_organisms \
+        .options(joinedload(EnzymeReactionOrganism.enzyme), joinedload(EnzymeReactionOrganism.reaction),
+                 joinedload(EnzymeReactionOrganism.organism)).all()
+
+    model_data = [
+        model.enzyme_reaction_inhibitions.options(joinedload(EnzymeReactionInhibition.inhibitor_met),
+                                                  joinedload(EnzymeReactionInhibition.affected_met),
+                                                  joinedload(EnzymeReactionInhibition.evidence))
+        .order_by(EnzymeReactionInhibition.id),
+        model.enzyme_reaction_activations.options(joinedload(EnzymeReactionActivation.activator_met),
+                                                  joinedload(EnzymeReactionActivation.evidence))
+        .order_by(EnzymeReactionActivation.id),
+        model.enzyme_reaction_effectors.options(joinedload(EnzymeReactionEffector.effector_met),
+                                                joinedload(EnzymeReactionEffector.evidence))
+        .order_by(EnzymeReactionEffector.id),
+        model.enzyme_reaction_misc_infos.options(joinedload(EnzymeReactionMiscInfo.evidence))
+        .order_by(EnzymeReactionMiscInfo.id)]
+
+    enz_rxn_org_data = dict((enz_rxn_org.id, []) for enz_rxn_org in enz_rxn_orgs)
+    for data_query in model_data:
+        for data_point in data_query:
+            if data_point.enz_rxn_org_id in enz_rxn_org_data:
+                enz_rxn_org_data[data_point.enz_rxn_org_id].append('-> ' + str(data_point))
+
+    reaction_data = []
+    for enz_rxn_org in enz_rxn_orgs:
+        reaction_data.append(enz_rxn_org)
+        reaction_data.extend(enz_rxn_org_data[enz_rxn_org.id])
+
+    return reaction_data
+
+
 @bp.route('/see_model/<model_name>', methods=['GET', 'POST'])
 @login_required
 def see_model(model_name):
@@ -696,6 +771,26 @@ def see_model(model_name):
          render_template to see_data with data_type set to model.
      """
 
+    detail = detail_cache.get_or_set(('model', model_name), lambda: _get_model_detail(model_name))
+
+    form = ModifyDataForm()
+    if form.validate_on_submit():
+        return redirect(url_for('main.modify_model', model_name=model_name, title='Modify model'))
+
+    return render_template("see_data_element.html", title='See model', data_type='model', form=form, **detail)
+
+
+def _get_model_detail(model_name):
+    """
+    Gets the data shown in the see_model page, as strings so that it can be cached.
+
+    Args:
+        model_name: the model name.
+
+    Returns:
+        dict with data_name, data_list and data_list_nested.
+    """
+
     model = Model.query.filter_by(name=model_name).first()
 
     data = []
@@ -709,40 +804,10 @@ def see_model(model_name):
     assumptions = [str(assumption) for assumption in model.model_assumptions]
     data_nested.append({'field_name': 'Assumptions', 'data': [', '.join(assumptions)] if assumptions else ['NA']})
 
-    # reaction_ids = [enz_rxn_org.reaction_id for enz_rxn_org in model.enzyme_reaction_organisms]
-    # reactions = [str(reaction) for reaction in Reaction.query.filter(Reaction.id.in_(reaction_ids))]
-
-    if model.enzyme_reaction_organisms:
-        reaction_data = []
-        for enz_rxn_org in model.enzyme_reaction_organisms:
-            reaction_data.append(enz_rxn_org)
-            for inhibitor in enz_rxn_org.enzyme_reaction_inhibitors:
-                if model.has_enzyme_reaction_inhibitor(inhibitor):
-                    reaction_data.append('-> ' + str(inhibitor))
-
-            for activator in enz_rxn_org.enzyme_reaction_activators:
-                if model.has_enzyme_reaction_activator(activator):
-                    reaction_data.append('-> ' + str(activator))
-
-            for effector in enz_rxn_org.enzyme_reaction_effectors:
-                if model.has_enzyme_reaction_effector(effector):
-                    reaction_data.append('-> ' + str(effector))
+    reaction_data = [str(data_point) for data_point in _get_model_reaction_data(model)]
+    data_nested.append({'field_name': 'Reactions', 'data': reaction_data if reaction_data else ['NA']})
 
-            for misc_info in enz_rxn_org.enzyme_reaction_misc_infos:
-                if model.has_enzyme_reaction_misc_info(misc_info):
-                    reaction_data.append('-> ' + str(misc_info))
-
-        # data_nested.append({'field_name': 'Reactions', 'data': model.enzyme_reaction_organisms if model.enzyme_reaction_organisms else ['NA']})
-        data_nested.append({'field_name': 'Reactions', 'data': reaction_data})
-    else:
-        data_nested.append({'field_name': 'Reactions', 'data': ['NA']})
-
-    form = ModifyDataForm()
-    if form.validate_on_submit():
-        return redirect(url_for('main.modify_model', model_name=model_name, title='Modify model'))
-
-    return render_template("see_data_element.html", title='See model', data_name=model.name, data_type='model',
-                           data_list=data, data_list_nested=data_nested, form=form)
+    return {'data_name': model.name, 'data_list': data, 'data_list_nested': data_nested}
 
 
 @bp.route('/see_model_assumptions_list')
@@ -766,13 +831,10 @@ def see_model_assumptions_list():
                     <th>Assumption</th> \
                     <th>Model</th>")
 
-    page = request.args.get('page', 1, type=int)
-    model_assumptions = ModelAssumptions.query.order_by(ModelAssumptions.assumption.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_model_assumptions_list', page=model_assumptions.next_num) \
-        if model_assumptions.has_next else None
-    prev_url = url_for('main.see_model_assumptions_list', page=model_assumptions.prev_num) \
-        if model_assumptions.has_prev else None
+    model_assumption_query = ModelAssumptions.query.options(joinedload(ModelAssumptions.model))
+    model_assumptions, next_url, prev_url = _get_page(model_assumption_query,
+                                                      [ModelAssumptions.assumption, ModelAssumptions.id],
+                                                      'main.see_model_assumptions_list')
     return render_template("see_data.html", title='See model assumptions', data=model_assumptions.items,
                            data_type='model_assumptions', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -835,13 +897,7 @@ def see_organism_list():
                   "enzyme_misc_info:": "#", "model_assumptions": "#", "mechanisms": "#"}
     header = Markup("<th>Name</th>")
 
-    page = request.args.get('page', 1, type=int)
-    organisms = Organism.query.order_by(Organism.name.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_organism_list', page=organisms.next_num) \
-        if organisms.has_next else None
-    prev_url = url_for('main.see_organism_list', page=organisms.prev_num) \
-        if organisms.has_prev else None
+    organisms, next_url, prev_url = _get_page(Organism.query, [Organism.name, Organism.id], 'main.see_organism_list')
     return render_template("see_data.html", title='See organisms', data=organisms.items,
                            data_type='organism', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -862,7 +918,7 @@ def see_organism(organism_name):
          render_template to see_data with data_type set to organism.
     """
 
-    organism = Organism.query.filter_by(name=organism_name).first()
+    organism = reference_data.get(Organism, name=organism_name)
 
     data = []
     data_nested = []
@@ -906,13 +962,7 @@ def see_reaction_list():
                     <th>KEGG ID</th> \
                     <th>Compartment</th>")
 
-    page = request.args.get('page', 1, type=int)
-    reactions = Reaction.query.order_by(Reaction.name.asc()).paginate(
-        page, current_app.config['POSTS_PER_PAGE'], False)
-    next_url = url_for('main.see_reaction_list', page=reactions.next_num) \
-        if reactions.has_next else None
-    prev_url = url_for('main.see_reaction_list', page=reactions.prev_num) \
-        if reactions.has_prev else None
+    reactions, next_url, prev_url = _get_page(Reaction.query, [Reaction.name, Reaction.id], 'main.see_reaction_list')
     return render_template("see_data.html", title='See reactions', data=reactions.items,
                            data_type='reaction', tab_status=tab_status, header=header,
                            next_url=next_url, prev_url=prev_url)
@@ -941,6 +991,26 @@ def see_reaction(reaction_acronym):
          render_template to see_data with data_type set to reaction.
     """
 
+    detail = detail_cache.get_or_set(('reaction', reaction_acronym), lambda: _get_reaction_detail(reaction_acronym))
+
+    form = ModifyDataForm()
+    if form.validate_on_submit():
+        return redirect(url_for('main.modify_reaction_select_organism', reaction_acronym=reaction_acronym))
+
+    return render_template("see_data_element.html", title='See reaction', data_type='reaction', form=form, **detail)
+
+
+def _get_reaction_detail(reaction_acronym):
+    """
+    Gets the data shown in the see_reaction page, as strings so that it can be cached.
+
+    Args:
+        reaction_acronym: the reaction acronym, e.g. PFK.
+
+    Returns:
+        dict with data_name, data_list and data_list_nested.
+    """
+
     reaction = Reaction.query.filter_by(acronym=reaction_acronym).first()
 
     data = []
@@ -970,10 +1040,4 @@ def see_reaction(reaction_acronym):
     organisms = [enz_rxn_org.organism.name for enz_rxn_org in reaction.enzyme_reaction_organisms]
     data.append({'field_name': 'Organisms', 'data': ', '.join(organisms) if organisms else 'NA'})
 
-    form = ModifyDataForm()
-    if form.validate_on_submit():
-        return redirect(url_for('main.modify_reaction_select_organism', reaction_acronym=reaction_acronym))
-
-    return render_template("see_data_element.html", title='See reaction', data_name=reaction.acronym,
-                           data_type='reaction',
-                           data_list=data, data_list_nested=data_nested, form=form)
+    return {'data_name': reaction.acronym, 'data_list': data, 'data_list_nested': data_nested}
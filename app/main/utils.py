@@ -1,9 +1,16 @@
 import re
+from collections import OrderedDict
 
-from app import db
-from app.models import Compartment, EnzymeGeneOrganism, EnzymeOrganism, EnzymeStructure, \
-    Gene, GibbsEnergy, GibbsEnergyReactionModel, Metabolite, Reference, EnzymeReactionEffector, ReactionMetabolite
-from app.utils.parsers import ReactionParser, parse_input_list
+from flask import url_for
+
+from app import db, reference_data
+from app.load_data.xref_index import get_xref_index
+from app.models import ChebiIds, Compartment, EnzymeGeneOrganism, EnzymeOrganism, EnzymeStructure, \
+    Gene, GibbsEnergy, GibbsEnergyReactionModel, Reference, ReactionMetabolite
+from app.utils.metabolites import get_metabolite_resolver
+from app.utils.parsers import parse_input_list, parse_reaction
+from app.utils.references import get_reference_resolver
+from app.utils.regulations import get_regulation_lookup
 
 
 def add_enzyme_organism(enzyme, organism_id, uniprot_id_list, number_of_active_sites):
@@ -74,20 +81,24 @@ def add_enzyme_genes(gene_names, enzyme, organism_id):
     if gene_names:
         gene_bigg_ids_list = parse_input_list(gene_names)
         for gene_name in gene_bigg_ids_list:
-            gene_db = Gene.query.filter_by(name=gene_name).first()
-            if not gene_db:
-                gene_db = Gene(name=gene_name)
-                db.session.add(gene_db)
-                db.session.commit()
-
-            enzyme_gene_organism_db = EnzymeGeneOrganism.query.filter_by(gene_id=gene_db.id,
-                                                                         enzyme_id=enzyme.id,
-                                                                         organism_id=organism_id).first()
-            if not enzyme_gene_organism_db:
-                enzyme_gene_organism = EnzymeGeneOrganism(gene_id=gene_db.id,
-                                                          enzyme_id=enzyme.id,
-                                                          organism_id=organism_id)
-                db.session.add(enzyme_gene_organism)
+            _add_enzyme_gene(gene_name, enzyme, organism_id)
+
+
+def _add_enzyme_gene(gene_name, enzyme, organism_id):
+    gene_db = Gene.query.filter_by(name=gene_name).first()
+    if not gene_db:
+        gene_db = Gene(name=gene_name)
+        db.session.add(gene_db)
+        db.session.flush()
+
+    enzyme_gene_organism_db = EnzymeGeneOrganism.query.filter_by(gene_id=gene_db.id,
+                                                                 enzyme_id=enzyme.id,
+                                                                 organism_id=organism_id).first()
+    if not enzyme_gene_organism_db:
+        enzyme_gene_organism = EnzymeGeneOrganism(gene_id=gene_db.id,
+                                                  enzyme_id=enzyme.id,
+                                                  organism_id=organism_id)
+        db.session.add(enzyme_gene_organism)
 
 
 def add_enzyme_structures(enzyme, organism_id, pdb_id_list, strain_list):
@@ -104,23 +115,31 @@ def add_enzyme_structures(enzyme, organism_id, pdb_id_list, strain_list):
         None
     """
 
+    for pdb_id, pdb_id_strain in _get_pdb_id_strains(pdb_id_list, strain_list):
+        _add_enzyme_structure(enzyme, organism_id, pdb_id, pdb_id_strain)
+
+
+def _get_pdb_id_strains(pdb_id_list, strain_list):
     if len(strain_list) == 1 and len(pdb_id_list) > 1:
         pdb_id_strain_list = zip(pdb_id_list, [strain_list[0] for i in range(len(pdb_id_list))])
-    elif len(strain_list) == 0 and len(pdb_id_list) > 1:
+    elif len(strain_list) == 0:
         pdb_id_strain_list = zip(pdb_id_list, ['' for i in range(len(pdb_id_list))])
     elif len(strain_list) == len(pdb_id_list):
         pdb_id_strain_list = zip(pdb_id_list, strain_list)
 
-    for pdb_id, pdb_id_strain in pdb_id_strain_list:
-        enzyme_structure_db = EnzymeStructure.query.filter_by(pdb_id=pdb_id).first()
-        if not enzyme_structure_db:
-            enzyme_structure_db = EnzymeStructure(enzyme_id=enzyme.id,
-                                                  pdb_id=pdb_id,
-                                                  organism_id=organism_id,
-                                                  strain=pdb_id_strain)
-            db.session.add(enzyme_structure_db)
+    return list(pdb_id_strain_list)
+
+
+def _add_enzyme_structure(enzyme, organism_id, pdb_id, strain):
+    enzyme_structure_db = EnzymeStructure.query.filter_by(pdb_id=pdb_id).first()
+    if not enzyme_structure_db:
+        enzyme_structure_db = EnzymeStructure(enzyme_id=enzyme.id,
+                                              pdb_id=pdb_id,
+                                              organism_id=organism_id,
+                                              strain=strain)
+        db.session.add(enzyme_structure_db)
 
-        enzyme.add_structure(enzyme_structure_db)
+    enzyme.add_structure(enzyme_structure_db)
 
 
 def add_metabolites_to_reaction(reaction, reaction_string):
@@ -136,25 +155,235 @@ def add_metabolites_to_reaction(reaction, reaction_string):
         reaction object with added metabolites.
     """
 
-    reversible, stoichiometry = ReactionParser().parse_reaction(reaction_string)
+    for met_db, stoich_coef, compartment_db in _get_reaction_metabolites(reaction_string):
+        reaction.add_metabolite(met_db, stoich_coef, compartment_db)
+
+    return reaction
+
+
+def get_reaction_bigg_ids(reaction_string):
+    """
+    Gets the metabolite bigg ids and compartments of a reaction string.
+
+    Args:
+        reaction_string: reaction string in the format A_c + B_c <-> P_c
+
+    Returns:
+        list of tuples (bigg_id, compartment acronym, stoich_coef).
+    """
+
+    reversible, stoichiometry = parse_reaction(reaction_string)
     # (True, OrderedDict([('m_pep_c', -1.0), ('m_adp_c', -1.5), ('m_pyr_c', 1.0), ('m_atp_m', 2.0)]))
 
-    for met, stoich_coef in stoichiometry.items():
-        met_compartment = re.findall('(\w+)_(\w+)', met)[0]
+    return [re.findall('(\w+)_(\w+)', met)[0] + (stoich_coef,) for met, stoich_coef in stoichiometry.items()]
+
+
+def _get_reaction_metabolites(reaction_string):
+    """
+    Gets the metabolites of a reaction string, adding the ones that are not in the database and their compartments.
+
+    Returns:
+        list of tuples (metabolite, stoich_coef, compartment).
+    """
 
-        bigg_id = met_compartment[0]
-        compartment_acronym = met_compartment[1]
+    met_compartments = get_reaction_bigg_ids(reaction_string)
 
-        met_db = check_metabolite(bigg_id)
+    resolver = get_metabolite_resolver()
+    mets_db = resolver.resolve([bigg_id for bigg_id, _, _ in met_compartments])
+    compartments_db = [reference_data.get(Compartment, bigg_id=compartment_acronym)
+                       for _, compartment_acronym, _ in met_compartments]
+    resolver.add_compartments(list(zip(mets_db, compartments_db)))
 
-        compartment_db = Compartment.query.filter_by(bigg_id=compartment_acronym).first()
-        met_db.add_compartment(compartment_db)
+    # the reaction metabolites are created with the metabolite ids
+    if any(met_db.id is None for met_db in mets_db):
+        db.session.flush()
 
-        reaction.add_metabolite(met_db, stoich_coef, compartment_db)
+    return [(met_db, stoich_coef, compartment_db)
+            for met_db, (_, _, stoich_coef), compartment_db in zip(mets_db, met_compartments, compartments_db)]
+
+
+def update_collection(collection, items):
+    """
+    Makes a relationship collection, e.g. model.enzyme_reaction_organisms, contain the given items, removing and adding
+    only the ones that changed. The collection is loaded with a single query, and the association rows that changed
+    are deleted and inserted in one statement per table when the session is flushed.
+
+    Args:
+        collection: the relationship collection.
+        items: the objects the collection should contain.
+
+    Returns:
+        tuple (added, removed) with the lists of added and removed objects.
+    """
+
+    items = list(OrderedDict.fromkeys(items or []))
+    current_items = list(collection)
+
+    new_set = set(items)
+    current_set = set(current_items)
+    removed = [item for item in current_items if item not in new_set]
+    added = [item for item in items if item not in current_set]
 
+    for item in removed:
+        collection.remove(item)
+    for item in added:
+        collection.append(item)
+
+    return added, removed
+
+
+def update_reaction_metabolites(reaction, reaction_string):
+    """
+    Updates the metabolites of a reaction to the ones in reaction_string, only the ReactionMetabolite entries that
+    changed are deleted, added or updated, and the reaction equation is rebuilt.
+
+    Args:
+        reaction: reaction object from DB
+        reaction_string: reaction string in the format A_c + B_c <-> P_c
+
+    Returns:
+        reaction object with the updated metabolites.
+    """
+
+    metabolites = _get_reaction_metabolites(reaction_string)
+
+    current_rxn_mets = dict(((rxn_met.metabolite_id, rxn_met.compartment_id), rxn_met)
+                            for rxn_met in reaction.metabolites)
+    new_keys = set((met_db.id, compartment_db.id) for met_db, stoich_coef, compartment_db in metabolites)
+
+    for key, rxn_met in current_rxn_mets.items():
+        if key not in new_keys:
+            db.session.delete(rxn_met)
+
+    for met_db, stoich_coef, compartment_db in metabolites:
+        rxn_met = current_rxn_mets.get((met_db.id, compartment_db.id))
+        if rxn_met is None:
+            reaction.metabolites.append(ReactionMetabolite(reaction_id=reaction.id, metabolite_id=met_db.id,
+                                                           stoich_coef=stoich_coef, compartment=compartment_db))
+        elif rxn_met.stoich_coef != stoich_coef:
+            rxn_met.stoich_coef = stoich_coef
+
+    reaction.equation = reaction.get_equation([(met_db.bigg_id, compartment_db.bigg_id, stoich_coef)
+                                               for met_db, stoich_coef, compartment_db in metabolites])
     return reaction
 
 
+def update_enzyme_genes(gene_names, enzyme, organism_id):
+    """
+    Updates the genes of an enzyme in an organism, only the EnzymeGeneOrganism entries of the genes that were removed
+    or added are deleted or added.
+
+    Args:
+        gene_names: a string with the gene names, or None to remove all the genes.
+        enzyme: an enzyme object.
+        organism_id: the id of the organism (in the DB).
+
+    Returns:
+        None
+    """
+
+    gene_name_list = parse_input_list(gene_names) if gene_names else []
+
+    current_genes = dict(db.session.query(Gene.name, EnzymeGeneOrganism)
+                         .join(EnzymeGeneOrganism.gene)
+                         .filter(EnzymeGeneOrganism.enzyme_id == enzyme.id,
+                                 EnzymeGeneOrganism.organism_id == organism_id))
+
+    for gene_name, enzyme_gene_organism in current_genes.items():
+        if gene_name not in gene_name_list:
+            db.session.delete(enzyme_gene_organism)
+
+    for gene_name in OrderedDict.fromkeys(gene_name_list):
+        if gene_name not in current_genes:
+            _add_enzyme_gene(gene_name, enzyme, organism_id)
+
+
+def update_enzyme_structures(enzyme, organism_id, pdb_id_list, strain_list):
+    """
+    Updates the structures of an enzyme in an organism, the structures that were removed are deleted, the strain of the
+    ones that were kept is updated if it changed, and the new ones are added.
+
+    Args:
+        enzyme: an enzyme object.
+        organism_id: the id of the organism (in the DB).
+        pdb_id_list: a list of pdb ids.
+        strain_list: a list of strains, either a single one or one per pdb_id.
+
+    Returns:
+        None
+    """
+
+    pdb_id_strains = OrderedDict(_get_pdb_id_strains(pdb_id_list, strain_list)) if pdb_id_list else OrderedDict()
+    current_structures = dict((enzyme_structure.pdb_id, enzyme_structure) for enzyme_structure in
+                              enzyme.enzyme_structures.filter(EnzymeStructure.organism_id == organism_id))
+
+    for pdb_id, enzyme_structure in current_structures.items():
+        if pdb_id not in pdb_id_strains:
+            db.session.delete(enzyme_structure)
+        elif enzyme_structure.strain != pdb_id_strains[pdb_id]:
+            enzyme_structure.strain = pdb_id_strains[pdb_id]
+
+    for pdb_id, strain in pdb_id_strains.items():
+        if pdb_id not in current_structures:
+            _add_enzyme_structure(enzyme, organism_id, pdb_id, strain)
+
+
+def update_enzyme_organisms(enzyme, organism_id, uniprot_id_list, number_of_active_sites):
+    """
+    Updates the EnzymeOrganism entries of an enzyme in an organism, the ones whose uniprot_id was removed are deleted,
+    the number of active sites of the ones that were kept is updated if it changed, and the new ones are added.
+
+    Args:
+        enzyme: an enzyme object.
+        organism_id: the id of the organism (in the DB).
+        uniprot_id_list: a list of uniprot IDs.
+        number_of_active_sites: the number of active sites in the enzyme.
+
+    Returns:
+        None
+    """
+
+    current_enzyme_organisms = dict((enzyme_organism.uniprot_id, enzyme_organism) for enzyme_organism in
+                                    enzyme.enzyme_organisms.filter(EnzymeOrganism.organism_id == organism_id))
+
+    for uniprot_id, enzyme_organism in current_enzyme_organisms.items():
+        if uniprot_id not in uniprot_id_list:
+            db.session.delete(enzyme_organism)
+        elif enzyme_organism.n_active_sites != int(number_of_active_sites):
+            enzyme_organism.n_active_sites = int(number_of_active_sites)
+
+    new_uniprot_ids = [uniprot_id for uniprot_id in OrderedDict.fromkeys(uniprot_id_list)
+                       if uniprot_id not in current_enzyme_organisms]
+    add_enzyme_organism(enzyme, organism_id, new_uniprot_ids, number_of_active_sites)
+
+
+def update_metabolite_chebis(metabolite, chebi_id_list, inchi_list):
+    """
+    Updates the ChebiIds of a metabolite, the existing entries with the same chebi_id and inchi are kept.
+
+    Args:
+        metabolite: a metabolite object.
+        chebi_id_list: a list of ChEBI ids.
+        inchi_list: a list of InChIs, one per ChEBI id.
+
+    Returns:
+        None
+    """
+
+    current_chebis = dict(((chebi.chebi_id, chebi.inchi), chebi) for chebi in metabolite.chebis)
+
+    chebis = []
+    for chebi_id, inchi in zip(chebi_id_list, inchi_list):
+        chebi_db = current_chebis.get((chebi_id, inchi))
+        if chebi_db is None:
+            chebi_db = ChebiIds(chebi_id=chebi_id, inchi=inchi)
+            db.session.add(chebi_db)
+            current_chebis[(chebi_id, inchi)] = chebi_db
+        chebis.append(chebi_db)
+
+    update_collection(metabolite.chebis, chebis)
+
+
 def add_gibbs_energy(reaction_id, model_id, standard_dg, standard_dg_std, standard_dg_ph, standard_dg_is,
                      std_gibbs_energy_references):
     """
@@ -199,7 +428,7 @@ def add_gibbs_energy(reaction_id, model_id, standard_dg, standard_dg_std, standa
                                       ionic_strength=standard_dg_is)
 
         db.session.add(gibbs_energy_db)
-        db.session.commit()
+        db.session.flush()
 
         gibbs_energy_reaction_model_db = GibbsEnergyReactionModel(reaction_id=reaction_id,
                                                                   model_id=model_id,
@@ -207,17 +436,8 @@ def add_gibbs_energy(reaction_id, model_id, standard_dg, standard_dg_std, standa
 
         db.session.add(gibbs_energy_reaction_model_db)
 
-        db.session.commit()
-
     if std_gibbs_energy_references.lower().strip() != 'equilibrator':
-
-        gibbs_references = parse_input_list(std_gibbs_energy_references)
-        for ref_doi in gibbs_references:
-            ref_db = Reference.query.filter(doi=ref_doi).first()
-            if not ref_db:
-                ref_db = Reference(doi=ref_doi)
-                db.session.add(ref_db)
-            gibbs_energy_db.add_reference(ref_db.id)
+        add_references(std_gibbs_energy_references, gibbs_energy_db)
 
     if std_gibbs_energy_references.lower().strip() == 'equilibrator':
         ref_db = Reference.query.filter_by(title='eQuilibrator').first()
@@ -237,21 +457,16 @@ def add_mechanism_references(mechanism_references, enzyme_reaction_model):
         None
     """
 
-    mech_references = parse_input_list(mechanism_references)
-
-    for ref_doi in mech_references:
-        ref_db = Reference.query.filter_by(doi=ref_doi).first()
-        if not ref_db:
-            ref_db = Reference(doi=ref_doi)
-            db.session.add(ref_db)
-
-        enzyme_reaction_model.add_mechanism_reference(ref_db)
+    add_references(mechanism_references, enzyme_reaction_model, mechanism_ref=True)
 
 
 def add_references(references, obj, mechanism_ref=False):
     """
-    Takes in a list of doi and adds them as references to the database. Returns a list of the DB instances of the
-    references inserted.
+    Takes in a list of doi and adds them as references to the database, if they are not there yet, and to obj.
+
+    The DOIs are resolved with the reference resolver of the current request or import (see app.utils.references), so
+    each DOI is looked up at most once, and the references of obj are loaded with a single query.
+
     Args:
         references: a list of references
         obj: DB object to which the references will be added
@@ -266,17 +481,16 @@ def add_references(references, obj, mechanism_ref=False):
     else:
         reference_list = references
 
-    for reference in reference_list:
-        ref_db = Reference.query.filter_by(doi=reference).first()
+    if not reference_list:
+        return
 
-        if not ref_db:
-            ref_db = Reference(doi=reference)
-            db.session.add(ref_db)
+    collection = obj.mechanism_references if mechanism_ref else obj.references
+    current_references = set(collection)
 
-        if mechanism_ref:
-            obj.add_mechanism_reference(ref_db)
-        else:
-            obj.add_reference(ref_db)
+    for ref_db in get_reference_resolver().resolve(reference_list):
+        if ref_db not in current_references:
+            collection.append(ref_db)
+            current_references.add(ref_db)
 
 
 def check_metabolite(bigg_id):
@@ -290,18 +504,7 @@ def check_metabolite(bigg_id):
         the metabolite object that was added to the DB
     """
 
-    if bigg_id.find('_') != -1:
-        met_compartment = re.findall('(\w+)_(\w*)', bigg_id)[0]
-        bigg_id = met_compartment[0]
-
-    met_db = Metabolite.query.filter_by(bigg_id=bigg_id).first()
-
-    if not met_db:
-        met_db = Metabolite(bigg_id=bigg_id,
-                            grasp_id=bigg_id)
-        db.session.add(met_db)
-
-    return met_db
+    return get_metabolite_resolver().resolve([bigg_id])[0]
 
 
 def set_binding_release_order(rxn, rxn_string, enz_rxn_org, mechanisms_dict):
@@ -319,7 +522,7 @@ def set_binding_release_order(rxn, rxn_string, enz_rxn_org, mechanisms_dict):
         binding_order, release_order lists
     """
 
-    rev, stoic = ReactionParser().parse_reaction(rxn_string)
+    rev, stoic = parse_reaction(rxn_string)
 
     binding_ind = []
     release_ind = []
@@ -358,16 +561,11 @@ def add_effector(effector_dic, rxn, effector_type, model, enz_rxn_org):
         None
     """
 
-    for effector_i, effector in enumerate(effector_dic[rxn][0]):
-        effector_met_db = check_metabolite(effector)
+    effector_mets_db = get_metabolite_resolver().resolve(effector_dic[rxn][0])
 
-        enz_effector_db = EnzymeReactionEffector.query.filter_by(effector_met=effector_met_db,
-                                                                 effector_type=effector_type).first()
+    for effector_i, (effector, effector_met_db) in enumerate(zip(effector_dic[rxn][0], effector_mets_db)):
 
-        if not enz_effector_db:
-            enz_effector_db = EnzymeReactionEffector(effector_met=effector_met_db,
-                                                     effector_type=effector_type)
-            db.session.add(enz_effector_db)
+        enz_effector_db = get_regulation_lookup().get_effector(effector_met_db, effector_type)
 
         enz_effector_db.add_model(model)
         enz_rxn_org.add_enzyme_reaction_effector(enz_effector_db)
@@ -382,3 +580,54 @@ def add_effector(effector_dic, rxn, effector_type, model, enz_rxn_org):
                 print(f'Number of references is wrong for effector {effector} from reaction {rxn}. '
                       f'These references won\'t be added.'
                       f'There should be either a single reference for all effectors, or one for each.')
+
+
+def get_metabolite_xrefs(bigg_id):
+    """
+    Looks up the Metanetx id and name of a metabolite in the xref index, if it has been built.
+
+    Args:
+        bigg_id: the metabolite bigg id, e.g. 'atp'.
+
+    Returns:
+        dictionary with metanetx_id and name, empty if the index or the metabolite are not found.
+    """
+
+    xref_index = get_xref_index()
+    if not xref_index or not bigg_id:
+        return {}
+
+    return xref_index.get_metabolite(bigg_id) or {}
+
+
+def get_reaction_xrefs(bigg_id):
+    """
+    Looks up the Metanetx id, KEGG id, and EC number of a reaction in the xref index, if it has been built.
+
+    Args:
+        bigg_id: the reaction bigg id, e.g. 'PGI'.
+
+    Returns:
+        dictionary with metanetx_id, kegg_id, and ec_number, empty if the index or the reaction are not found.
+    """
+
+    xref_index = get_xref_index()
+    if not xref_index or not bigg_id:
+        return {}
+
+    return xref_index.get_reaction(bigg_id) or {}
+
+
+def get_autocomplete_field(id_value, entity):
+    """
+    Gets the data of a form field autocompleted with the api autocomplete endpoint.
+
+    Args:
+        id_value: the css id of the field, e.g. '#organism_name'.
+        entity: the autocomplete entity, e.g. 'organism'.
+
+    Returns:
+        Dictionary with the id_value and the url of the autocomplete endpoint.
+    """
+
+    return {'id_value': id_value, 'url': url_for('api.get_autocomplete', entity=entity)}
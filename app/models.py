@@ -89,44 +89,54 @@ class Post(db.Model):
         return '<Post {}>'.format(self.body)
 
 
+# the association tables have a composite index for the collections of the first column and an index on the second
+# one for the reverse collections, the collections are sorted explicitly by their relationships' order_by
 reference_inhibition = db.Table('reference_inhibition',
     db.Column('inhibition_id', db.Integer, db.ForeignKey('enzyme_reaction_inhibition.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_inhibition', 'inhibition_id', 'reference_id')
 )
 
 reference_activation = db.Table('reference_activation',
     db.Column('activation_id', db.Integer, db.ForeignKey('enzyme_reaction_activation.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_activation', 'activation_id', 'reference_id')
 )
 
 reference_effector = db.Table('reference_effector',
     db.Column('effector_id', db.Integer, db.ForeignKey('enzyme_reaction_effector.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_effector', 'effector_id', 'reference_id')
 )
 
 reference_misc_info = db.Table('reference_misc_info',
     db.Column('misc_info_id', db.Integer, db.ForeignKey('enzyme_reaction_misc_info.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_misc_info', 'misc_info_id', 'reference_id')
 )
 
 reference_mechanism = db.Table('reference_mechanism',
     db.Column('mechanism_id', db.Integer, db.ForeignKey('enzyme_reaction_organism.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_mechanism', 'mechanism_id', 'reference_id')
 )
 
 reference_model_assumptions = db.Table('reference_model_assumptions',
     db.Column('model_assumptions_id', db.Integer, db.ForeignKey('model_assumptions.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_model_assumptions', 'model_assumptions_id', 'reference_id')
 )
 
 reference_gibbs_energy = db.Table('reference_gibbs_energy',
     db.Column('gibbs_energy_id', db.Integer, db.ForeignKey('gibbs_energy.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'), index=True),
+    db.Index('ix_reference_gibbs_energy', 'gibbs_energy_id', 'reference_id')
 )
 
 reference_author = db.Table('reference_author',
-    db.Column('author_id', db.Integer, db.ForeignKey('author.id')),
-    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id'))
+    db.Column('author_id', db.Integer, db.ForeignKey('author.id'), index=True),
+    db.Column('reference_id', db.Integer, db.ForeignKey('reference.id')),
+    db.Index('ix_reference_author', 'reference_id', 'author_id')
 )
 
 
@@ -139,6 +149,7 @@ class Author(db.Model):
     references = db.relationship(
         'Reference', secondary=reference_author,
         primaryjoin=(reference_author.c.author_id == id),
+        order_by='Reference.doi',
         back_populates='authors')
 
     def add_reference(self, reference):
@@ -163,39 +174,49 @@ class Reference(db.Model):
     link = db.Column(db.String)
     type_id = db.Column(db.Integer, db.ForeignKey('reference_type.id'))
     timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+    # DOIs are looked up in lower case, see app.utils.references
+    __table_args__ = (db.Index('ix_reference_doi_lower', db.func.lower(doi)),)
 
     type = db.relationship('ReferenceType', back_populates='references')
     authors = db.relationship(
         'Author', secondary=reference_author,
         primaryjoin=(reference_author.c.reference_id == id),
+        order_by='Author.id',
         back_populates='references', lazy='dynamic')
     enzyme_reaction_inhibitions = db.relationship(
         'EnzymeReactionInhibition', secondary=reference_inhibition,
         primaryjoin=(reference_inhibition.c.reference_id == id),
+        order_by='EnzymeReactionInhibition.id',
         back_populates='references', lazy='dynamic')
     enzyme_reaction_activations = db.relationship(
         'EnzymeReactionActivation', secondary=reference_activation,
         primaryjoin=(reference_activation.c.reference_id == id),
+        order_by='EnzymeReactionActivation.id',
         back_populates='references', lazy='dynamic')
     enzyme_reaction_effectors = db.relationship(
         'EnzymeReactionEffector', secondary=reference_effector,
         primaryjoin=(reference_effector.c.reference_id == id),
+        order_by='EnzymeReactionEffector.id',
         back_populates='references', lazy='dynamic')
     enzyme_reaction_misc_infos = db.relationship(
         'EnzymeReactionMiscInfo', secondary=reference_misc_info,
         primaryjoin=(reference_misc_info.c.reference_id == id),
+        order_by='EnzymeReactionMiscInfo.id',
         back_populates='references', lazy='dynamic')
     enzyme_reaction_mechanisms = db.relationship(
         'EnzymeReactionOrganism', secondary=reference_mechanism,
         primaryjoin=(reference_mechanism.c.reference_id == id),
+        order_by='EnzymeReactionOrganism.id',
         back_populates='mechanism_references', lazy='dynamic')
     model_assumptions = db.relationship(
         'ModelAssumptions', secondary=reference_model_assumptions,
         primaryjoin=(reference_model_assumptions.c.reference_id == id),
+        order_by='ModelAssumptions.id',
         back_populates='references', lazy='dynamic')
     gibbs_energies= db.relationship(
         'GibbsEnergy', secondary=reference_gibbs_energy,
         primaryjoin=(reference_gibbs_energy.c.reference_id == id),
+        order_by='GibbsEnergy.id',
         back_populates='references', lazy='dynamic')
 
     def __repr__(self):
@@ -313,7 +334,7 @@ class ReferenceType(db.Model):
 
 class EnzymeGeneOrganism(db.Model):
     gene_id = db.Column(db.Integer, db.ForeignKey('gene.id'), primary_key=True)
-    enzyme_id = db.Column(db.Integer, db.ForeignKey('enzyme.id'), primary_key=True)
+    enzyme_id = db.Column(db.Integer, db.ForeignKey('enzyme.id'), primary_key=True, index=True)
     organism_id = db.Column(db.Integer, db.ForeignKey('organism.id'), primary_key=True)
     gene = db.relationship('Gene', back_populates='enzyme_gene_organisms')
     enzyme = db.relationship('Enzyme', back_populates='enzyme_gene_organisms')
@@ -322,7 +343,8 @@ class EnzymeGeneOrganism(db.Model):
 
 enzyme_complex_subunit = db.Table('enzyme_complex_subunit',
     db.Column('enzyme_complex_id', db.Integer, db.ForeignKey('enzyme.id')),
-    db.Column('enzyme_subunit_id', db.Integer, db.ForeignKey('enzyme.id'))
+    db.Column('enzyme_subunit_id', db.Integer, db.ForeignKey('enzyme.id'), index=True),
+    db.Index('ix_enzyme_complex_subunit', 'enzyme_complex_id', 'enzyme_subunit_id')
 )
 
 
@@ -343,7 +365,8 @@ class Enzyme(db.Model):
         'Enzyme', secondary=enzyme_complex_subunit,
         primaryjoin=(enzyme_complex_subunit.c.enzyme_complex_id == id),
         secondaryjoin=(enzyme_complex_subunit.c.enzyme_subunit_id == id),
-        backref=db.backref('enzyme_complex_subunit', lazy='dynamic'), lazy='dynamic')
+        order_by='Enzyme.id',
+        backref=db.backref('enzyme_complex_subunit', order_by='Enzyme.id', lazy='dynamic'), lazy='dynamic')
 
     def __repr__(self):
         return str(self.isoenzyme)
@@ -430,7 +453,8 @@ class Gene(db.Model):
 
 metabolite_compartment = db.Table('metabolite_compartment',
     db.Column('metabolite_id', db.Integer, db.ForeignKey('metabolite.id')),
-    db.Column('compartment_id', db.Integer, db.ForeignKey('compartment.id'))
+    db.Column('compartment_id', db.Integer, db.ForeignKey('compartment.id'), index=True),
+    db.Index('ix_metabolite_compartment', 'metabolite_id', 'compartment_id')
 )
 
 
@@ -445,6 +469,7 @@ class Compartment(db.Model):
     metabolites = db.relationship(
         'Metabolite', secondary=metabolite_compartment,
         primaryjoin=(metabolite_compartment.c.compartment_id == id),
+        order_by='Metabolite.id',
         back_populates='compartments', lazy='dynamic')
 
     def __repr__(self):
@@ -481,14 +506,15 @@ class Compartment(db.Model):
 
 metabolite_chebi = db.Table('metabolite_chebi',
     db.Column('metabolite_id', db.Integer, db.ForeignKey('metabolite.id')),
-    db.Column('chebi_id', db.Integer, db.ForeignKey('chebi_ids.id'))
+    db.Column('chebi_id', db.Integer, db.ForeignKey('chebi_ids.id'), index=True),
+    db.Index('ix_metabolite_chebi', 'metabolite_id', 'chebi_id')
 )
 
 
 class ReactionMetabolite(db.Model):
     __tablename__ = 'reaction_metabolite'
     reaction_id = db.Column(db.Integer, db.ForeignKey('reaction.id'), primary_key=True)
-    metabolite_id = db.Column(db.Integer, db.ForeignKey('metabolite.id'), primary_key=True)
+    metabolite_id = db.Column(db.Integer, db.ForeignKey('metabolite.id'), primary_key=True, index=True)
     compartment_id = db.Column(db.Integer, db.ForeignKey('compartment.id'), primary_key=True)
     stoich_coef = db.Column(db.Float)
 
@@ -515,10 +541,12 @@ class Metabolite(db.Model):
     chebis = db.relationship(
         'ChebiIds', secondary=metabolite_chebi,
         primaryjoin=(metabolite_chebi.c.metabolite_id == id),
+        order_by='ChebiIds.id',
         back_populates='metabolites', lazy='dynamic')
     compartments = db.relationship(
         'Compartment', secondary=metabolite_compartment,
         primaryjoin=(metabolite_compartment.c.metabolite_id == id),
+        order_by='Compartment.id',
         back_populates='metabolites', lazy='dynamic')
 
 
@@ -581,6 +609,7 @@ class ChebiIds(db.Model):
     metabolites = db.relationship(
         'Metabolite', secondary=metabolite_chebi,
         primaryjoin=(metabolite_chebi.c.chebi_id == id),
+        order_by='Metabolite.id',
         back_populates='chebis', lazy='dynamic')
 
     def __repr__(self):
@@ -611,45 +640,66 @@ class Reaction(db.Model):
     bigg_id = db.Column(db.String)
     kegg_id = db.Column(db.String)
     compartment_name = db.Column(db.String, db.ForeignKey(Compartment.name))
+    equation = db.Column(db.String, default=' <-> ')
     timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
 
+    # a hash index has no size limit on the indexed value, equations of large reactions would not fit in a btree
+    __table_args__ = (db.Index('ix_reaction_equation', 'equation', postgresql_using='hash'),)
+
     compartment = db.relationship('Compartment', back_populates='reactions')
     enzyme_reaction_organisms = db.relationship('EnzymeReactionOrganism', back_populates='reaction', lazy='dynamic')
     metabolites = db.relationship('ReactionMetabolite', back_populates='reaction', lazy='dynamic')
     gibbs_energy_reaction_models = db.relationship('GibbsEnergyReactionModel', back_populates='reaction', lazy='dynamic')
 
     def __repr__(self):
-        reaction_string = ''
-        reaction_string += ' + '.join([str(-met.stoich_coef) + ' ' + str(met.metabolite) + '_' + str(met.compartment)
-                                        for met in self.metabolites if met.stoich_coef < 0])
-        reaction_string += ' <-> '
-        reaction_string += ' + '.join([str(met.stoich_coef) + ' ' + str(met.metabolite) + '_' + str(met.compartment)
-                                         for met in self.metabolites if met.stoich_coef > 0])
-        return reaction_string
+        if self.equation is None:
+            return self.get_equation(self._get_stoichiometry())
+        return self.equation
 
     def __str__(self):
-        reaction_string = ''
-        reaction_string += ' + '.join([str(-met.stoich_coef) + ' ' + str(met.metabolite) + '_' + str(met.compartment)
-                                        for met in self.metabolites if met.stoich_coef < 0])
-        reaction_string += ' <-> '
-        reaction_string += ' + '.join([str(met.stoich_coef) + ' ' + str(met.metabolite) + '_' + str(met.compartment)
-                                         for met in self.metabolites if met.stoich_coef > 0])
+        return ': '.join([self.acronym, repr(self)])
+
+    @staticmethod
+    def get_equation(stoichiometry):
+        """
+        Builds the reaction equation, e.g. 1.0 pep_c + 1.5 adp_c <-> 1.0 pyr_c + 2.0 atp_c.
+
+        Args:
+            stoichiometry: list of tuples of the form (metabolite bigg_id, compartment bigg_id, stoich_coef).
 
-        #return reaction_string
+        Returns:
+            the reaction equation.
+        """
 
-        return ': '.join([self.acronym, reaction_string])
+        equation = ''
+        equation += ' + '.join([str(-float(stoich_coef)) + ' ' + str(met) + '_' + str(compartment)
+                                for met, compartment, stoich_coef in stoichiometry if stoich_coef < 0])
+        equation += ' <-> '
+        equation += ' + '.join([str(float(stoich_coef)) + ' ' + str(met) + '_' + str(compartment)
+                                for met, compartment, stoich_coef in stoichiometry if stoich_coef > 0])
+        return equation
 
+    def _get_stoichiometry(self):
+        return [(met.metabolite.bigg_id, met.compartment.bigg_id, met.stoich_coef) for met in self.metabolites]
 
     def add_metabolite(self, metabolite, stoich_coef, compartment):
         self.metabolites.append(ReactionMetabolite(reaction_id=self.id, metabolite_id=metabolite.id,
                                                    stoich_coef=stoich_coef, compartment=compartment))
 
+        if self.equation is None and self.id is not None:
+            self.equation = self.get_equation(self._get_stoichiometry())
+        else:
+            substrates, products = (self.equation or self.get_equation([])).split(' <-> ')
+            new_equation = self.get_equation([(metabolite.bigg_id, compartment.bigg_id, stoich_coef)])
+            new_substrates, new_products = new_equation.split(' <-> ')
+            self.equation = ' <-> '.join([' + '.join(filter(None, [substrates, new_substrates])),
+                                          ' + '.join(filter(None, [products, new_products]))])
+
     def empty_metabolites(self):
         for rxn_met in self.metabolites:
-            ReactionMetabolite.query.filter(ReactionMetabolite.reaction_id == rxn_met.reaction_id,
-                                            ReactionMetabolite.compartment_id == rxn_met.compartment_id,
-                                            ReactionMetabolite.metabolite_id == rxn_met.metabolite_id).delete()
+            db.session.delete(rxn_met)
 
+        self.equation = self.get_equation([])
 
     def add_enzyme_organism(self, enzyme_organism):
         if not self.is_part_of_enzyme_organism(enzyme_organism):
@@ -735,27 +785,32 @@ class Organism(db.Model):
 
 enzyme_reaction_organism_model = db.Table('enzyme_reaction_organism_model',
     db.Column('model_id', db.Integer, db.ForeignKey('model.id')),
-    db.Column('enzyme_reaction_organism_id', db.Integer, db.ForeignKey('enzyme_reaction_organism.id'))
+    db.Column('enzyme_reaction_organism_id', db.Integer, db.ForeignKey('enzyme_reaction_organism.id'), index=True),
+    db.Index('ix_enzyme_reaction_organism_model', 'model_id', 'enzyme_reaction_organism_id')
 )
 
 enzyme_reaction_inhibition_model = db.Table('enzyme_reaction_inhibition_model',
     db.Column('model_id', db.Integer, db.ForeignKey('model.id')),
-    db.Column('inhibition_id', db.Integer, db.ForeignKey('enzyme_reaction_inhibition.id'))
+    db.Column('inhibition_id', db.Integer, db.ForeignKey('enzyme_reaction_inhibition.id'), index=True),
+    db.Index('ix_enzyme_reaction_inhibition_model', 'model_id', 'inhibition_id')
 )
 
 enzyme_reaction_activation_model = db.Table('enzyme_reaction_activation_model',
     db.Column('model_id', db.Integer, db.ForeignKey('model.id')),
-    db.Column('activation_id', db.Integer, db.ForeignKey('enzyme_reaction_activation.id'))
+    db.Column('activation_id', db.Integer, db.ForeignKey('enzyme_reaction_activation.id'), index=True),
+    db.Index('ix_enzyme_reaction_activation_model', 'model_id', 'activation_id')
 )
 
 enzyme_reaction_effector_model = db.Table('enzyme_reaction_effector_model',
     db.Column('model_id', db.Integer, db.ForeignKey('model.id')),
-    db.Column('effector_id', db.Integer, db.ForeignKey('enzyme_reaction_effector.id'))
+    db.Column('effector_id', db.Integer, db.ForeignKey('enzyme_reaction_effector.id'), index=True),
+    db.Index('ix_enzyme_reaction_effector_model', 'model_id', 'effector_id')
 )
 
 enzyme_reaction_misc_info_model = db.Table('enzyme_reaction_misc_info_model',
     db.Column('model_id', db.Integer, db.ForeignKey('model.id')),
-    db.Column('misc_info_id', db.Integer, db.ForeignKey('enzyme_reaction_misc_info.id'))
+    db.Column('misc_info_id', db.Integer, db.ForeignKey('enzyme_reaction_misc_info.id'), index=True),
+    db.Index('ix_enzyme_reaction_misc_info_model', 'model_id', 'misc_info_id')
 )
 
 
@@ -776,26 +831,31 @@ class Model(db.Model):
     enzyme_reaction_inhibitions = db.relationship(
         'EnzymeReactionInhibition', secondary=enzyme_reaction_inhibition_model,
         primaryjoin=(enzyme_reaction_inhibition_model.c.model_id == id),
+        order_by='EnzymeReactionInhibition.id',
         back_populates='models', lazy='dynamic')
 
     enzyme_reaction_activations = db.relationship(
         'EnzymeReactionActivation', secondary=enzyme_reaction_activation_model,
         primaryjoin=(enzyme_reaction_activation_model.c.model_id == id),
+        order_by='EnzymeReactionActivation.id',
         back_populates='models', lazy='dynamic')
 
     enzyme_reaction_effectors = db.relationship(
         'EnzymeReactionEffector', secondary=enzyme_reaction_effector_model,
         primaryjoin=(enzyme_reaction_effector_model.c.model_id == id),
+        order_by='EnzymeReactionEffector.id',
         back_populates='models', lazy='dynamic')
 
     enzyme_reaction_misc_infos = db.relationship(
         'EnzymeReactionMiscInfo', secondary=enzyme_reaction_misc_info_model,
         primaryjoin=(enzyme_reaction_misc_info_model.c.model_id == id),
+        order_by='EnzymeReactionMiscInfo.id',
         back_populates='models', lazy='dynamic')
 
     enzyme_reaction_organisms = db.relationship(
         'EnzymeReactionOrganism', secondary=enzyme_reaction_organism_model,
         primaryjoin=(enzyme_reaction_organism_model.c.model_id == id),
+        order_by='EnzymeReactionOrganism.id',
         back_populates='models', lazy='dynamic')
 
     def __repr__(self):
@@ -909,6 +969,7 @@ class GibbsEnergy(db.Model):
     references = db.relationship(
         'Reference', secondary=reference_gibbs_energy,
         primaryjoin=(reference_gibbs_energy.c.gibbs_energy_id == id),
+        order_by='Reference.doi',
         back_populates='gibbs_energies', lazy='dynamic')
 
     def __repr__(self):
@@ -932,9 +993,10 @@ class GibbsEnergy(db.Model):
 
 class GibbsEnergyReactionModel(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    gibbs_energy_id = db.Column(db.Integer, db.ForeignKey(GibbsEnergy.id), nullable=False)
-    model_id = db.Column(db.Integer, db.ForeignKey(Model.id), nullable=False)
+    gibbs_energy_id = db.Column(db.Integer, db.ForeignKey(GibbsEnergy.id), nullable=False, index=True)
+    model_id = db.Column(db.Integer, db.ForeignKey(Model.id), nullable=False, index=True)
     reaction_id = db.Column(db.Integer, db.ForeignKey(Reaction.id), nullable=False)
+    __table_args__ = (db.Index('ix_gibbs_energy_reaction_model_reaction_id_model_id', 'reaction_id', 'model_id'),)
 
     model = db.relationship('Model', back_populates='gibbs_energy_reaction_models')
     reaction = db.relationship('Reaction', back_populates='gibbs_energy_reaction_models')
@@ -944,8 +1006,8 @@ class GibbsEnergyReactionModel(db.Model):
 class EnzymeStructure(db.Model):
     __tablename__ = 'enzyme_structure'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    enzyme_id = db.Column(db.Integer, db.ForeignKey(Enzyme.id), nullable=False)
-    organism_id = db.Column(db.Integer, db.ForeignKey(Organism.id), nullable=False)
+    enzyme_id = db.Column(db.Integer, db.ForeignKey(Enzyme.id), nullable=False, index=True)
+    organism_id = db.Column(db.Integer, db.ForeignKey(Organism.id), nullable=False, index=True)
     pdb_id = db.Column(db.String, unique=True)
     strain = db.Column(db.String)
 
@@ -980,8 +1042,8 @@ class Mechanism(db.Model):
 class EnzymeOrganism(db.Model):
     __tablename__ = 'enzyme_organism'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    enzyme_id = db.Column(db.Integer, db.ForeignKey(Enzyme.id), nullable=False)
-    organism_id = db.Column(db.Integer, db.ForeignKey(Organism.id), nullable=False)
+    enzyme_id = db.Column(db.Integer, db.ForeignKey(Enzyme.id), nullable=False, index=True)
+    organism_id = db.Column(db.Integer, db.ForeignKey(Organism.id), nullable=False, index=True)
     uniprot_id = db.Column(db.String, unique=True)
     n_active_sites = db.Column(db.Integer)
 
@@ -1086,8 +1148,8 @@ class EnzymeReactionOrganism(db.Model):
     __tablename__ = 'enzyme_reaction_organism'
     id = db.Column(db.Integer, nullable=False, unique=True)
     enzyme_id = db.Column(db.Integer, db.ForeignKey(Enzyme.id), primary_key=True)
-    reaction_id = db.Column(db.Integer, db.ForeignKey(Reaction.id), primary_key=True)
-    organism_id = db.Column(db.Integer, db.ForeignKey(Organism.id), primary_key=True)
+    reaction_id = db.Column(db.Integer, db.ForeignKey(Reaction.id), primary_key=True, index=True)
+    organism_id = db.Column(db.Integer, db.ForeignKey(Organism.id), primary_key=True, index=True)
     mechanism_id = db.Column(db.Integer, db.ForeignKey(Mechanism.id))
     mech_evidence_level_id = db.Column(db.Integer, db.ForeignKey(EvidenceLevel.id))
 
@@ -1110,11 +1172,13 @@ class EnzymeReactionOrganism(db.Model):
     models = db.relationship(
         'Model', secondary=enzyme_reaction_organism_model,
         primaryjoin=(enzyme_reaction_organism_model.c.enzyme_reaction_organism_id == id),
+        order_by='Model.id',
         back_populates='enzyme_reaction_organisms', lazy='dynamic')
 
     mechanism_references = db.relationship(
         'Reference', secondary=reference_mechanism,
         primaryjoin=(reference_mechanism.c.mechanism_id == id),
+        order_by='Reference.doi',
         back_populates='enzyme_reaction_mechanisms', lazy='dynamic')
 
 
@@ -1205,14 +1269,18 @@ class EnzymeReactionOrganism(db.Model):
 class EnzymeReactionInhibition(db.Model):
     __tablename__ = 'enzyme_reaction_inhibition'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id))
-    inhibitor_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id))
-    affected_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id))
+    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id), index=True)
+    inhibitor_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id), index=True)
+    affected_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id), index=True)
 
     inhibition_type = db.Column(db.String)
     inhibition_constant = db.Column(db.Float)
     evidence_level_id = db.Column(db.Integer, db.ForeignKey(EvidenceLevel.id))
     comments = db.Column(db.Text)
+    # inhibitions with only the inhibitor, as added by the model import, see app.utils.regulations
+    __table_args__ = (db.Index('ix_enzyme_reaction_inhibition_empty', 'inhibitor_met_id',
+                               postgresql_where=db.and_(affected_met_id.is_(None), inhibition_type.is_(None),
+                                                        inhibition_constant.is_(None))),)
 
     enzyme_reaction_organism = db.relationship('EnzymeReactionOrganism', back_populates='enzyme_reaction_inhibitors')
     inhibitor_met = db.relationship('Metabolite', foreign_keys=[inhibitor_met_id])
@@ -1221,11 +1289,13 @@ class EnzymeReactionInhibition(db.Model):
     references = db.relationship(
         'Reference', secondary=reference_inhibition,
         primaryjoin=(reference_inhibition.c.inhibition_id == id),
+        order_by='Reference.doi',
         back_populates='enzyme_reaction_inhibitions', lazy='dynamic')
 
     models = db.relationship(
         'Model', secondary=enzyme_reaction_inhibition_model,
         primaryjoin=(enzyme_reaction_inhibition_model.c.inhibition_id == id),
+        order_by='Model.id',
         back_populates='enzyme_reaction_inhibitions', lazy='dynamic')
 
     def __repr__(self):
@@ -1280,11 +1350,14 @@ class EnzymeReactionInhibition(db.Model):
 class EnzymeReactionActivation(db.Model):
     __tablename__ = 'enzyme_reaction_activation'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id))
-    activator_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id))
+    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id), index=True)
+    activator_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id), index=True)
     activation_constant = db.Column(db.Float)
     evidence_level_id = db.Column(db.Integer, db.ForeignKey(EvidenceLevel.id))
     comments = db.Column(db.Text)
+    # activations with only the activator, as added by the model import, see app.utils.regulations
+    __table_args__ = (db.Index('ix_enzyme_reaction_activation_empty', 'activator_met_id',
+                               postgresql_where=activation_constant.is_(None)),)
 
     enzyme_reaction_organism = db.relationship('EnzymeReactionOrganism', back_populates='enzyme_reaction_activators')
     activator_met = db.relationship('Metabolite', foreign_keys=[activator_met_id])
@@ -1293,10 +1366,12 @@ class EnzymeReactionActivation(db.Model):
     models = db.relationship(
         'Model', secondary=enzyme_reaction_activation_model,
         primaryjoin=(enzyme_reaction_activation_model.c.activation_id == id),
+        order_by='Model.id',
         back_populates='enzyme_reaction_activations', lazy='dynamic')
     references = db.relationship(
         'Reference', secondary=reference_activation,
         primaryjoin=(reference_activation.c.activation_id == id),
+        order_by='Reference.doi',
         back_populates='enzyme_reaction_activations', lazy='dynamic')
 
     def __repr__(self):
@@ -1348,8 +1423,8 @@ class EnzymeReactionActivation(db.Model):
 class EnzymeReactionEffector(db.Model):
     __tablename__ = 'enzyme_reaction_effector'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id))
-    effector_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id))
+    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id), index=True)
+    effector_met_id = db.Column(db.Integer, db.ForeignKey(Metabolite.id), index=True)
     effector_type = db.Column(db.String)
     evidence_level_id = db.Column(db.Integer, db.ForeignKey(EvidenceLevel.id))
     comments = db.Column(db.Text)
@@ -1360,10 +1435,12 @@ class EnzymeReactionEffector(db.Model):
     models = db.relationship(
         'Model', secondary=enzyme_reaction_effector_model,
         primaryjoin=(enzyme_reaction_effector_model.c.effector_id == id),
+        order_by='Model.id',
         back_populates='enzyme_reaction_effectors', lazy='dynamic')
     references = db.relationship(
         'Reference', secondary=reference_effector,
         primaryjoin=(reference_effector.c.effector_id == id),
+        order_by='Reference.doi',
         back_populates='enzyme_reaction_effectors', lazy='dynamic')
 
 
@@ -1420,7 +1497,7 @@ class EnzymeReactionEffector(db.Model):
 class EnzymeReactionMiscInfo(db.Model):
     __tablename__ = 'enzyme_reaction_misc_info'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id))
+    enz_rxn_org_id = db.Column(db.Integer, db.ForeignKey(EnzymeReactionOrganism.id), index=True)
     topic = db.Column(db.String)
     description = db.Column(db.Text)
     evidence_level_id = db.Column(db.Integer, db.ForeignKey(EvidenceLevel.id))
@@ -1432,11 +1509,13 @@ class EnzymeReactionMiscInfo(db.Model):
     models = db.relationship(
         'Model', secondary=enzyme_reaction_misc_info_model,
         primaryjoin=(enzyme_reaction_misc_info_model.c.misc_info_id == id),
+        order_by='Model.id',
         back_populates='enzyme_reaction_misc_infos', lazy='dynamic')
 
     references = db.relationship(
         'Reference', secondary=reference_misc_info,
         primaryjoin=(reference_misc_info.c.misc_info_id == id),
+        order_by='Reference.doi',
         back_populates='enzyme_reaction_misc_infos', lazy='dynamic')
 
     def __repr__(self):
@@ -1479,7 +1558,7 @@ class EnzymeReactionMiscInfo(db.Model):
 class ModelAssumptions(db.Model):
     __tablename__ = 'model_assumptions'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    model_id = db.Column(db.Integer, db.ForeignKey(Model.id))
+    model_id = db.Column(db.Integer, db.ForeignKey(Model.id), index=True)
     assumption = db.Column(db.String)
     description = db.Column(db.Text)
     evidence_level_id = db.Column(db.Integer, db.ForeignKey(EvidenceLevel.id))
@@ -1491,6 +1570,7 @@ class ModelAssumptions(db.Model):
     references = db.relationship(
         'Reference', secondary=reference_model_assumptions,
         primaryjoin=(reference_model_assumptions.c.model_assumptions_id == id),
+        order_by='Reference.doi',
         back_populates='model_assumptions', lazy='dynamic')
 
     def __repr__(self):
@@ -1513,3 +1593,10 @@ class ModelAssumptions(db.Model):
 
     def empty_references(self):
         self.references = []
+
+
+# version of each table cached by app.utils.reference_data, incremented in every transaction that changes the table
+class ReferenceDataVersion(db.Model):
+    __tablename__ = 'reference_data_version'
+    table_name = db.Column(db.String, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,95 @@
+import unittest
+
+from app import create_app, db
+from app.models import Enzyme
+from app.utils.autocomplete import PrefixIndex
+from app.utils.populate_db import add_compartments, add_enzymes, add_evidence_levels, add_mechanisms, add_models, \
+    add_organisms, add_reaction, add_reference_types, add_references
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    add_references()
+    add_reaction(client)
+
+
+class TestPrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PrefixIndex(['PFK1', 'pfk2', 'PGI', 'FBA', None, '', 'PFK1'])
+
+    def test_search(self):
+        self.assertListEqual(self.index.search('PF'), ['PFK1', 'pfk2'])
+        self.assertListEqual(self.index.search('pg'), ['PGI'])
+        self.assertListEqual(self.index.search(''), ['FBA', 'PFK1', 'pfk2', 'PGI'])
+        self.assertListEqual(self.index.search('x'), [])
+        self.assertEqual(len(self.index), 4)
+
+    def test_search_limit(self):
+        self.assertListEqual(self.index.search('p', limit=2), ['PFK1', 'pfk2'])
+
+
+class TestAutocomplete(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get_results(self, url, status_code=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status_code)
+        return response.get_json()
+
+    def test_get_autocomplete(self):
+        self.assertListEqual(self._get_results('/api/v1/autocomplete/isoenzyme?q=pf')['results'], ['PFK1', 'PFK2'])
+        self.assertListEqual(self._get_results('/api/v1/autocomplete/isoenzyme?q=pf&limit=1')['results'], ['PFK1'])
+        self.assertListEqual(self._get_results('/api/v1/autocomplete/organism?q=E.')['results'], ['E. coli'])
+        self.assertListEqual(self._get_results('/api/v1/autocomplete/metabolite?q=xyz')['results'], [])
+
+    def test_unknown_entity(self):
+        data = self._get_results('/api/v1/autocomplete/nope?q=a', status_code=404)
+        self.assertEqual(data['error'], 'Not Found')
+
+    def test_index_invalidation(self):
+        self.assertListEqual(self._get_results('/api/v1/autocomplete/isoenzyme?q=pf')['results'], ['PFK1', 'PFK2'])
+
+        db.session.add(Enzyme(name='Phosphofructokinase', acronym='PFK', isoenzyme='PFK3'))
+        db.session.commit()
+
+        self.assertListEqual(self._get_results('/api/v1/autocomplete/isoenzyme?q=pf')['results'],
+                             ['PFK1', 'PFK2', 'PFK3'])
+
+    def test_form_page_has_no_data(self):
+        response = self.client.get('/add_reaction')
+        self.assertEqual(response.status_code, 200)
+
+        html = response.data.decode('utf-8')
+        self.assertIn('/api/v1/autocomplete/isoenzyme', html)
+        self.assertNotIn('input_data', html)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
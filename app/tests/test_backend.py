@@ -2,8 +2,8 @@ import unittest
 from datetime import datetime, timedelta
 
 from app import create_app, db
-from app.models import User, Post, Enzyme, EnzymeOrganism, EnzymeStructure, Gene, Model, \
-    Organism, EnzymeGeneOrganism
+from app.models import User, Post, Compartment, Enzyme, EnzymeOrganism, EnzymeStructure, Gene, Metabolite, Model, \
+    Organism, EnzymeGeneOrganism, Reaction
 from app.utils.parsers import parse_input_list
 from app.utils.misc import clear_data
 from config import Config
@@ -343,5 +343,70 @@ class OrganismModelCase(unittest.TestCase):
         self.assertEqual(organism.query.first().name, organism_name)
 
 
+class ReactionModelCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.compartment = Compartment(name='cytosol', bigg_id='c')
+        db.session.add(self.compartment)
+        self.metabolites = {}
+        for bigg_id in ['pep', 'adp', 'pyr', 'atp']:
+            self.metabolites[bigg_id] = Metabolite(grasp_id=bigg_id, bigg_id=bigg_id)
+            db.session.add(self.metabolites[bigg_id])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_add_metabolite_equation(self):
+        reaction = Reaction(name='pyruvate kinase', acronym='PYK')
+        db.session.add(reaction)
+
+        for bigg_id, stoich_coef in [('pep', -1), ('adp', -1.5), ('pyr', 1), ('atp', 2)]:
+            reaction.add_metabolite(self.metabolites[bigg_id], stoich_coef, self.compartment)
+        db.session.commit()
+
+        true_equation = '1.0 pep_c + 1.5 adp_c <-> 1.0 pyr_c + 2.0 atp_c'
+        self.assertEqual(Reaction.query.first().equation, true_equation)
+        self.assertEqual(repr(Reaction.query.first()), true_equation)
+        self.assertEqual(str(Reaction.query.first()), 'PYK: ' + true_equation)
+
+    def test_empty_metabolites_equation(self):
+        reaction = Reaction(name='pyruvate kinase', acronym='PYK')
+        db.session.add(reaction)
+        reaction.add_metabolite(self.metabolites['pep'], -1, self.compartment)
+        reaction.add_metabolite(self.metabolites['pyr'], 1, self.compartment)
+        db.session.commit()
+
+        reaction.empty_metabolites()
+        reaction.add_metabolite(self.metabolites['adp'], -1, self.compartment)
+        reaction.add_metabolite(self.metabolites['atp'], 1, self.compartment)
+        db.session.commit()
+
+        self.assertEqual(Reaction.query.first().equation, '1.0 adp_c <-> 1.0 atp_c')
+
+    def test_add_metabolite_without_equation(self):
+        reaction = Reaction(name='pyruvate kinase', acronym='PYK')
+        db.session.add(reaction)
+        reaction.add_metabolite(self.metabolites['pep'], -1, self.compartment)
+        db.session.commit()
+
+        Reaction.query.update({'equation': None})
+        db.session.commit()
+
+        reaction = Reaction.query.first()
+        self.assertEqual(repr(reaction), '1.0 pep_c <-> ')
+
+        reaction.add_metabolite(self.metabolites['pyr'], 1, self.compartment)
+        db.session.commit()
+
+        self.assertEqual(Reaction.query.first().equation, '1.0 pep_c <-> 1.0 pyr_c')
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
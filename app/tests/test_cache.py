@@ -0,0 +1,130 @@
+import unittest
+
+from app import create_app
+from app.utils.cache import DetailCache, LRUCacheBackend, NullCacheBackend, RedisCacheBackend
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+class DictRedisClient(object):
+    """
+    Stands in for a redis.Redis client, only the methods used by RedisCacheBackend.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.expirations = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode('utf-8')
+        self.expirations[key] = ex
+
+
+class TestLRUCacheBackend(unittest.TestCase):
+    def test_get_many(self):
+        backend = LRUCacheBackend(max_size=10)
+        backend.set('a', 1)
+        backend.set('b', [1, 2])
+
+        self.assertListEqual(backend.get_many(['a', 'b', 'c']), [1, [1, 2], None])
+
+    def test_evicts_least_recently_used(self):
+        backend = LRUCacheBackend(max_size=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get_many(['a'])
+        backend.set('c', 3)
+
+        self.assertEqual(len(backend), 2)
+        self.assertListEqual(backend.get_many(['a', 'b', 'c']), [1, None, 3])
+
+    def test_expires_entries(self):
+        backend = LRUCacheBackend(max_size=10, default_ttl=0)
+        backend.set('a', 1)
+
+        self.assertListEqual(backend.get_many(['a']), [None])
+        self.assertEqual(len(backend), 0)
+
+
+class TestRedisCacheBackend(unittest.TestCase):
+    def test_get_many(self):
+        client = DictRedisClient()
+        backend = RedisCacheBackend(client, default_ttl=60)
+        backend.set('a', {'data_name': 'PFK1', 'data_list': []})
+
+        self.assertListEqual(backend.get_many(['a', 'b']), [{'data_name': 'PFK1', 'data_list': []}, None])
+        self.assertDictEqual(client.expirations, {'kinetics_db:a': 60})
+
+
+class TestDetailCache(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.cache = DetailCache()
+        self.cache.init_app(self.app)
+
+        self.n_calls = 0
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def _get_data(self):
+        self.n_calls += 1
+        return {'n_calls': self.n_calls}
+
+    def test_get_or_set(self):
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 1})
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 1})
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK2'), self._get_data), {'n_calls': 2})
+
+    def test_invalidate(self):
+        self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data)
+        self.cache.get_or_set(('enzyme', 'PFK2'), self._get_data)
+        self.cache.invalidate([('enzyme', 'PFK1')])
+
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 3})
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK2'), self._get_data), {'n_calls': 2})
+
+    def test_clear(self):
+        self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data)
+        self.cache.get_or_set(('model', 'PFK1'), self._get_data)
+        self.cache.clear()
+
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 3})
+        self.assertDictEqual(self.cache.get_or_set(('model', 'PFK1'), self._get_data), {'n_calls': 4})
+
+    def test_redis_backend(self):
+        self.app.extensions['detail_cache'].backend = RedisCacheBackend(DictRedisClient())
+
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 1})
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 1})
+        self.cache.invalidate([('enzyme', 'PFK1')])
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 2})
+
+    def test_null_backend(self):
+        self.app.config['DETAIL_CACHE_BACKEND'] = 'null'
+        self.cache.init_app(self.app)
+
+        self.assertIsInstance(self.cache.backend, NullCacheBackend)
+        self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data)
+        self.assertDictEqual(self.cache.get_or_set(('enzyme', 'PFK1'), self._get_data), {'n_calls': 2})
+
+    def test_unknown_backend(self):
+        self.app.config['DETAIL_CACHE_BACKEND'] = 'memcached'
+
+        with self.assertRaises(ValueError):
+            self.cache.init_app(self.app)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,163 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Compartment, Metabolite, Reaction
+from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
+    add_compartments, add_evidence_levels, add_organisms, add_references, add_activations, add_effectors, \
+    add_inhibitions, add_misc_infos, add_model_assumptions
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    add_references()
+    add_reaction(client)
+    add_activations(client)
+    add_inhibitions(client)
+    add_effectors(client)
+    add_misc_infos(client)
+    add_model_assumptions(client)
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def _get(self, url, status_code=200, **kwargs):
+        self.n_queries = 0
+        response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, status_code)
+        return response
+
+    def _add_reactions(self, n_reactions):
+        compartment = Compartment.query.filter_by(bigg_id='c').first()
+        metabolite = Metabolite.query.filter_by(grasp_id='pep').first()
+        for i in range(n_reactions):
+            reaction = Reaction(name='reaction ' + str(i), acronym='RXN' + str(i))
+            db.session.add(reaction)
+            reaction.add_metabolite(metabolite, -1, compartment)
+        db.session.commit()
+
+    def test_get_enzymes(self):
+        response = self._get('/api/v1/enzymes?isoenzyme=PFK2,PFK1,XYZ&include=models,pdb_ids,inhibitors')
+        data = response.get_json()
+
+        self.assertListEqual([enzyme['isoenzyme'] for enzyme in data['data']], ['PFK2', 'PFK1'])
+        self.assertListEqual(data['missing'], ['XYZ'])
+
+        enzyme = data['data'][1]
+        self.assertEqual(enzyme['name'], 'Phosphofructokinase')
+        self.assertListEqual(enzyme['models'], ['E. coli - iteration 1', 'E. coli - iteration 2'])
+        self.assertListEqual(enzyme['pdb_ids'], ['1E9I', '3H8A'])
+        self.assertListEqual([(inhibitor['reaction'], inhibitor['inhibitor'], inhibitor['affected_metabolite'])
+                              for inhibitor in enzyme['inhibitors']], [('PFK', 'adp', 'atp'), ('PFK', 'nad', 'nadh')])
+        self.assertNotIn('organisms', enzyme)
+        self.assertListEqual(data['data'][0]['inhibitors'], [])
+
+    def test_get_reactions(self):
+        response = self._get('/api/v1/reactions?acronym=PFK&fields=equation&include=metabolites,enzymes')
+        reaction = response.get_json()['data'][0]
+
+        self.assertSetEqual(set(reaction), {'acronym', 'equation', 'metabolites', 'enzymes'})
+        self.assertEqual(reaction['equation'], '1.0 pep_c + 1.5 adp_c <-> 1.0 pyr_c + 2.0 atp_c')
+        self.assertListEqual(reaction['enzymes'], ['PFK1', 'PFK2'])
+        self.assertIn({'metabolite': 'adp', 'compartment': 'c', 'stoich_coef': -1.5}, reaction['metabolites'])
+
+    def test_get_metabolites(self):
+        response = self._get('/api/v1/metabolites?grasp_id=pep&grasp_id=adp&include=compartments,reactions')
+        data = response.get_json()['data']
+
+        self.assertListEqual([metabolite['grasp_id'] for metabolite in data], ['pep', 'adp'])
+        self.assertListEqual(data[0]['compartments'], ['c'])
+        self.assertListEqual(data[0]['reactions'], ['PFK'])
+
+    def test_get_models(self):
+        response = self._get('/api/v1/models?name=E. coli - iteration 1&include=reactions,assumptions,misc_infos')
+        model = response.get_json()['data'][0]
+
+        self.assertEqual(model['organism'], 'E. coli')
+        self.assertListEqual([(reaction['enzyme'], reaction['reaction']) for reaction in model['reactions']],
+                             [('PFK1', 'PFK'), ('PFK2', 'PFK')])
+        self.assertListEqual([assumption['assumption'] for assumption in model['assumptions']],
+                             ['allostery sucks', 'inhibition also sucks'])
+        self.assertListEqual([misc_info['topic'] for misc_info in model['misc_infos']], ['allostery', 'blurb'])
+
+    def test_query_count(self):
+        url = '/api/v1/reactions?include=metabolites,enzymes,organisms,models,gibbs_energies&acronym='
+        self._get(url + 'PFK')
+        n_queries = self.n_queries
+
+        self._add_reactions(20)
+        response = self._get(url + ','.join(['PFK'] + ['RXN' + str(i) for i in range(20)]))
+
+        self.assertEqual(len(response.get_json()['data']), 21)
+        self.assertEqual(n_queries, 6)
+        self.assertEqual(self.n_queries, n_queries)
+
+    def test_pages(self):
+        self._add_reactions(5)
+
+        acronyms = []
+        url = '/api/v1/reactions?limit=2&fields=name'
+        while url:
+            data = self._get(url).get_json()
+            self.assertLessEqual(len(data['data']), 2)
+            acronyms.extend(reaction['acronym'] for reaction in data['data'])
+            url = data['next']
+
+        self.assertListEqual(acronyms, sorted(['PFK'] + ['RXN' + str(i) for i in range(5)]))
+
+    def test_etag(self):
+        response = self._get('/api/v1/enzymes?isoenzyme=PFK1')
+        etag = response.headers['ETag']
+
+        self._get('/api/v1/enzymes?isoenzyme=PFK1', status_code=304, headers={'If-None-Match': etag})
+        response = self._get('/api/v1/enzymes?isoenzyme=PFK1,PFK2', headers={'If-None-Match': etag})
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_bad_request(self):
+        self._get('/api/v1/reactions?fields=name,nope', status_code=400)
+        self._get('/api/v1/models?include=nope', status_code=400)
+
+        self.app.config['API_MAX_BATCH_SIZE'] = 2
+        response = self._get('/api/v1/reactions?acronym=PFK,A,B', status_code=400)
+        self.assertEqual(response.get_json()['error'], 'Bad Request')
+        self.assertEqual(self.n_queries, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,6 +1,8 @@
 import re
 import unittest
 
+from sqlalchemy import event
+
 from app import create_app, db
 from app.models import Compartment, Enzyme, EnzymeOrganism, EnzymeReactionOrganism, EnzymeStructure, \
     EvidenceLevel, Gene, GibbsEnergy, GibbsEnergyReactionModel, Mechanism, Metabolite, Model, Organism, Reaction, \
@@ -329,6 +331,45 @@ class TestModifyModel(unittest.TestCase):
         self.assertEqual(model.enzyme_reaction_effectors.count(), 1)
         self.assertEqual(model.enzyme_reaction_misc_infos.count(), 1)
 
+    def test_modify_model_change_one(self):
+        current_model_name = 'E. coli - iteration 1'
+
+        model = Model.query.filter_by(name=current_model_name).first()
+        enz_rxn_orgs = ['{}:{}:{}'.format(enz_rxn_org.enzyme_id, enz_rxn_org.reaction_id, enz_rxn_org.organism_id)
+                        for enz_rxn_org in model.enzyme_reaction_organisms]
+        self.assertEqual(len(enz_rxn_orgs), 2)
+
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith(('INSERT', 'DELETE')):
+                statements.append((statement.split('(')[0].split(' WHERE')[0].strip(), executemany))
+
+        event.listen(db.engine, 'before_cursor_execute', record_statement)
+        try:
+            response = self.client.post('/modify_model/' + current_model_name, data=dict(
+                name=model.name,
+                organism_name=model.organism_name,
+                strain=model.strain,
+                enz_rxn_orgs=enz_rxn_orgs[:1],
+                model_inhibitions=[str(inhibition.id) for inhibition in model.enzyme_reaction_inhibitions],
+                model_activations=[str(activation.id) for activation in model.enzyme_reaction_activations],
+                model_effectors=[str(effector.id) for effector in model.enzyme_reaction_effectors],
+                model_misc_infos=[str(misc_info.id) for misc_info in model.enzyme_reaction_misc_infos],
+                model_assumptions=[str(model_assumption.id) for model_assumption in model.model_assumptions],
+                comments=model.comments), follow_redirects=True)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record_statement)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b'Your model has been modified' in response.data)
+
+        self.assertListEqual([statement for statement in statements if 'reference_data_version' not in statement[0]],
+                             [('DELETE FROM enzyme_reaction_organism_model', False)])
+        self.assertEqual(model.enzyme_reaction_organisms.count(), 1)
+        self.assertEqual(model.enzyme_reaction_inhibitions.count(), 2)
+        self.assertEqual(model.enzyme_reaction_misc_infos.count(), 2)
+
     def test_modify_model_change_nothing(self):
         current_model_name = 'E. coli - iteration 1'
         new_model_name = 'E. coli - iteration 1'
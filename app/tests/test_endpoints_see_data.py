@@ -1,9 +1,14 @@
+import re
 import unittest
 
+from sqlalchemy import event
+
 from app import create_app, db
+from app.models import Compartment, Enzyme, EnzymeReactionInhibition, Gene, Metabolite, Model, Reaction
 from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
     add_compartments, add_evidence_levels, add_organisms, add_references, add_activations, add_effectors, \
     add_inhibitions, add_misc_infos, add_model_assumptions
+from app.utils.profiles import EnzymeProfile
 from config import Config
 
 
@@ -69,6 +74,34 @@ class TestSeeEnzyme(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+    def test_enzyme_profile(self):
+        profile = EnzymeProfile.from_isoenzyme('PFK1')
+
+        self.assertEqual(profile.enzyme.isoenzyme, 'PFK1')
+        self.assertListEqual([organism.name for organism in profile.organisms], ['E. coli'])
+        self.assertListEqual([model.name for model in profile.models], ['E. coli - iteration 1', 'E. coli - iteration 2'])
+        self.assertListEqual([reaction.acronym for reaction in profile.reactions], ['PFK'])
+        self.assertListEqual(profile.uniprot_ids, ['PC3W1', 'P34D'])
+        self.assertEqual(len(profile.inhibitors), 2)
+        self.assertEqual(len(profile.activators), 2)
+        self.assertEqual(len(profile.effectors), 2)
+        self.assertEqual(len(profile.misc_infos), 2)
+
+        self.assertIsNone(EnzymeProfile.from_isoenzyme('not an enzyme'))
+
+    def test_see_enzyme_query_count(self):
+        n_queries = []
+
+        def count_query(*args):
+            n_queries.append(1)
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        response = self.client.get('/see_enzyme/PFK1', follow_redirects=True)
+        event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(n_queries), 10)
+
 
 class TestSeeEnzymeInhibitor(unittest.TestCase):
     def setUp(self):
@@ -253,6 +286,29 @@ class TestSeeModel(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+    def test_see_model_query_count(self):
+        n_queries = []
+
+        def count_query(*args):
+            n_queries.append(1)
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+
+        response = self.client.get('/see_model/E. coli - iteration 1', follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.count(b'-&gt; Inhibitor: '), 2)
+        self.assertEqual(response.data.count(b'-&gt; Topic: '), 2)
+        n_queries_model_1 = len(n_queries)
+
+        del n_queries[:]
+        response = self.client.get('/see_model/E. coli - iteration 2', follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+        event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        # the model, its assumptions, its reactions, and one query per association table
+        self.assertEqual(n_queries_model_1, 7)
+        self.assertEqual(len(n_queries), 7)
+
 
 class TestSeeModelAssumption(unittest.TestCase):
     def setUp(self):
@@ -335,5 +391,228 @@ class TestSeeReaction(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class TestSeeListQueryCount(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db('see_lists', self.client)
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def _get_n_queries(self, url):
+        self.n_queries = 0
+        response = self.client.get(url, follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+        return self.n_queries
+
+    def test_see_list_query_count(self):
+        true_n_queries = {'enzyme': 1, 'enzyme_inhibitors': 1, 'enzyme_activators': 1, 'enzyme_effectors': 1,
+                          'enzyme_misc_info': 1, 'gene': 1, 'mechanism': 1, 'metabolite': 2, 'model': 1,
+                          'model_assumptions': 1, 'organism': 1, 'reaction': 1}
+
+        n_queries = dict((data_type, self._get_n_queries('/see_' + data_type + '_list'))
+                         for data_type in true_n_queries)
+
+        self.assertDictEqual(n_queries, true_n_queries)
+
+    def test_see_reaction_list_query_count_per_page(self):
+        n_queries = self._get_n_queries('/see_reaction_list')
+
+        compartment = Compartment.query.filter_by(bigg_id='c').first()
+        for i in range(5):
+            reaction = Reaction(name='reaction ' + str(i), acronym='RXN' + str(i))
+            db.session.add(reaction)
+            for met_i, stoich_coef in enumerate([-1, 1]):
+                met_id = 'm_' + str(i) + '_' + str(met_i)
+                metabolite = Metabolite(grasp_id=met_id, bigg_id=met_id)
+                db.session.add(metabolite)
+                db.session.flush()
+                compartment.add_metabolite(metabolite)
+                reaction.add_metabolite(metabolite, stoich_coef, compartment)
+        db.session.commit()
+
+        self.assertEqual(self._get_n_queries('/see_reaction_list'), n_queries)
+        self.assertEqual(self._get_n_queries('/see_metabolite_list'), 2)
+
+
+class TestSeeListKeysetPagination(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app.config['POSTS_PER_PAGE'] = 4
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        # repeated and missing names, so that the id is needed to break ties
+        for i in range(15):
+            name = None if i % 5 == 0 else 'reaction ' + str(i % 4)
+            db.session.add(Reaction(name=name, acronym='RXN' + str(i)))
+        for i in range(6):
+            db.session.add(Gene(name='gene' + str(i)))
+        db.session.commit()
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def _get_page(self, url, name_pattern=r'<a href="/see_reaction/(\w+)">'):
+        self.n_queries = 0
+        response = self.client.get(url, follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+
+        html = response.data.decode('utf-8')
+        names = re.findall(name_pattern, html)
+        next_url = re.search(r'<li class="next">\s*<a href="([^"]+)">', html)
+        prev_url = re.search(r'<li class="previous">\s*<a href="([^"]+)">', html)
+        return names, next_url.group(1).replace('&amp;', '&') if next_url else None, \
+            prev_url.group(1).replace('&amp;', '&') if prev_url else None
+
+    def test_see_reaction_list_pages(self):
+        true_acronyms = [reaction.acronym for reaction in
+                         sorted(Reaction.query.all(), key=lambda rxn: (rxn.name is None, rxn.name or '', rxn.id))]
+
+        pages = []
+        acronyms, next_url, prev_url = self._get_page('/see_reaction_list')
+        self.assertIsNone(prev_url)
+        n_queries = self.n_queries
+        pages.append(acronyms)
+        while next_url:
+            acronyms, next_url, prev_url = self._get_page(next_url)
+            self.assertEqual(self.n_queries, n_queries)
+            self.assertIsNotNone(prev_url)
+            pages.append(acronyms)
+
+        self.assertListEqual([len(acronyms) for acronyms in pages], [4, 4, 4, 3])
+        self.assertListEqual([acronym for acronyms in pages for acronym in acronyms], true_acronyms)
+
+        back_pages = [acronyms]
+        while prev_url:
+            acronyms, next_url, prev_url = self._get_page(prev_url)
+            self.assertIsNotNone(next_url)
+            back_pages.insert(0, acronyms)
+
+        self.assertListEqual(back_pages, pages)
+
+    def test_see_gene_list_pages(self):
+        true_names = [gene.name for gene in
+                      sorted(Gene.query.all(), key=lambda gene: (gene.timestamp, gene.id), reverse=True)]
+
+        names, next_url, prev_url = self._get_page('/see_gene_list', r'gene\d+')
+        second_names, _, prev_url = self._get_page(next_url, r'gene\d+')
+        self.assertListEqual(names + second_names, true_names)
+        self.assertListEqual(self._get_page(prev_url, r'gene\d+')[0], names)
+
+    def test_see_reaction_list_invalid_cursor(self):
+        first_page = self._get_page('/see_reaction_list')
+        self.assertEqual(self._get_page('/see_reaction_list?cursor=not-a-cursor'), first_page)
+
+
+class TestSeeDataCache(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db('see_data_cache', self.client)
+
+        self.urls = ['/see_enzyme/PFK1', '/see_enzyme/PFK2', '/see_reaction/PFK', '/see_metabolite/pep',
+                     '/see_model/E. coli - iteration 1', '/see_model/E. coli - iteration 2']
+        self.responses = dict((url, self._get(url)[0]) for url in self.urls)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, url):
+        n_queries = []
+
+        def count_query(*args):
+            n_queries.append(1)
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        response = self.client.get(url, follow_redirects=True)
+        event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(n_queries)
+
+    def _get_refreshed_urls(self):
+        return [url for url in self.urls if self._get(url)[1] > 0]
+
+    def test_see_detail_cached(self):
+        for url in self.urls:
+            self.assertEqual(self._get(url), (self.responses[url], 0))
+
+    def test_invalidate_on_change(self):
+        inhibition = EnzymeReactionInhibition.query.first()
+        self.assertEqual(inhibition.enzyme_reaction_organism.enzyme.isoenzyme, 'PFK1')
+        self.assertListEqual([model.name for model in inhibition.models], ['E. coli - iteration 1'])
+
+        inhibition.inhibition_type = 'Uncompetitive'
+        db.session.commit()
+
+        self.assertListEqual(self._get_refreshed_urls(), ['/see_enzyme/PFK1', '/see_model/E. coli - iteration 1'])
+        self.assertIn(b'Inhibition type: Uncompetitive', self._get('/see_enzyme/PFK1')[0])
+
+    def test_invalidate_on_insert(self):
+        inhibition = EnzymeReactionInhibition.query.first()
+        new_inhibition = EnzymeReactionInhibition(enzyme_reaction_organism=inhibition.enzyme_reaction_organism,
+                                                  inhibitor_met=inhibition.inhibitor_met,
+                                                  affected_met=inhibition.affected_met)
+        new_inhibition.models.append(Model.query.filter_by(name='E. coli - iteration 2').first())
+        db.session.add(new_inhibition)
+        db.session.commit()
+
+        # the model of the new inhibition is only known from its collection history
+        self.assertIn('/see_model/E. coli - iteration 2', self._get_refreshed_urls())
+
+    def test_invalidate_on_rename(self):
+        enzyme = Enzyme.query.filter_by(isoenzyme='PFK1').first()
+        enzyme.isoenzyme = 'PFK1a'
+        db.session.commit()
+
+        self.urls.remove('/see_enzyme/PFK1')
+        self.assertIn(b'PFK1a', self._get('/see_enzyme/PFK1a')[0])
+
+        # the reaction and the models show the enzyme through its EnzymeReactionOrganism entries
+        self.assertListEqual(self._get_refreshed_urls(), ['/see_reaction/PFK', '/see_model/E. coli - iteration 1',
+                                                          '/see_model/E. coli - iteration 2'])
+        self.assertIn(b'PFK1a', self._get('/see_reaction/PFK')[0])
+
+    def test_no_invalidation_on_rollback(self):
+        enzyme = Enzyme.query.filter_by(isoenzyme='PFK2').first()
+        enzyme.name = 'changed'
+        db.session.flush()
+        db.session.rollback()
+
+        self.assertListEqual(self._get_refreshed_urls(), [])
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -5,9 +5,11 @@ import pandas as pd
 
 from app import create_app, db
 from app.load_data.import_grasp_model import get_model_name, get_model_stoichiometry, get_model_enzymes, get_model_subunits, \
+    get_model_enzyme_id_lists, \
     get_model_mechanisms, get_model_inhibitors, get_model_activators, get_model_effectors, get_model_gibbs_energies
 from app.main.utils import set_binding_release_order
 from app.models import Enzyme, EnzymeReactionOrganism, Organism, Reaction
+from app.utils.parsers import parse_input_list
 from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
     add_compartments, add_evidence_levels, add_organisms, add_references
 from config import Config
@@ -128,6 +130,16 @@ class TestImportModel(unittest.TestCase):
 
         self.assertListEqual(enzyme_list, true_enzyme_list)
 
+    def test_get_model_enzyme_id_lists(self):
+        sheet_name = 'enzyme_reaction'
+        enzyme_list = get_model_enzymes(self.file_path, sheet_name)
+        enzyme_id_lists = get_model_enzyme_id_lists(enzyme_list)
+
+        self.assertListEqual(enzyme_id_lists['pdb_ids'][:2], [['1UCW', '1E9I'], ['']])
+        self.assertListEqual(enzyme_id_lists['uniprot_ids'][:2], [[''], ['3CV8K', 'H12KP']])
+        for column in ('uniprot_ids', 'pdb_ids', 'strain'):
+            self.assertListEqual(enzyme_id_lists[column], [parse_input_list(enzyme[column]) for enzyme in enzyme_list])
+
     def test_get_model_subunits(self):
         true_subunit_dict = {'TPH': 4, 'DDC': 2, 'AANAT': 1, 'ASMT': 2, 'DDC_tryptm': 2, 'AANAT_tryptm': 1,
                              'IN_trp': 1, 'EX_trp': 1, 'EX_meltn': 1, 'EX_nactryptm': 1}
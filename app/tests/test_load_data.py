@@ -1,10 +1,19 @@
+import os
+import sqlite3
+import tempfile
 import unittest
 
 from app import create_app, db
 from app.load_data.load_initial_data import load_compartments, load_enzymes, load_genes, load_metabolites, \
     load_organisms, load_reactions, load_reference_types, load_enzyme_reaction_relation
+from app.load_data import ECOLI_CORE_MODEL
+from app.load_data.load_genome_scale import load_genome_scale_model
+from app.load_data.reaction_equations import update_reaction_equations
+from app.load_data.refresh_data import refresh_data
+from app.load_data.metanetx_xrefs import stream_xrefs, stream_rows, REAC_XREF_COLUMNS, REAC_PROP_COLUMNS
+from app.load_data.xref_index import build_xref_index, get_xref_index, XrefIndex
 from app.models import Compartment, Enzyme, EnzymeGeneOrganism, Gene, Metabolite, Organism, Reaction, \
-    ReactionMetabolite, ReferenceType, EnzymeReactionOrganism
+    ReactionMetabolite, ReferenceDataVersion, ReferenceType, EnzymeReactionOrganism
 from config import Config
 
 
@@ -201,5 +210,233 @@ class TestLoadEnzymeReactionRelation(unittest.TestCase):
         self.assertEqual(EnzymeReactionOrganism.query.count(), 28)
 
 
+class TestLoadGenomeScaleModel(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        load_compartments()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_load_genome_scale_model(self):
+        counts = load_genome_scale_model([ECOLI_CORE_MODEL], processes=2)
+
+        self.assertEqual(counts['metabolites'], 54)
+        self.assertEqual(counts['reactions'], 74)
+        self.assertEqual(Metabolite.query.count(), 54)
+        self.assertEqual(Reaction.query.count(), 74)
+        self.assertEqual(str(Reaction.query.filter_by(acronym='PGI').first()), 'PGI: 1.0 g6p_c <-> 1.0 f6p_c')
+
+        # loading the same model again does not add anything
+        counts = load_genome_scale_model([ECOLI_CORE_MODEL], processes=2)
+        self.assertEqual(sum(counts.values()), 0)
+
+
+class TestRefreshData(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        load_organisms()
+        load_compartments()
+        load_metabolites()
+        load_reactions()
+        load_enzymes()
+        load_genes()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_refresh_data(self):
+        counts = refresh_data()
+
+        for table_counts in counts.values():
+            self.assertEqual(table_counts['inserted'], 0)
+            self.assertEqual(table_counts['updated'], 0)
+        self.assertEqual(counts['metabolite']['unchanged'], 54)
+
+        metabolite = Metabolite.query.filter_by(bigg_id='atp').first()
+        metabolite.name = 'new name'
+        metabolite.grasp_id = 'curated_atp'
+        db.session.commit()
+
+        counts = refresh_data()
+        self.assertEqual(counts['metabolite'], {'inserted': 0, 'updated': 1, 'unchanged': 53})
+
+        metabolite = Metabolite.query.filter_by(bigg_id='atp').first()
+        self.assertNotEqual(metabolite.name, 'new name')
+        self.assertEqual(metabolite.grasp_id, 'curated_atp')
+
+    def test_refresh_data_invalidates_compartments(self):
+        version = ReferenceDataVersion.query.filter_by(table_name='compartment').first().version
+        refresh_data()
+
+        self.assertEqual(ReferenceDataVersion.query.filter_by(table_name='compartment').first().version, version + 1)
+
+
+class TestUpdateReactionEquations(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        load_compartments()
+        load_metabolites()
+        load_reactions()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_update_reaction_equations(self):
+        true_equations = dict((rxn.acronym, rxn.equation) for rxn in Reaction.query.all())
+        self.assertEqual(true_equations['PGI'], '1.0 g6p_c <-> 1.0 f6p_c')
+        self.assertEqual(update_reaction_equations(), 0)
+
+        Reaction.query.update({'equation': None})
+        db.session.commit()
+
+        self.assertEqual(update_reaction_equations(missing_only=True), 68)
+        db.session.commit()
+
+        self.assertDictEqual(dict((rxn.acronym, rxn.equation) for rxn in Reaction.query.all()), true_equations)
+
+    def test_update_stale_reaction_equations(self):
+        reaction = Reaction.query.filter_by(acronym='PGI').first()
+        true_equation = reaction.equation
+        reaction.equation = 'stale'
+        db.session.commit()
+
+        self.assertEqual(update_reaction_equations(missing_only=True), 0)
+        self.assertEqual(update_reaction_equations(), 1)
+        db.session.commit()
+
+        self.assertEqual(Reaction.query.filter_by(acronym='PGI').first().equation, true_equation)
+
+
+class TestStreamXrefs(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+        self.reac_xref_file = os.path.join(self.data_dir, 'reac_xref.tsv')
+        with open(self.reac_xref_file, 'w') as f_out:
+            f_out.write('#XREF\tMNX_ID\tDescription\n'
+                        'bigg:R_PGI\tMNXR1\tPGI\n'
+                        'bigg:R_PFK\tMNXR2\tPFK\n'
+                        'kegg:R00001\tMNXR1\tPGI\n'
+                        'metacyc:PFK-RXN\tMNXR2\tPFK\n'
+                        'bigg:R_ACALD\tMNXR3\tACALD\n')
+
+        self.reac_prop_file = os.path.join(self.data_dir, 'reac_prop.tsv')
+        with open(self.reac_prop_file, 'w') as f_out:
+            f_out.write('#MNX_ID\tEquation\tDescription\tBalance\tEC\tSource\n'
+                        'MNXR1\teq1\tdesc1\ttrue\t5.3.1.9\tbigg:PGI\n'
+                        'MNXR3\teq3\tdesc3\ttrue\t1.2.1.10\tbigg:ACALD\n')
+
+    def tearDown(self):
+        os.remove(self.reac_xref_file)
+        os.remove(self.reac_prop_file)
+        os.rmdir(self.data_dir)
+
+    def test_stream_xrefs(self):
+        xref_df = stream_xrefs(self.reac_xref_file, REAC_XREF_COLUMNS, {'bigg:R': ['R_PGI', 'R_PFK'], 'kegg:R': None},
+                               usecols=['XREF', 'metanetx_id'], chunksize=2)
+
+        self.assertEqual(list(xref_df.columns), ['XREF', 'metanetx_id', 'source'])
+        self.assertEqual(list(xref_df['XREF']), ['R_PGI', 'R_PFK', 'R00001'])
+        self.assertEqual(list(xref_df['source']), ['bigg', 'bigg', 'kegg'])
+        self.assertEqual(str(xref_df['source'].dtype), 'category')
+
+    def test_stream_rows(self):
+        ec_df = stream_rows(self.reac_prop_file, REAC_PROP_COLUMNS, 'metanetx_id', ['MNXR1', 'MNXR2'],
+                            usecols=['metanetx_id', 'EC'], chunksize=1)
+
+        self.assertEqual(list(ec_df.columns), ['metanetx_id', 'EC'])
+        self.assertEqual(list(ec_df['EC']), ['5.3.1.9'])
+
+
+class TestXrefIndex(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+        self.chem_xref_file = os.path.join(self.data_dir, 'chem_xref.tsv')
+        with open(self.chem_xref_file, 'w') as f_out:
+            f_out.write('#XREF\tMNX_ID\tEvidence\tDescription\n'
+                        'bigg:atp\tMNXM3\tidentity\tATP\n'
+                        'bigg:M_atp\tMNXM3\tidentity\tATP\n'
+                        'kegg:C00002\tMNXM3\tidentity\tATP\n'
+                        'bigg:adp\tMNXM7\tidentity\tADP\n')
+
+        self.reac_xref_file = os.path.join(self.data_dir, 'reac_xref.tsv')
+        with open(self.reac_xref_file, 'w') as f_out:
+            f_out.write('#XREF\tMNX_ID\tDescription\n'
+                        'bigg:R_PGI\tMNXR1\tPGI\n'
+                        'bigg:R_PFK\tMNXR2\tPFK\n'
+                        'kegg:R00001\tMNXR1\tPGI\n')
+
+        self.reac_prop_file = os.path.join(self.data_dir, 'reac_prop.tsv')
+        with open(self.reac_prop_file, 'w') as f_out:
+            f_out.write('#MNX_ID\tEquation\tDescription\tBalance\tEC\tSource\n'
+                        'MNXR1\teq1\tdesc1\ttrue\t5.3.1.9\tbigg:PGI\n')
+
+        self.index_file = os.path.join(self.data_dir, 'xref_index.sqlite')
+        build_xref_index(self.index_file, self.chem_xref_file, self.reac_xref_file, self.reac_prop_file)
+        self.xref_index = XrefIndex(self.index_file)
+
+    def tearDown(self):
+        self.xref_index.close()
+        for file_name in os.listdir(self.data_dir):
+            os.remove(os.path.join(self.data_dir, file_name))
+        os.rmdir(self.data_dir)
+
+    def test_get_metabolites(self):
+        met_xrefs = self.xref_index.get_metabolites(['atp', 'adp', 'pyr'])
+
+        self.assertEqual(met_xrefs, {'atp': {'metanetx_id': 'MNXM3', 'name': 'ATP'},
+                                     'adp': {'metanetx_id': 'MNXM7', 'name': 'ADP'}})
+
+    def test_get_reaction(self):
+        self.assertEqual(self.xref_index.get_reaction('R_PGI'),
+                         {'metanetx_id': 'MNXR1', 'kegg_id': 'R00001', 'ec_number': '5.3.1.9'})
+        self.assertEqual(self.xref_index.get_reaction('PFK'),
+                         {'metanetx_id': 'MNXR2', 'kegg_id': None, 'ec_number': None})
+        self.assertIsNone(self.xref_index.get_reaction('ACALD'))
+
+    def test_get_xref_index(self):
+        class XrefIndexConfig(TestConfig):
+            XREF_INDEX_FILE = self.index_file
+
+        app = create_app(XrefIndexConfig)
+        with app.app_context():
+            xref_index = get_xref_index()
+            self.assertEqual(xref_index.index_file, self.index_file)
+            self.assertIs(get_xref_index(), xref_index)
+            self.assertEqual(xref_index.get_metabolite('atp')['metanetx_id'], 'MNXM3')
+
+        # the connection is closed with the app context and the next one opens its own
+        self.assertRaises(sqlite3.ProgrammingError, xref_index.get_metabolite, 'atp')
+        with app.app_context():
+            self.assertIsNot(get_xref_index(), xref_index)
+
+        XrefIndexConfig.XREF_INDEX_FILE = os.path.join(self.data_dir, 'missing.sqlite')
+        with create_app(XrefIndexConfig).app_context():
+            self.assertIsNone(get_xref_index())
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
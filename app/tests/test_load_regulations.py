@@ -0,0 +1,222 @@
+import io
+import json
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.load_data.bulk_insert import write_in_batches
+from app.load_data.load_regulations import insert_regulations, read_regulations
+from app.models import EnzymeReactionActivation, EnzymeReactionEffector, EnzymeReactionInhibition, \
+    EnzymeReactionMiscInfo, EnzymeReactionOrganism, Metabolite, Reference
+from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
+    add_compartments, add_evidence_levels, add_organisms, add_references
+from app.utils.references import normalize_doi
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    add_references()
+    add_reaction(client)
+
+
+RECORDS = [
+    {'type': 'inhibition', 'isoenzyme': 'PFK1', 'reaction': 'PFK', 'organism': 'E. coli',
+     'models': 'E. coli - iteration 1', 'inhibitor_met': 'adp_c', 'affected_met': 'atp', 'inhibition_type': 'Competitive',
+     'inhibition_constant': '1.3e-4', 'evidence_level': 'Educated guess', 'references': '10.1093/bioinformatics/bty942'},
+    {'type': 'inhibition', 'isoenzyme': 'PFK2', 'reaction': 'PFK', 'organism': 'E. coli', 'inhibitor_met': 'pep'},
+    {'type': 'activation', 'isoenzyme': 'PFK1', 'reaction': 'PFK', 'organism': 'E. coli', 'activator_met': 'amp',
+     'activation_constant': 0.5, 'models': ['E. coli - iteration 1', 'E. coli - iteration 2']},
+    {'type': 'effector', 'isoenzyme': 'PFK1', 'reaction': 'PFK', 'organism': 'S. cerevisiae', 'effector_met': 'adp',
+     'effector_type': 'Inhibiting', 'references': '10.1093/bioinformatics/bty942'},
+    {'type': 'misc_info', 'isoenzyme': 'PFK1', 'reaction': 'PFK', 'organism': 'E. coli', 'topic': 'allostery',
+     'description': 'Tetramer', 'comments': 'From a review'},
+]
+
+
+class TestLoadRegulations(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+        self.n_selects = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_select)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_select)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_select(self, conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.n_selects += 1
+
+    def test_insert_regulations(self):
+        n_enz_rxn_orgs = EnzymeReactionOrganism.query.count()
+        n_references = Reference.query.count()
+
+        regulations, errors = insert_regulations(RECORDS)
+        db.session.commit()
+
+        self.assertListEqual(errors, [])
+        self.assertEqual(len(regulations), 5)
+
+        inhibition = EnzymeReactionInhibition.query.filter_by(id=regulations[0].id).first()
+        self.assertEqual(inhibition.inhibitor_met.bigg_id, 'adp')
+        self.assertEqual(inhibition.affected_met.bigg_id, 'atp')
+        self.assertEqual(inhibition.inhibition_type, 'Competitive')
+        self.assertEqual(inhibition.inhibition_constant, 1.3e-4)
+        self.assertEqual(inhibition.evidence.description, 'Educated guess')
+        self.assertEqual(inhibition.enzyme_reaction_organism.enzyme.isoenzyme, 'PFK1')
+        self.assertListEqual([model.name for model in inhibition.models], ['E. coli - iteration 1'])
+        self.assertListEqual([normalize_doi(reference.doi) for reference in inhibition.references],
+                             ['10.1093/bioinformatics/bty942'])
+
+        self.assertEqual(EnzymeReactionInhibition.query.filter_by(id=regulations[1].id).first().inhibition_type,
+                         'Unknown')
+        self.assertEqual(EnzymeReactionActivation.query.first().models.count(), 2)
+        self.assertEqual(EnzymeReactionEffector.query.first().effector_type, 'Inhibiting')
+        self.assertEqual(EnzymeReactionMiscInfo.query.first().description, 'Tetramer')
+
+        self.assertEqual(Metabolite.query.filter_by(bigg_id='adp').count(), 1)
+        self.assertEqual(Reference.query.count(), n_references)
+        self.assertEqual(EnzymeReactionOrganism.query.count(), n_enz_rxn_orgs + 1)
+
+    def test_insert_regulations_queries(self):
+        insert_regulations(RECORDS[:1], dry_run=True)
+
+        self.n_selects = 0
+        insert_regulations(RECORDS[:1], dry_run=True)
+        n_selects = self.n_selects
+
+        self.n_selects = 0
+        insert_regulations(RECORDS * 20, dry_run=True)
+        self.assertEqual(self.n_selects, n_selects)
+
+    def test_insert_regulations_flush_queries(self):
+        # the pages to invalidate in the detail cache are found with a number of queries that does not grow with the
+        # number of records
+        insert_regulations(RECORDS)
+        db.session.commit()
+
+        self.n_selects = 0
+        insert_regulations(RECORDS)
+        db.session.commit()
+        n_selects = self.n_selects
+
+        self.n_selects = 0
+        insert_regulations(RECORDS * 10)
+        db.session.commit()
+        self.assertEqual(self.n_selects, n_selects)
+
+    def test_insert_regulations_errors(self):
+        records = [dict(RECORDS[0]),
+                   {'type': 'inhibition', 'isoenzyme': 'PFK9', 'reaction': 'PFK', 'organism': 'E. coli',
+                    'inhibition_constant': 'abc', 'inhibition_type': 'Weird'},
+                   {'type': 'effector', 'isoenzyme': 'PFK1', 'reaction': 'XYZ', 'organism': 'Yeast',
+                    'effector_met': 'adp', 'models': 'Nope', 'evidence_level': 'Nope', 'color': 'red'},
+                   {'type': 'regulation'}]
+
+        regulations, errors = insert_regulations(records)
+
+        self.assertListEqual(regulations, [])
+        self.assertListEqual([error['row'] for error in errors], [2, 3, 4])
+        self.assertListEqual(errors[0]['errors'], ['inhibitor_met is required.', 'Unknown isoenzyme: PFK9.',
+                                                   'inhibition_constant must be a number, got: abc.',
+                                                   'inhibition_type must be one of: Unknown, Competitive, '
+                                                   'Uncompetitive, Noncompetitive, Mixed.'])
+        self.assertListEqual(errors[1]['errors'], ['Unknown fields: color.', 'Unknown reaction: XYZ.',
+                                                   'Unknown organism: Yeast.', 'Unknown evidence level: Nope.',
+                                                   'Unknown model: Nope.'])
+        self.assertEqual(EnzymeReactionInhibition.query.count(), 0)
+
+    def test_dry_run(self):
+        regulations, errors = insert_regulations(RECORDS, dry_run=True)
+        self.assertListEqual(regulations, [])
+        self.assertListEqual(errors, [])
+        self.assertEqual(EnzymeReactionInhibition.query.count(), 0)
+
+    def test_write_in_batches(self):
+        records = [dict(RECORDS[2], activator_met='met' + str(i)) for i in range(5)]
+
+        def write_batch(batch):
+            insert_regulations(batch)
+            if batch[-1]['activator_met'] == 'met3':
+                raise ValueError()
+
+        n_written, failed_batches = write_in_batches(records, write_batch, 2)
+        self.assertEqual(n_written, 3)
+        self.assertListEqual([first_record for first_record, error in failed_batches], [2])
+        self.assertIsInstance(failed_batches[0][1], ValueError)
+
+        # the batches before and after the failing one are committed, a rollback does not undo them
+        db.session.rollback()
+        self.assertEqual(EnzymeReactionActivation.query.count(), 3)
+        self.assertEqual(Metabolite.query.filter(Metabolite.bigg_id.in_(['met0', 'met1', 'met4'])).count(), 3)
+        self.assertEqual(Metabolite.query.filter(Metabolite.bigg_id.in_(['met2', 'met3'])).count(), 0)
+
+    def test_read_regulations(self):
+        data = 'type,isoenzyme,reaction,organism,inhibitor_met\ninhibition,PFK1,PFK,E. coli,adp\n'
+        self.assertListEqual(read_regulations(data, 'csv'), [{'type': 'inhibition', 'isoenzyme': 'PFK1',
+                                                               'reaction': 'PFK', 'organism': 'E. coli',
+                                                               'inhibitor_met': 'adp'}])
+        self.assertListEqual(read_regulations(json.dumps(RECORDS), 'json'), RECORDS)
+
+        self.assertRaises(ValueError, read_regulations, '{"type": "inhibition"}', 'json')
+        self.assertRaises(ValueError, read_regulations, 'type\ninhibition,PFK1\n', 'csv')
+        self.assertRaises(ValueError, read_regulations, data, 'xlsx')
+
+    def test_insert_regulations_endpoint(self):
+        response = self.client.post('/api/v1/regulations', data=json.dumps(RECORDS), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual(data['n_records'], 5)
+        self.assertDictEqual(data['counts'], {'inhibition': 2, 'activation': 1, 'effector': 1, 'misc_info': 1})
+        self.assertEqual(EnzymeReactionInhibition.query.count(), 2)
+
+        csv_data = 'type,isoenzyme,reaction,organism,activator_met\nactivation,PFK2,PFK,E. coli,amp\n'
+        response = self.client.post('/api/v1/regulations?dry_run=1', data=csv_data, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(EnzymeReactionActivation.query.count(), 1)
+
+        response = self.client.post('/api/v1/regulations', data={'file': (io.BytesIO(csv_data.encode()), 'a.csv')},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(EnzymeReactionActivation.query.count(), 2)
+
+    def test_insert_regulations_endpoint_errors(self):
+        response = self.client.post('/api/v1/regulations', data=json.dumps([{'type': 'inhibition'}]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['errors'][0]['row'], 1)
+
+        response = self.client.post('/api/v1/regulations', data='not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/v1/regulations', data='[]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
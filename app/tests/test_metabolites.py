@@ -0,0 +1,126 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.main.utils import add_metabolites_to_reaction, check_metabolite
+from app.models import Compartment, Metabolite, Reaction
+from app.utils.metabolites import MetaboliteResolver, get_metabolite_bigg_ids, get_metabolite_resolver
+from app.utils.populate_db import add_compartments
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db():
+    add_compartments()
+
+    for bigg_id in ['adp', 'atp']:
+        db.session.add(Metabolite(bigg_id=bigg_id, grasp_id=bigg_id))
+    db.session.commit()
+
+
+class TestMetabolites(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db()
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def test_get_metabolite_bigg_ids(self):
+        self.assertListEqual(get_metabolite_bigg_ids(['adp_c', 'atp', 'glc__D_e', 'nad_']),
+                             ['adp', 'atp', 'glc__D', 'nad'])
+
+    def test_resolve(self):
+        existing = Metabolite.query.filter_by(bigg_id='adp').first()
+        n_metabolites = Metabolite.query.count()
+
+        resolver = MetaboliteResolver()
+        self.n_queries = 0
+        metabolites = resolver.resolve(['adp_c', 'new_c', 'adp_m', 'new'])
+        self.assertEqual(self.n_queries, 1)
+
+        self.assertIs(metabolites[0], existing)
+        self.assertIs(metabolites[2], existing)
+        self.assertIs(metabolites[1], metabolites[3])
+        self.assertEqual(metabolites[1].grasp_id, 'new')
+
+        self.n_queries = 0
+        self.assertListEqual(resolver.resolve(['adp', 'new_m']), [existing, metabolites[1]])
+        self.assertEqual(self.n_queries, 0)
+
+        self.assertListEqual(MetaboliteResolver().resolve(['other'], create=False), [None])
+
+        db.session.commit()
+        self.assertEqual(Metabolite.query.count(), n_metabolites + 1)
+
+    def test_resolve_after_rollback(self):
+        resolver = MetaboliteResolver()
+        metabolite = resolver.resolve(['new'])[0]
+        db.session.rollback()
+
+        new_metabolite = resolver.resolve(['new'])[0]
+        self.assertIsNot(new_metabolite, metabolite)
+        self.assertIn(new_metabolite, db.session)
+
+    def test_add_compartments(self):
+        cytosol = Compartment.query.filter_by(bigg_id='c').first()
+        mitochondria = Compartment.query.filter_by(bigg_id='m').first()
+
+        resolver = MetaboliteResolver()
+        adp, new = resolver.resolve(['adp', 'new'])
+        resolver.add_compartments([(adp, cytosol), (adp, mitochondria), (new, cytosol), (new, cytosol), (adp, None)])
+        db.session.commit()
+
+        resolver.add_compartments([(adp, cytosol), (new, cytosol)])
+        db.session.commit()
+
+        self.assertListEqual(sorted(compartment.bigg_id for compartment in adp.compartments), ['c', 'm'])
+        self.assertListEqual([compartment.bigg_id for compartment in new.compartments], ['c'])
+
+    def test_add_metabolites_to_reaction(self):
+        check_metabolite('adp_c')
+        reaction = Reaction(name='phosphofructokinase', acronym='PFK')
+        db.session.add(reaction)
+
+        self.n_queries = 0
+        add_metabolites_to_reaction(reaction, '2 atp_c + 2 adp_m <-> atp_m + h2o_c')
+        n_queries = self.n_queries
+        db.session.commit()
+
+        self.assertEqual(reaction.metabolites.count(), 4)
+        self.assertEqual(Metabolite.query.filter_by(bigg_id='atp').first().compartments.count(), 2)
+        self.assertIs(get_metabolite_resolver(), get_metabolite_resolver())
+
+        reaction = Reaction(name='phosphofructokinase 2', acronym='PFK2')
+        db.session.add(reaction)
+        db.session.flush()
+
+        self.n_queries = 0
+        add_metabolites_to_reaction(reaction, '2 atp_c + 2 adp_m <-> atp_m + h2o_c')
+        self.assertLess(self.n_queries, n_queries)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
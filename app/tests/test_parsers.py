@@ -0,0 +1,134 @@
+import unittest
+from collections import OrderedDict
+
+import pandas as pd
+
+from app.utils.parsers import ReactionParser, parse_input_list, parse_many, parse_reaction, split_input_column
+
+
+class TestReactionParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = ReactionParser()
+
+    def test_parse_reaction(self):
+        reversible, stoichiometry = self.parser.parse_reaction('1 pep_c + 1.5 adp_c <-> pyr_c + 2.0 atp_m')
+
+        self.assertTrue(reversible)
+        self.assertEqual(stoichiometry, OrderedDict([('pep_c', -1.0), ('adp_c', -1.5), ('pyr_c', 1.0), ('atp_m', 2.0)]))
+
+    def test_parse_reaction_compact(self):
+        reversible, stoichiometry = self.parser.parse_reaction('pep_c+2e-1  adp_c-->pyr_c')
+
+        self.assertFalse(reversible)
+        self.assertEqual(stoichiometry, OrderedDict([('pep_c', -1.0), ('adp_c', -0.2), ('pyr_c', 1.0)]))
+
+    def test_parse_reaction_bounds_objective(self):
+        for reaction_str in ('g6p_c <-> f6p_c [-1000, 1000] @1', 'g6p_c <-> f6p_c[,]@-0.5', 'g6p_c <-> f6p_c @1'):
+            reversible, stoichiometry = self.parser.parse_reaction(reaction_str)
+
+            self.assertTrue(reversible)
+            self.assertEqual(stoichiometry, OrderedDict([('g6p_c', -1.0), ('f6p_c', 1.0)]))
+
+    def test_parse_reaction_repeated_metabolite(self):
+        reversible, stoichiometry = self.parser.parse_reaction('h_c + atp_c --> adp_c + 2 h_c + h_c')
+
+        self.assertEqual(stoichiometry, OrderedDict([('h_c', 2.0), ('atp_c', -1.0), ('adp_c', 1.0)]))
+
+    def test_parse_reaction_no_substrates(self):
+        reversible, stoichiometry = self.parser.parse_reaction('--> atp_c')
+
+        self.assertFalse(reversible)
+        self.assertEqual(stoichiometry, OrderedDict([('atp_c', 1.0)]))
+
+    def test_parse_reaction_error_position(self):
+        errors = [('pep_c --> 2pyr_c', 12), ('pep_c + --> pyr_c', 9), ('pep_c <=> pyr_c', 7),
+                  ('pep_c --> -1 pyr_c', 11), ('pep_c --> pyr_c [0, 10', 23), ('pep_c --> pyr_c @ 1', 19),
+                  ('pep_c --> pyr_c adp_c', 17)]
+
+        for reaction_str, offset in errors:
+            with self.assertRaises(SyntaxError) as context:
+                self.parser.parse_reaction(reaction_str)
+
+            self.assertEqual(context.exception.offset, offset)
+            self.assertIn('position ' + str(offset), str(context.exception))
+
+
+class TestParseReaction(unittest.TestCase):
+    def setUp(self):
+        parse_reaction.cache_clear()
+
+    def test_parse_reaction(self):
+        reversible, stoichiometry = parse_reaction('1 pep_c + 1.5 adp_c <-> pyr_c + 2.0 atp_m')
+
+        self.assertTrue(reversible)
+        self.assertEqual(list(stoichiometry.items()),
+                         [('pep_c', -1.0), ('adp_c', -1.5), ('pyr_c', 1.0), ('atp_m', 2.0)])
+
+    def test_parse_reaction_same_as_parser(self):
+        reaction_str = 'g6p_c --> f6p_c + f6p_c'
+
+        self.assertEqual(parse_reaction(reaction_str)[0], ReactionParser().parse_reaction(reaction_str)[0])
+        self.assertEqual(OrderedDict(parse_reaction(reaction_str)[1]),
+                         ReactionParser().parse_reaction(reaction_str)[1])
+
+    def test_parse_reaction_no_products(self):
+        reversible, stoichiometry = parse_reaction('atp_c -->')
+
+        self.assertFalse(reversible)
+        self.assertEqual(dict(stoichiometry), {'atp_c': -1.0})
+
+    def test_parse_reaction_is_memoized(self):
+        parse_reaction('pep_c <-> pyr_c')
+        parse_reaction('pep_c <-> pyr_c')
+
+        self.assertEqual(parse_reaction.cache_info().hits, 1)
+
+    def test_parse_reaction_read_only(self):
+        reversible, stoichiometry = parse_reaction('pep_c <-> pyr_c')
+
+        with self.assertRaises(TypeError):
+            stoichiometry['pep_c'] = 2.0
+
+    def test_parse_reaction_error(self):
+        with self.assertRaises(SyntaxError):
+            parse_reaction('pep_c <=> pyr_c')
+
+    def test_parse_many(self):
+        results = parse_many(['pep_c <-> pyr_c', 'g6p_c --> f6p_c'])
+
+        self.assertEqual([reversible for reversible, _ in results], [True, False])
+        self.assertEqual(dict(results[1][1]), {'g6p_c': -1.0, 'f6p_c': 1.0})
+
+
+
+class TestSplitInputColumn(unittest.TestCase):
+    def test_split_input_column(self):
+        cells = ['P12345 Q67890', '1UCW, 1E9I', 'a,b', 'x; y', 'c;d', ' single ', '']
+        token_df = split_input_column(cells)
+
+        self.assertListEqual(list(token_df.columns), ['row_index', 'token'])
+        self.assertListEqual(list(zip(token_df['row_index'], token_df['token'])),
+                             [(i, token) for i, cell in enumerate(cells) for token in parse_input_list(cell)])
+
+    def test_split_input_column_no_comma(self):
+        cells = ['InChI=1S/C3H4O3/c1-2, InChI=1S/H2O/h1H2', 'InChI=1S/C2H6O/c1-2-3']
+        token_df = split_input_column(cells, flag=False)
+
+        self.assertListEqual(list(zip(token_df['row_index'], token_df['token'])),
+                             [(i, token) for i, cell in enumerate(cells) for token in parse_input_list(cell, False)])
+
+    def test_split_input_column_series(self):
+        cells = pd.Series(['10.1093/nar/gkx1234; 10.1016/j.x', None, 'K-12'], index=['r1', 'r2', 'r3'])
+        token_df = split_input_column(cells)
+
+        self.assertListEqual(list(token_df['row_index']), ['r1', 'r1', 'r3'])
+        self.assertListEqual(list(token_df['token']), ['10.1093/nar/gkx1234', '10.1016/j.x', 'K-12'])
+
+    def test_split_input_column_empty(self):
+        token_df = split_input_column([])
+
+        self.assertEqual(len(token_df), 0)
+        self.assertListEqual(list(token_df.columns), ['row_index', 'token'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
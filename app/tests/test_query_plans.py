@@ -0,0 +1,59 @@
+import unittest
+
+from app import create_app, db
+from app.models import Reference
+from app.utils.populate_db import add_compartments, add_enzymes, add_evidence_levels, add_mechanisms, add_models, \
+    add_organisms, add_reaction, add_reference_types, add_references
+from app.utils.query_plans import get_query_plan, get_unindexed_queries, is_index_backed
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    add_references()
+    add_reaction(client)
+
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_hot_queries_use_indexes(self):
+        self.assertListEqual(get_unindexed_queries(), [])
+
+    def test_is_index_backed(self):
+        self.assertFalse(is_index_backed(get_query_plan(Reference.query.filter_by(title='eQuilibrator'))))
+
+        self.assertTrue(is_index_backed(['Index Scan using ix_metabolite_bigg_id on metabolite']))
+        self.assertTrue(is_index_backed(['SEARCH metabolite USING INDEX sqlite_autoindex_metabolite_1 (bigg_id=?)']))
+        self.assertFalse(is_index_backed(['Seq Scan on metabolite  (cost=0.00..1.01 rows=1 width=100)']))
+        self.assertFalse(is_index_backed(['SCAN metabolite']))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db, reference_data
+from app.models import Compartment, Organism, ReferenceDataVersion
+from app.utils.populate_db import add_compartments, add_organisms
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_organisms()
+
+
+class TestReferenceData(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def _get_version(self, model):
+        version = ReferenceDataVersion.query.filter_by(table_name=model.__tablename__).first()
+        return version.version if version else 0
+
+    def test_get(self):
+        compartment = reference_data.get(Compartment, bigg_id='c')
+        self.assertEqual(compartment.name, 'Cytosol')
+        self.assertIs(compartment, db.session.query(Compartment).get(compartment.id))
+
+        self.n_queries = 0
+        self.assertIs(reference_data.get(Compartment, id=compartment.id), compartment)
+        self.assertEqual(reference_data.get(Compartment, name='Mitochondria').bigg_id, 'm')
+        self.assertIsNone(reference_data.get(Compartment, bigg_id='xyz'))
+        self.assertListEqual([compartment.bigg_id for compartment in reference_data.all(Compartment)],
+                             ['c', 'm', 'v', 'e'])
+        self.assertEqual(self.n_queries, 0)
+
+        self.assertRaises(TypeError, reference_data.get, Compartment, bigg_id='c', name='Cytosol')
+
+    def test_local_change(self):
+        self.assertIsNone(reference_data.get(Organism, name='Yeast'))
+        version = self._get_version(Organism)
+
+        response = self.client.post('/add_organism', data=dict(name='Yeast'), follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(reference_data.get(Organism, name='Yeast').name, 'Yeast')
+        self.assertEqual(self._get_version(Organism), version + 1)
+
+    def test_uncommitted_change(self):
+        self.assertIsNone(reference_data.get(Organism, name='Yeast'))
+
+        organism = Organism(name='Yeast')
+        db.session.add(organism)
+        self.assertIs(reference_data.get(Organism, name='Yeast'), organism)
+
+        db.session.rollback()
+        self.assertIsNone(reference_data.get(Organism, name='Yeast'))
+
+    def test_change_in_other_process(self):
+        self.assertIsNone(reference_data.get(Organism, name='Yeast'))
+
+        version_table = ReferenceDataVersion.__table__
+        db.session.execute(Organism.__table__.insert().values(name='Yeast'))
+        db.session.execute(version_table.update().where(version_table.c.table_name == Organism.__tablename__)
+                           .values(version=version_table.c.version + 1))
+        db.session.commit()
+
+        self.assertIsNone(reference_data.get(Organism, name='Yeast'))
+
+        with self.app.app_context():
+            self.assertEqual(reference_data.get(Organism, name='Yeast').name, 'Yeast')
+
+    def test_invalidate(self):
+        self.assertIsNone(reference_data.get(Compartment, bigg_id='p'))
+        version = self._get_version(Compartment)
+
+        db.session.execute(Compartment.__table__.insert().values(name='Periplasm', bigg_id='p'))
+        reference_data.invalidate(Compartment)
+        db.session.commit()
+
+        self.assertEqual(reference_data.get(Compartment, bigg_id='p').name, 'Periplasm')
+        self.assertEqual(self._get_version(Compartment), version + 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,127 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.main.utils import add_references
+from app.models import EnzymeReactionInhibition, Reference
+from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
+    add_compartments, add_evidence_levels, add_organisms, add_references as populate_references, add_inhibitions
+from app.utils.references import ReferenceResolver, get_reference_resolver, normalize_doi
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    populate_references()
+    add_reaction(client)
+    add_inhibitions(client)
+
+
+class TestReferences(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def test_normalize_doi(self):
+        self.assertEqual(normalize_doi(' https://doi.org/10.1093/Bioinformatics/bty942'), '10.1093/bioinformatics/bty942')
+        self.assertEqual(normalize_doi('http://dx.doi.org/10.1093/bty942'), '10.1093/bty942')
+        self.assertEqual(normalize_doi('doi: 10.1093/bty942'), '10.1093/bty942')
+        self.assertEqual(normalize_doi('10.1093/bty942'), '10.1093/bty942')
+
+    def test_resolve(self):
+        existing = Reference.query.filter_by(doi='https://doi.org/10.1093/bioinformatics/bty942').first()
+        n_references = Reference.query.count()
+
+        resolver = ReferenceResolver()
+        self.n_queries = 0
+        references = resolver.resolve(['10.1093/Bioinformatics/bty942', 'doi:10.1000/new',
+                                       'https://doi.org/10.1093/bioinformatics/bty942', '10.1000/new'])
+        self.assertEqual(self.n_queries, 1)
+
+        self.assertIs(references[0], existing)
+        self.assertIs(references[2], existing)
+        self.assertIs(references[1], references[3])
+        self.assertEqual(references[1].doi, 'doi:10.1000/new')
+
+        self.n_queries = 0
+        self.assertListEqual(resolver.resolve(['10.1000/NEW']), [references[1]])
+        self.assertEqual(self.n_queries, 0)
+
+        self.assertListEqual(ReferenceResolver().resolve(['10.1000/other'], create=False), [None])
+
+        db.session.commit()
+        self.assertEqual(Reference.query.count(), n_references + 1)
+
+    def test_resolve_after_rollback(self):
+        resolver = ReferenceResolver()
+        reference = resolver.resolve(['10.1000/new'])[0]
+        db.session.rollback()
+
+        new_reference = resolver.resolve(['10.1000/new'])[0]
+        self.assertIsNot(new_reference, reference)
+        self.assertIn(new_reference, db.session)
+
+    def test_add_references(self):
+        inhibition = EnzymeReactionInhibition.query.first()
+        self.assertEqual(inhibition.references.count(), 2)
+
+        with self.app.test_request_context():
+            add_references('10.1093/bioinformatics/bty942, 10.1000/new, 10.1000/new', inhibition)
+            self.assertIs(get_reference_resolver(), get_reference_resolver())
+        db.session.commit()
+
+        self.assertListEqual([reference.doi for reference in inhibition.references],
+                             ['10.1000/new', 'https://doi.org/10.1093/bioinformatics/bty942',
+                              'https://doi.org/10.1093/bioinformatics/bty943'])
+
+    def test_add_references_queries(self):
+        inhibition = EnzymeReactionInhibition.query.first()
+
+        # the number of queries does not depend on the number of new DOIs
+        n_queries = []
+        for references in ['10.1000/new1', '10.1000/new2, 10.1000/new3, 10.1000/new4']:
+            db.session.commit()
+            with self.app.test_request_context():
+                self.n_queries = 0
+                add_references(references, inhibition)
+                n_queries.append(self.n_queries)
+        db.session.commit()
+
+        self.assertEqual(n_queries[0], n_queries[1])
+        self.assertEqual(inhibition.references.count(), 6)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
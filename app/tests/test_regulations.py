@@ -0,0 +1,109 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import EnzymeReactionActivation, EnzymeReactionEffector, EnzymeReactionInhibition, Metabolite
+from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
+    add_compartments, add_evidence_levels, add_organisms, add_references, add_inhibitions
+from app.utils.regulations import RegulationLookup, get_regulation_lookup
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    add_references()
+    add_reaction(client)
+    add_inhibitions(client)
+
+
+class TestRegulationLookup(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+        self.adp = Metabolite.query.filter_by(bigg_id='adp').first()
+        self.nad = Metabolite.query.filter_by(bigg_id='nad').first()
+        self.empty_inhibition = EnzymeReactionInhibition(inhibitor_met=self.adp)
+        self.empty_activation = EnzymeReactionActivation(activator_met=self.adp)
+        self.effector = EnzymeReactionEffector(effector_met=self.adp, effector_type='Inhibiting')
+        db.session.add_all([self.empty_inhibition, self.empty_activation, self.effector])
+        db.session.commit()
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def test_load(self):
+        lookup = RegulationLookup()
+        metabolites = Metabolite.query.filter(Metabolite.bigg_id.in_(['adp', 'nad'])).all()
+        self.n_queries = 0
+        lookup.load(metabolites + [None])
+        self.assertEqual(self.n_queries, 3)
+
+        self.n_queries = 0
+        self.assertIs(lookup.get_inhibition(self.adp), self.empty_inhibition)
+        self.assertIs(lookup.get_activation(self.adp), self.empty_activation)
+        self.assertIs(lookup.get_effector(self.adp, 'Inhibiting'), self.effector)
+        self.assertEqual(self.n_queries, 0)
+
+    def test_get_new(self):
+        n_inhibitions = EnzymeReactionInhibition.query.count()
+        # the inhibitions of populate_db have an affected metabolite and a type, so they are not reused
+        self.assertTrue(EnzymeReactionInhibition.query.filter_by(inhibitor_met=self.nad).count() > 0)
+
+        lookup = RegulationLookup()
+        lookup.load([self.adp, self.nad])
+
+        self.n_queries = 0
+        inhibition = lookup.get_inhibition(self.nad)
+        self.assertIs(lookup.get_inhibition(self.nad), inhibition)
+        self.assertIsNot(lookup.get_effector(self.adp, 'Activating'), self.effector)
+        self.assertEqual(self.n_queries, 0)
+
+        self.assertIsNot(inhibition, self.empty_inhibition)
+        self.assertIsNone(inhibition.affected_met)
+
+        db.session.commit()
+        self.assertEqual(EnzymeReactionInhibition.query.count(), n_inhibitions + 1)
+
+    def test_get_after_rollback(self):
+        lookup = RegulationLookup()
+        inhibition = lookup.get_inhibition(self.nad)
+        db.session.rollback()
+
+        new_inhibition = lookup.get_inhibition(self.nad)
+        self.assertIsNot(new_inhibition, inhibition)
+        self.assertIn(new_inhibition, db.session)
+        self.assertIs(get_regulation_lookup(), get_regulation_lookup())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+import unittest
+
+from flask_wtf import FlaskForm
+from sqlalchemy import event
+from werkzeug.datastructures import MultiDict
+
+from app import create_app, db
+from app.main.fields import LazyQuerySelectField, LazyQuerySelectMultipleField
+from app.models import Enzyme, EnzymeReactionOrganism
+from app.utils.populate_db import add_models, add_mechanisms, add_reaction, add_reference_types, add_enzymes, \
+    add_compartments, add_evidence_levels, add_organisms, add_references, add_inhibitions
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    #SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    POSTGRES_DB = 'kinetics_db_test'
+    LOGIN_DISABLED = True
+    WTF_CSRF_ENABLED = False
+
+
+def populate_db(client=None):
+    add_compartments()
+    add_evidence_levels()
+    add_mechanisms()
+    add_organisms()
+    add_enzymes(client)
+    add_models()
+    add_reference_types()
+    add_references()
+    add_reaction(client)
+    add_inhibitions(client)
+
+
+class SelectForm(FlaskForm):
+    enzyme = LazyQuerySelectField('Isoenzyme', model=Enzyme, entity='enzyme')
+    enz_rxn_orgs = LazyQuerySelectMultipleField('Reactions', model=EnzymeReactionOrganism,
+                                                entity='enzyme_reaction_organism')
+
+
+class TestSelectFields(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        populate_db(self.client)
+
+        self.n_queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._count_query)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_query(self, *args):
+        self.n_queries += 1
+
+    def _validate(self, **formdata):
+        with self.app.test_request_context(method='POST'):
+            form = SelectForm(formdata=MultiDict(formdata))
+            self.n_queries = 0
+            form.validate()
+            return form
+
+    def test_validate(self):
+        form = self._validate(enzyme='2', enz_rxn_orgs=['2:1:1', '1:1:1'])
+        n_queries = self.n_queries
+
+        self.assertDictEqual(form.errors, {})
+        self.assertEqual(form.enzyme.data.isoenzyme, 'PFK2')
+        self.assertListEqual([enz_rxn_org.enzyme.isoenzyme for enz_rxn_org in form.enz_rxn_orgs.data],
+                             ['PFK2', 'PFK1'])
+        self.assertEqual(n_queries, 2)
+
+    def test_validate_invalid(self):
+        form = self._validate(enzyme='99', enz_rxn_orgs=['1:1:1', '9:9:9', 'abc'])
+        self.assertListEqual(form.errors['enzyme'], ['Not a valid choice'])
+        self.assertListEqual(form.errors['enz_rxn_orgs'], ['Not a valid choice'])
+
+        form = self._validate(enzyme='', enz_rxn_orgs=[])
+        self.assertListEqual(form.errors['enzyme'], ['Not a valid choice'])
+        self.assertNotIn('enz_rxn_orgs', form.errors)
+        self.assertEqual(self.n_queries, 0)
+
+    def test_render(self):
+        with self.app.test_request_context():
+            form = SelectForm(data={'enz_rxn_orgs': EnzymeReactionOrganism.query.filter_by(id=1).all()})
+            html = str(form.enzyme()) + str(form.enz_rxn_orgs())
+
+        self.assertIn('data-search-url="/api/v1/options/enzyme"', html)
+        self.assertIn('<option selected value="1:1:1">', html)
+        self.assertNotIn('2:1:1', html)
+        self.assertNotIn('PFK2', html)
+
+    def test_form_page(self):
+        response = self.client.get('/add_enzyme_inhibition')
+        self.assertEqual(response.status_code, 200)
+
+        html = response.data.decode('utf-8')
+        self.assertIn('data-search-url="/api/v1/options/reaction"', html)
+        self.assertNotIn('PFK1', html)
+
+    def test_get_options(self):
+        response = self.client.get('/api/v1/options/enzyme_reaction_organism?q=pfk2')
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual([result['id'] for result in response.get_json()['results']], ['2:1:1'])
+
+        response = self.client.get('/api/v1/options/enzyme_inhibition?q=ad')
+        self.assertTrue(response.get_json()['results'][0]['text'].startswith('Inhibitor: adp'))
+
+        response = self.client.get('/api/v1/options/nope')
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_options_pages(self):
+        ids = []
+        url = '/api/v1/options/enzyme?limit=1'
+        while url:
+            data = self.client.get(url).get_json()
+            self.assertLessEqual(len(data['results']), 1)
+            ids.extend(result['id'] for result in data['results'])
+            url = data['next']
+
+        self.assertListEqual(ids, ['1', '2', '3'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+""" This module implements the prefix indexes used to autocomplete form fields, e.g. isoenzymes or organism names.
+
+Each index is a sorted array of the distinct values of a column, searched with bisect, so a lookup costs O(log n) plus
+the number of results instead of a table scan, and the form pages no longer embed whole tables.
+
+Indexes are built on first use and rebuilt when they are older than AUTOCOMPLETE_TTL seconds, or after a commit that
+changed their table in this process.
+
+"""
+
+import time
+from bisect import bisect_left
+
+from flask import current_app
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import event
+
+
+class PrefixIndex(object):
+    """
+    Case insensitive prefix search over a set of strings.
+
+    Args:
+        values: iterable of strings, None and empty values are ignored.
+    """
+
+    def __init__(self, values):
+        self._entries = sorted(set((value.lower(), value) for value in values if value))
+
+    def search(self, prefix, limit=10):
+        """
+        Gets the values that start with prefix, ignoring case.
+
+        Args:
+            prefix: the prefix to search for.
+            limit: maximum number of values to return.
+
+        Returns:
+            list of values, sorted alphabetically.
+        """
+
+        prefix = prefix.lower()
+        values = []
+        i = bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and len(values) < limit and self._entries[i][0].startswith(prefix):
+            values.append(self._entries[i][1])
+            i += 1
+        return values
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Autocomplete(object):
+    """
+    Flask extension with the prefix indexes of the autocomplete fields.
+    """
+
+    def __init__(self, app=None, sources=None):
+        if app is not None:
+            self.init_app(app, sources)
+
+    def init_app(self, app, sources):
+        """
+        Args:
+            app: the flask app.
+            sources: dictionary {entity: model column}, e.g. {'isoenzyme': Enzyme.isoenzyme}.
+
+        Returns:
+            None
+        """
+
+        app.config.setdefault('AUTOCOMPLETE_TTL', 60)
+        app.config.setdefault('AUTOCOMPLETE_LIMIT', 10)
+        app.extensions['autocomplete'] = _AutocompleteState(sources)
+
+        if not event.contains(SignallingSession, 'after_flush', _after_flush):
+            event.listen(SignallingSession, 'after_flush', _after_flush)
+            event.listen(SignallingSession, 'after_commit', _after_commit)
+
+    def search(self, entity, prefix, limit=None):
+        """
+        Gets the values of entity that start with prefix.
+
+        Args:
+            entity: one of the entities given to init_app.
+            prefix: the prefix to search for.
+            limit: maximum number of values, AUTOCOMPLETE_LIMIT by default.
+
+        Returns:
+            list of values.
+
+        Raises:
+            KeyError if entity is not known.
+        """
+
+        state = current_app.extensions['autocomplete']
+        column = state.sources[entity]
+
+        index, built_at = state.indexes.get(entity, (None, None))
+        if index is None or time.monotonic() - built_at > current_app.config['AUTOCOMPLETE_TTL']:
+            index = PrefixIndex(value for value, in column.class_.query.with_entities(column).distinct())
+            state.indexes[entity] = (index, time.monotonic())
+
+        return index.search(prefix, limit or current_app.config['AUTOCOMPLETE_LIMIT'])
+
+
+class _AutocompleteState(object):
+    def __init__(self, sources):
+        self.sources = sources
+        self.indexes = {}
+
+
+def _after_flush(session, flush_context):
+    changed_models = session.info.setdefault('autocomplete_models', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed_models.add(type(obj))
+
+
+def _after_commit(session):
+    changed_models = session.info.pop('autocomplete_models', None)
+    state = current_app.extensions.get('autocomplete') if current_app else None
+    if not changed_models or state is None:
+        return
+
+    for entity, column in state.sources.items():
+        if column.class_ in changed_models:
+            state.indexes.pop(entity, None)
@@ -0,0 +1,288 @@
+""" This module implements a server-side cache for the data shown in the detail pages (see_enzyme, see_reaction,
+see_metabolite, and see_model).
+
+Cached data is keyed by page, i.e. (entity type, key), e.g. ('enzyme', 'PFK1'), and by a version token of the page.
+Invalidating a page replaces its version token, so data computed from the database before the change can never be
+read afterwards, even if it is stored after the invalidation. Clearing the cache replaces a global generation token.
+
+Pages are invalidated when a session that changed the data they show is committed, see init_app. The pages affected
+by a change of an object are given by a function, e.g. app.utils.detail_pages.get_dependent_pages.
+
+The backend is chosen with DETAIL_CACHE_BACKEND:
+ - 'lru': in-process LRU cache with DETAIL_CACHE_MAX_SIZE entries (default).
+ - 'redis': Redis, or any server with the same protocol, at DETAIL_CACHE_REDIS_URL. It needs the redis package. The
+   size is bounded by the server's maxmemory policy.
+ - 'null': no caching.
+Entries expire DETAIL_CACHE_TTL seconds after being stored.
+
+Bulk loaders write with core statements, which do not trigger session events, so they clear the cache when done. The
+LRU cache is per process: a loader run from the command line only reaches the web server through a shared backend,
+e.g. Redis, otherwise pages are refreshed when their entries expire.
+
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import event
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class NullCacheBackend(object):
+    """
+    A backend that stores nothing.
+    """
+
+    def get_many(self, keys):
+        return [None for _ in keys]
+
+    def set(self, key, value):
+        pass
+
+
+class LRUCacheBackend(object):
+    """
+    In-process cache that evicts the least recently used entries once it holds max_size entries, and entries older than
+    their ttl.
+
+    Args:
+        max_size: maximum number of entries.
+        default_ttl: seconds after which an entry expires, None for no expiration.
+    """
+
+    def __init__(self, max_size=1000, default_ttl=None):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    values.append(None)
+                elif entry[1] is not None and entry[1] <= now:
+                    del self._entries[key]
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[0])
+        return values
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.default_ttl if self.default_ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend(object):
+    """
+    Cache stored in Redis, values are serialized as JSON.
+
+    Args:
+        client: a redis.Redis client or any object with the same get/mget/set methods, e.g. a local stand-in.
+        default_ttl: seconds after which an entry expires, None for no expiration.
+        prefix: prefix of all keys, so that the database can be shared.
+    """
+
+    def __init__(self, client, default_ttl=None, prefix='kinetics_db:'):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, default_ttl=None):
+        if redis is None:
+            raise RuntimeError('The redis package is needed for DETAIL_CACHE_BACKEND = \'redis\'.')
+        return cls(redis.Redis.from_url(url), default_ttl=default_ttl)
+
+    def get_many(self, keys):
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [json.loads(value) if value is not None else None for value in values]
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(self.default_ttl) if self.default_ttl else None)
+
+
+def _new_token():
+    return uuid.uuid4().hex[:16]
+
+
+class DetailCache(object):
+    """
+    Flask extension with the cache of the detail pages, use get_or_set to read through it.
+    """
+
+    GENERATION_KEY = 'generation'
+
+    def __init__(self, app=None, get_dependent_pages=None):
+        if app is not None:
+            self.init_app(app, get_dependent_pages)
+
+    def init_app(self, app, get_dependent_pages=None):
+        """
+        Sets up the backend from the app config and the invalidation of pages on commit.
+
+        Args:
+            app: the flask app.
+            get_dependent_pages: function that takes a list of model objects and whether they have been flushed, and
+                returns the set of pages that show their data.
+
+        Returns:
+            None
+        """
+
+        app.config.setdefault('DETAIL_CACHE_BACKEND', 'lru')
+        app.config.setdefault('DETAIL_CACHE_TTL', 300)
+        app.config.setdefault('DETAIL_CACHE_MAX_SIZE', 1000)
+        app.config.setdefault('DETAIL_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+        backend = app.config['DETAIL_CACHE_BACKEND']
+        ttl = app.config['DETAIL_CACHE_TTL']
+        if backend == 'lru':
+            backend = LRUCacheBackend(max_size=app.config['DETAIL_CACHE_MAX_SIZE'], default_ttl=ttl)
+        elif backend == 'redis':
+            backend = RedisCacheBackend.from_url(app.config['DETAIL_CACHE_REDIS_URL'], default_ttl=ttl)
+        elif backend == 'null':
+            backend = NullCacheBackend()
+        elif isinstance(backend, str):
+            raise ValueError('Unknown DETAIL_CACHE_BACKEND: ' + backend)
+
+        app.extensions['detail_cache'] = _DetailCacheState(self, backend, get_dependent_pages)
+
+        if not event.contains(SignallingSession, 'before_flush', _before_flush):
+            event.listen(SignallingSession, 'before_flush', _before_flush)
+            event.listen(SignallingSession, 'after_flush_postexec', _after_flush_postexec)
+            event.listen(SignallingSession, 'after_commit', _after_commit)
+            event.listen(SignallingSession, 'after_soft_rollback', _after_soft_rollback)
+
+    @property
+    def backend(self):
+        return current_app.extensions['detail_cache'].backend
+
+    def _get_version_keys(self, page):
+        return [self.GENERATION_KEY, 'version:' + ':'.join(page)]
+
+    def get_or_set(self, page, get_data):
+        """
+        Gets the data of page from the cache, or computes it with get_data and stores it.
+
+        Args:
+            page: tuple (entity type, key), e.g. ('enzyme', 'PFK1').
+            get_data: function without arguments that returns the data, it must be serializable as JSON.
+
+        Returns:
+            the page data.
+        """
+
+        backend = self.backend
+        generation_key, version_key = self._get_version_keys(page)
+        generation, version = backend.get_many([generation_key, version_key])
+        # a missing token, e.g. evicted, is replaced by a new one, which only causes a cache miss
+        if generation is None:
+            generation = _new_token()
+            backend.set(generation_key, generation)
+        if version is None:
+            version = _new_token()
+            backend.set(version_key, version)
+
+        data_key = ':'.join(('data', generation) + tuple(page) + (version,))
+        data = backend.get_many([data_key])[0]
+        if data is None:
+            data = get_data()
+            backend.set(data_key, data)
+
+        return data
+
+    def invalidate(self, pages):
+        """
+        Invalidates pages.
+
+        Args:
+            pages: iterable of tuples (entity type, key).
+
+        Returns:
+            None
+        """
+
+        backend = self.backend
+        for page in pages:
+            backend.set(self._get_version_keys(page)[1], _new_token())
+
+    def clear(self):
+        """
+        Invalidates all pages, e.g. after bulk loads that do not go through the ORM.
+        """
+
+        self.backend.set(self.GENERATION_KEY, _new_token())
+
+
+class _DetailCacheState(object):
+    def __init__(self, cache, backend, get_dependent_pages):
+        self.cache = cache
+        self.backend = backend
+        self.get_dependent_pages = get_dependent_pages
+
+
+def _get_state():
+    state = current_app.extensions.get('detail_cache') if current_app else None
+    return state if state is not None and state.get_dependent_pages is not None else None
+
+
+def _add_dependent_pages(session, state, objects, after_flush=False):
+    pages = session.info.setdefault('detail_cache_pages', set())
+    with session.no_autoflush:
+        pages.update(state.get_dependent_pages(objects, after_flush))
+
+
+def _before_flush(session, flush_context, instances):
+    state = _get_state()
+    if state is None:
+        return
+
+    # pages showing the data as it was before the flush, e.g. under the old name or of a deleted association, and the
+    # pages of the pending changes of collections, whose history is reset by the flush
+    _add_dependent_pages(session, state, list(session.new) + list(session.dirty) + list(session.deleted))
+    session.info.setdefault('detail_cache_objects', []).extend(list(session.new) + list(session.dirty))
+
+
+def _after_flush_postexec(session, flush_context):
+    state = _get_state()
+    if state is None:
+        return
+
+    # pages showing the data as it is now, new objects have their ids and relationships at this point
+    objects = session.info.pop('detail_cache_objects', [])
+    _add_dependent_pages(session, state, [obj for obj in objects if obj in session], after_flush=True)
+
+
+def _after_commit(session):
+    pages = session.info.pop('detail_cache_pages', None)
+    state = _get_state()
+    if pages and state is not None:
+        state.cache.invalidate(pages)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # pages of a rolled back savepoint are kept, invalidating too many pages is harmless
+    if previous_transaction.parent is None:
+        session.info.pop('detail_cache_pages', None)
+        session.info.pop('detail_cache_objects', None)
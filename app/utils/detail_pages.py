@@ -0,0 +1,255 @@
+""" This module implements the dependencies of the detail pages (see_enzyme, see_reaction, see_metabolite, and see_model)
+on the database entries, i.e. which pages have to be invalidated in the detail cache when an entry is changed.
+
+A page is a tuple (entity type, key): ('enzyme', isoenzyme), ('reaction', acronym), ('metabolite', grasp_id), or
+('model', name).
+
+get_dependent_pages is called before each flush for the new, changed and deleted objects, when relationships still point
+to the old entries, and after it for the new and changed objects, when they point to the new ones. So the pages showing
+an object before and after the change are both invalidated.
+
+The models of regulations and of enzyme reaction organisms are only looked up before the flush, where the added and
+removed ones are in the collection history, and the unchanged ones of all the objects are queried at once, one query per
+association table.
+
+"""
+
+from collections import defaultdict, namedtuple
+
+from sqlalchemy import inspect, or_
+
+from app import db
+from app.models import ChebiIds, Compartment, Enzyme, EnzymeOrganism, EnzymeReactionActivation, \
+    EnzymeReactionEffector, EnzymeReactionInhibition, EnzymeReactionMiscInfo, EnzymeReactionOrganism, \
+    EnzymeStructure, EvidenceLevel, GibbsEnergy, GibbsEnergyReactionModel, Metabolite, Model, ModelAssumptions, \
+    Organism, Reaction, ReactionMetabolite
+
+
+def _get_deleted(obj, key):
+    # the history of an attribute that was never set, e.g. of a new object, is blank
+    return [value for value in inspect(obj).attrs[key].history.deleted or () if value is not None]
+
+
+def _get_values(obj, key):
+    """
+    Gets the current and the replaced values of an attribute.
+    """
+
+    value = getattr(obj, key)
+    if value is None:
+        values = []
+    elif hasattr(value, '__iter__') and not isinstance(value, str):
+        values = list(value)
+    else:
+        values = [value]
+    return values + _get_deleted(obj, key)
+
+
+def _is_changed(obj, *keys):
+    # whether obj is being deleted or any of keys is being changed, i.e. whether pages showing it through other
+    # entries are affected
+    state = inspect(obj)
+    return (state.session is not None and obj in state.session.deleted) or \
+        any(_get_deleted(obj, key) for key in keys)
+
+
+def _get_pages(entity_type, values):
+    return set((entity_type, value) for value in values if value is not None)
+
+
+def _get_enzyme_pages(enzymes):
+    return _get_pages('enzyme', [enzyme.isoenzyme for enzyme in enzymes])
+
+
+def _get_reaction_pages(reactions):
+    return _get_pages('reaction', [reaction.acronym for reaction in reactions])
+
+
+def _get_metabolite_pages(metabolites):
+    return _get_pages('metabolite', [metabolite.grasp_id for metabolite in metabolites])
+
+
+def _get_model_pages(models):
+    return _get_pages('model', [model.name for model in models])
+
+
+# stands for the model pages of owner, resolved for all the objects at once in _resolve_model_pages
+_ModelsOf = namedtuple('_ModelsOf', ['owner'])
+
+
+def _get_owned_model_pages(owner):
+    return {_ModelsOf(owner)}
+
+
+def _get_unchanged_model_names(owners):
+    """
+    Gets the names of the models already associated with persistent owners, one query per association table.
+    """
+
+    owner_ids = defaultdict(dict)
+    for owner in owners:
+        owner_ids[type(owner)][inspect(owner).identity[0]] = owner
+
+    names = defaultdict(list)
+    for owner_type, owners_by_id in owner_ids.items():
+        relationship = inspect(owner_type).relationships['models']
+        owner_id_column = relationship.synchronize_pairs[0][1]
+        model_id_column = relationship.secondary_synchronize_pairs[0][1]
+        rows = db.session.query(owner_id_column, Model.name) \
+            .join(Model, Model.id == model_id_column) \
+            .filter(owner_id_column.in_(list(owners_by_id)))
+        for owner_id, name in rows:
+            names[owners_by_id[owner_id]].append(name)
+    return names
+
+
+def _resolve_model_pages(pages, after_flush):
+    owners = [page.owner for page in pages if isinstance(page, _ModelsOf)]
+    pages = set(page for page in pages if not isinstance(page, _ModelsOf))
+    # the models of the objects of a flush are all known before it, and the flush does not change those of the others
+    if after_flush or not owners:
+        return pages
+
+    unchanged_names = _get_unchanged_model_names([owner for owner in owners if inspect(owner).has_identity])
+    for owner in owners:
+        history = inspect(owner).attrs.models.history
+        pages.update(_get_model_pages(list(history.added) + list(history.deleted)))
+        pages.update(_get_pages('model', unchanged_names.get(owner, [])))
+    return pages
+
+
+def _get_enzyme_reaction_organism_pages(enz_rxn_orgs):
+    pages = set()
+    for enz_rxn_org in enz_rxn_orgs:
+        pages.update(_get_enzyme_pages(_get_values(enz_rxn_org, 'enzyme')))
+        pages.update(_get_reaction_pages(_get_values(enz_rxn_org, 'reaction')))
+        pages.update(_get_owned_model_pages(enz_rxn_org))
+    return pages
+
+
+def _get_regulation_pages(regulation):
+    # inhibitors, activators, effectors and misc info are shown in the pages of the enzyme and of their models
+    pages = _get_enzyme_pages(enz_rxn_org.enzyme for enz_rxn_org in
+                              _get_values(regulation, 'enzyme_reaction_organism'))
+    pages.update(_get_owned_model_pages(regulation))
+    return pages
+
+
+def _get_enzyme_dependent_pages(enzyme):
+    pages = _get_pages('enzyme', _get_values(enzyme, 'isoenzyme'))
+    if _is_changed(enzyme, 'isoenzyme'):
+        pages.update(_get_enzyme_reaction_organism_pages(enzyme.enzyme_reaction_organisms))
+    return pages
+
+
+def _get_reaction_dependent_pages(reaction):
+    pages = _get_pages('reaction', _get_values(reaction, 'acronym'))
+    if _is_changed(reaction, 'acronym', 'equation'):
+        pages.update(_get_enzyme_reaction_organism_pages(reaction.enzyme_reaction_organisms))
+        pages.update(_get_metabolite_pages(rxn_met.metabolite for rxn_met in reaction.metabolites))
+    return pages
+
+
+def _get_metabolite_dependent_pages(metabolite):
+    pages = _get_pages('metabolite', _get_values(metabolite, 'grasp_id'))
+    if _is_changed(metabolite, 'bigg_id'):
+        regulations = []
+        for data_model, met_columns in ((EnzymeReactionInhibition, (EnzymeReactionInhibition.inhibitor_met_id,
+                                                                    EnzymeReactionInhibition.affected_met_id)),
+                                        (EnzymeReactionActivation, (EnzymeReactionActivation.activator_met_id,)),
+                                        (EnzymeReactionEffector, (EnzymeReactionEffector.effector_met_id,))):
+            regulations.extend(data_model.query.filter(or_(*[column == metabolite.id for column in met_columns])))
+        for regulation in regulations:
+            pages.update(_get_regulation_pages(regulation))
+    return pages
+
+
+def _get_model_dependent_pages(model):
+    pages = _get_pages('model', _get_values(model, 'name'))
+    if _is_changed(model, 'name'):
+        pages.update(_get_enzyme_reaction_organism_pages(model.enzyme_reaction_organisms))
+    else:
+        # only the reactions added to or removed from the model
+        enz_rxn_orgs = inspect(model).attrs.enzyme_reaction_organisms.history
+        pages.update(_get_enzyme_reaction_organism_pages(list(enz_rxn_orgs.added) + list(enz_rxn_orgs.deleted)))
+    return pages
+
+
+def _get_organism_dependent_pages(organism):
+    if not _is_changed(organism, 'name'):
+        return set()
+
+    pages = _get_enzyme_pages(enzyme_structure.enzyme for enzyme_structure in organism.enzyme_structures)
+    pages.update(_get_enzyme_pages(enzyme_organism.enzyme for enzyme_organism in organism.enzyme_organisms))
+    pages.update(_get_enzyme_reaction_organism_pages(organism.enzyme_reaction_organisms))
+    pages.update(_get_model_pages(organism.models))
+    return pages
+
+
+def _get_evidence_level_dependent_pages(evidence_level):
+    if not _is_changed(evidence_level, 'description'):
+        return set()
+
+    pages = set()
+    for regulations in (evidence_level.enzyme_reaction_inhibitors, evidence_level.enzyme_reaction_activators,
+                        evidence_level.enzyme_reaction_effectors, evidence_level.enzyme_reaction_misc_infos):
+        for regulation in regulations:
+            pages.update(_get_regulation_pages(regulation))
+    return pages
+
+
+def _get_gibbs_energy_dependent_pages(gibbs_energy):
+    return _get_reaction_pages(gibbs_energy_rxn_model.reaction
+                               for gibbs_energy_rxn_model in gibbs_energy.gibbs_energy_reaction_models)
+
+
+def _get_compartment_dependent_pages(compartment):
+    if not _is_changed(compartment, 'bigg_id'):
+        return set()
+    return _get_metabolite_pages(compartment.metabolites)
+
+
+_DEPENDENT_PAGES = {
+    Enzyme: _get_enzyme_dependent_pages,
+    EnzymeStructure: lambda enzyme_structure: _get_enzyme_pages(_get_values(enzyme_structure, 'enzyme')),
+    EnzymeOrganism: lambda enzyme_organism: _get_enzyme_pages(_get_values(enzyme_organism, 'enzyme')),
+    EnzymeReactionOrganism: lambda enz_rxn_org: _get_enzyme_reaction_organism_pages([enz_rxn_org]),
+    EnzymeReactionInhibition: _get_regulation_pages,
+    EnzymeReactionActivation: _get_regulation_pages,
+    EnzymeReactionEffector: _get_regulation_pages,
+    EnzymeReactionMiscInfo: _get_regulation_pages,
+    EvidenceLevel: _get_evidence_level_dependent_pages,
+    Reaction: _get_reaction_dependent_pages,
+    ReactionMetabolite: lambda rxn_met: _get_reaction_pages(_get_values(rxn_met, 'reaction')) |
+                                        _get_metabolite_pages(_get_values(rxn_met, 'metabolite')),
+    GibbsEnergyReactionModel: lambda gibbs_energy_rxn_model:
+        _get_reaction_pages(_get_values(gibbs_energy_rxn_model, 'reaction')) |
+        _get_model_pages(_get_values(gibbs_energy_rxn_model, 'model')),
+    GibbsEnergy: _get_gibbs_energy_dependent_pages,
+    Metabolite: _get_metabolite_dependent_pages,
+    ChebiIds: lambda chebi: _get_metabolite_pages(_get_values(chebi, 'metabolites')),
+    Compartment: _get_compartment_dependent_pages,
+    Model: _get_model_dependent_pages,
+    ModelAssumptions: lambda model_assumption: _get_model_pages(_get_values(model_assumption, 'model')),
+    Organism: _get_organism_dependent_pages,
+}
+
+
+def get_dependent_pages(objects, after_flush=False):
+    """
+    Gets the detail pages that show data of objects, to be invalidated when they are added, changed or deleted.
+
+    Args:
+        objects: list of model objects.
+        after_flush: whether objects have been flushed, see the module docstring.
+
+    Returns:
+        set of tuples (entity type, key), empty for objects that are not shown in any detail page, e.g. users.
+    """
+
+    pages = set()
+    for obj in objects:
+        get_pages = _DEPENDENT_PAGES.get(type(obj))
+        if get_pages:
+            pages.update(get_pages(obj))
+    return _resolve_model_pages(pages, after_flush)
@@ -0,0 +1,144 @@
+""" This module implements the resolution of metabolites by bigg id.
+
+Metabolites are stored without compartment, e.g. adp_c and adp_m are both the metabolite adp, which is linked to the
+compartments c and m.
+
+A MetaboliteResolver takes a list of bigg ids, strips their compartments in one step, and resolves the ones it has not
+seen before with a single query, adding the unknown ones to the session. Common cofactors like atp, nad or h2o are thus
+looked up once per import instead of once per reaction. get_metabolite_resolver returns the resolver of the current app
+context, i.e. of the current request, or of the whole import for the data loading scripts.
+
+"""
+
+import pandas as pd
+from flask import g
+from sqlalchemy import inspect
+
+from app import db
+from app.models import Metabolite, metabolite_compartment
+
+
+_BIGG_ID_RE = r'(\w+)_\w*'
+
+
+def get_metabolite_bigg_id(bigg_id):
+    """
+    Removes the compartment from a metabolite bigg id, if there is one, e.g. adp_c becomes adp.
+
+    Args:
+        bigg_id: bigg_id for the metabolite, with or without compartment.
+
+    Returns:
+        the bigg_id without compartment.
+    """
+
+    return get_metabolite_bigg_ids([bigg_id])[0]
+
+
+def get_metabolite_bigg_ids(bigg_ids):
+    """
+    Removes the compartments from a list of metabolite bigg ids, e.g. ['adp_c', 'atp'] becomes ['adp', 'atp'].
+
+    Args:
+        bigg_ids: list of bigg_ids, with or without compartment.
+
+    Returns:
+        list with the bigg_ids without compartment.
+    """
+
+    bigg_ids = pd.Series(list(bigg_ids), dtype=object)
+    return bigg_ids.str.extract(_BIGG_ID_RE, expand=False).fillna(bigg_ids).tolist()
+
+
+class MetaboliteResolver(object):
+    """
+    Resolves bigg ids to metabolites, adding the ones that are not in the database.
+    """
+
+    def __init__(self):
+        self._bigg_ids = {}
+        self._metabolites = {}
+
+    def _strip_compartments(self, bigg_ids):
+        new_bigg_ids = list(set(bigg_ids) - set(self._bigg_ids))
+        if new_bigg_ids:
+            self._bigg_ids.update(zip(new_bigg_ids, get_metabolite_bigg_ids(new_bigg_ids)))
+        return [self._bigg_ids[bigg_id] for bigg_id in bigg_ids]
+
+    def resolve(self, bigg_ids, create=True):
+        """
+        Gets the metabolites for a list of bigg ids, the ones not seen before are looked up with a single query.
+
+        Args:
+            bigg_ids: list of bigg_ids, with or without compartment.
+            create: whether to add the metabolites that are not in the database to the session.
+
+        Returns:
+            list with the metabolite of each bigg_id, or None for the missing ones if create is False.
+        """
+
+        bigg_ids = self._strip_compartments(bigg_ids)
+
+        # metabolites added before a rollback are not in the session anymore
+        for bigg_id in set(bigg_ids) & set(self._metabolites):
+            state = inspect(self._metabolites[bigg_id])
+            if state.transient or state.detached:
+                del self._metabolites[bigg_id]
+
+        missing = set(bigg_ids) - set(self._metabolites)
+        if missing:
+            for metabolite in Metabolite.query.filter(Metabolite.bigg_id.in_(missing)).order_by(Metabolite.id):
+                self._metabolites.setdefault(metabolite.bigg_id, metabolite)
+
+        metabolites = []
+        for bigg_id in bigg_ids:
+            metabolite = self._metabolites.get(bigg_id)
+            if metabolite is None and create:
+                metabolite = Metabolite(bigg_id=bigg_id, grasp_id=bigg_id)
+                db.session.add(metabolite)
+                self._metabolites[bigg_id] = metabolite
+            metabolites.append(metabolite)
+
+        return metabolites
+
+    @staticmethod
+    def add_compartments(metabolite_compartments):
+        """
+        Links metabolites to compartments. The existing links are loaded with a single query and the missing ones are
+        inserted in one statement when the session is flushed.
+
+        Args:
+            metabolite_compartments: list of tuples (metabolite, compartment), compartment may be None.
+
+        Returns:
+            None
+        """
+
+        metabolite_compartments = [(metabolite, compartment) for metabolite, compartment in metabolite_compartments
+                                   if compartment is not None]
+
+        metabolite_ids = set(metabolite.id for metabolite, _ in metabolite_compartments if metabolite.id is not None)
+        existing = set()
+        if metabolite_ids:
+            existing = set(db.session.query(metabolite_compartment.c.metabolite_id,
+                                            metabolite_compartment.c.compartment_id)
+                           .filter(metabolite_compartment.c.metabolite_id.in_(metabolite_ids)))
+
+        for metabolite, compartment in metabolite_compartments:
+            key = (metabolite.id, compartment.id) if metabolite.id is not None else (metabolite, compartment.id)
+            if key not in existing:
+                existing.add(key)
+                metabolite.compartments.append(compartment)
+
+
+def get_metabolite_resolver():
+    """
+    Gets the metabolite resolver of the current app context.
+
+    Returns:
+        MetaboliteResolver
+    """
+
+    if 'metabolite_resolver' not in g:
+        g.metabolite_resolver = MetaboliteResolver()
+    return g.metabolite_resolver
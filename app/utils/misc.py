@@ -0,0 +1,14 @@
+def clear_data(db):
+    """
+    Deletes all rows from all tables, children first, without dropping the tables.
+
+    Args:
+        db: the flask-sqlalchemy database object.
+
+    Returns:
+        None
+    """
+
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
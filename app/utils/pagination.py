@@ -0,0 +1,188 @@
+""" This module implements keyset (seek) pagination for the data lists.
+
+Instead of OFFSET n, each page is fetched with a WHERE clause on the sort key of the last (or first) row of the
+previous page, so all pages cost the same regardless of how deep they are. The position is passed around as an opaque
+cursor token.
+
+NULL values in the sort columns are treated as greater than any other value, as in a default PostgreSQL index.
+
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.types import DateTime
+
+CURSOR_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def _is_nullable(column):
+    return getattr(column.expression, 'nullable', True)
+
+
+def _encode_value(value):
+    return value.strftime(CURSOR_DATETIME_FORMAT) if isinstance(value, datetime) else value
+
+
+def _decode_value(column, value):
+    if value is not None and isinstance(column.expression.type, DateTime):
+        return datetime.strptime(value, CURSOR_DATETIME_FORMAT)
+    return value
+
+
+def encode_cursor(values, backward=False):
+    """
+    Encodes the sort key of a row into a url safe cursor token.
+
+    Args:
+        values: list with the values of the sort columns.
+        backward: if True the cursor points to the page before the row, otherwise to the page after it.
+
+    Returns:
+        the cursor token.
+    """
+
+    data = json.dumps(['prev' if backward else 'next', [_encode_value(value) for value in values]])
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_columns):
+    """
+    Decodes a cursor token created by encode_cursor.
+
+    Args:
+        cursor: the cursor token.
+        sort_columns: the sort columns the cursor was created for.
+
+    Returns:
+        tuple (values, backward).
+
+    Raises:
+        ValueError if the cursor is not valid for sort_columns.
+    """
+
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8'))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor: ' + str(cursor))
+
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(sort_columns):
+        raise ValueError('Invalid cursor: ' + str(cursor))
+
+    return [_decode_value(column, value) for column, value in zip(sort_columns, values)], direction == 'prev'
+
+
+def _get_order_by(sort_columns, descending):
+    order_by = []
+    for column in sort_columns:
+        if not _is_nullable(column):
+            order_by.append(column.desc() if descending else column.asc())
+        else:
+            order_by.append(column.desc().nullsfirst() if descending else column.asc().nullslast())
+    return order_by
+
+
+def _get_seek_filter(sort_columns, values, descending):
+    """
+    Gets the filter for the rows that come after values when sorting by sort_columns, i.e. the expansion of
+    (col_1, ..., col_n) > (value_1, ..., value_n) taking into account NULLs.
+    """
+
+    conditions = []
+    equal_conditions = []
+    for column, value in zip(sort_columns, values):
+        if value is None:
+            # NULLs are the greatest values, nothing comes after them in ascending order
+            after = column.isnot(None) if descending else None
+            equal = column.is_(None)
+        else:
+            if descending:
+                after = column < value
+            else:
+                after = or_(column > value, column.is_(None)) if _is_nullable(column) else column > value
+            equal = column == value
+
+        if after is not None:
+            conditions.append(and_(*(equal_conditions + [after])))
+        equal_conditions.append(equal)
+
+    return or_(*conditions)
+
+
+class KeysetPage(object):
+    """
+    A page of rows fetched with keyset_paginate, it can be used like the Pagination object of Flask-SQLAlchemy.
+    """
+
+    def __init__(self, query, items, sort_columns, has_next, has_prev):
+        self.query = query
+        self.items = items
+        self.sort_columns = sort_columns
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self._total = None
+
+    def _get_sort_key(self, item):
+        return [getattr(item, column.key) for column in self.sort_columns]
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self._get_sort_key(self.items[-1])) if self.has_next else None
+
+    @property
+    def prev_cursor(self):
+        return encode_cursor(self._get_sort_key(self.items[0]), backward=True) if self.has_prev else None
+
+    @property
+    def total(self):
+        """
+        The total number of rows, the count query only runs the first time it is needed.
+        """
+
+        if self._total is None:
+            self._total = self.query.order_by(None).count()
+        return self._total
+
+
+def keyset_paginate(query, sort_columns, cursor=None, per_page=20, descending=False):
+    """
+    Gets the page of query that comes after (or before) cursor, sorted by sort_columns, with a single query.
+
+    An invalid cursor is handled as no cursor, i.e. the first page is returned.
+
+    Args:
+        query: the query to paginate, without order_by.
+        sort_columns: list of model columns to sort by, the last one must be unique, e.g. [Reaction.name, Reaction.id].
+        cursor: a next_cursor or prev_cursor of a previous page, or None for the first page.
+        per_page: maximum number of rows per page.
+        descending: if True all columns are sorted in descending order.
+
+    Returns:
+        KeysetPage
+    """
+
+    values, backward = None, False
+    if cursor:
+        try:
+            values, backward = decode_cursor(cursor, sort_columns)
+        except ValueError:
+            pass
+
+    page_query = query
+    if values is not None:
+        # going backward is going forward in the reversed order
+        page_query = page_query.filter(_get_seek_filter(sort_columns, values, descending != backward))
+    page_query = page_query.order_by(*_get_order_by(sort_columns, descending != backward))
+
+    items = page_query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if not backward:
+        return KeysetPage(query, items, sort_columns, has_next=has_more, has_prev=values is not None)
+
+    if not items:
+        return keyset_paginate(query, sort_columns, per_page=per_page, descending=descending)
+    return KeysetPage(query, items[::-1], sort_columns, has_next=True, has_prev=has_more)
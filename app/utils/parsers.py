@@ -1,38 +1,52 @@
 from builtins import object
 from re import compile
 from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+
+import pandas as pd
+
+REACTION_CACHE_SIZE = 4096
+
+# separators tried by parse_input_list, in order of preference
+INPUT_LIST_SEPARATORS = (', ', '; ', ' ', ',', ';')
+
+# maximum number of metabolite ids and coefficients remembered by each ReactionParser
+_MAX_KNOWN_TOKENS = 100000
 
 
 class ReactionParser(object):
     """
-    ReactionParser class, whose goal is to parse a reaction string in the format: A_c + B_c <-> P_c
+    ReactionParser class, whose goal is to parse a reaction string in the format: A_c + 2 B_c <-> P_c [lb, ub] @obj
+
+    Reactions in the usual form (single spaces around '+' and the direction) are split with plain string operations.
+    Any other string is split into tokens (numbers, metabolite ids and operators) with a single regex scan and the
+    tokens are parsed in one pass, so there is no backtracking over the whole reaction string and syntax errors report
+    the position of the first unexpected token.
 
     """
 
     def __init__(self):
         id_re = '[a-zA-Z]\w*'
-        pos_float_re = '\d+(?:\.\d+)?(?:e[+-]?\d+)?'
         float_re = '-?\d+(?:\.\d+)?(?:e[+-]?\d+)?'
 
-        compound = '(?:' + pos_float_re + '\s+)?' + id_re
-        expression = compound + '(?:\s*\+\s*' + compound + ')*'
-        bounds = '\[\s*(?P<lb>' + float_re + ')?\s*,\s*(?P<ub>' + float_re + ')?\s*\]'
-        objective = '@' + float_re
-        reaction ='\s*(?P<substrates>' + expression + ')?' + \
-                   '\s*(?P<direction>-->|<->)' + \
-                   '\s*(?P<products>' + expression + ')?' + \
-                   '\s*(?P<bounds>' + bounds + ')?' + \
-                   '\s*(?P<objective>' + objective + ')?$'
+        # each token is (leading whitespace, number, metabolite id, operator, unexpected character)
+        self.regex_token = compile('(\s*)(?:(' + float_re + ')|(' + id_re + ')|(-->|<->|[+\[\],@])|(\S))')
+        self.regex_met_id = compile(id_re)
+        self.regex_coeff = compile('\d+(?:\.\d+)?(?:e[+-]?\d+)?')
+        self.regex_options = compile('(?:\[\s*(?:' + float_re + ')?\s*,\s*(?:' + float_re + ')?\s*\])?'
+                                     '\s*(?:@' + float_re + ')?')
 
-        self.regex_compound = compile('(?P<coeff>' + pos_float_re + '\s+)?(?P<met_id>' + id_re + ')')
-        self.regex_bounds = compile(bounds)
-        self.regex_reaction = compile(reaction)
+        self._met_ids = set()
+        self._coeffs = {}
 
     def parse_reaction(self, reaction_str):
         """
         Given a reaction string in the form A_c + B_c <-> P_c, parses it to retrieve its reversibility (True or False)
         and stoichiometry in the form of a dictionary {metabolite_id : stoichoimetric_coefficient}.
 
+        Optional flux bounds and objective coefficient, e.g. A_c --> P_c [0, 10] @1, are validated but not returned.
+
         Args:
             reaction_str: a reaction string in the form A_c + B_c <-> P_c
 
@@ -40,55 +54,217 @@ class ReactionParser(object):
             reaction reverisibility (True or False), and stoichiometry dictionary
         """
 
-        match = self.regex_reaction.match(reaction_str)
+        result = self._parse_terms(reaction_str)
+        if result is not None:
+            return result
+
+        return self._parse_tokens(reaction_str)
 
-        if not match:
-            raise SyntaxError('Unable to parse: ' + reaction_str)
+    def _parse_terms(self, reaction_str):
+        """
+        Fast path for reaction strings in the usual form, with single spaces around '+', the direction, and the bounds
+        or objective, e.g. 2 A_c + B_c <-> P_c [0, 10] @1.
 
-        reversible = match.group('direction') == '<->'
-        substrates = match.group('substrates')
-        products = match.group('products')
+        Valid metabolite ids and coefficients are remembered, so they are only checked the first time they are seen.
 
+        Args:
+            reaction_str: a reaction string in the form A_c + B_c <-> P_c
+
+        Returns:
+            reaction reversibility and stoichiometry dictionary, or None if reaction_str is not in that form.
+        """
+
+        reaction_str, sep, options = reaction_str.partition(' [')
+        if not sep:
+            reaction_str, sep, options = reaction_str.partition(' @')
+        if sep and not self.regex_options.fullmatch(sep[1:] + options):
+            return None
+
+        substrates, direction, products = reaction_str.partition(' --> ')
+        if not direction:
+            substrates, direction, products = reaction_str.partition(' <-> ')
+            if not direction:
+                return None
+
+        met_ids = self._met_ids
+        coeffs = self._coeffs
         stoichiometry = OrderedDict()
 
-        if substrates:
-            left_coeffs = self.parse_coefficients(substrates, sense=-1.0)
-            stoichiometry.update(left_coeffs)
+        for sense, expression in ((-1.0, substrates), (1.0, products)):
+            for term in expression.split(' + '):
+                coeff_str, _, m_id = term.rpartition(' ')
+
+                if m_id not in met_ids:
+                    if not self.regex_met_id.fullmatch(m_id):
+                        return None
+                    if len(met_ids) < _MAX_KNOWN_TOKENS:
+                        met_ids.add(m_id)
+
+                if coeff_str:
+                    coeff = coeffs.get(coeff_str)
+                    if coeff is None:
+                        if not self.regex_coeff.fullmatch(coeff_str):
+                            return None
+                        coeff = float(coeff_str)
+                        if len(coeffs) < _MAX_KNOWN_TOKENS:
+                            coeffs[coeff_str] = coeff
+                    val = sense * coeff
+                else:
+                    val = sense
 
-        if products:
-            right_coeffs = self.parse_coefficients(products, sense=1.0)
-            for m_id, val in right_coeffs:
-                if m_id in stoichiometry:
+                if sense > 0 and m_id in stoichiometry:
                     new_val = val + stoichiometry[m_id]
                     stoichiometry[m_id] = new_val
                 else:
                     stoichiometry[m_id] = val
 
-            return reversible, stoichiometry
+        return direction == ' <-> ', stoichiometry
+
+    def _parse_tokens(self, reaction_str):
+        """
+        Parses any reaction string, including bounds and objective, and raises a SyntaxError with the position of the
+        first unexpected token if it is not valid.
+
+        Args:
+            reaction_str: a reaction string in the form A_c + B_c <-> P_c [lb, ub] @obj
+
+        Returns:
+            reaction reversibility and stoichiometry dictionary.
+        """
+
+        tokens = self.regex_token.findall(reaction_str)
+        n_tokens = len(tokens)
+        i = 0
+
+        stoichiometry = OrderedDict()
+        reversible = None
+        sense = -1.0
+
+        while True:
+            coefficients = []
+            if i < n_tokens and (tokens[i][1] or tokens[i][2]):
+                while True:
+                    _, number, met_id, _, _ = tokens[i]
+                    if number:
+                        if number[0] == '-':
+                            self._raise_syntax_error(reaction_str, tokens, i, 'a positive coefficient')
+                        i += 1
+                        if i == n_tokens or not tokens[i][2] or not tokens[i][0]:
+                            self._raise_syntax_error(reaction_str, tokens, i, 'a space and a metabolite id')
+                        coefficients.append((tokens[i][2], sense * float(number)))
+                    elif met_id:
+                        coefficients.append((met_id, sense))
+                    else:
+                        self._raise_syntax_error(reaction_str, tokens, i, 'a metabolite id')
+
+                    i += 1
+                    if i < n_tokens and tokens[i][3] == '+':
+                        i += 1
+                        if i == n_tokens:
+                            self._raise_syntax_error(reaction_str, tokens, i, 'a metabolite id')
+                    else:
+                        break
+
+            if reversible is not None:
+                break
+
+            stoichiometry.update(coefficients)
+
+            if i == n_tokens or tokens[i][3] not in ('-->', '<->'):
+                self._raise_syntax_error(reaction_str, tokens, i, "'-->' or '<->'")
+            reversible = tokens[i][3] == '<->'
+            i += 1
+            sense = 1.0
+
+        for m_id, val in coefficients:
+            if m_id in stoichiometry:
+                new_val = val + stoichiometry[m_id]
+                stoichiometry[m_id] = new_val
+            else:
+                stoichiometry[m_id] = val
+
+        if i < n_tokens and tokens[i][3] == '[':
+            i += 1
+            for expected in (',', ']'):
+                if i < n_tokens and tokens[i][1]:
+                    i += 1
+                if i == n_tokens or tokens[i][3] != expected:
+                    self._raise_syntax_error(reaction_str, tokens, i, "a number or '{}'".format(expected))
+                i += 1
+
+        if i < n_tokens and tokens[i][3] == '@':
+            i += 1
+            if i == n_tokens or not tokens[i][1] or tokens[i][0]:
+                self._raise_syntax_error(reaction_str, tokens, i, 'an objective coefficient')
+            i += 1
+
+        if i < n_tokens:
+            self._raise_syntax_error(reaction_str, tokens, i, 'the end of the reaction')
 
-    def parse_coefficients(self, expression, sense):
+        return reversible, stoichiometry
+
+    def _raise_syntax_error(self, reaction_str, tokens, i, expected):
         """
-        Parses the stoichiometric coefficients from expression.
-        Expression has the form  2.0 metabolite_id.
+        Raises a SyntaxError for the i-th token of reaction_str, with the position of the token in the message and in
+        the offset attribute (1-based, as for python syntax errors).
 
         Args:
-            expression: metabolite with respective stoichiometric coefficient, "2.0 metabolite_id"
-            sense: whether the metabolite is consumed (-1) or produced (1)
+            reaction_str: the reaction string being parsed.
+            tokens: the tokens of reaction_str.
+            i: index of the unexpected token, len(tokens) if the reaction string ended too soon.
+            expected: description of what was expected, e.g. 'a metabolite id'.
 
         Returns:
-            The stoichiometric coefficients
+            None
         """
 
-        coefficients = []
-        terms = expression.split('+')
+        if i < len(tokens):
+            position = [match.end(1) for match in self.regex_token.finditer(reaction_str)][i]
+            found = ''.join(tokens[i][1:])
+        else:
+            position = len(reaction_str.rstrip())
+            found = 'end of string'
+
+        error = SyntaxError('Unable to parse: {}, expected {} at position {} but found {}'.format(
+            reaction_str, expected, position + 1, repr(found) if i < len(tokens) else found))
+        error.offset = position + 1
+        error.text = reaction_str
+        raise error
+
+
+_reaction_parser = ReactionParser()
+
+
+@lru_cache(maxsize=REACTION_CACHE_SIZE)
+def parse_reaction(reaction_str):
+    """
+    Parses a reaction string with a shared ReactionParser, see ReactionParser.parse_reaction.
+
+    Results are memoized, so the stoichiometry is returned as a read-only mapping and must not be modified.
+
+    Args:
+        reaction_str: a reaction string in the form A_c + B_c <-> P_c
+
+    Returns:
+        reaction reversibility (True or False), and read-only stoichiometry dictionary
+    """
+
+    reversible, stoichiometry = _reaction_parser.parse_reaction(reaction_str)
+    return reversible, MappingProxyType(stoichiometry)
+
+
+def parse_many(reaction_strs):
+    """
+    Parses a list of reaction strings, see parse_reaction.
+
+    Args:
+        reaction_strs: list of reaction strings in the form A_c + B_c <-> P_c
 
-        for term in terms:
-            match = self.regex_compound.match(term.strip())
-            coeff = sense * float(match.group('coeff')) if match.group('coeff') else sense
-            m_id = match.group('met_id')
-            coefficients.append((m_id, coeff))
+    Returns:
+        list of (reversibility, read-only stoichiometry dictionary), in the same order as reaction_strs
+    """
 
-        return coefficients
+    return [parse_reaction(reaction_str) for reaction_str in reaction_strs]
 
 
 def parse_input_list(input_list, flag=True):
@@ -103,19 +279,54 @@ def parse_input_list(input_list, flag=True):
         list with the elements from the input.
     """
 
-    input_list = input_list.strip()
-
-    if input_list.find(', ') != -1:
-        parsed_list = input_list.split(', ')
-    elif input_list.find('; ') != -1:
-        parsed_list = input_list.split('; ')
-    elif input_list.find(' ') != -1:
-        parsed_list = input_list.split(' ')
-    elif input_list.find(',') != -1 and flag:
-        parsed_list = input_list.split(',')
-    elif input_list.find(';') != -1:
-        parsed_list = input_list.split(';')
+    return _split_cell(input_list.strip(), _get_separators(flag))
+
+
+def _get_separators(flag):
+    return [separator for separator in INPUT_LIST_SEPARATORS if flag or separator != ',']
+
+
+def _split_cell(cell, separators):
+    for separator in separators:
+        if separator in cell:
+            return cell.split(separator)
+    return [cell]
+
+
+def split_input_column(cells, flag=True):
+    """
+    Splits all the cells of a column at once, each cell in the same way as parse_input_list, and returns the tokens
+    of all cells flattened, so that multi-valued cells of an import file can be exploded in one step.
+
+    Args:
+        cells: a pandas Series or a list of strings, e.g. the uniprot ids column of an import file.
+        flag: if False, ',' is not used as a separator, as in parse_input_list.
+
+    Returns:
+        pandas DataFrame with the columns row_index (the index of the cell in cells) and token, with the tokens in the
+        same order as in cells. Missing cells (None or NaN) have no tokens.
+    """
+
+    if isinstance(cells, pd.Series):
+        row_index = cells.index
+        cells = cells.values
     else:
-        parsed_list = [input_list]
+        row_index = None
+
+    separators = _get_separators(flag)
+
+    positions = []
+    tokens = []
+    for position, cell in enumerate(cells):
+        if not isinstance(cell, str):
+            if cell is None or pd.isnull(cell):
+                continue
+            cell = str(cell)
+
+        cell_tokens = _split_cell(cell.strip(), separators)
+
+        positions.extend([position] * len(cell_tokens))
+        tokens.extend(cell_tokens)
 
-    return parsed_list
+    return pd.DataFrame({'row_index': positions if row_index is None else row_index[positions], 'token': tokens},
+                        columns=['row_index', 'token'])
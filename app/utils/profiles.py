@@ -0,0 +1,107 @@
+""" This module implements profiles, i.e. all the data about a database entry that is shown in its detail page, loaded
+with a fixed number of queries so that it can be shared by the views and the API.
+
+"""
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Enzyme, EnzymeOrganism, EnzymeReactionActivation, EnzymeReactionEffector, \
+    EnzymeReactionInhibition, EnzymeReactionMiscInfo, EnzymeReactionOrganism, EnzymeStructure, Model, Organism, \
+    enzyme_reaction_organism_model
+
+
+class EnzymeProfile(object):
+    """
+    All the data about an enzyme: its structures, organisms, models, reactions, inhibitors, activators, effectors and
+    misc info. Each query is run once when the profile is created, related data is fetched with IN queries over all
+    the enzyme's EnzymeReactionOrganism entries.
+
+    Attributes:
+        enzyme: the Enzyme object.
+        structures: list of EnzymeStructure objects.
+        enzyme_organisms: list of EnzymeOrganism objects.
+        enzyme_reaction_organisms: list of EnzymeReactionOrganism objects, with their reaction loaded.
+        organisms: list of Organism objects the enzyme is associated to through any of the above.
+        models: list with the models of each EnzymeReactionOrganism, a model appears once per EnzymeReactionOrganism.
+        reactions: list of the (distinct) Reaction objects catalyzed by the enzyme.
+        inhibitors: list of EnzymeReactionInhibition objects.
+        activators: list of EnzymeReactionActivation objects.
+        effectors: list of EnzymeReactionEffector objects.
+        misc_infos: list of EnzymeReactionMiscInfo objects.
+        uniprot_ids: list of uniprot ids from enzyme_organisms.
+        pdb_ids: list of pdb ids from structures.
+    """
+
+    def __init__(self, enzyme):
+        self.enzyme = enzyme
+
+        self.structures = EnzymeStructure.query.filter_by(enzyme_id=enzyme.id).all()
+        self.enzyme_organisms = EnzymeOrganism.query.filter_by(enzyme_id=enzyme.id).all()
+        self.enzyme_reaction_organisms = EnzymeReactionOrganism.query.filter_by(enzyme_id=enzyme.id) \
+            .options(joinedload(EnzymeReactionOrganism.reaction)).all()
+
+        organism_ids = set([structure.organism_id for structure in self.structures] +
+                           [enz_org.organism_id for enz_org in self.enzyme_organisms] +
+                           [enz_rxn_org.organism_id for enz_rxn_org in self.enzyme_reaction_organisms])
+        self.organisms = Organism.query.filter(Organism.id.in_(organism_ids)).all() if organism_ids else []
+
+        reactions = dict((enz_rxn_org.reaction_id, enz_rxn_org.reaction)
+                         for enz_rxn_org in self.enzyme_reaction_organisms)
+        self.reactions = [reactions[reaction_id] for reaction_id in sorted(reactions)]
+
+        enz_rxn_org_ids = [enz_rxn_org.id for enz_rxn_org in self.enzyme_reaction_organisms]
+        self.models = self._get_models(enz_rxn_org_ids)
+
+        self.inhibitors = self._get_enzyme_reaction_data(
+            EnzymeReactionInhibition, enz_rxn_org_ids, EnzymeReactionInhibition.inhibitor_met,
+            EnzymeReactionInhibition.affected_met, EnzymeReactionInhibition.evidence)
+        self.activators = self._get_enzyme_reaction_data(
+            EnzymeReactionActivation, enz_rxn_org_ids, EnzymeReactionActivation.activator_met,
+            EnzymeReactionActivation.evidence)
+        self.effectors = self._get_enzyme_reaction_data(
+            EnzymeReactionEffector, enz_rxn_org_ids, EnzymeReactionEffector.effector_met,
+            EnzymeReactionEffector.evidence)
+        self.misc_infos = self._get_enzyme_reaction_data(
+            EnzymeReactionMiscInfo, enz_rxn_org_ids, EnzymeReactionMiscInfo.evidence)
+
+        self.uniprot_ids = [enz_org.uniprot_id for enz_org in self.enzyme_organisms]
+        self.pdb_ids = [structure.pdb_id for structure in self.structures]
+
+    @classmethod
+    def from_isoenzyme(cls, isoenzyme):
+        """
+        Loads the profile of the enzyme with the given isoenzyme.
+
+        Args:
+            isoenzyme: the isoenzyme, e.g. PFK1.
+
+        Returns:
+            EnzymeProfile or None if there is no such enzyme.
+        """
+
+        enzyme = Enzyme.query.filter_by(isoenzyme=isoenzyme).first()
+        return cls(enzyme) if enzyme else None
+
+    @staticmethod
+    def _get_models(enz_rxn_org_ids):
+        if not enz_rxn_org_ids:
+            return []
+
+        enz_rxn_org_col = enzyme_reaction_organism_model.c.enzyme_reaction_organism_id
+        enz_rxn_org_models = dict((enz_rxn_org_id, []) for enz_rxn_org_id in enz_rxn_org_ids)
+        model_query = db.session.query(enz_rxn_org_col, Model) \
+            .join(Model, Model.id == enzyme_reaction_organism_model.c.model_id) \
+            .filter(enz_rxn_org_col.in_(enz_rxn_org_ids))
+        for enz_rxn_org_id, model in model_query:
+            enz_rxn_org_models[enz_rxn_org_id].append(model)
+
+        return [model for enz_rxn_org_id in enz_rxn_org_ids for model in enz_rxn_org_models[enz_rxn_org_id]]
+
+    @staticmethod
+    def _get_enzyme_reaction_data(data_model, enz_rxn_org_ids, *relationships):
+        if not enz_rxn_org_ids:
+            return []
+
+        return data_model.query.filter(data_model.enz_rxn_org_id.in_(enz_rxn_org_ids)) \
+            .options(*[joinedload(relationship) for relationship in relationships]).all()
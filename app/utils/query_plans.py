@@ -0,0 +1,129 @@
+""" This module implements a check that the hot lookup queries are backed by indexes.
+
+HOT_QUERIES has the queries run for every row of an import or for every detail page, e.g. metabolites by bigg id or
+inhibitions by EnzymeReactionOrganism. get_query_plan runs EXPLAIN on a query and is_index_backed tells whether the plan
+scans a whole table. On PostgreSQL sequential scans are disabled for the EXPLAIN, since the planner prefers them over an
+index on small tables, so the check is whether an index can be used at all.
+
+Usage:
+    python -m app.utils.query_plans
+
+"""
+
+import sys
+
+from sqlalchemy import func
+
+from app import create_app, db
+from app.models import Enzyme, EnzymeOrganism, EnzymeReactionActivation, EnzymeReactionEffector, \
+    EnzymeReactionInhibition, EnzymeReactionOrganism, EnzymeStructure, GibbsEnergyReactionModel, Metabolite, Reference, \
+    ReactionMetabolite, enzyme_reaction_organism_model, metabolite_compartment, reference_inhibition
+
+
+HOT_QUERIES = [
+    ('metabolite by bigg_id', lambda: Metabolite.query.filter(Metabolite.bigg_id.in_(['atp', 'adp']))),
+    ('metabolite by grasp_id', lambda: Metabolite.query.filter_by(grasp_id='atp')),
+    ('enzyme by isoenzyme', lambda: Enzyme.query.filter_by(isoenzyme='PFK1')),
+    ('reference by doi', lambda: Reference.query.filter(func.lower(Reference.doi).in_(['10.1093/bty942']))),
+    ('enzyme_organism by uniprot_id', lambda: EnzymeOrganism.query.filter_by(uniprot_id='P0A796')),
+    ('enzyme_organism by enzyme', lambda: EnzymeOrganism.query.filter_by(enzyme_id=1)),
+    ('enzyme_structure by pdb_id', lambda: EnzymeStructure.query.filter_by(pdb_id='1E9I')),
+    ('enzyme_reaction_organism by reaction', lambda: EnzymeReactionOrganism.query.filter_by(reaction_id=1)),
+    ('inhibitions by enzyme_reaction_organism', lambda: EnzymeReactionInhibition.query.filter_by(enz_rxn_org_id=1)),
+    ('inhibitions by inhibitor', lambda: EnzymeReactionInhibition.query.filter_by(inhibitor_met_id=1)),
+    ('inhibitions without data by inhibitor', lambda: EnzymeReactionInhibition.query.filter_by(
+        inhibitor_met_id=1, affected_met_id=None, inhibition_type=None, inhibition_constant=None)),
+    ('activations without data by activator', lambda: EnzymeReactionActivation.query.filter_by(
+        activator_met_id=1, activation_constant=None)),
+    ('effectors by metabolite and type', lambda: EnzymeReactionEffector.query.filter_by(
+        effector_met_id=1, effector_type='Inhibiting')),
+    ('activations by enzyme_reaction_organism', lambda: EnzymeReactionActivation.query.filter_by(enz_rxn_org_id=1)),
+    ('effectors by enzyme_reaction_organism', lambda: EnzymeReactionEffector.query.filter_by(enz_rxn_org_id=1)),
+    ('reaction_metabolite by metabolite', lambda: ReactionMetabolite.query.filter_by(metabolite_id=1)),
+    ('gibbs energies by reaction and model', lambda: GibbsEnergyReactionModel.query.filter_by(reaction_id=1,
+                                                                                               model_id=1)),
+    ('metabolite compartments', lambda: db.session.query(metabolite_compartment).filter(
+        metabolite_compartment.c.metabolite_id.in_([1, 2]))),
+    ('model enzyme_reaction_organisms', lambda: db.session.query(enzyme_reaction_organism_model).filter(
+        enzyme_reaction_organism_model.c.model_id == 1)),
+    ('enzyme_reaction_organism models', lambda: db.session.query(enzyme_reaction_organism_model).filter(
+        enzyme_reaction_organism_model.c.enzyme_reaction_organism_id == 1)),
+    ('reference inhibitions', lambda: db.session.query(reference_inhibition).filter(
+        reference_inhibition.c.reference_id == 1)),
+]
+
+
+def get_query_plan(query):
+    """
+    Gets the query plan of a query with EXPLAIN, or EXPLAIN QUERY PLAN on SQLite.
+
+    Args:
+        query: a SQLAlchemy query.
+
+    Returns:
+        list with the lines of the query plan.
+    """
+
+    dialect = db.session.get_bind().dialect
+    compiled = query.statement.compile(dialect=dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    connection = db.session.connection()
+    if dialect.name == 'sqlite':
+        return [row[-1] for row in connection.execute('EXPLAIN QUERY PLAN ' + str(compiled), params)]
+
+    if dialect.name == 'postgresql':
+        connection.execute('SET LOCAL enable_seqscan = off')
+    try:
+        return [row[0] for row in connection.execute('EXPLAIN ' + str(compiled), params)]
+    finally:
+        if dialect.name == 'postgresql':
+            connection.execute('SET LOCAL enable_seqscan = on')
+
+
+def is_index_backed(plan):
+    """
+    Checks whether a query plan reads all the tables through indexes.
+
+    Args:
+        plan: list with the lines of the query plan, as returned by get_query_plan.
+
+    Returns:
+        True if no table is scanned sequentially.
+    """
+
+    return not any('Seq Scan' in line or line.strip().startswith('SCAN ') for line in plan)
+
+
+def get_unindexed_queries():
+    """
+    Gets the hot queries that are not backed by indexes.
+
+    Returns:
+        list of tuples (query name, query plan).
+    """
+
+    unindexed_queries = []
+    for name, get_query in HOT_QUERIES:
+        plan = get_query_plan(get_query())
+        if not is_index_backed(plan):
+            unindexed_queries.append((name, plan))
+    return unindexed_queries
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        unindexed_queries = get_unindexed_queries()
+
+    for name, plan in unindexed_queries:
+        print(name + ':\n    ' + '\n    '.join(plan), file=sys.stderr)
+    if unindexed_queries:
+        sys.exit(1)
+    print('All {} hot queries use indexes'.format(len(HOT_QUERIES)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+""" This module implements an in-process cache of small reference tables, e.g. compartments or organisms, so that
+lookups like Compartment.query.filter_by(bigg_id='c').first() do not hit the database every time.
+
+Each table is loaded with a single query the first time it is used, and indexed by id and by the columns it is looked up
+by. The cached rows are detached, lookups return them merged into the current session without querying the database.
+
+Every change to a cached table bumps its version in the reference_data_version table, in the same transaction. The
+versions are checked once per app context, so the tables changed by other processes are reloaded on the next request.
+Tables changed by this process are dropped as soon as the change is committed. Within a transaction that changed a
+table, lookups of that table go to the database.
+
+"""
+
+from flask import current_app, g
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+
+class ReferenceTable(object):
+    """
+    The rows of a reference table, indexed by id and by the columns used in lookups.
+
+    Args:
+        rows: list of detached model instances, sorted by id.
+        version: the version of the table the rows were loaded for.
+    """
+
+    def __init__(self, rows, version):
+        self.rows = rows
+        self.version = version
+        self._indexes = {'id': dict((row.id, row) for row in rows)}
+
+    def get(self, column, value):
+        """
+        Gets the row where column is value, the first one by id if there are many.
+
+        Args:
+            column: the column name.
+            value: the column value.
+
+        Returns:
+            the row or None.
+        """
+
+        index = self._indexes.get(column)
+        if index is None:
+            index = {}
+            for row in self.rows:
+                index.setdefault(getattr(row, column), row)
+            self._indexes[column] = index
+        return index.get(value)
+
+
+class ReferenceData(object):
+    """
+    Flask extension with the cache of the reference tables.
+    """
+
+    def __init__(self, app=None, models=None, version_model=None):
+        if app is not None:
+            self.init_app(app, models, version_model)
+
+    def init_app(self, app, models, version_model):
+        """
+        Args:
+            app: the flask app.
+            models: list of the model classes to cache, e.g. [Compartment, Organism].
+            version_model: the model class of the reference_data_version table.
+
+        Returns:
+            None
+        """
+
+        app.extensions['reference_data'] = _ReferenceDataState(models, version_model)
+
+        if not event.contains(SignallingSession, 'after_flush', _after_flush):
+            event.listen(SignallingSession, 'after_flush', _after_flush)
+            event.listen(SignallingSession, 'after_commit', _after_commit)
+            event.listen(SignallingSession, 'after_soft_rollback', _after_soft_rollback)
+
+    def get(self, model, **kwargs):
+        """
+        Gets the entry of model with the given id or column value, e.g. get(Compartment, bigg_id='c').
+
+        Args:
+            model: one of the cached model classes.
+            kwargs: one column name and value.
+
+        Returns:
+            the entry, in the current session, or None if it does not exist.
+        """
+
+        if len(kwargs) != 1:
+            raise TypeError('get() takes exactly one column, got: ' + ', '.join(sorted(kwargs)))
+
+        if _is_changed(model):
+            return model.query.filter_by(**kwargs).first()
+
+        (column, value), = kwargs.items()
+        row = self._get_table(model).get(column, value)
+        return _get_db().session.merge(row, load=False) if row is not None else None
+
+    def all(self, model):
+        """
+        Gets all the entries of model, sorted by id. It can be used as query_factory in a QuerySelectField.
+
+        Args:
+            model: one of the cached model classes.
+
+        Returns:
+            list of entries, in the current session.
+        """
+
+        if _is_changed(model):
+            return model.query.order_by(model.id).all()
+
+        session = _get_db().session
+        return [session.merge(row, load=False) for row in self._get_table(model).rows]
+
+    def invalidate(self, *models):
+        """
+        Marks models as changed in the current transaction, for changes that are not made through the ORM, e.g.
+        bulk inserts. The change is seen by all processes once the transaction is committed.
+
+        Args:
+            models: the changed model classes.
+
+        Returns:
+            None
+        """
+
+        state = current_app.extensions['reference_data']
+        _bump_versions(_get_db().session(), state, set(model.__tablename__ for model in models))
+
+    def _get_table(self, model):
+        state = current_app.extensions['reference_data']
+        if model not in state.models:
+            raise KeyError(model.__name__ + ' is not a cached reference table.')
+
+        versions = g.get('reference_data_versions')
+        if versions is None:
+            version_model = state.version_model
+            versions = dict(version_model.query.with_entities(version_model.table_name, version_model.version))
+            g.reference_data_versions = versions
+            for table_name, table in list(state.tables.items()):
+                if table.version != versions.get(table_name, 0):
+                    state.tables.pop(table_name, None)
+
+        table = state.tables.get(model.__tablename__)
+        if table is None:
+            table = ReferenceTable(_load_rows(model), versions.get(model.__tablename__, 0))
+            state.tables[model.__tablename__] = table
+        return table
+
+
+class _ReferenceDataState(object):
+    def __init__(self, models, version_model):
+        self.models = set(models)
+        self.table_names = set(model.__tablename__ for model in models)
+        self.version_model = version_model
+        self.tables = {}
+
+
+def _get_db():
+    return current_app.extensions['sqlalchemy'].db
+
+
+def _load_rows(model):
+    """
+    Loads all the rows of model in a separate session, so they can be kept detached.
+    """
+
+    session = _get_db().create_session({})()
+    try:
+        rows = session.query(model).order_by(model.id).all()
+        session.expunge_all()
+    finally:
+        session.close()
+    return rows
+
+
+def _is_changed(model):
+    session = _get_db().session()
+    if model.__tablename__ in session.info.get('reference_data_tables', ()):
+        return True
+    return any(isinstance(obj, model) for obj in list(session.new) + list(session.dirty) + list(session.deleted))
+
+
+def _bump_versions(session, state, table_names):
+    """
+    Increments the versions of table_names in the reference_data_version table, once per transaction.
+
+    On PostgreSQL this is a single INSERT ... ON CONFLICT DO UPDATE, so two transactions bumping a table without a row
+    do not both insert it.
+    """
+
+    changed_tables = session.info.setdefault('reference_data_tables', set())
+    version_table = state.version_model.__table__
+
+    for table_name in sorted(table_names - changed_tables):
+        if session.get_bind().dialect.name == 'postgresql':
+            insert_stmt = pg_insert(version_table).values(table_name=table_name, version=1)
+            session.execute(insert_stmt.on_conflict_do_update(
+                index_elements=[version_table.c.table_name],
+                set_={'version': version_table.c.version + 1}))
+            changed_tables.add(table_name)
+            continue
+
+        result = session.execute(version_table.update()
+                                 .where(version_table.c.table_name == table_name)
+                                 .values(version=version_table.c.version + 1))
+        if not result.rowcount:
+            session.execute(version_table.insert().values(table_name=table_name, version=1))
+        changed_tables.add(table_name)
+
+
+def _after_flush(session, flush_context):
+    state = current_app.extensions.get('reference_data') if current_app else None
+    if state is None:
+        return
+
+    table_names = set(type(obj).__tablename__ for obj in list(session.new) + list(session.dirty) +
+                      list(session.deleted)) & state.table_names
+    if table_names:
+        _bump_versions(session, state, table_names)
+
+
+def _after_commit(session):
+    table_names = session.info.pop('reference_data_tables', None)
+    state = current_app.extensions.get('reference_data') if current_app else None
+    if not table_names or state is None:
+        return
+
+    for table_name in table_names:
+        state.tables.pop(table_name, None)
+    g.pop('reference_data_versions', None)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('reference_data_tables', None)
@@ -0,0 +1,104 @@
+""" This module implements the resolution of references by DOI.
+
+DOIs are compared in their normalized form, without the https://doi.org/ or doi: prefixes and in lower case, so that
+https://doi.org/10.1093/bioinformatics/bty942 and 10.1093/Bioinformatics/bty942 are the same reference. New references
+are stored with the DOI as it was given.
+
+A ReferenceResolver resolves a list of DOIs with a single query and keeps the references it has seen, so that each DOI is
+looked up at most once. get_reference_resolver returns the resolver of the current app context, i.e. of the current
+request, or of the whole import for the data loading scripts.
+
+"""
+
+import re
+
+from flask import g
+from sqlalchemy import func, inspect
+
+from app import db
+from app.models import Reference
+
+
+DOI_PREFIXES = ['https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:']
+
+_DOI_PREFIX_RE = re.compile(r'^(https?://(dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+
+
+def normalize_doi(doi):
+    """
+    Normalizes a DOI, e.g. https://doi.org/10.1093/Bioinformatics/bty942 becomes 10.1093/bioinformatics/bty942.
+
+    Args:
+        doi: the DOI, with or without prefix.
+
+    Returns:
+        the normalized DOI.
+    """
+
+    return _DOI_PREFIX_RE.sub('', doi.strip()).lower()
+
+
+def _get_doi_variants(normalized_doi):
+    # the forms in which a DOI may have been stored, in lower case
+    if not normalized_doi.startswith('10.'):
+        return [normalized_doi]
+    return [normalized_doi] + [prefix + normalized_doi for prefix in DOI_PREFIXES]
+
+
+class ReferenceResolver(object):
+    """
+    Resolves DOIs to references, adding the ones that are not in the database.
+    """
+
+    def __init__(self):
+        self._references = {}
+
+    def resolve(self, dois, create=True):
+        """
+        Gets the references for a list of DOIs, the ones not seen before are looked up with a single query.
+
+        Args:
+            dois: list of DOIs.
+            create: whether to add the references that are not in the database to the session.
+
+        Returns:
+            list with the reference of each DOI, or None for the missing ones if create is False.
+        """
+
+        normalized_dois = [normalize_doi(doi) for doi in dois]
+
+        # references added before a rollback are not in the session anymore
+        for normalized_doi in set(normalized_dois) & set(self._references):
+            state = inspect(self._references[normalized_doi])
+            if state.transient or state.detached:
+                del self._references[normalized_doi]
+
+        missing = set(normalized_dois) - set(self._references)
+        if missing:
+            variants = [variant for normalized_doi in missing for variant in _get_doi_variants(normalized_doi)]
+            for reference in Reference.query.filter(func.lower(Reference.doi).in_(variants)).order_by(Reference.id):
+                self._references.setdefault(normalize_doi(reference.doi), reference)
+
+        references = []
+        for doi, normalized_doi in zip(dois, normalized_dois):
+            reference = self._references.get(normalized_doi)
+            if reference is None and create:
+                reference = Reference(doi=doi.strip())
+                db.session.add(reference)
+                self._references[normalized_doi] = reference
+            references.append(reference)
+
+        return references
+
+
+def get_reference_resolver():
+    """
+    Gets the reference resolver of the current app context.
+
+    Returns:
+        ReferenceResolver
+    """
+
+    if 'reference_resolver' not in g:
+        g.reference_resolver = ReferenceResolver()
+    return g.reference_resolver
@@ -0,0 +1,147 @@
+""" This module implements the lookup of the regulations added by the model import.
+
+The model import only knows the metabolites of inhibitors, activators and effectors, so it adds inhibitions with only
+the inhibitor, activations with only the activator and effectors with only the metabolite and type, and reuses them
+across reactions and models. A RegulationLookup loads these rows for a list of metabolites with one query per
+regulation type, using the partial indexes on the rows without data, and then finds them with dictionary lookups. The
+ones it does not find are added to the session and kept, so each inhibitor, activator or effector is looked up at most
+once per import. get_regulation_lookup returns the lookup of the current app context.
+
+"""
+
+from flask import g
+from sqlalchemy import inspect
+
+from app import db
+from app.models import EnzymeReactionActivation, EnzymeReactionEffector, EnzymeReactionInhibition
+
+
+def _is_stale(obj):
+    # objects added before a rollback are not in the session anymore
+    state = inspect(obj)
+    return state.transient or state.detached
+
+
+class RegulationLookup(object):
+    """
+    Finds the inhibitions, activations and effectors without data of metabolites, adding the ones that do not exist.
+    """
+
+    def __init__(self):
+        self._inhibitions = {}
+        self._activations = {}
+        self._effectors = {}
+        self._loaded = {}
+
+    def _get_new_metabolites(self, key, metabolites):
+        loaded = self._loaded.setdefault(key, set())
+        loaded.difference_update([metabolite for metabolite in loaded if _is_stale(metabolite)])
+
+        new_metabolites = set(metabolites) - loaded
+        loaded.update(new_metabolites)
+        return dict((metabolite.id, metabolite) for metabolite in new_metabolites if metabolite.id is not None)
+
+    def load(self, metabolites):
+        """
+        Loads the regulations without data of metabolites, with one query per regulation type.
+
+        Args:
+            metabolites: list of metabolites.
+
+        Returns:
+            None
+        """
+
+        metabolites = [metabolite for metabolite in metabolites if metabolite is not None]
+
+        new_metabolites = self._get_new_metabolites('inhibitions', metabolites)
+        if new_metabolites:
+            for inhibition in EnzymeReactionInhibition.query.filter(
+                    EnzymeReactionInhibition.inhibitor_met_id.in_(new_metabolites),
+                    EnzymeReactionInhibition.affected_met_id.is_(None),
+                    EnzymeReactionInhibition.inhibition_type.is_(None),
+                    EnzymeReactionInhibition.inhibition_constant.is_(None)).order_by(EnzymeReactionInhibition.id):
+                self._inhibitions.setdefault(new_metabolites[inhibition.inhibitor_met_id], inhibition)
+
+        new_metabolites = self._get_new_metabolites('activations', metabolites)
+        if new_metabolites:
+            for activation in EnzymeReactionActivation.query.filter(
+                    EnzymeReactionActivation.activator_met_id.in_(new_metabolites),
+                    EnzymeReactionActivation.activation_constant.is_(None)).order_by(EnzymeReactionActivation.id):
+                self._activations.setdefault(new_metabolites[activation.activator_met_id], activation)
+
+        new_metabolites = self._get_new_metabolites('effectors', metabolites)
+        if new_metabolites:
+            for effector in EnzymeReactionEffector.query.filter(
+                    EnzymeReactionEffector.effector_met_id.in_(new_metabolites)).order_by(EnzymeReactionEffector.id):
+                self._effectors.setdefault((new_metabolites[effector.effector_met_id], effector.effector_type),
+                                           effector)
+
+    def _get(self, regulations, key, metabolite, create):
+        regulation = regulations.get(key)
+        if regulation is not None and _is_stale(regulation):
+            regulation = None
+        if regulation is None:
+            self.load([metabolite])
+            regulation = regulations.get(key)
+        if regulation is None or _is_stale(regulation):
+            regulation = create()
+            db.session.add(regulation)
+            regulations[key] = regulation
+        return regulation
+
+    def get_inhibition(self, metabolite):
+        """
+        Gets the inhibition with only the given inhibitor, adding it if it does not exist.
+
+        Args:
+            metabolite: the inhibitor metabolite.
+
+        Returns:
+            EnzymeReactionInhibition
+        """
+
+        return self._get(self._inhibitions, metabolite, metabolite,
+                         lambda: EnzymeReactionInhibition(inhibitor_met=metabolite))
+
+    def get_activation(self, metabolite):
+        """
+        Gets the activation with only the given activator, adding it if it does not exist.
+
+        Args:
+            metabolite: the activator metabolite.
+
+        Returns:
+            EnzymeReactionActivation
+        """
+
+        return self._get(self._activations, metabolite, metabolite,
+                         lambda: EnzymeReactionActivation(activator_met=metabolite))
+
+    def get_effector(self, metabolite, effector_type):
+        """
+        Gets an effector with the given metabolite and effector type, adding it if it does not exist.
+
+        Args:
+            metabolite: the effector metabolite.
+            effector_type: either Activating or Inhibiting.
+
+        Returns:
+            EnzymeReactionEffector
+        """
+
+        return self._get(self._effectors, (metabolite, effector_type), metabolite,
+                         lambda: EnzymeReactionEffector(effector_met=metabolite, effector_type=effector_type))
+
+
+def get_regulation_lookup():
+    """
+    Gets the regulation lookup of the current app context.
+
+    Returns:
+        RegulationLookup
+    """
+
+    if 'regulation_lookup' not in g:
+        g.regulation_lookup = RegulationLookup()
+    return g.regulation_lookup
@@ -26,4 +26,21 @@ class Config(object):
     UPLOAD_FOLDER = './app/static/models'
     DOWNLOAD_FOLDER = './app/static/models'
 
+    XREF_INDEX_FILE = os.environ.get('XREF_INDEX_FILE') or os.path.join(basedir, 'data', 'xref_index.sqlite')
+
+    DETAIL_CACHE_BACKEND = os.environ.get('DETAIL_CACHE_BACKEND') or 'lru'
+    DETAIL_CACHE_TTL = int(os.environ.get('DETAIL_CACHE_TTL') or 300)
+    DETAIL_CACHE_MAX_SIZE = int(os.environ.get('DETAIL_CACHE_MAX_SIZE') or 1000)
+    DETAIL_CACHE_REDIS_URL = os.environ.get('DETAIL_CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+
+    API_PAGE_SIZE = 100
+    API_MAX_BATCH_SIZE = 1000
+
+    AUTOCOMPLETE_TTL = 60
+    AUTOCOMPLETE_LIMIT = 10
+
+    OPTIONS_PAGE_SIZE = 20
+
+    REGULATIONS_MAX_ROWS = 10000
+
 
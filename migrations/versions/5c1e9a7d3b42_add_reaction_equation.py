@@ -0,0 +1,27 @@
+"""add reaction equation
+
+Revision ID: 5c1e9a7d3b42
+Revises: 212eeecb56ee
+Create Date: 2026-10-19 18:40:12.417093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e9a7d3b42'
+down_revision = '212eeecb56ee'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reaction', sa.Column('equation', sa.String(), nullable=True))
+    op.create_index('ix_reaction_equation', 'reaction', ['equation'], unique=False, postgresql_using='hash')
+    # existing reactions get their equation with: python -m app.load_data.reaction_equations
+
+
+def downgrade():
+    op.drop_index('ix_reaction_equation', table_name='reaction')
+    op.drop_column('reaction', 'equation')
@@ -0,0 +1,34 @@
+"""add reference data version
+
+Revision ID: 8e4f0c2a6d15
+Revises: 5c1e9a7d3b42
+Create Date: 2026-10-19 21:05:37.184402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f0c2a6d15'
+down_revision = '5c1e9a7d3b42'
+branch_labels = None
+depends_on = None
+
+
+# the tables cached by app.utils.reference_data, each has one row so the version bumps only need to update it
+REFERENCE_TABLES = ['compartment', 'evidence_level', 'mechanism', 'organism', 'reference_type']
+
+
+def upgrade():
+    reference_data_version = op.create_table('reference_data_version',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(reference_data_version, [{'table_name': table_name, 'version': 0}
+                                            for table_name in REFERENCE_TABLES])
+
+
+def downgrade():
+    op.drop_table('reference_data_version')
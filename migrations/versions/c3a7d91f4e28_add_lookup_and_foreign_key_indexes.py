@@ -0,0 +1,131 @@
+"""add indexes for lookups and foreign keys
+
+Revision ID: c3a7d91f4e28
+Revises: 8e4f0c2a6d15
+Create Date: 2026-10-19 23:12:48.603517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7d91f4e28'
+down_revision = '8e4f0c2a6d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # bigg_id, grasp_id, isoenzyme, uniprot_id and pdb_id have unique constraints, which are already indexed
+    # the association tables get a composite index on both columns and an index on the second one
+    op.create_index('ix_enzyme_complex_subunit', 'enzyme_complex_subunit', ['enzyme_complex_id', 'enzyme_subunit_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_complex_subunit_enzyme_subunit_id'), 'enzyme_complex_subunit', ['enzyme_subunit_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_gene_organism_enzyme_id'), 'enzyme_gene_organism', ['enzyme_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_organism_enzyme_id'), 'enzyme_organism', ['enzyme_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_organism_organism_id'), 'enzyme_organism', ['organism_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_activation_activator_met_id'), 'enzyme_reaction_activation', ['activator_met_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_activation_enz_rxn_org_id'), 'enzyme_reaction_activation', ['enz_rxn_org_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_activation_model_activation_id'), 'enzyme_reaction_activation_model', ['activation_id'], unique=False)
+    op.create_index('ix_enzyme_reaction_activation_model', 'enzyme_reaction_activation_model', ['model_id', 'activation_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_effector_effector_met_id'), 'enzyme_reaction_effector', ['effector_met_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_effector_enz_rxn_org_id'), 'enzyme_reaction_effector', ['enz_rxn_org_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_effector_model_effector_id'), 'enzyme_reaction_effector_model', ['effector_id'], unique=False)
+    op.create_index('ix_enzyme_reaction_effector_model', 'enzyme_reaction_effector_model', ['model_id', 'effector_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_inhibition_affected_met_id'), 'enzyme_reaction_inhibition', ['affected_met_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_inhibition_enz_rxn_org_id'), 'enzyme_reaction_inhibition', ['enz_rxn_org_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_inhibition_inhibitor_met_id'), 'enzyme_reaction_inhibition', ['inhibitor_met_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_inhibition_model_inhibition_id'), 'enzyme_reaction_inhibition_model', ['inhibition_id'], unique=False)
+    op.create_index('ix_enzyme_reaction_inhibition_model', 'enzyme_reaction_inhibition_model', ['model_id', 'inhibition_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_misc_info_enz_rxn_org_id'), 'enzyme_reaction_misc_info', ['enz_rxn_org_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_misc_info_model_misc_info_id'), 'enzyme_reaction_misc_info_model', ['misc_info_id'], unique=False)
+    op.create_index('ix_enzyme_reaction_misc_info_model', 'enzyme_reaction_misc_info_model', ['model_id', 'misc_info_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_organism_organism_id'), 'enzyme_reaction_organism', ['organism_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_organism_reaction_id'), 'enzyme_reaction_organism', ['reaction_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_reaction_organism_model_enzyme_reaction_organism_id'), 'enzyme_reaction_organism_model', ['enzyme_reaction_organism_id'], unique=False)
+    op.create_index('ix_enzyme_reaction_organism_model', 'enzyme_reaction_organism_model', ['model_id', 'enzyme_reaction_organism_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_structure_enzyme_id'), 'enzyme_structure', ['enzyme_id'], unique=False)
+    op.create_index(op.f('ix_enzyme_structure_organism_id'), 'enzyme_structure', ['organism_id'], unique=False)
+    op.create_index(op.f('ix_gibbs_energy_reaction_model_gibbs_energy_id'), 'gibbs_energy_reaction_model', ['gibbs_energy_id'], unique=False)
+    op.create_index(op.f('ix_gibbs_energy_reaction_model_model_id'), 'gibbs_energy_reaction_model', ['model_id'], unique=False)
+    op.create_index('ix_gibbs_energy_reaction_model_reaction_id_model_id', 'gibbs_energy_reaction_model', ['reaction_id', 'model_id'], unique=False)
+    op.create_index(op.f('ix_metabolite_chebi_chebi_id'), 'metabolite_chebi', ['chebi_id'], unique=False)
+    op.create_index('ix_metabolite_chebi', 'metabolite_chebi', ['metabolite_id', 'chebi_id'], unique=False)
+    op.create_index(op.f('ix_metabolite_compartment_compartment_id'), 'metabolite_compartment', ['compartment_id'], unique=False)
+    op.create_index('ix_metabolite_compartment', 'metabolite_compartment', ['metabolite_id', 'compartment_id'], unique=False)
+    op.create_index(op.f('ix_model_assumptions_model_id'), 'model_assumptions', ['model_id'], unique=False)
+    op.create_index(op.f('ix_reaction_metabolite_metabolite_id'), 'reaction_metabolite', ['metabolite_id'], unique=False)
+    op.create_index('ix_reference_doi_lower', 'reference', [sa.text('lower(doi)')], unique=False)
+    op.create_index('ix_reference_activation', 'reference_activation', ['activation_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_activation_reference_id'), 'reference_activation', ['reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_author_author_id'), 'reference_author', ['author_id'], unique=False)
+    op.create_index('ix_reference_author', 'reference_author', ['reference_id', 'author_id'], unique=False)
+    op.create_index('ix_reference_effector', 'reference_effector', ['effector_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_effector_reference_id'), 'reference_effector', ['reference_id'], unique=False)
+    op.create_index('ix_reference_gibbs_energy', 'reference_gibbs_energy', ['gibbs_energy_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_gibbs_energy_reference_id'), 'reference_gibbs_energy', ['reference_id'], unique=False)
+    op.create_index('ix_reference_inhibition', 'reference_inhibition', ['inhibition_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_inhibition_reference_id'), 'reference_inhibition', ['reference_id'], unique=False)
+    op.create_index('ix_reference_mechanism', 'reference_mechanism', ['mechanism_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_mechanism_reference_id'), 'reference_mechanism', ['reference_id'], unique=False)
+    op.create_index('ix_reference_misc_info', 'reference_misc_info', ['misc_info_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_misc_info_reference_id'), 'reference_misc_info', ['reference_id'], unique=False)
+    op.create_index('ix_reference_model_assumptions', 'reference_model_assumptions', ['model_assumptions_id', 'reference_id'], unique=False)
+    op.create_index(op.f('ix_reference_model_assumptions_reference_id'), 'reference_model_assumptions', ['reference_id'], unique=False)
+    # check the query plans with: python -m app.utils.query_plans
+
+
+def downgrade():
+    op.drop_index(op.f('ix_reference_model_assumptions_reference_id'), table_name='reference_model_assumptions')
+    op.drop_index('ix_reference_model_assumptions', table_name='reference_model_assumptions')
+    op.drop_index(op.f('ix_reference_misc_info_reference_id'), table_name='reference_misc_info')
+    op.drop_index('ix_reference_misc_info', table_name='reference_misc_info')
+    op.drop_index(op.f('ix_reference_mechanism_reference_id'), table_name='reference_mechanism')
+    op.drop_index('ix_reference_mechanism', table_name='reference_mechanism')
+    op.drop_index(op.f('ix_reference_inhibition_reference_id'), table_name='reference_inhibition')
+    op.drop_index('ix_reference_inhibition', table_name='reference_inhibition')
+    op.drop_index(op.f('ix_reference_gibbs_energy_reference_id'), table_name='reference_gibbs_energy')
+    op.drop_index('ix_reference_gibbs_energy', table_name='reference_gibbs_energy')
+    op.drop_index(op.f('ix_reference_effector_reference_id'), table_name='reference_effector')
+    op.drop_index('ix_reference_effector', table_name='reference_effector')
+    op.drop_index('ix_reference_author', table_name='reference_author')
+    op.drop_index(op.f('ix_reference_author_author_id'), table_name='reference_author')
+    op.drop_index(op.f('ix_reference_activation_reference_id'), table_name='reference_activation')
+    op.drop_index('ix_reference_activation', table_name='reference_activation')
+    op.drop_index('ix_reference_doi_lower', table_name='reference')
+    op.drop_index(op.f('ix_reaction_metabolite_metabolite_id'), table_name='reaction_metabolite')
+    op.drop_index(op.f('ix_model_assumptions_model_id'), table_name='model_assumptions')
+    op.drop_index('ix_metabolite_compartment', table_name='metabolite_compartment')
+    op.drop_index(op.f('ix_metabolite_compartment_compartment_id'), table_name='metabolite_compartment')
+    op.drop_index('ix_metabolite_chebi', table_name='metabolite_chebi')
+    op.drop_index(op.f('ix_metabolite_chebi_chebi_id'), table_name='metabolite_chebi')
+    op.drop_index('ix_gibbs_energy_reaction_model_reaction_id_model_id', table_name='gibbs_energy_reaction_model')
+    op.drop_index(op.f('ix_gibbs_energy_reaction_model_model_id'), table_name='gibbs_energy_reaction_model')
+    op.drop_index(op.f('ix_gibbs_energy_reaction_model_gibbs_energy_id'), table_name='gibbs_energy_reaction_model')
+    op.drop_index(op.f('ix_enzyme_structure_organism_id'), table_name='enzyme_structure')
+    op.drop_index(op.f('ix_enzyme_structure_enzyme_id'), table_name='enzyme_structure')
+    op.drop_index('ix_enzyme_reaction_organism_model', table_name='enzyme_reaction_organism_model')
+    op.drop_index(op.f('ix_enzyme_reaction_organism_model_enzyme_reaction_organism_id'), table_name='enzyme_reaction_organism_model')
+    op.drop_index(op.f('ix_enzyme_reaction_organism_reaction_id'), table_name='enzyme_reaction_organism')
+    op.drop_index(op.f('ix_enzyme_reaction_organism_organism_id'), table_name='enzyme_reaction_organism')
+    op.drop_index('ix_enzyme_reaction_misc_info_model', table_name='enzyme_reaction_misc_info_model')
+    op.drop_index(op.f('ix_enzyme_reaction_misc_info_model_misc_info_id'), table_name='enzyme_reaction_misc_info_model')
+    op.drop_index(op.f('ix_enzyme_reaction_misc_info_enz_rxn_org_id'), table_name='enzyme_reaction_misc_info')
+    op.drop_index('ix_enzyme_reaction_inhibition_model', table_name='enzyme_reaction_inhibition_model')
+    op.drop_index(op.f('ix_enzyme_reaction_inhibition_model_inhibition_id'), table_name='enzyme_reaction_inhibition_model')
+    op.drop_index(op.f('ix_enzyme_reaction_inhibition_inhibitor_met_id'), table_name='enzyme_reaction_inhibition')
+    op.drop_index(op.f('ix_enzyme_reaction_inhibition_enz_rxn_org_id'), table_name='enzyme_reaction_inhibition')
+    op.drop_index(op.f('ix_enzyme_reaction_inhibition_affected_met_id'), table_name='enzyme_reaction_inhibition')
+    op.drop_index('ix_enzyme_reaction_effector_model', table_name='enzyme_reaction_effector_model')
+    op.drop_index(op.f('ix_enzyme_reaction_effector_model_effector_id'), table_name='enzyme_reaction_effector_model')
+    op.drop_index(op.f('ix_enzyme_reaction_effector_enz_rxn_org_id'), table_name='enzyme_reaction_effector')
+    op.drop_index(op.f('ix_enzyme_reaction_effector_effector_met_id'), table_name='enzyme_reaction_effector')
+    op.drop_index('ix_enzyme_reaction_activation_model', table_name='enzyme_reaction_activation_model')
+    op.drop_index(op.f('ix_enzyme_reaction_activation_model_activation_id'), table_name='enzyme_reaction_activation_model')
+    op.drop_index(op.f('ix_enzyme_reaction_activation_enz_rxn_org_id'), table_name='enzyme_reaction_activation')
+    op.drop_index(op.f('ix_enzyme_reaction_activation_activator_met_id'), table_name='enzyme_reaction_activation')
+    op.drop_index(op.f('ix_enzyme_organism_organism_id'), table_name='enzyme_organism')
+    op.drop_index(op.f('ix_enzyme_organism_enzyme_id'), table_name='enzyme_organism')
+    op.drop_index(op.f('ix_enzyme_gene_organism_enzyme_id'), table_name='enzyme_gene_organism')
+    op.drop_index(op.f('ix_enzyme_complex_subunit_enzyme_subunit_id'), table_name='enzyme_complex_subunit')
+    op.drop_index('ix_enzyme_complex_subunit', table_name='enzyme_complex_subunit')
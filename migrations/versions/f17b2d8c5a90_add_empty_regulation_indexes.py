@@ -0,0 +1,30 @@
+"""add indexes for regulations without data
+
+Revision ID: f17b2d8c5a90
+Revises: c3a7d91f4e28
+Create Date: 2026-10-20 00:27:09.318246
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f17b2d8c5a90'
+down_revision = 'c3a7d91f4e28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the inhibitions and activations added by the model import, with only the metabolite
+    op.create_index('ix_enzyme_reaction_inhibition_empty', 'enzyme_reaction_inhibition', ['inhibitor_met_id'],
+                    unique=False, postgresql_where=sa.text('affected_met_id IS NULL AND inhibition_type IS NULL AND '
+                                                           'inhibition_constant IS NULL'))
+    op.create_index('ix_enzyme_reaction_activation_empty', 'enzyme_reaction_activation', ['activator_met_id'],
+                    unique=False, postgresql_where=sa.text('activation_constant IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_enzyme_reaction_activation_empty', table_name='enzyme_reaction_activation')
+    op.drop_index('ix_enzyme_reaction_inhibition_empty', table_name='enzyme_reaction_inhibition')